@@ -0,0 +1,103 @@
+"""Memory held by the cache per image, before and after `StreakImage`.
+
+Before, the cache kept the long `trpl.TRPLData` of every image, with a row per
+pixel, and its streak image. Now it keeps a `StreakImage` only.
+
+    python scripts/benchmark_memory.py [--budget MIB] [IMG ...]
+
+Without images, a synthetic image of --shape is measured as a long DataFrame.
+"""
+
+import argparse
+import gc
+import tracemalloc
+import typing as t
+from collections import abc
+
+import numpy as np
+import pandas as pd
+
+from dawa_trpl import streak
+
+
+def measure(load: abc.Callable[[], t.Any]) -> int:
+    # Bytes allocated by `load` that are still alive while its result is
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = load()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def synthetic(shape: tuple[int, int]) -> tuple[int, int]:
+    rng = np.random.default_rng(0)
+    n_time, n_wavelength = shape
+    time = np.linspace(0.0, 10.0, n_time, dtype=np.float32)
+    wavelength = np.linspace(400.0, 600.0, n_wavelength, dtype=np.float32)
+    counts = rng.poisson(50, shape).astype(np.uint16)
+
+    def load_before() -> tuple[pd.DataFrame, t.Any]:
+        grid_time, grid_wavelength = np.meshgrid(time, wavelength, indexing="ij")
+        df = pd.DataFrame(
+            dict(
+                time=grid_time.ravel(),
+                wavelength=grid_wavelength.ravel(),
+                intensity=counts.ravel().astype(np.float64),
+            )
+        )
+        return df, df["intensity"].to_numpy().reshape(shape).copy()
+
+    def load_after() -> streak.StreakImage:
+        return streak.StreakImage(time, wavelength, counts.copy(), [])
+
+    return measure(load_before), measure(load_after)
+
+
+def real(filepath: str) -> tuple[int, int]:
+    from tlab_analysis import trpl
+
+    def load_before() -> tuple[trpl.TRPLData, t.Any]:
+        data = trpl.read_file(filepath)
+        return data, np.asarray(data.to_streak_image())
+
+    def load_after() -> streak.StreakImage:
+        return streak.StreakImage.from_trpl_data(trpl.read_file(filepath))
+
+    return measure(load_before), measure(load_after)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", help=".img files")
+    parser.add_argument("--budget", type=float, default=1024, help="cache in MiB")
+    parser.add_argument(
+        "--shape", type=int, nargs=2, default=(480, 640), metavar=("TIME", "WL")
+    )
+    args = parser.parse_args()
+    budget = args.budget * 1024**2
+    results = (
+        {path: real(path) for path in args.paths}
+        if args.paths
+        else {f"synthetic {args.shape[0]}x{args.shape[1]}": synthetic(args.shape)}
+    )
+    print(f"{'image':<40} {'before MiB':>10} {'after MiB':>10} {'ratio':>6}")
+    for name, (before, after) in results.items():
+        print(
+            f"{name:<40} {before / 1024**2:>10.2f} {after / 1024**2:>10.2f} "
+            f"{before / after:>6.1f}"
+        )
+    before = np.mean([before for before, _ in results.values()])
+    after = np.mean([after for _, after in results.values()])
+    print(
+        f"Images in a {args.budget:g} MiB cache: "
+        f"{int(budget // before)} before, {int(budget // after)} after"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Memory and figure JSON of spectra and decays in float64 and float32.
+
+Aggregates are kept in `DAWA_TRPL_PRECISION`, while fits are computed in
+float64 either way; the relative difference of fitted curves is reported.
+
+    python scripts/benchmark_precision.py [--fitting] [IMG ...]
+
+Without images, a synthetic decay of --shape is measured.
+"""
+
+import argparse
+import contextlib
+import os
+import tempfile
+from collections import abc
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from dawa_trpl import config, streak
+from dawa_trpl import data_system as ds
+from dawa_trpl.components.tabs.h_figure_tab import process as h_process
+from dawa_trpl.components.tabs.v_figure_tab import process as v_process
+
+PRECISIONS = ("float64", "float32")
+
+
+def synthetic_image(shape: tuple[int, int]) -> streak.StreakImage:
+    rng = np.random.default_rng(0)
+    n_time, n_wavelength = shape
+    time = np.linspace(0.0, 20.0, n_time, dtype=np.float32)
+    wavelength = np.linspace(400.0, 600.0, n_wavelength, dtype=np.float32)
+    t = np.clip(time - 2.0, 0.0, None)
+    decay = (time >= 2.0) * (5000 * np.exp(-t / 1.5) + 1500 * np.exp(-t / 6.0))
+    spectrum = np.exp(-(((wavelength - 500.0) / 30.0) ** 2))
+    counts = rng.poisson(np.outer(decay, spectrum) + 20).astype(np.uint16)
+    return streak.StreakImage(time, wavelength, counts, [])
+
+
+def measure(
+    filepaths: list[str], fitting: bool
+) -> dict[str, tuple[int, int, list[pd.DataFrame]]]:
+    # Bytes of the dataframes and of the figure JSON, and the decays
+    results = dict()
+    for precision in PRECISIONS:
+        with mock.patch.object(config, "PRECISION", precision):
+            ds._load_wavelength_df.cache_clear()
+            ds._load_time_df.cache_clear()
+            wdfs = ds.load_wavelength_dfs(filepaths)
+            tdfs = ds.load_time_dfs(filepaths, fitting=fitting)
+        h_fig = h_process.create_figure(wdfs)
+        v_fig = v_process.create_figure(tdfs)
+        if fitting:
+            v_fig = v_process.add_fitting_curve(v_fig, tdfs)
+        memory = sum(int(df.memory_usage(index=False).sum()) for df in [*wdfs, *tdfs])
+        results[precision] = (
+            memory,
+            len(h_fig.to_json()) + len(v_fig.to_json()),
+            tdfs,
+        )
+    return results
+
+
+def max_fit_difference(
+    expected: abc.Iterable[pd.DataFrame], actual: abc.Iterable[pd.DataFrame]
+) -> float:
+    return max(
+        float(np.nanmax(np.abs(b["fit"] - a["fit"])) / np.nanmax(a["fit"]))
+        for a, b in zip(expected, actual)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", help=".img files")
+    parser.add_argument("--fitting", action="store_true", help="fit the decays")
+    parser.add_argument(
+        "--shape", type=int, nargs=2, default=(1024, 1344), metavar=("TIME", "WL")
+    )
+    args = parser.parse_args()
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(config, "STORE_DIR", ""))
+        filepaths = args.paths
+        if not filepaths:
+            # The store is disabled, so the file only has to exist
+            tmpdir = stack.enter_context(tempfile.TemporaryDirectory())
+            filepaths = [os.path.join(tmpdir, "synthetic.img")]
+            open(filepaths[0], "wb").close()
+            stack.enter_context(
+                mock.patch.object(
+                    ds, "load_image", return_value=synthetic_image(args.shape)
+                )
+            )
+        results = measure(filepaths, args.fitting)
+    print(f"{'precision':<10} {'memory KiB':>10} {'JSON KiB':>10}")
+    for precision, (memory, size, _) in results.items():
+        print(f"{precision:<10} {memory / 1024:>10.1f} {size / 1024:>10.1f}")
+    if args.fitting:
+        difference = max_fit_difference(results["float64"][2], results["float32"][2])
+        print(f"Maximum difference of fitted curves: {difference:.2e} of the peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,80 @@
-from dawa_trpl import app
+import argparse
+from collections import abc
+
+from werkzeug import serving
+
+from dawa_trpl import asgi, batch, export, models
+
+
+def parse_args(argv: abc.Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m dawa_trpl")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("serve", help="run the app (default)")
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="process images without the app",
+        description="Writes the spectrum, the decay and the peaks of every image "
+        "and a summary of them. Images processed by a previous run are skipped.",
+    )
+    batch_parser.add_argument(
+        "paths", nargs="+", help="directories of .img files or glob patterns"
+    )
+    batch_parser.add_argument(
+        "-o", "--out-dir", default="dawa_trpl_batch", help="output directory"
+    )
+    batch_parser.add_argument(
+        "-w",
+        "--wavelength-range",
+        nargs=2,
+        type=float,
+        metavar=("START", "STOP"),
+        help="wavelength range of the decays in nm (default: the whole range)",
+    )
+    batch_parser.add_argument(
+        "-m", "--model", choices=list(models.MODELS), default=models.DEFAULT_MODEL
+    )
+    batch_parser.add_argument(
+        "--irf", metavar="PATH", help="image of the IRF to fit the decays with"
+    )
+    batch_parser.add_argument(
+        "-f", "--format", choices=list(export.TABLE_FORMATS), default="csv"
+    )
+    batch_parser.add_argument(
+        "--pptx", action="store_true", help="write a PowerPoint file per image"
+    )
+    batch_parser.add_argument(
+        "--overwrite", action="store_true", help="process every image again"
+    )
+    batch_parser.add_argument(
+        "-j", "--workers", type=int, help="processes (default: DAWA_TRPL_WORKERS)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: abc.Sequence[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.command != "batch":
+        # The app is only built to be served, not to process a batch
+        from dawa_trpl import web
+
+        # The app is served by a child process of the reloader
+        if serving.is_running_from_reloader():
+            asgi.start_background_tasks()
+        web.app.run_server(debug=True)
+        return
+    options = batch.Options(
+        out_dir=args.out_dir,
+        wavelength_range=(
+            tuple(args.wavelength_range) if args.wavelength_range else None
+        ),
+        model=args.model,
+        irf=args.irf,
+        file_format=args.format,
+        pptx=args.pptx,
+        overwrite=args.overwrite,
+    )
+    batch.run(batch.find_files(args.paths), options, args.workers)
+
 
 if __name__ == "__main__":
-    app.run_server(debug=True)
+    main()
@@ -0,0 +1,93 @@
+import dataclasses
+import typing as t
+
+import numpy as np
+import numpy.typing as npt
+from scipy import optimize
+
+Array = npt.NDArray[np.float64]
+
+
+@dataclasses.dataclass(frozen=True)
+class GlobalAnalysis:
+    time: Array  # (n_time,) of the fitted window
+    wavelength: Array  # (n_wavelength,)
+    lifetimes: Array  # (n_components,) in ascending order
+    das: Array  # (n_components, n_wavelength)
+    singular_values: Array  # (min(n_time, n_wavelength),)
+    residuals: Array  # (n_time, n_wavelength)
+    cost: float
+
+    def to_arrays(self) -> dict[str, npt.NDArray[t.Any]]:
+        return {
+            field.name: np.asarray(getattr(self, field.name), dtype=np.float64)
+            for field in dataclasses.fields(self)
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, npt.NDArray[t.Any]]) -> "GlobalAnalysis":
+        return cls(
+            time=arrays["time"],
+            wavelength=arrays["wavelength"],
+            lifetimes=arrays["lifetimes"],
+            das=arrays["das"],
+            singular_values=arrays["singular_values"],
+            residuals=arrays["residuals"],
+            cost=float(arrays["cost"]),
+        )
+
+
+def exponential_basis(time: Array, lifetimes: Array) -> Array:
+    return np.exp(-time[:, np.newaxis] / lifetimes[np.newaxis, :])
+
+
+def _projected_residual(log_lifetimes: Array, time: Array, data: Array) -> Array:
+    # Variable projection: the amplitudes are eliminated by projecting the data
+    # onto the orthogonal complement of the exponential basis
+    q, _ = np.linalg.qr(exponential_basis(time, np.exp(log_lifetimes)))
+    return (data - q @ (q.T @ data)).ravel()
+
+
+def global_fit(
+    time: Array,
+    wavelength: Array,
+    image: Array,
+    n_components: int,
+    rank: int,
+    lifetimes0: Array | None = None,
+) -> GlobalAnalysis:
+    if n_components < 1:
+        raise ValueError("The number of components must be a positive integer.")
+    if rank < n_components:
+        raise ValueError("The rank must not be less than the number of components.")
+    image = np.asarray(image, dtype=np.float64)
+    # The decays are fitted from the peak of the wavelength-integrated decay
+    start = int(np.argmax(image.sum(axis=1)))
+    time, image = time[start:], image[start:]
+    shifted = time - time[0]
+    # A single SVD gives both the spectrum of singular values and the basis
+    u, singular_values, _ = np.linalg.svd(image, full_matrices=False)
+    u, s = u[:, :rank], singular_values[:rank]
+    if lifetimes0 is None:
+        span = shifted[-1] - shifted[0]
+        lifetimes0 = np.geomspace(span / 50, span / 3, n_components)
+    # The fit runs on the rank-reduced matrix of (n_time, rank) instead of the
+    # whole image, which keeps every residual evaluation cheap
+    result = optimize.least_squares(
+        _projected_residual,
+        np.log(lifetimes0),
+        args=(shifted, u * s),
+    )
+    lifetimes = np.sort(np.exp(result.x))
+    basis = exponential_basis(shifted, lifetimes)
+    das, *_ = np.linalg.lstsq(basis, image, rcond=None)
+    residuals = image - basis @ das
+    return GlobalAnalysis(
+        time=np.asarray(time, dtype=np.float64),
+        wavelength=np.asarray(wavelength, dtype=np.float64),
+        lifetimes=lifetimes,
+        das=np.asarray(das, dtype=np.float64),
+        singular_values=np.asarray(singular_values, dtype=np.float64),
+        residuals=residuals,
+        cost=float(np.sum(residuals**2)),
+    )
@@ -0,0 +1,210 @@
+import os
+import typing as t
+from collections import abc
+
+import flask
+import numpy as np
+import pandas as pd
+from werkzeug import exceptions
+
+from dawa_trpl import config, export, models
+from dawa_trpl import data_system as ds
+
+ARROW_MIMETYPE = "application/vnd.apache.arrow.file"
+
+blueprint = flask.Blueprint("api", __name__)
+
+
+@blueprint.errorhandler(exceptions.HTTPException)
+def handle_error(error: exceptions.HTTPException) -> tuple[flask.Response, int]:
+    return flask.jsonify(error=error.description), error.code or 500
+
+
+def get_upload_dir(session: str) -> str:
+    # Sessions are the upload directories, which are shared with the app
+    upload_dir = os.path.join(config.UPLOAD_BASEDIR, session)
+    if (
+        os.path.basename(session) != session
+        or session.startswith(".")
+        or not os.path.isdir(upload_dir)
+    ):
+        raise exceptions.NotFound(f"No session {session}")
+    return upload_dir
+
+
+def get_filepaths(upload_dir: str) -> list[str]:
+    item_names = flask.request.args.getlist("item")
+    if not item_names:
+        raise exceptions.BadRequest("No item is given")
+    missing = [
+        name
+        for name, filepath in zip(
+            item_names, ds.get_item_filepaths(item_names, upload_dir)
+        )
+        if filepath is None
+    ]
+    if missing:
+        raise exceptions.NotFound(f"No items {', '.join(missing)}")
+    return ds.get_existing_item_filepaths(item_names, upload_dir)
+
+
+def get_range(name: str) -> tuple[float, float] | None:
+    value = flask.request.args.get(name)
+    if not value:
+        return None
+    try:
+        start, stop = map(float, value.split(","))
+    except ValueError:
+        raise exceptions.BadRequest(f"{name} must be START,STOP") from None
+    return start, stop
+
+
+def get_flag(name: str) -> bool:
+    value = flask.request.args.get(name, "false").lower()
+    if value not in ("true", "false", "1", "0"):
+        raise exceptions.BadRequest(f"{name} must be true or false")
+    return value in ("true", "1")
+
+
+def get_model() -> str:
+    model = flask.request.args.get("model", models.DEFAULT_MODEL)
+    if model not in models.MODELS:
+        raise exceptions.BadRequest(f"Unknown model {model}")
+    return model
+
+
+def get_irf_filepath(upload_dir: str) -> str | None:
+    # An item of the session measuring the instrument response, as in the app
+    item_name = flask.request.args.get("irf")
+    if not item_name:
+        return None
+    filepath = ds.get_item_filepath(item_name, upload_dir)
+    if filepath is None:
+        raise exceptions.NotFound(f"No item {item_name}")
+    return filepath
+
+
+def _to_json_values(df: pd.DataFrame) -> dict[str, list[t.Any]]:
+    # NaN and infinities are not valid in JSON
+    return {
+        str(column): [v if np.isfinite(v) else None for v in values.tolist()]
+        if values.dtype.kind == "f"
+        else values.tolist()
+        for column, values in df.items()
+    }
+
+
+def _to_json_attrs(obj: t.Any) -> t.Any:
+    # Fits which have not converged have NaN parameters and covariances
+    if isinstance(obj, abc.Mapping):
+        return {key: _to_json_attrs(value) for key, value in obj.items()}
+    if isinstance(obj, np.ndarray):
+        obj = obj.tolist()
+    if isinstance(obj, (list, tuple)):
+        return [_to_json_attrs(value) for value in obj]
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if np.isfinite(obj) else None
+    return obj
+
+
+def respond(item_names: abc.Sequence[str], dfs: abc.Sequence[pd.DataFrame]) -> t.Any:
+    # JSON by default, or a single Arrow IPC table of every item with an `item`
+    # column and the attrs of each under its name
+    file_format = flask.request.args.get("format")
+    if file_format is None and flask.request.accept_mimetypes.best == ARROW_MIMETYPE:
+        file_format = "arrow"
+    if file_format == "arrow":
+        df = pd.concat(
+            [df.assign(item=name) for name, df in zip(item_names, dfs)],
+            ignore_index=True,
+        )
+        df = df[["item", *df.columns.drop("item")]]
+        df.attrs = {name: frame.attrs for name, frame in zip(item_names, dfs)}
+        return flask.Response(export.df_to_arrow(df), mimetype=ARROW_MIMETYPE)
+    if file_format not in (None, "json"):
+        raise exceptions.BadRequest(f"Unsupported format {file_format}")
+    body = dict(
+        items=[
+            dict(item=name, attrs=_to_json_attrs(df.attrs), data=_to_json_values(df))
+            for name, df in zip(item_names, dfs)
+        ]
+    )
+    return flask.Response(export.dump_attrs(body), mimetype="application/json")
+
+
+@blueprint.post("/sessions")
+def create_session() -> tuple[flask.Response, int]:
+    upload_dir = ds.create_upload_dir()
+    return flask.jsonify(session=os.path.basename(upload_dir)), 201
+
+
+@blueprint.get("/sessions/<session>/items")
+def list_items(session: str) -> flask.Response:
+    return flask.jsonify(items=ds.get_item_names(get_upload_dir(session)))
+
+
+@blueprint.post("/sessions/<session>/items")
+def upload_items(session: str) -> tuple[flask.Response, int]:
+    upload_dir = get_upload_dir(session)
+    files = flask.request.files.getlist("file")
+    if not files:
+        raise exceptions.BadRequest("No file is given")
+    filenames = [file.filename or "" for file in files]
+    for filename in filenames:
+        try:
+            ds.validate_item_name(filename)
+        except ValueError as e:
+            raise exceptions.BadRequest(str(e))
+    # Each file is validated and saved on its own as by the upload bar, so
+    # that valid files are kept even when others are rejected
+    saved, errors = list(), list()
+    for filename, file in zip(filenames, files):
+        try:
+            ds.save_item(filename, file.read(), upload_dir)
+        except (ValueError, OSError) as e:
+            errors.append(f"{filename}: {str(e) or type(e).__name__}")
+        else:
+            saved.append(filename)
+    ds.register_items(saved, upload_dir)
+    if errors:
+        raise exceptions.BadRequest("Invalid files: " + "; ".join(errors))
+    return flask.jsonify(items=saved), 201
+
+
+@blueprint.get("/sessions/<session>/spectra")
+def get_spectra(session: str) -> t.Any:
+    filepaths = get_filepaths(get_upload_dir(session))
+    dfs = ds.load_wavelength_dfs(
+        filepaths,
+        normalize_intensity=get_flag("normalize"),
+        time_range=get_range("time_range"),
+    )
+    return respond(flask.request.args.getlist("item"), dfs)
+
+
+@blueprint.get("/sessions/<session>/decays")
+def get_decays(session: str) -> t.Any:
+    upload_dir = get_upload_dir(session)
+    filepaths = get_filepaths(upload_dir)
+    dfs = ds.load_time_dfs(
+        filepaths,
+        wavelength_range=get_range("wavelength_range"),
+        fitting=get_flag("fitting"),
+        normalize_intensity=get_flag("normalize"),
+        irf_filepath=get_irf_filepath(upload_dir),
+        model=get_model(),
+    )
+    return respond(flask.request.args.getlist("item"), dfs)
+
+
+@blueprint.get("/sessions/<session>/peaks")
+def get_peaks(session: str) -> t.Any:
+    filepaths = get_filepaths(get_upload_dir(session))
+    dfs = [ds.load_peaks_df(filepath) for filepath in filepaths]
+    return respond(flask.request.args.getlist("item"), dfs)
+
+
+def register(server: flask.Flask) -> None:
+    server.register_blueprint(
+        blueprint, url_prefix=config.URL_BASE_PATH.rstrip("/") + "/api"
+    )
@@ -0,0 +1,49 @@
+import threading
+import typing as t
+from collections import abc
+
+from asgiref import wsgi
+
+from dawa_trpl import janitor, watch
+
+Scope = dict[str, t.Any]
+Message = dict[str, t.Any]
+Receive = abc.Callable[[], abc.Awaitable[Message]]
+Send = abc.Callable[[Message], abc.Awaitable[None]]
+
+_started = False
+_started_lock = threading.Lock()
+
+
+def start_background_tasks() -> None:
+    # The janitor and the watcher run once in the process serving the app,
+    # rather than in every process importing the package
+    global _started
+    with _started_lock:
+        if _started:
+            return
+        _started = True
+    janitor.start()
+    watch.start()
+
+
+class Server:
+    # The WSGI app of Dash as an ASGI app, which starts the background tasks
+    # on the startup of the lifespan protocol, or on the first request for
+    # servers without it
+    def __init__(self, wsgi_app: t.Any) -> None:
+        self.app = wsgi.WsgiToAsgi(wsgi_app)  # type: ignore[no-untyped-call]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "lifespan":
+            start_background_tasks()
+            await self.app(scope, receive, send)
+            return
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                start_background_tasks()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
@@ -0,0 +1,141 @@
+// Normalization and the log scale are applied to the raw figures and tables
+// delivered by the server, so that toggling them needs no round trip.
+(function () {
+  const TYPED_ARRAYS = {
+    i1: Int8Array,
+    u1: Uint8Array,
+    u1c: Uint8ClampedArray,
+    i2: Int16Array,
+    u2: Uint16Array,
+    i4: Int32Array,
+    u4: Uint32Array,
+    f4: Float32Array,
+    f8: Float64Array,
+  };
+
+  function toArray(values) {
+    // Plotly serializes numpy arrays as base64-encoded typed arrays
+    if (values && values.bdata !== undefined) {
+      const bytes = Uint8Array.from(atob(values.bdata), (c) => c.charCodeAt(0));
+      return Array.from(new TYPED_ARRAYS[values.dtype](bytes.buffer));
+    }
+    return values || [];
+  }
+
+  function maxOf(traces) {
+    let max = -Infinity;
+    for (const trace of traces) {
+      for (const value of trace.y) {
+        if (Number.isFinite(value) && value > max) {
+          max = value;
+        }
+      }
+    }
+    return max;
+  }
+
+  function stripZeros(text) {
+    return text.includes(".") ? text.replace(/\.?0+$/, "") : text;
+  }
+
+  function formatIntensity(value) {
+    // Same as the "{:.4g}" format of Python
+    const [mantissa, power] = value.toExponential(3).split("e");
+    const exponent = Number(power);
+    if (exponent < -4 || exponent >= 4) {
+      const digits = String(Math.abs(exponent)).padStart(2, "0");
+      return `${stripZeros(mantissa)}e${exponent < 0 ? "-" : "+"}${digits}`;
+    }
+    return stripZeros(value.toFixed(3 - exponent));
+  }
+
+  function scaleTraces(figure, normalize) {
+    const scales = {};
+    const data = figure.data.map((trace) => {
+      const scale = normalize && trace.meta ? trace.meta.scale : 1;
+      if (!(trace.meta && trace.meta.fit)) {
+        scales[trace.name] = scale;
+      }
+      const y = toArray(trace.y).map((v) => (v === null ? null : v / scale));
+      return { ...trace, y };
+    });
+    return { data, scales };
+  }
+
+  function transformHFigure(figure, normalize) {
+    if (!figure) {
+      return window.dash_clientside.no_update;
+    }
+    if (!figure.data || figure.data.length === 0) {
+      return figure;
+    }
+    const { data, scales } = scaleTraces(figure, normalize);
+    // The zoom of the user is kept over updates of downsampled traces, but the
+    // y axis is reset when the intensities are rescaled
+    const layout = { ...figure.layout, uirevision: `${Boolean(normalize)}` };
+    layout.yaxis = { ...layout.yaxis, range: [0, maxOf(data) * 1.05] };
+    layout.shapes = (layout.shapes || []).map((shape) => {
+      const scale = scales[shape.name] || 1;
+      return { ...shape, y0: shape.y0 / scale, y1: shape.y1 / scale };
+    });
+    layout.annotations = (layout.annotations || []).map((annotation) => {
+      const match = /^Intensity: (.+)$/.exec(annotation.hovertext || "");
+      if (!match || !(annotation.name in scales)) {
+        return annotation;
+      }
+      const intensity = Number(match[1]) / scales[annotation.name];
+      return { ...annotation, hovertext: `Intensity: ${formatIntensity(intensity)}` };
+    });
+    return { ...figure, data, layout };
+  }
+
+  function transformVFigure(figure, normalize, logY) {
+    if (!figure) {
+      return window.dash_clientside.no_update;
+    }
+    if (!figure.data || figure.data.length === 0) {
+      return figure;
+    }
+    const { data } = scaleTraces(figure, normalize);
+    const max = maxOf(data.filter((trace) => !(trace.meta && trace.meta.fit)));
+    const range = logY ? [Math.log10(0.05 * max), Math.log10(max)] : [0.05 * max, max];
+    const layout = {
+      ...figure.layout,
+      uirevision: `${Boolean(normalize)}-${Boolean(logY)}`,
+    };
+    layout.yaxis = {
+      ...layout.yaxis,
+      type: logY ? "log" : "linear",
+      range: [range[0], range[1] * 1.05],
+    };
+    return { ...figure, data, layout };
+  }
+
+  function transformTable(table, normalize) {
+    if (!table) {
+      return null;
+    }
+    if (!normalize) {
+      return table.records;
+    }
+    const records = [];
+    let start = 0;
+    for (const [size, scale] of table.groups) {
+      for (const record of table.records.slice(start, start + size)) {
+        const normalized = { ...record };
+        for (const column of table.columns) {
+          if (typeof normalized[column] === "number") {
+            normalized[column] /= scale;
+          }
+        }
+        records.push(normalized);
+      }
+      start += size;
+    }
+    return records;
+  }
+
+  window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dawa_trpl: { transformHFigure, transformVFigure, transformTable },
+  });
+})();
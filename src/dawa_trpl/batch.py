@@ -0,0 +1,212 @@
+import concurrent.futures
+import dataclasses
+import glob
+import hashlib
+import json
+import os
+import pathlib
+import sys
+import time
+import typing as t
+from collections import abc
+
+import pandas as pd
+
+from dawa_trpl import config, export, models, store
+from dawa_trpl import data_system as ds
+
+SUMMARY_NAME = "summary"
+
+
+@dataclasses.dataclass(frozen=True)
+class Options:
+    out_dir: str
+    wavelength_range: tuple[float, float] | None = None
+    model: str = models.DEFAULT_MODEL
+    irf: str | None = None
+    file_format: str = "csv"
+    pptx: bool = False
+    overwrite: bool = False
+
+
+def find_files(patterns: abc.Iterable[str]) -> list[str]:
+    # Directories are searched for images and anything else is a glob pattern
+    filepaths: list[str] = list()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            filepaths += sorted(glob.glob(os.path.join(pattern, "*.img")))
+        else:
+            filepaths += sorted(glob.glob(pattern, recursive=True))
+    return list(dict.fromkeys(filepaths))
+
+
+def _get_output_stem(filepath: str, options: Options) -> pathlib.Path:
+    # Files of the same name in different directories are told apart by a
+    # hash of their absolute path
+    path = os.path.abspath(filepath)
+    key = hashlib.blake2b(path.encode(), digest_size=4).hexdigest()
+    return pathlib.Path(options.out_dir, f"{pathlib.Path(path).stem}-{key}")
+
+
+def get_output_paths(filepath: str, options: Options) -> dict[str, pathlib.Path]:
+    stem = _get_output_stem(filepath, options)
+    paths = {
+        name: stem.with_name(f"{stem.name}-{name}.{options.file_format}")
+        for name in ("h", "v", "peaks")
+    }
+    if options.pptx:
+        paths["pptx"] = stem.with_suffix(".pptx")
+    return paths
+
+
+def get_manifest_path(filepath: str, options: Options) -> pathlib.Path:
+    return _get_output_stem(filepath, options).with_suffix(".json")
+
+
+def get_manifest(filepath: str, options: Options) -> dict[str, t.Any]:
+    # What the outputs were computed from, so that they are only reused for
+    # the same contents of the image and the same options
+    return dict(
+        filepath=os.path.abspath(filepath),
+        digest=store.file_digest(filepath),
+        wavelength_range=(
+            list(options.wavelength_range) if options.wavelength_range else None
+        ),
+        model=models.get_model(options.model).name,
+        irf=store.file_digest(options.irf) if options.irf else None,
+        file_format=options.file_format,
+        pptx=options.pptx,
+    )
+
+
+def read_manifest(path: pathlib.Path) -> dict[str, t.Any] | None:
+    try:
+        manifest: dict[str, t.Any] = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return manifest
+
+
+def write_df(df: pd.DataFrame, path: pathlib.Path, file_format: str) -> None:
+    match file_format:
+        case "csv":
+            df.to_csv(path, index=False)
+        case "parquet":
+            path.write_bytes(export.df_to_parquet(df))
+        case "arrow":
+            path.write_bytes(export.df_to_arrow(df))
+        case _:
+            raise ValueError(f"Unsupported file format: {file_format}")
+
+
+def process_file(filepath: str, options: Options) -> tuple[pd.DataFrame, bool]:
+    # Returns the summary of the file and whether it was done by a previous run.
+    # Results are kept in the store, so that an interrupted batch resumes from
+    # the files it has not processed yet.
+    summary = ds.load_summary_df(
+        filepath, options.wavelength_range, options.model, options.irf
+    )
+    paths = get_output_paths(filepath, options)
+    manifest_path = get_manifest_path(filepath, options)
+    manifest = get_manifest(filepath, options)
+    if (
+        not options.overwrite
+        and read_manifest(manifest_path) == manifest
+        and all(path.exists() for path in paths.values())
+    ):
+        return summary, True
+    # Outputs of a previous run are stale until the manifest is written again
+    manifest_path.unlink(missing_ok=True)
+    wdf = ds.load_wavelength_df(filepath)
+    write_df(wdf, paths["h"], options.file_format)
+    tdf = ds.load_time_df(
+        filepath,
+        options.wavelength_range,
+        fitting=True,
+        irf_filepath=options.irf,
+        model=options.model,
+    )
+    write_df(tdf, paths["v"], options.file_format)
+    write_df(ds.load_peaks_df(filepath), paths["peaks"], options.file_format)
+    if options.pptx:
+        from dawa_trpl import powerpoint  # Only needed for the presentations
+
+        wavelength_range = options.wavelength_range or (
+            float(wdf["wavelength"].min()),
+            float(wdf["wavelength"].max()),
+        )
+        prs = powerpoint.build_presentation(
+            filepath,
+            wavelength_range,
+            model=options.model,
+            irf_filepath=options.irf,
+        )
+        prs.save(paths["pptx"])
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return summary, False
+
+
+def _process_file(filepath: str, options: Options) -> tuple[pd.DataFrame, bool]:
+    # Failures are reported in the summary instead of stopping the batch
+    try:
+        return process_file(filepath, options)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        summary = pd.DataFrame([dict(filename=os.path.basename(filepath), error=error)])
+        return summary, False
+
+
+def _init_worker() -> None:
+    # The processes already use every core, so each fits on a single thread
+    config.WORKERS = 1
+
+
+def run(
+    filepaths: abc.Sequence[str],
+    options: Options,
+    workers: int | None = None,
+    log: t.TextIO = sys.stderr,
+) -> pd.DataFrame:
+    os.makedirs(options.out_dir, exist_ok=True)
+    workers = config.WORKERS if workers is None else workers
+    start = time.perf_counter()
+    summaries: dict[str, pd.DataFrame] = dict()
+    n_resumed = 0
+    # A single worker runs in this process
+    executor: concurrent.futures.Executor = (
+        concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker)
+        if workers > 1
+        else concurrent.futures.ThreadPoolExecutor(1)
+    )
+    with executor:
+        futures = {
+            executor.submit(_process_file, filepath, options): filepath
+            for filepath in filepaths
+        }
+        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            filepath = futures[future]
+            summary, resumed = future.result()
+            summaries[filepath] = summary
+            n_resumed += resumed
+            status = "resumed" if resumed else "done"
+            if "error" in summary:
+                status = "failed: " + summary["error"].iloc[0]
+            print(f"[{i}/{len(filepaths)}] {filepath}: {status}", file=log)
+    # Rows are in the order of the files rather than of completion
+    rows = [summaries[filepath] for filepath in filepaths]
+    df = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
+    if rows:
+        write_df(
+            df,
+            pathlib.Path(options.out_dir, f"{SUMMARY_NAME}.{options.file_format}"),
+            options.file_format,
+        )
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(filepath) for filepath in filepaths) / 1024**2
+    print(
+        f"Processed {len(filepaths)} files ({n_resumed} resumed, {size:.1f} MiB) "
+        f"in {elapsed:.1f} s: {len(filepaths) / max(elapsed, 1e-9):.2f} files/s, "
+        f"{size / max(elapsed, 1e-9):.1f} MiB/s",
+        file=log,
+    )
+    return df
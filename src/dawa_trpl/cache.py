@@ -0,0 +1,76 @@
+import collections
+import functools
+import threading
+import typing as t
+from collections import abc
+
+P = t.ParamSpec("P")
+R = t.TypeVar("R")
+
+
+class CacheInfo(t.NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class LRUCache(t.Generic[P, R]):
+    # `functools.lru_cache` of functions of files, of which the entries of some
+    # files can be dropped when they are replaced. An entry belongs to every
+    # file passed as an argument, such as an image and its IRF.
+    def __init__(self, func: abc.Callable[P, R], maxsize: int) -> None:
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.maxsize = maxsize
+        self._entries: collections.OrderedDict[abc.Hashable, R] = (
+            collections.OrderedDict()
+        )
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args: P.args, **kwargs: P.kwargs) -> R:
+        key = (args, tuple(kwargs.items()))
+        with self._lock:
+            if key in self._entries:
+                self._hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self._misses += 1
+        # Computed without the lock, so that other files are not blocked
+        result = self.func(*args, **kwargs)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._entries))
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+
+    def cache_discard(self, filepaths: abc.Collection[str]) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                args, kwargs = t.cast(
+                    tuple[tuple[t.Any, ...], tuple[tuple[str, t.Any], ...]], key
+                )
+                values = [*args, *(value for _, value in kwargs)]
+                if any(isinstance(v, str) and v in filepaths for v in values):
+                    del self._entries[key]
+
+
+def lru_cache(
+    maxsize: int,
+) -> abc.Callable[[abc.Callable[P, R]], LRUCache[P, R]]:
+    def decorator(func: abc.Callable[P, R]) -> LRUCache[P, R]:
+        return LRUCache(func, maxsize)
+
+    return decorator
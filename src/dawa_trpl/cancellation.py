@@ -0,0 +1,44 @@
+import contextlib
+import contextvars
+import itertools
+import threading
+from collections import abc
+
+_generations: dict[abc.Hashable, int] = dict()
+_counter = itertools.count(1)
+_lock = threading.Lock()
+_should_stop: contextvars.ContextVar[abc.Callable[[], bool] | None] = (
+    contextvars.ContextVar("should_stop", default=None)
+)
+
+
+class Cancelled(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def latest_only(key: abc.Hashable) -> abc.Generator[None, None, None]:
+    # A request supersedes every earlier one with the same key, which then
+    # stops at its next check. Generations never repeat so that a request
+    # cannot become current again once it is superseded.
+    with _lock:
+        generation = next(_counter)
+        _generations[key] = generation
+    token = _should_stop.set(lambda: _generations.get(key) != generation)
+    try:
+        yield
+    finally:
+        _should_stop.reset(token)
+        with _lock:
+            if _generations.get(key) == generation:
+                del _generations[key]
+
+
+def current() -> abc.Callable[[], bool] | None:
+    return _should_stop.get()
+
+
+def check() -> None:
+    should_stop = current()
+    if should_stop is not None and should_stop():
+        raise Cancelled
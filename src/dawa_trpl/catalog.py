@@ -0,0 +1,199 @@
+import contextlib
+import dataclasses
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import typing as t
+from collections import abc
+
+from tlab_analysis import trpl
+
+from dawa_trpl import config, img_header, store
+
+CATALOG_FILENAME = ".catalog.json"
+
+
+@dataclasses.dataclass(frozen=True)
+class Entry:
+    name: str
+    size: int
+    digest: str
+    metadata: list[str] | None = None
+    wavelength_range: tuple[float, float] | None = None
+    time_range: tuple[float, float] | None = None
+
+    def to_dict(self) -> dict[str, t.Any]:
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict[str, t.Any]) -> "Entry":
+        return cls(
+            name=d["name"],
+            size=d["size"],
+            digest=d["digest"],
+            metadata=d["metadata"],
+            wavelength_range=_to_range(d["wavelength_range"]),
+            time_range=_to_range(d["time_range"]),
+        )
+
+
+def _to_range(value: abc.Sequence[float] | None) -> tuple[float, float] | None:
+    return None if value is None else (float(value[0]), float(value[1]))
+
+
+def read_entry(filepath: str) -> Entry:
+    entry = Entry(
+        name=os.path.basename(filepath),
+        size=os.path.getsize(filepath),
+        digest=store.file_digest(filepath),
+    )
+    try:
+        header = img_header.read_header(filepath)
+    except img_header.HeaderError:
+        pass
+    else:
+        return dataclasses.replace(
+            entry,
+            metadata=header.metadata,
+            wavelength_range=header.wavelength_range,
+            time_range=header.time_range,
+        )
+    # Falls back to decoding the whole file when the header is not understood
+    try:
+        data = trpl.read_file(filepath)
+    except Exception:
+        return entry
+    return dataclasses.replace(
+        entry,
+        metadata=list(data.metadata),
+        wavelength_range=(float(data.wavelength.min()), float(data.wavelength.max())),
+        time_range=(float(data.time.min()), float(data.time.max())),
+    )
+
+
+class Catalog:
+    def __init__(self, upload_dir: str, path: str | None = None) -> None:
+        self.upload_dir = upload_dir
+        self.path = path or os.path.join(upload_dir, CATALOG_FILENAME)
+        self._entries: dict[str, Entry] = dict()
+        self._loaded_mtime_ns: int | None = None
+        self._lock = threading.RLock()
+        with self._lock:
+            if not self._load():
+                self.scan()
+
+    def _load(self) -> bool:
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            with open(self.path) as f:
+                entries = [Entry.from_dict(d) for d in json.load(f)]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self._entries = {entry.name: entry for entry in entries}
+        self._loaded_mtime_ns = mtime_ns
+        return True
+
+    def _refresh(self) -> None:
+        # Another process may have updated the persisted catalog
+        with contextlib.suppress(OSError):
+            if os.stat(self.path).st_mtime_ns != self._loaded_mtime_ns:
+                self._load()
+
+    def save(self) -> None:
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd, tmppath = tempfile.mkstemp(
+                dir=os.path.dirname(self.path), prefix=".catalog-"
+            )
+            with os.fdopen(fd, "w") as f:
+                json.dump([entry.to_dict() for entry in self._entries.values()], f)
+            os.replace(tmppath, self.path)
+            self._loaded_mtime_ns = os.stat(self.path).st_mtime_ns
+
+    def scan(self) -> None:
+        with self._lock:
+            self._entries = dict()
+            if os.path.isdir(self.upload_dir):
+                with os.scandir(self.upload_dir) as entries:
+                    filepaths = [
+                        entry.path
+                        for entry in entries
+                        if entry.is_file() and not entry.name.startswith(".")
+                    ]
+                for filepath in filepaths:
+                    entry = read_entry(filepath)
+                    self._entries[entry.name] = entry
+                self.save()
+
+    def add(self, names: abc.Iterable[str]) -> list[Entry]:
+        with self._lock:
+            self._refresh()
+            entries = [
+                read_entry(os.path.join(self.upload_dir, name)) for name in names
+            ]
+            self._entries.update((entry.name, entry) for entry in entries)
+            self.save()
+            return entries
+
+    def discard(self, names: abc.Iterable[str]) -> None:
+        with self._lock:
+            self._refresh()
+            for name in names:
+                self._entries.pop(name, None)
+            if os.path.isdir(self.upload_dir):
+                self.save()
+
+    def names(self) -> list[str]:
+        with self._lock:
+            self._refresh()
+            return list(self._entries.keys())
+
+    def get(self, name: str) -> Entry | None:
+        with self._lock:
+            self._refresh()
+            return self._entries.get(name)
+
+    def get_filepath(self, name: str) -> str | None:
+        entry = self.get(name)
+        return None if entry is None else os.path.join(self.upload_dir, entry.name)
+
+
+def get_catalog_path(upload_dir: str) -> str:
+    # The watched directory is shared with the instrument and may be read-only,
+    # so its catalog is kept in the store, or next to the upload directories
+    if not config.WATCH_DIR or os.path.abspath(upload_dir) != os.path.abspath(
+        config.WATCH_DIR
+    ):
+        return os.path.join(upload_dir, CATALOG_FILENAME)
+    key = hashlib.blake2b(
+        os.path.abspath(upload_dir).encode(), digest_size=8
+    ).hexdigest()
+    return os.path.join(
+        config.STORE_DIR or config.UPLOAD_BASEDIR, f".watch-catalog-{key}.json"
+    )
+
+
+_catalogs: dict[str, Catalog] = dict()
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(upload_dir: str) -> Catalog:
+    with _catalogs_lock:
+        if upload_dir not in _catalogs:
+            _catalogs[upload_dir] = Catalog(upload_dir, get_catalog_path(upload_dir))
+        return _catalogs[upload_dir]
+
+
+def discard_filepaths(filepaths: abc.Iterable[str]) -> None:
+    upload_dir_to_names: dict[str, list[str]] = dict()
+    for filepath in filepaths:
+        upload_dir, name = os.path.split(filepath)
+        upload_dir_to_names.setdefault(upload_dir, list()).append(name)
+    for upload_dir, names in upload_dir_to_names.items():
+        if os.path.isdir(upload_dir):
+            get_catalog(upload_dir).discard(names)
+        else:
+            with _catalogs_lock:
+                _catalogs.pop(upload_dir, None)
@@ -1,25 +1,55 @@
 import dash_bootstrap_components as dbc
 
-from . import h_figure_tab, streak_image_tab, v_figure_tab
+from . import (
+    common,
+    global_analysis_tab,
+    h_figure_tab,
+    lifetime_map_tab,
+    live_tab,
+    streak_image_tab,
+    v_figure_tab,
+)
 
 layout = dbc.Tabs(
     [
         dbc.Tab(
             streak_image_tab.layout,
             id="streak-image-tab",
+            tab_id=streak_image_tab.TAB_ID,
             label="Streak Image",
         ),
         dbc.Tab(
             h_figure_tab.layout,
             id="h-figure-tab",
+            tab_id=h_figure_tab.TAB_ID,
             label="H-Figure",
         ),
         dbc.Tab(
             v_figure_tab.layout,
             id="v-figure-tab",
+            tab_id=v_figure_tab.TAB_ID,
             label="V-Figure",
         ),
+        dbc.Tab(
+            lifetime_map_tab.layout,
+            id="lifetime-map-tab",
+            tab_id=lifetime_map_tab.TAB_ID,
+            label="Lifetime Map",
+        ),
+        dbc.Tab(
+            global_analysis_tab.layout,
+            id="global-analysis-tab",
+            tab_id=global_analysis_tab.TAB_ID,
+            label="Global Analysis",
+        ),
+        dbc.Tab(
+            live_tab.layout,
+            id="live-tab",
+            tab_id=live_tab.TAB_ID,
+            label="Live",
+        ),
     ],
-    id="figure-tabs",
+    id=common.TABS_ID,
+    active_tab=streak_image_tab.TAB_ID,
     className="nav-fill",
 )
@@ -1,9 +1,14 @@
+import contextlib
 import typing as t
+from collections import abc
 
+import dash
 import dash_bootstrap_components as dbc
 from dash import dash_table, dcc
 
-from dawa_trpl import typing
+from dawa_trpl import cancellation, typing
+
+TABS_ID = "figure-tabs"
 
 
 def create_graph(**kwargs: t.Any) -> dcc.Graph:
@@ -46,16 +51,103 @@ def create_layout(
     graph: dcc.Graph | None = None,
     options: dbc.Container | None = None,
     table: dash_table.DataTable | None = None,
+    figure_store: dcc.Store | None = None,
+    table_store: dcc.Store | None = None,
 ) -> dbc.Container:
+    # Stores hold the raw outputs which are transformed in the browser, and the
+    # figure store stays within the spinner as it is the one waited for
     container = dbc.Container(
         [
             dbc.Row(
                 [
-                    dbc.Col(dcc.Loading(graph, type="circle"), width=12, lg=9),
+                    dbc.Col(
+                        dcc.Loading([graph, figure_store], type="circle"),
+                        width=12,
+                        lg=9,
+                    ),
                     dbc.Col(options, width=12, lg=3),
                 ]
             ),
-            dbc.Row([dbc.Col(table)]),
+            dbc.Row([dbc.Col([table, table_store])]),
         ]
     )
     return container
+
+
+@contextlib.contextmanager
+def latest_only(*key: abc.Hashable) -> abc.Generator[None, None, None]:
+    # Drops an update superseded by a newer request with the same key
+    try:
+        with cancellation.latest_only(key):
+            yield
+    except cancellation.Cancelled:
+        raise dash.exceptions.PreventUpdate
+
+
+def clientside_function(function_name: str) -> dash.ClientsideFunction:
+    # Defined in `assets/transforms.js`
+    return dash.ClientsideFunction(namespace="dawa_trpl", function_name=function_name)
+
+
+def table_store_data(
+    records: list[dict[abc.Hashable, t.Any]],
+    groups: abc.Iterable[tuple[int, float]],
+    columns: abc.Iterable[str],
+) -> dict[str, t.Any]:
+    # Rows are normalized in the browser in groups of (n_rows, maximum)
+    return dict(
+        records=records,
+        groups=[[n_rows, scale] for n_rows, scale in groups],
+        columns=list(columns),
+    )
+
+
+def parse_viewport(
+    relayout_data: dict[str, t.Any],
+) -> tuple[tuple[float, float] | None, tuple[float, float] | None]:
+    # Returns the ranges of the (x, y) axes, where None is the whole axis
+    ranges: list[tuple[float, float] | None] = list()
+    for axis in ("xaxis", "yaxis"):
+        if f"{axis}.range[0]" in relayout_data:
+            start = relayout_data[f"{axis}.range[0]"]
+            stop = relayout_data[f"{axis}.range[1]"]
+        elif f"{axis}.range" in relayout_data:
+            start, stop = relayout_data[f"{axis}.range"]
+        else:
+            ranges.append(None)
+            continue
+        ranges.append((float(start), float(stop)))
+    return ranges[0], ranges[1]
+
+
+def is_axis_relayout(
+    relayout_data: dict[str, t.Any], axes: tuple[str, ...] = ("xaxis", "yaxis")
+) -> bool:
+    return any(
+        key.startswith(tuple(f"{axis}." for axis in axes)) for key in relayout_data
+    )
+
+
+def get_x_range(
+    relayout_data: dict[str, t.Any] | None, graph_id: str
+) -> tuple[float, float] | None:
+    # The x range in view of a graph of downsampled traces, which are updated
+    # when the x axis is zoomed or panned
+    if relayout_data is None:
+        return None
+    if dash.ctx.triggered_id == graph_id and not is_axis_relayout(
+        relayout_data, ("xaxis",)
+    ):
+        raise dash.exceptions.PreventUpdate
+    return parse_viewport(relayout_data)[0]
+
+
+def defer_inactive(active_tab: str | None, tab_id: str) -> bool:
+    # Outputs of a hidden tab are computed when the tab is opened. Returns
+    # whether they should be cleared, as their inputs changed while hidden.
+    if active_tab is None or active_tab == tab_id:
+        return False
+    if dash.ctx.triggered_id == TABS_ID:
+        # Leaving the tab keeps its outputs for when it is opened again
+        raise dash.exceptions.PreventUpdate
+    return True
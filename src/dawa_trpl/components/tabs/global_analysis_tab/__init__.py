@@ -0,0 +1,116 @@
+import typing as t
+from collections import abc
+
+import dash
+import dash_bootstrap_components as dbc
+import pandas as pd
+import plotly.graph_objects as go
+
+from dawa_trpl import data_system as ds
+from dawa_trpl.components import upload_bar
+from dawa_trpl.components.tabs import common
+from dawa_trpl.components.tabs.global_analysis_tab import process
+
+TAB_ID = "global-analysis"
+
+n_components_input = dbc.Input(
+    id="global-analysis-n-components-input",
+    type="number",
+    min=1,
+    max=5,
+    step=1,
+    value=2,
+)
+rank_input = dbc.Input(
+    id="global-analysis-rank-input",
+    type="number",
+    min=1,
+    step=1,
+    value=10,
+)
+graph = common.create_graph(id="global-analysis-graph")
+options = common.create_options_layout(
+    options_components=[
+        dbc.Label("Number of Components"),
+        n_components_input,
+        dbc.Label("SVD Rank", className="mt-2"),
+        rank_input,
+    ],
+    download_components=None,
+)
+table = common.create_table(id="global-analysis-table")
+layout = common.create_layout(graph, options, table)
+
+
+@dash.callback(
+    dash.Output(graph, "figure"),
+    dash.Input(upload_bar.files_dropdown, "value"),
+    dash.State(upload_bar.upload_dir_store, "data"),
+    dash.Input(n_components_input, "value"),
+    dash.Input(rank_input, "value"),
+    dash.Input(common.TABS_ID, "active_tab"),
+    prevent_initial_call=True,
+)
+def update_graph(
+    selected_items: list[str] | None,
+    upload_dir: str | None,
+    n_components: int | None,
+    rank: int | None,
+    active_tab: str | None = TAB_ID,
+) -> go.Figure:
+    if common.defer_inactive(active_tab, TAB_ID):
+        return go.Figure()
+    if not selected_items:
+        return go.Figure()
+    if not n_components or not rank or not 1 <= n_components <= rank:
+        raise dash.exceptions.PreventUpdate
+    filepaths = ds.get_existing_item_filepaths(
+        selected_items,
+        ds.validate_upload_dir(upload_dir),
+    )
+    if len(filepaths) == 0:
+        return go.Figure()
+    # The global analysis is shown for the first selected item
+    result = ds.load_global_analysis(filepaths[0], int(n_components), int(rank))
+    return process.create_figure(result)
+
+
+@dash.callback(
+    dash.Output(table, "data"),
+    dash.Input(upload_bar.files_dropdown, "value"),
+    dash.State(upload_bar.upload_dir_store, "data"),
+    dash.Input(n_components_input, "value"),
+    dash.Input(rank_input, "value"),
+    dash.Input(common.TABS_ID, "active_tab"),
+    prevent_initial_call=True,
+)
+def update_table(
+    selected_items: list[str] | None,
+    upload_dir: str | None,
+    n_components: int | None,
+    rank: int | None,
+    active_tab: str | None = TAB_ID,
+) -> list[dict[abc.Hashable, t.Any]] | None:
+    if common.defer_inactive(active_tab, TAB_ID):
+        return None
+    if not selected_items:
+        return None
+    if not n_components or not rank or not 1 <= n_components <= rank:
+        raise dash.exceptions.PreventUpdate
+    filepaths = ds.get_existing_item_filepaths(
+        selected_items,
+        ds.validate_upload_dir(upload_dir),
+    )
+    if len(filepaths) == 0:
+        return None
+    result = ds.load_global_analysis(filepaths[0], int(n_components), int(rank))
+    df = pd.DataFrame(
+        dict(
+            wavelength=result.wavelength,
+            **{
+                f"das{i + 1} ({lifetime:.3g} ns)": das
+                for i, (lifetime, das) in enumerate(zip(result.lifetimes, result.das))
+            },
+        )
+    )
+    return df.to_dict("records")
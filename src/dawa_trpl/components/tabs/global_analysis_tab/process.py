@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly import subplots
+
+from dawa_trpl import analysis
+
+
+def create_figure(result: analysis.GlobalAnalysis) -> go.Figure:
+    fig = subplots.make_subplots(
+        rows=2,
+        cols=2,
+        specs=[[dict(colspan=2), None], [dict(), dict()]],
+        row_heights=[0.6, 0.4],
+        vertical_spacing=0.12,
+        subplot_titles=("Decay-Associated Spectra", "Singular Values", "Residuals"),
+    )
+    for i, (lifetime, das, color) in enumerate(
+        zip(result.lifetimes, result.das, itertools.cycle(px.colors.qualitative.Set1))
+    ):
+        fig.add_trace(
+            go.Scatter(
+                x=result.wavelength,
+                y=das,
+                mode="lines",
+                name=f"DAS{i + 1}: τ = {lifetime:.3g} ns",
+                line=dict(color=color),
+                hovertemplate=""
+                "Wavelength: %{x:.2f} nm<br>"
+                "Amplitude: %{y:.4g}<br>"
+                "<extra></extra>",
+            ),
+            row=1,
+            col=1,
+        )
+    fig.add_trace(
+        go.Scatter(
+            x=np.arange(1, len(result.singular_values) + 1),
+            y=result.singular_values,
+            mode="markers",
+            name="Singular Values",
+            showlegend=False,
+            marker=dict(color="black"),
+        ),
+        row=2,
+        col=1,
+    )
+    fig.add_trace(
+        go.Heatmap(
+            x=result.wavelength,
+            y=result.time,
+            z=result.residuals,
+            colorscale="RdBu",
+            zmid=0,
+            showscale=False,
+            hovertemplate=""
+            "Wavelength: %{x:.2f} nm<br>"
+            "Time: %{y:.3g} ns<br>"
+            "Residual: %{z:.4g}<br>"
+            "<extra></extra>",
+        ),
+        row=2,
+        col=2,
+    )
+    return (
+        fig.update_layout(
+            legend=dict(font=dict(size=14), yanchor="top", y=-0.1, xanchor="left", x=0),
+        )
+        .update_xaxes(title_text="<b>Wavelength (nm)</b>", row=1, col=1)
+        .update_yaxes(title_text="<b>Amplitude (arb. units)</b>", row=1, col=1)
+        .update_xaxes(title_text="<b>Index</b>", row=2, col=1)
+        .update_yaxes(type="log", row=2, col=1)
+        .update_xaxes(title_text="<b>Wavelength (nm)</b>", row=2, col=2)
+        .update_yaxes(title_text="<b>Time (ns)</b>", row=2, col=2)
+    )
@@ -1,6 +1,5 @@
 import os
 import typing as t
-from collections import abc
 
 import dash
 import dash_bootstrap_components as dbc
@@ -9,12 +8,29 @@ import plotly.graph_objects as go
 from dash import dcc
 
 from dawa_trpl import data_system as ds
+from dawa_trpl import export
 from dawa_trpl.components import upload_bar
 from dawa_trpl.components.tabs import common
 from dawa_trpl.components.tabs.h_figure_tab import process
 
+TAB_ID = "h-figure"
+TIME_STEP = 0.01
+
+time_slider = dcc.RangeSlider(
+    id="h-time-slider",
+    min=0,
+    max=10,
+    value=(0, 10),
+    step=TIME_STEP,
+    marks=None,
+    tooltip={"placement": "bottom", "always_visible": True},
+    updatemode="drag",
+)
 peak_vline_switch = dbc.Switch(
-    id="h-peak-vline-switch", label="Vertical Line at Peak", value=False
+    id="h-peak-vline-switch",
+    label="Vertical Line at Peak",
+    value=False,
+    className="mt-2",
 )
 FWHM_range_switch = dbc.Switch(
     id="h-FWHM-range-switch", label="FWHM Range", value=False
@@ -24,28 +40,54 @@ normalize_intensity_switch = dbc.Switch(
 )
 download = dcc.Download(id="h-csv-download")
 download_button = dbc.Button(
-    ["Download CSV", download], id="h-csv-download-button", disabled=True
+    ["Download", download], id="h-csv-download-button", disabled=True
+)
+download_format_select = dbc.Select(
+    id="h-download-format-select",
+    options=[dict(label=v, value=k) for k, v in export.TABLE_FORMATS.items()],
+    value="csv",
 )
 graph = common.create_graph(id="h-figure-graph")
+figure_store = dcc.Store(id="h-figure-store")
 options = common.create_options_layout(
     options_components=[
+        dbc.Label("Time Range"),
+        time_slider,
         peak_vline_switch,
         FWHM_range_switch,
         normalize_intensity_switch,
     ],
-    download_components=[download_button],
+    download_components=[dbc.InputGroup([download_format_select, download_button])],
 )
 table = common.create_table(id="h-table")
-layout = common.create_layout(graph, options, table)
+table_store = dcc.Store(id="h-table-store")
+layout = common.create_layout(graph, options, table, figure_store, table_store)
+
+dash.clientside_callback(
+    common.clientside_function("transformHFigure"),
+    dash.Output(graph, "figure"),
+    dash.Input(figure_store, "data"),
+    dash.Input(normalize_intensity_switch, "value"),
+    prevent_initial_call=True,
+)
+dash.clientside_callback(
+    common.clientside_function("transformTable"),
+    dash.Output(table, "data"),
+    dash.Input(table_store, "data"),
+    dash.Input(normalize_intensity_switch, "value"),
+    prevent_initial_call=True,
+)
 
 
 @dash.callback(
-    dash.Output(graph, "figure"),
+    dash.Output(figure_store, "data"),
     dash.Input(upload_bar.files_dropdown, "value"),
     dash.State(upload_bar.upload_dir_store, "data"),
     dash.Input(peak_vline_switch, "value"),
     dash.Input(FWHM_range_switch, "value"),
-    dash.Input(normalize_intensity_switch, "value"),
+    dash.Input(time_slider, "value"),
+    dash.Input(graph, "relayoutData"),
+    dash.Input(common.TABS_ID, "active_tab"),
     prevent_initial_call=True,
 )
 def update_graph(
@@ -53,16 +95,22 @@ def update_graph(
     upload_dir: str | None,
     show_peak_vline: bool,
     show_FWHM_range: bool,
-    normalize_intensity: bool,
+    time_range: list[float] | None = None,
+    relayout_data: dict[str, t.Any] | None = None,
+    active_tab: str | None = TAB_ID,
 ) -> go.Figure:
+    if common.defer_inactive(active_tab, TAB_ID):
+        return go.Figure()
+    x_range = common.get_x_range(relayout_data, graph.id)
     if not selected_items:
         return go.Figure()
-    filepaths = ds.get_existing_item_filepaths(
-        selected_items,
-        ds.validate_upload_dir(upload_dir),
+    upload_dir = ds.validate_upload_dir(upload_dir)
+    filepaths = ds.get_existing_item_filepaths(selected_items, upload_dir)
+    dfs = ds.load_wavelength_dfs(
+        filepaths,
+        time_range=_to_time_range(time_range, selected_items, upload_dir),
     )
-    dfs = ds.load_wavelength_dfs(filepaths, normalize_intensity)
-    fig = process.create_figure(dfs)
+    fig = process.create_figure(dfs, x_range=x_range)
     if show_peak_vline:
         fig = process.add_peak_vline(fig, dfs)
     if show_FWHM_range:
@@ -71,24 +119,77 @@ def update_graph(
 
 
 @dash.callback(
-    dash.Output(table, "data"),
+    dash.Output(table_store, "data"),
     dash.Input(upload_bar.files_dropdown, "value"),
     dash.State(upload_bar.upload_dir_store, "data"),
-    dash.Input(normalize_intensity_switch, "value"),
+    dash.Input(time_slider, "value"),
+    dash.Input(common.TABS_ID, "active_tab"),
     prevent_initial_call=True,
 )
 def update_table(
-    selected_items: list[str] | None, upload_dir: str | None, normalize_intensity: bool
-) -> list[dict[abc.Hashable, t.Any]] | None:
+    selected_items: list[str] | None,
+    upload_dir: str | None,
+    time_range: list[float] | None = None,
+    active_tab: str | None = TAB_ID,
+) -> dict[str, t.Any] | None:
+    if common.defer_inactive(active_tab, TAB_ID):
+        return None
     if not selected_items:
         return None
-    filepaths = ds.get_existing_item_filepaths(
+    upload_dir = ds.validate_upload_dir(upload_dir)
+    filepaths = ds.get_existing_item_filepaths(selected_items, upload_dir)
+    dfs = ds.load_wavelength_dfs(
+        filepaths,
+        time_range=_to_time_range(time_range, selected_items, upload_dir),
+    )
+    df = pd.concat(dfs)
+    return common.table_store_data(
+        df.to_dict("records"),
+        [(len(wdf), float(wdf["intensity"].max())) for wdf in dfs],
+        ["intensity"],
+    )
+
+
+@dash.callback(
+    dash.Output(time_slider, "min"),
+    dash.Output(time_slider, "max"),
+    dash.Output(time_slider, "value"),
+    dash.Input(upload_bar.files_dropdown, "value"),
+    dash.State(upload_bar.upload_dir_store, "data"),
+    prevent_initial_call=True,
+)
+def update_time_slider_range(
+    selected_items: list[str] | None, upload_dir: str | None
+) -> tuple[float, float, tuple[float, float]]:
+    if not selected_items:
+        raise dash.exceptions.PreventUpdate
+    time_range = ds.get_time_range(
         selected_items,
         ds.validate_upload_dir(upload_dir),
     )
-    dfs = ds.load_wavelength_dfs(filepaths, normalize_intensity)
-    df = pd.concat(dfs)
-    return df.to_dict("records")
+    if time_range is None:
+        raise dash.exceptions.PreventUpdate
+    # Exact bounds, so that the full range is the spectrum of every time bin
+    start, stop = time_range
+    return start, stop, (start, stop)
+
+
+def _to_time_range(
+    time_range: list[float] | None, selected_items: list[str], upload_dir: str
+) -> tuple[float, float] | None:
+    # The full range, to the step of the slider, is the cached spectrum of the
+    # whole image rather than a time-gated one
+    if time_range is None:
+        return None
+    start, stop = float(time_range[0]), float(time_range[1])
+    full_range = ds.get_time_range(selected_items, upload_dir)
+    if (
+        full_range is not None
+        and start <= full_range[0] + TIME_STEP / 2
+        and stop >= full_range[1] - TIME_STEP / 2
+    ):
+        return None
+    return start, stop
 
 
 @dash.callback(
@@ -107,6 +208,8 @@ def update_download_button_ability(selected_items: list[str] | None) -> bool:
     dash.State(upload_bar.files_dropdown, "value"),
     dash.State(upload_bar.upload_dir_store, "data"),
     dash.State(normalize_intensity_switch, "value"),
+    dash.State(download_format_select, "value"),
+    dash.State(time_slider, "value"),
     prevent_initial_call=True,
 )
 def download_csv(
@@ -114,20 +217,19 @@ def download_csv(
     selected_items: list[str] | None,
     upload_dir: str | None,
     normalize_intensity: bool,
+    file_format: str = "csv",
+    time_range: list[float] | None = None,
 ) -> dict[str, t.Any]:
     if not selected_items:
         raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
-    filepaths = ds.get_existing_item_filepaths(
-        selected_items,
-        ds.validate_upload_dir(upload_dir),
-    )
+    upload_dir = ds.validate_upload_dir(upload_dir)
+    filepaths = ds.get_existing_item_filepaths(selected_items, upload_dir)
     if len(filepaths) == 0:
         raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
     filepath = filepaths[0]
-    df = ds.load_wavelength_df(filepath, normalize_intensity)
-    return dict(
-        filename="h-" + os.path.basename(filepath) + ".csv",
-        content=df.to_csv(index=False),
-        type="text/csv",
-        base64=False,
-    )
+    gated_range = _to_time_range(time_range, selected_items, upload_dir)
+    df = ds.load_wavelength_df(filepath, normalize_intensity, gated_range)
+    basename = "h-" + os.path.basename(filepath)
+    if time_range is not None and gated_range is not None:
+        basename = f"h({time_range[0]}-{time_range[1]})-" + os.path.basename(filepath)
+    return export.df_to_download(df, basename, file_format)
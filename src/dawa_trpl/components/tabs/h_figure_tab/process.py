@@ -7,17 +7,27 @@ import plotly.express as px
 import plotly.graph_objects as go
 from tlab_analysis import utils
 
+from dawa_trpl import downsampling
 
-def create_figure(dfs: abc.Iterable[pd.DataFrame]) -> go.Figure:
+
+def create_figure(
+    dfs: abc.Iterable[pd.DataFrame], x_range: tuple[float, float] | None = None
+) -> go.Figure:
     dfs = [df.assign(name=df.attrs["filename"]) for df in dfs]
     df = pd.concat(dfs)
+    # Traces carry their maximum for normalizing them in the browser
+    scales = df.groupby("name")["intensity"].max()
     fig = (
         px.line(
-            df,
+            pd.concat(
+                downsampling.downsample_df(df, "wavelength", "intensity", x_range)
+                for df in dfs
+            ),
             x="wavelength",
             y="intensity",
             color="name",
             color_discrete_sequence=px.colors.qualitative.Set1,
+            render_mode="webgl" if len(dfs) > downsampling.WEBGL_TRACES else "svg",
         )
         .update_traces(
             hovertemplate=""
@@ -28,11 +38,14 @@ def create_figure(dfs: abc.Iterable[pd.DataFrame]) -> go.Figure:
         .update_layout(
             legend=dict(font=dict(size=14), yanchor="top", y=-0.1, xanchor="left", x=0),
         )
-        .update_xaxes(title_text="<b>Wavelength (nm)</b>")
+        .update_xaxes(title_text="<b>Wavelength (nm)</b>", range=x_range)
         .update_yaxes(
             title_text="<b>Intensity (arb. units)</b>",
             range=(0, df["intensity"].max() * 1.05),
         )
+        .for_each_trace(
+            lambda trace: trace.update(meta=dict(scale=float(scales[trace.name])))
+        )
     )
     return fig
 
@@ -47,6 +60,7 @@ def add_peak_vline(fig: go.Figure, dfs: abc.Iterable[pd.DataFrame]) -> go.Figure
             fig.add_vline(
                 peak.x,
                 annotation=dict(
+                    name=df.attrs["filename"],
                     text=f"{peak.x:.2f} nm",
                     hovertext=f"Intensity: {peak.y:.4g}",
                 ),
@@ -65,6 +79,7 @@ def add_FWHM_range(fig: go.Figure, dfs: abc.Iterable[pd.DataFrame]) -> go.Figure
         for peak in peaks:
             fig.add_shape(
                 type="line",
+                name=df.attrs["filename"],
                 label=go.layout.shape.Label(text=f"{peak.width:.1f}nm", yanchor="top"),
                 x0=peak.x0,
                 x1=peak.x1,
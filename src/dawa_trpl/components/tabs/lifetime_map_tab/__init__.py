@@ -0,0 +1,89 @@
+import typing as t
+from collections import abc
+
+import dash
+import dash_bootstrap_components as dbc
+import pandas as pd
+import plotly.graph_objects as go
+
+from dawa_trpl import data_system as ds
+from dawa_trpl.components import upload_bar
+from dawa_trpl.components.tabs import common
+from dawa_trpl.components.tabs.lifetime_map_tab import process
+
+TAB_ID = "lifetime-map"
+
+binning_input = dbc.Input(
+    id="lifetime-map-binning-input",
+    type="number",
+    min=1,
+    step=1,
+    value=4,
+)
+graph = common.create_graph(id="lifetime-map-graph")
+options = common.create_options_layout(
+    options_components=[
+        dbc.Label("Wavelength Binning"),
+        binning_input,
+    ],
+    download_components=None,
+)
+table = common.create_table(id="lifetime-map-table")
+layout = common.create_layout(graph, options, table)
+
+
+@dash.callback(
+    dash.Output(graph, "figure"),
+    dash.Input(upload_bar.files_dropdown, "value"),
+    dash.State(upload_bar.upload_dir_store, "data"),
+    dash.Input(binning_input, "value"),
+    dash.Input(common.TABS_ID, "active_tab"),
+    prevent_initial_call=True,
+)
+def update_graph(
+    selected_items: list[str] | None,
+    upload_dir: str | None,
+    binning: int | None,
+    active_tab: str | None = TAB_ID,
+) -> go.Figure:
+    if common.defer_inactive(active_tab, TAB_ID):
+        return go.Figure()
+    if not selected_items:
+        return go.Figure()
+    if not binning or binning < 1:
+        raise dash.exceptions.PreventUpdate
+    filepaths = ds.get_existing_item_filepaths(
+        selected_items,
+        ds.validate_upload_dir(upload_dir),
+    )
+    dfs = ds.load_lifetime_map_dfs(filepaths, int(binning))
+    return process.create_figure(dfs)
+
+
+@dash.callback(
+    dash.Output(table, "data"),
+    dash.Input(upload_bar.files_dropdown, "value"),
+    dash.State(upload_bar.upload_dir_store, "data"),
+    dash.Input(binning_input, "value"),
+    dash.Input(common.TABS_ID, "active_tab"),
+    prevent_initial_call=True,
+)
+def update_table(
+    selected_items: list[str] | None,
+    upload_dir: str | None,
+    binning: int | None,
+    active_tab: str | None = TAB_ID,
+) -> list[dict[abc.Hashable, t.Any]] | None:
+    if common.defer_inactive(active_tab, TAB_ID):
+        return None
+    if not selected_items:
+        return None
+    if not binning or binning < 1:
+        raise dash.exceptions.PreventUpdate
+    filepaths = ds.get_existing_item_filepaths(
+        selected_items,
+        ds.validate_upload_dir(upload_dir),
+    )
+    dfs = ds.load_lifetime_map_dfs(filepaths, int(binning))
+    df = pd.concat([df.assign(name=df.attrs["filename"]) for df in dfs])
+    return df.to_dict("records")
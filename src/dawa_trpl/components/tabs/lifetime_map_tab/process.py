@@ -0,0 +1,62 @@
+import itertools
+from collections import abc
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly import subplots
+
+
+def create_figure(dfs: abc.Iterable[pd.DataFrame]) -> go.Figure:
+    fig = subplots.make_subplots(
+        rows=2,
+        cols=1,
+        shared_xaxes=True,
+        row_heights=[0.7, 0.3],
+        vertical_spacing=0.05,
+    )
+    for df, color in zip(dfs, itertools.cycle(px.colors.qualitative.Set1)):
+        name = df.attrs["filename"]
+        for tau, dash in (("tau1", "solid"), ("tau2", "dot")):
+            fig.add_trace(
+                go.Scatter(
+                    x=df["wavelength"],
+                    y=df[tau],
+                    mode="lines+markers",
+                    name=f"{name} τ{tau[-1]}",
+                    legendgroup=name,
+                    line=dict(color=color, dash=dash),
+                    hovertemplate=""
+                    "Wavelength: %{x:.2f} nm<br>"
+                    f"τ{tau[-1]}: " + "%{y:.3g} ns<br>"
+                    "<extra></extra>",
+                ),
+                row=1,
+                col=1,
+            )
+        fig.add_trace(
+            go.Scatter(
+                x=df["wavelength"],
+                y=df["a"],
+                mode="lines",
+                name=f"{name} a",
+                legendgroup=name,
+                showlegend=False,
+                line=dict(color=color),
+                hovertemplate=""
+                "Wavelength: %{x:.2f} nm<br>"
+                "a : b = %{y:.0f} : %{customdata:.0f}<br>"
+                "<extra></extra>",
+                customdata=df["b"],
+            ),
+            row=2,
+            col=1,
+        )
+    return (
+        fig.update_layout(
+            legend=dict(font=dict(size=14), yanchor="top", y=-0.1, xanchor="left", x=0),
+        )
+        .update_xaxes(title_text="<b>Wavelength (nm)</b>", row=2, col=1)
+        .update_yaxes(title_text="<b>Lifetime (ns)</b>", type="log", row=1, col=1)
+        .update_yaxes(title_text="<b>a (%)</b>", range=(0, 100), row=2, col=1)
+    )
@@ -0,0 +1,107 @@
+import typing as t
+
+import dash
+import dash_bootstrap_components as dbc
+import plotly.graph_objects as go
+from dash import dcc
+
+from dawa_trpl import config, live
+from dawa_trpl.components.tabs import common
+from dawa_trpl.components.tabs.live_tab import process
+
+TAB_ID = "live"
+
+acquisition_dropdown = dcc.Dropdown(
+    id="live-acquisition-dropdown",
+    options=[],
+    value=None,
+    clearable=True,
+)
+interval = dcc.Interval(
+    id="live-interval",
+    interval=config.LIVE_INTERVAL * 1000,
+    disabled=not config.WATCH_DIR,
+)
+# The acquisition drawn and the version of its sums in the browser
+view_store = dcc.Store(id="live-view-store", storage_type="memory", data=None)
+image_graph = common.create_graph(id="live-image-graph")
+h_graph = common.create_graph(id="live-h-graph", style={"height": "35vh"})
+v_graph = common.create_graph(id="live-v-graph", style={"height": "35vh"})
+options = common.create_options_layout(
+    options_components=[
+        dbc.Label("Acquisition"),
+        acquisition_dropdown,
+        dbc.FormText(
+            "Images and directories of frames in the watched directory, whose new "
+            "frames are added as they are written"
+        ),
+    ],
+    download_components=None,
+)
+layout = dbc.Container(
+    [
+        dbc.Row(
+            [
+                dbc.Col(image_graph, width=12, lg=9),
+                dbc.Col(options, width=12, lg=3),
+            ]
+        ),
+        dbc.Row([dbc.Col(h_graph, width=12, lg=6), dbc.Col(v_graph, width=12, lg=6)]),
+        interval,
+        view_store,
+    ]
+)
+
+
+@dash.callback(
+    dash.Output(acquisition_dropdown, "options"),
+    dash.Input(interval, "n_intervals"),
+    dash.Input(common.TABS_ID, "active_tab"),
+    dash.State(acquisition_dropdown, "options"),
+    prevent_initial_call=True,
+)
+def update_options(
+    n_intervals: int | None, active_tab: str | None, options: list[str] | None
+) -> list[str]:
+    if active_tab != TAB_ID:
+        raise dash.exceptions.PreventUpdate
+    names = live.list_acquisitions()
+    if names == options:
+        raise dash.exceptions.PreventUpdate
+    return names
+
+
+@dash.callback(
+    dash.Output(image_graph, "figure"),
+    dash.Output(h_graph, "figure"),
+    dash.Output(v_graph, "figure"),
+    dash.Output(view_store, "data"),
+    dash.Input(acquisition_dropdown, "value"),
+    dash.Input(interval, "n_intervals"),
+    dash.Input(common.TABS_ID, "active_tab"),
+    dash.State(view_store, "data"),
+    prevent_initial_call=True,
+)
+def update_figures(
+    name: str | None,
+    n_intervals: int | None,
+    active_tab: str | None,
+    view: dict[str, t.Any] | None,
+) -> tuple[go.Figure | dash.Patch, ...]:
+    if active_tab != TAB_ID:
+        raise dash.exceptions.PreventUpdate  # Polled while the tab is open only
+    if not name:
+        return go.Figure(), go.Figure(), go.Figure(), None
+    try:
+        acquisition = live.get_acquisition(name)
+    except ValueError:
+        raise dash.exceptions.PreventUpdate
+    acquisition.poll()
+    since = view["version"] if view is not None and view["name"] == name else 0
+    update = acquisition.changes(since)
+    if update is None or (since and update.version == since):
+        raise dash.exceptions.PreventUpdate
+    view = dict(name=name, version=update.version)
+    if since < update.reset_version:
+        return *process.create_figures(name, update), view
+    return *process.patch_figures(update), view
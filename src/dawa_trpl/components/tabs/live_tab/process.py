@@ -0,0 +1,84 @@
+import dash
+import plotly.graph_objects as go
+
+from dawa_trpl import live
+
+
+def create_figures(
+    name: str, update: live.Update
+) -> tuple[go.Figure, go.Figure, go.Figure]:
+    header = update.header
+    # The streak image holds lists of rows, so that rows can be replaced by a
+    # patch afterwards
+    image = [[0] * header.width for _ in range(header.height)]
+    for row, counts in zip(update.rows.tolist(), update.image.tolist()):
+        image[row] = counts
+    image_fig = (
+        go.Figure(
+            go.Heatmap(
+                z=image,
+                x=header.wavelength,
+                y=header.time,
+                name=name,
+                colorscale="Viridis",
+                hovertemplate=""
+                "Wavelength: %{x:.2f} nm<br>"
+                "Time: %{y:.2f} ns<br>"
+                "Intensity: %{z:d}<br>"
+                "<extra></extra>",
+            )
+        )
+        .update_layout(
+            title=dict(text=name, font=dict(size=14)),
+            margin=dict(l=40, r=40, b=40, t=40),
+            uirevision=name,
+        )
+        .update_xaxes(title_text="<b>Wavelength (nm)</b>")
+        .update_yaxes(title_text="<b>Time (ns)</b>")
+    )
+    h_fig = (
+        go.Figure(
+            go.Scatter(
+                x=header.wavelength,
+                y=update.spectrum.tolist(),
+                name=name,
+                hovertemplate=""
+                "Wavelength: %{x:.2f} nm<br>"
+                "Intensity: %{y:d}<br>"
+                "<extra></extra>",
+            )
+        )
+        .update_layout(margin=dict(l=40, r=40, b=40, t=20), uirevision=name)
+        .update_xaxes(title_text="<b>Wavelength (nm)</b>")
+        .update_yaxes(title_text="<b>Intensity (arb. units)</b>")
+    )
+    v_fig = (
+        go.Figure(
+            go.Scatter(
+                x=header.time,
+                y=update.decay.tolist(),
+                name=name,
+                hovertemplate=""
+                "Time: %{x:.3g} ns<br>"
+                "Intensity: %{y:d}<br>"
+                "<extra></extra>",
+            )
+        )
+        .update_layout(margin=dict(l=40, r=40, b=40, t=20), uirevision=name)
+        .update_xaxes(title_text="<b>Time (ns)</b>")
+        .update_yaxes(title_text="<b>Intensity (arb. units)</b>")
+    )
+    return image_fig, h_fig, v_fig
+
+
+def patch_figures(update: live.Update) -> tuple[dash.Patch, dash.Patch, dash.Patch]:
+    # Only the changed rows of the streak image are sent, while the spectrum
+    # and the decay are small enough to be replaced
+    image_patch = dash.Patch()
+    for row, counts in zip(update.rows.tolist(), update.image.tolist()):
+        image_patch["data"][0]["z"][row] = counts
+    h_patch = dash.Patch()
+    h_patch["data"][0]["y"] = update.spectrum.tolist()
+    v_patch = dash.Patch()
+    v_patch["data"][0]["y"] = update.decay.tolist()
+    return image_patch, h_patch, v_patch
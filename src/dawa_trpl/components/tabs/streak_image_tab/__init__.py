@@ -8,10 +8,23 @@ import plotly.graph_objects as go
 from dash import dcc
 
 from dawa_trpl import data_system as ds
+from dawa_trpl import export
 from dawa_trpl.components import upload_bar
 from dawa_trpl.components.tabs import common
 from dawa_trpl.components.tabs.streak_image_tab import process
 
+TAB_ID = "streak-image"
+
+view_select = dbc.RadioItems(
+    id="streak-image-view-select",
+    options=[
+        dict(label="3D Surface", value="surface"),
+        dict(label="Heatmap", value="heatmap"),
+    ],
+    value="surface",
+    inline=True,
+)
+
 img_download = dcc.Download("img-download")
 img_download_button = dbc.Button(
     ["Download Image", img_download],
@@ -20,9 +33,18 @@ img_download_button = dbc.Button(
     className="mt-2",
     disabled=True,
 )
+img_download_format_select = dbc.Select(
+    id="img-download-format-select",
+    options=[dict(label=v, value=k) for k, v in export.IMAGE_FORMATS.items()],
+    value="img",
+    className="mt-2",
+)
 graph = common.create_graph(id="streak-image-graph")
 options = common.create_options_layout(
-    options_components=None, download_components=[img_download_button]
+    options_components=[dbc.Label("View"), view_select],
+    download_components=[
+        dbc.InputGroup([img_download_format_select, img_download_button])
+    ],
 )
 layout = common.create_layout(graph, options)
 
@@ -31,21 +53,45 @@ layout = common.create_layout(graph, options)
     dash.Output(graph, "figure"),
     dash.Input(upload_bar.files_dropdown, "value"),
     dash.State(upload_bar.upload_dir_store, "data"),
+    dash.Input(view_select, "value"),
+    dash.Input(graph, "relayoutData"),
+    dash.Input(common.TABS_ID, "active_tab"),
     prevent_initial_call=True,
 )
 def update_streak_image(
     selected_items: list[str] | None,
     upload_dir: str | None,
+    view: str = "surface",
+    relayout_data: dict[str, t.Any] | None = None,
+    active_tab: str | None = TAB_ID,
 ) -> go.Figure:
+    if common.defer_inactive(active_tab, TAB_ID):
+        return go.Figure()
+    if relayout_data is not None and dash.ctx.triggered_id == graph.id:
+        # Only zooming and panning the heatmap needs other tiles
+        if view != "heatmap" or not common.is_axis_relayout(relayout_data):
+            raise dash.exceptions.PreventUpdate
+    else:
+        relayout_data = dict()
     if not selected_items:
         return go.Figure()
     filepaths = ds.get_existing_item_filepaths(
         selected_items,
         ds.validate_upload_dir(upload_dir),
     )
+    if view == "heatmap":
+        # Shows the first item, as heatmaps of several items would overlap
+        if not filepaths:
+            return go.Figure()
+        wavelength_range, time_range = common.parse_viewport(relayout_data)
+        level, tiles = ds.load_streak_image_tiles(
+            filepaths[0], time_range, wavelength_range
+        )
+        return process.create_heatmap_figure(
+            os.path.basename(filepaths[0]), level, tiles
+        )
     item_to_data = {
-        os.path.basename(filepath): ds.load_trpl_data(filepath)
-        for filepath in filepaths
+        os.path.basename(filepath): ds.load_image(filepath) for filepath in filepaths
     }
     fig = process.create_figure(item_to_data)
     return fig
@@ -66,12 +112,14 @@ def update_download_button_ability(selected_items: list[str] | None) -> bool:
     dash.Input(img_download_button, "n_clicks"),
     dash.State(upload_bar.files_dropdown, "value"),
     dash.State(upload_bar.upload_dir_store, "data"),
+    dash.State(img_download_format_select, "value"),
     prevent_initial_call=True,
 )
 def download_img(
     n_clicks: int | None,
     selected_items: list[str] | None,
     upload_dir: str | None,
+    file_format: str = "img",
 ) -> dict[str, t.Any]:
     if not selected_items:
         raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
@@ -82,10 +130,18 @@ def download_img(
     if len(filepaths) == 0:
         raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
     filepath = filepaths[0]
-    data = ds.load_trpl_data(filepath)
+    match file_format:
+        case "img":
+            filename = os.path.basename(filepath)
+            raw = ds.load_trpl_data(filepath).to_raw_binary()
+        case "npz":
+            filename = os.path.basename(filepath) + ".npz"
+            raw = export.streak_image_to_npz(ds.load_image(filepath))
+        case _:
+            raise ValueError(f"Unsupported file format: {file_format}")
     return dict(
-        filename=os.path.basename(filepath),
-        content=base64.urlsafe_b64encode(data.to_raw_binary()).decode(),
+        filename=filename,
+        content=base64.urlsafe_b64encode(raw).decode(),
         type="application/octet-stream",
         base64=True,
     )
@@ -1,15 +1,16 @@
 import plotly.graph_objects as go
-from tlab_analysis import trpl
 
+from dawa_trpl import pyramid, streak
 
-def create_figure(item_to_data: dict[str, trpl.TRPLData]) -> go.Figure:
+
+def create_figure(item_to_data: dict[str, streak.StreakImage]) -> go.Figure:
     return (
         go.Figure(
             [
                 go.Surface(
-                    z=data.to_streak_image(),
-                    x=data.wavelength.unique(),
-                    y=data.time.unique(),
+                    z=data.intensity,
+                    x=data.wavelength,
+                    y=data.time,
                     name=key,
                 )
                 for key, data in item_to_data.items()
@@ -39,3 +40,30 @@ def create_figure(item_to_data: dict[str, trpl.TRPLData]) -> go.Figure:
             ),
         )
     )
+
+
+def create_heatmap_figure(name: str, level: int, tiles: pyramid.Level) -> go.Figure:
+    return (
+        go.Figure(
+            go.Heatmap(
+                z=tiles.image,
+                x=tiles.wavelength,
+                y=tiles.time,
+                name=name,
+                colorscale="Viridis",
+                hovertemplate=""
+                "Wavelength: %{x:.2f} nm<br>"
+                "Time: %{y:.2f} ns<br>"
+                "Intensity: %{z:.4g}<br>"
+                "<extra></extra>",
+            )
+        )
+        .update_layout(
+            title=dict(text=f"{name} (1:{2**level})", font=dict(size=14)),
+            margin=dict(l=40, r=40, b=40, t=40),
+            # Keeps the zoom of the user while tiles are replaced
+            uirevision=name,
+        )
+        .update_xaxes(title_text="<b>Wavelength (nm)</b>")
+        .update_yaxes(title_text="<b>Time (ns)</b>")
+    )
@@ -1,19 +1,21 @@
 import os
+import re
 import typing as t
-from collections import abc
 
 import dash
 import dash_bootstrap_components as dbc
-import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from dash import dcc
 
 from dawa_trpl import data_system as ds
+from dawa_trpl import export, models
 from dawa_trpl.components import upload_bar
 from dawa_trpl.components.tabs import common
 from dawa_trpl.components.tabs.v_figure_tab import process
 
+TAB_ID = "v-figure"
+
 wavelength_slider = dcc.RangeSlider(
     id="v-wavelength-slider",
     min=0,
@@ -23,9 +25,31 @@ wavelength_slider = dcc.RangeSlider(
     marks=None,
     tooltip={"placement": "bottom", "always_visible": True},
 )
+wavelength_windows_input = dbc.Input(
+    id="v-wavelength-windows-input",
+    type="text",
+    placeholder="e.g. 450-470, 480-500",
+    debounce=True,
+    className="mt-2",
+)
+irf_select = dbc.Select(
+    id="v-irf-select",
+    options=[dict(label="None", value="")],
+    value="",
+    className="mt-2",
+)
+fit_model_select = dbc.Select(
+    id="v-fit-model-select",
+    options=[dict(label=m.label, value=name) for name, m in models.MODELS.items()],
+    value=models.DEFAULT_MODEL,
+    className="mt-2",
+)
 fitting_curve_switch = dbc.Switch(
     id="v-fitting-curve-switch", label="Fitting", value=True, className="mt-2"
 )
+confidence_interval_switch = dbc.Switch(
+    id="v-confidence-interval-switch", label="Confidence Intervals", value=False
+)
 log_intensity_switch = dbc.Switch(
     id="v-log-intensity-switch", label="Log Intensity", value=True
 )
@@ -33,30 +57,133 @@ normalize_intensity_switch = dbc.Switch(
     id="v-normalize-intensity-switch", label="Normalize Intensity", value=False
 )
 download = dcc.Download(id="v-csv-download")
-download_button = dbc.Button(["Download CSV", download], id="v-csv-download-button")
+download_button = dbc.Button(["Download", download], id="v-csv-download-button")
+download_format_select = dbc.Select(
+    id="v-download-format-select",
+    options=[dict(label=v, value=k) for k, v in export.TABLE_FORMATS.items()],
+    value="csv",
+)
 graph = common.create_graph(id="v-figure-graph")
+figure_store = dcc.Store(id="v-figure-store")
 options = common.create_options_layout(
     options_components=[
         dbc.Label("Wavelength Range"),
         wavelength_slider,
+        dbc.Label("Wavelength Windows", className="mt-2"),
+        wavelength_windows_input,
+        dbc.Label("IRF", className="mt-2"),
+        irf_select,
+        dbc.Label("Fit Model", className="mt-2"),
+        fit_model_select,
         fitting_curve_switch,
+        confidence_interval_switch,
         log_intensity_switch,
         normalize_intensity_switch,
     ],
-    download_components=[download_button],
+    download_components=[dbc.InputGroup([download_format_select, download_button])],
 )
 table = common.create_table(id="v-table")
-layout = common.create_layout(graph, options, table)
+table_store = dcc.Store(id="v-table-store")
+layout = common.create_layout(graph, options, table, figure_store, table_store)
+
+dash.clientside_callback(
+    common.clientside_function("transformVFigure"),
+    dash.Output(graph, "figure"),
+    dash.Input(figure_store, "data"),
+    dash.Input(normalize_intensity_switch, "value"),
+    dash.Input(log_intensity_switch, "value"),
+    prevent_initial_call=True,
+)
+dash.clientside_callback(
+    common.clientside_function("transformTable"),
+    dash.Output(table, "data"),
+    dash.Input(table_store, "data"),
+    dash.Input(normalize_intensity_switch, "value"),
+    prevent_initial_call=True,
+)
+
+_WINDOW_PATTERN = re.compile(r"^\s*(\d+(?:\.\d*)?)\s*-\s*(\d+(?:\.\d*)?)\s*$")
+
+
+def parse_wavelength_windows(text: str | None) -> list[tuple[float, float]]:
+    windows = list()
+    for item in re.split(r"[,;]", text or ""):
+        if not item.strip():
+            continue
+        match = _WINDOW_PATTERN.match(item)
+        if match is None:
+            raise ValueError(f"Invalid wavelength window: {item.strip()}")
+        start, stop = float(match[1]), float(match[2])
+        if start > stop:
+            raise ValueError(f"Invalid wavelength window: {item.strip()}")
+        windows.append((start, stop))
+    return windows
+
+
+def get_irf_filepath(irf_item: str | None, upload_dir: str) -> str | None:
+    if not irf_item:
+        return None
+    return ds.get_item_filepath(irf_item, upload_dir)
+
+
+def load_time_dfs(
+    filepaths: list[str],
+    wavelength_range: list[int],
+    wavelength_windows: str | None,
+    fitting: bool,
+    irf_filepath: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+) -> list[pd.DataFrame]:
+    try:
+        windows = parse_wavelength_windows(wavelength_windows)
+    except ValueError:
+        raise dash.exceptions.PreventUpdate
+    if windows:
+        return ds.load_multi_window_time_dfs(
+            filepaths, windows, fitting, irf_filepath=irf_filepath, model=model
+        )
+    return ds.load_time_dfs(
+        filepaths,
+        (
+            float(wavelength_range[0]),
+            float(wavelength_range[1]),
+        ),  # TODO: Any other way to pass mypy?
+        fitting,
+        irf_filepath=irf_filepath,
+        model=model,
+        warm_start=True,
+    )
+
+
+def load_fit_intervals(
+    filepaths: list[str],
+    wavelength_range: list[int],
+    wavelength_windows: str | None,
+    irf_filepath: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+) -> list[dict[str, tuple[float, float]]]:
+    # Ordered like the dataframes returned by `load_time_dfs`
+    windows = parse_wavelength_windows(wavelength_windows)
+    return ds.load_multi_fit_intervals(
+        filepaths,
+        windows or [(float(wavelength_range[0]), float(wavelength_range[1]))],
+        model,
+        irf_filepath,
+    )
 
 
 @dash.callback(
-    dash.Output(graph, "figure"),
+    dash.Output(figure_store, "data"),
     dash.Input(upload_bar.files_dropdown, "value"),
     dash.State(upload_bar.upload_dir_store, "data"),
     dash.Input(wavelength_slider, "value"),
     dash.Input(fitting_curve_switch, "value"),
-    dash.Input(log_intensity_switch, "value"),
-    dash.Input(normalize_intensity_switch, "value"),
+    dash.Input(wavelength_windows_input, "value"),
+    dash.Input(irf_select, "value"),
+    dash.Input(fit_model_select, "value"),
+    dash.Input(confidence_interval_switch, "value"),
+    dash.Input(graph, "relayoutData"),
+    dash.Input(common.TABS_ID, "active_tab"),
     prevent_initial_call=True,
 )
 def update_graph(
@@ -64,37 +191,56 @@ def update_graph(
     upload_dir: str | None,
     wavelength_range: list[int],
     fitting: bool,
-    log_y: bool,
-    normalize_intensity: bool,
+    wavelength_windows: str | None = None,
+    irf_item: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+    confidence_interval: bool = False,
+    relayout_data: dict[str, t.Any] | None = None,
+    active_tab: str | None = TAB_ID,
 ) -> go.Figure:
+    if common.defer_inactive(active_tab, TAB_ID):
+        return go.Figure()
+    x_range = common.get_x_range(relayout_data, graph.id)
     if not selected_items:
         return go.Figure()
-    filepaths = ds.get_existing_item_filepaths(
-        selected_items,
-        ds.validate_upload_dir(upload_dir),
-    )
-    dfs = ds.load_time_dfs(
-        filepaths,
-        (
-            float(wavelength_range[0]),
-            float(wavelength_range[1]),
-        ),  # TODO: Any other way to pass mypy?
-        fitting,
-        normalize_intensity,
-    )
-    fig = process.create_figure(dfs, log_y)
+    upload_dir = ds.validate_upload_dir(upload_dir)
+    filepaths = ds.get_existing_item_filepaths(selected_items, upload_dir)
+    # Dragging the slider fires a request per position, of which only the
+    # latest one per session is worth fitting
+    irf_filepath = get_irf_filepath(irf_item, upload_dir)
+    with common.latest_only(upload_dir, graph.id):
+        dfs = load_time_dfs(
+            filepaths,
+            wavelength_range,
+            wavelength_windows,
+            fitting,
+            irf_filepath,
+            model,
+        )
+        intervals = (
+            load_fit_intervals(
+                filepaths, wavelength_range, wavelength_windows, irf_filepath, model
+            )
+            if fitting and confidence_interval
+            else None
+        )
+    fig = process.create_figure(dfs, x_range=x_range)
     if fitting:
-        fig = process.add_fitting_curve(fig, dfs)
+        fig = process.add_fitting_curve(fig, dfs, intervals, x_range=x_range)
     return fig
 
 
 @dash.callback(
-    dash.Output(table, "data"),
+    dash.Output(table_store, "data"),
     dash.Input(upload_bar.files_dropdown, "value"),
     dash.State(upload_bar.upload_dir_store, "data"),
     dash.Input(wavelength_slider, "value"),
     dash.Input(fitting_curve_switch, "value"),
-    dash.Input(normalize_intensity_switch, "value"),
+    dash.Input(wavelength_windows_input, "value"),
+    dash.Input(irf_select, "value"),
+    dash.Input(fit_model_select, "value"),
+    dash.Input(confidence_interval_switch, "value"),
+    dash.Input(common.TABS_ID, "active_tab"),
     prevent_initial_call=True,
 )
 def update_table(
@@ -102,25 +248,42 @@ def update_table(
     upload_dir: str | None,
     wavelength_range: list[int],
     fitting: bool,
-    normalize_intensity: bool,
-) -> list[dict[abc.Hashable, t.Any]] | None:
+    wavelength_windows: str | None = None,
+    irf_item: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+    confidence_interval: bool = False,
+    active_tab: str | None = TAB_ID,
+) -> dict[str, t.Any] | None:
+    if common.defer_inactive(active_tab, TAB_ID):
+        return None
     if not selected_items:
         return None
-    filepaths = ds.get_existing_item_filepaths(
-        selected_items,
-        ds.validate_upload_dir(upload_dir),
+    upload_dir = ds.validate_upload_dir(upload_dir)
+    filepaths = ds.get_existing_item_filepaths(selected_items, upload_dir)
+    irf_filepath = get_irf_filepath(irf_item, upload_dir)
+    with common.latest_only(upload_dir, table.id):
+        dfs = load_time_dfs(
+            filepaths,
+            wavelength_range,
+            wavelength_windows,
+            fitting,
+            irf_filepath,
+            model,
+        )
+        if fitting and confidence_interval:
+            intervals = load_fit_intervals(
+                filepaths, wavelength_range, wavelength_windows, irf_filepath, model
+            )
+            dfs = [
+                _with_interval_columns(df, interval)
+                for df, interval in zip(dfs, intervals)
+            ]
+    df = pd.concat([_with_window_column(df) for df in dfs])
+    return common.table_store_data(
+        df.to_dict("records"),
+        [(len(tdf), float(tdf["intensity"].max())) for tdf in dfs],
+        ["intensity", "fit"],
     )
-    dfs = ds.load_time_dfs(
-        filepaths,
-        (
-            float(wavelength_range[0]),
-            float(wavelength_range[1]),
-        ),  # TODO: Any other way to pass mypy?
-        fitting,
-        normalize_intensity,
-    )
-    df = pd.concat(dfs)
-    return df.to_dict("records")
 
 
 @dash.callback(
@@ -135,14 +298,55 @@ def update_wavelength_slider_range(
 ) -> tuple[float, float]:
     if not selected_items:
         raise dash.exceptions.PreventUpdate
-    filepaths = ds.get_existing_item_filepaths(
+    wavelength_range = ds.get_wavelength_range(
         selected_items,
         ds.validate_upload_dir(upload_dir),
     )
-    wavelength = np.concatenate(
-        [ds.load_trpl_data(filepath).wavelength for filepath in filepaths]
-    )
-    return int(wavelength.min()), int(wavelength.max())
+    if wavelength_range is None:
+        raise dash.exceptions.PreventUpdate
+    return int(wavelength_range[0]), int(wavelength_range[1])
+
+
+def _with_window_column(df: pd.DataFrame) -> pd.DataFrame:
+    if "window" not in df.attrs:
+        return df
+    start, stop = df.attrs["window"]
+    return df.assign(window=f"{start:g}-{stop:g}")
+
+
+def _with_interval_columns(
+    df: pd.DataFrame, intervals: dict[str, tuple[float, float]]
+) -> pd.DataFrame:
+    columns = dict()
+    for name, (low, high) in intervals.items():
+        columns[f"{name}_low"] = low
+        columns[f"{name}_high"] = high
+    return df.assign(**columns)
+
+
+@dash.callback(
+    dash.Output(wavelength_slider, "disabled"),
+    dash.Output(wavelength_windows_input, "invalid"),
+    dash.Input(wavelength_windows_input, "value"),
+)
+def update_wavelength_windows_validity(
+    wavelength_windows: str | None,
+) -> tuple[bool, bool]:
+    try:
+        windows = parse_wavelength_windows(wavelength_windows)
+    except ValueError:
+        return False, True
+    return bool(windows), False
+
+
+@dash.callback(
+    dash.Output(irf_select, "options"),
+    dash.Input(upload_bar.files_dropdown, "options"),
+)
+def update_irf_options(item_names: list[str] | None) -> list[dict[str, str]]:
+    return [dict(label="None", value="")] + [
+        dict(label=item_name, value=item_name) for item_name in item_names or list()
+    ]
 
 
 @dash.callback(
@@ -163,6 +367,10 @@ def update_download_button_ability(selected_items: list[str] | None) -> bool:
     dash.State(wavelength_slider, "value"),
     dash.State(fitting_curve_switch, "value"),
     dash.State(normalize_intensity_switch, "value"),
+    dash.State(download_format_select, "value"),
+    dash.State(wavelength_windows_input, "value"),
+    dash.State(irf_select, "value"),
+    dash.State(fit_model_select, "value"),
     prevent_initial_call=True,
 )
 def download_csv(
@@ -172,27 +380,41 @@ def download_csv(
     wavelength_range: list[int],
     fitting: bool,
     normalize_intensity: bool,
+    file_format: str = "csv",
+    wavelength_windows: str | None = None,
+    irf_item: str | None = None,
+    model: str = models.DEFAULT_MODEL,
 ) -> dict[str, t.Any]:
     if not selected_items:
         raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
-    filepaths = ds.get_existing_item_filepaths(
-        selected_items,
-        ds.validate_upload_dir(upload_dir),
-    )
+    upload_dir = ds.validate_upload_dir(upload_dir)
+    filepaths = ds.get_existing_item_filepaths(selected_items, upload_dir)
+    irf_filepath = get_irf_filepath(irf_item, upload_dir)
     if len(filepaths) == 0:
         raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
     filepath = filepaths[0]
+    try:
+        windows = parse_wavelength_windows(wavelength_windows)
+    except ValueError:
+        raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
+    if windows:
+        dfs = ds.load_window_time_dfs(
+            filepath, windows, fitting, normalize_intensity, irf_filepath, model
+        )
+        df = pd.concat([_with_window_column(df) for df in dfs], ignore_index=True)
+        df.attrs = dict(filename=os.path.basename(filepath), windows=windows)
+        basename = "v(windows)-" + os.path.basename(filepath)
+        return export.df_to_download(df, basename, file_format)
     df = ds.load_time_df(
-        filepath, tuple(wavelength_range[:2]), fitting, normalize_intensity
-    )
-    filename = (
-        f"v({wavelength_range[0]}-{wavelength_range[1]})-"
-        + os.path.basename(filepath)
-        + ".csv"
+        filepath,
+        (float(wavelength_range[0]), float(wavelength_range[1])),
+        fitting,
+        normalize_intensity,
+        irf_filepath,
+        model,
+        warm_start=True,  # The decay shown in the graph
     )
-    return dict(
-        filename=filename,
-        content=df.to_csv(index=False),
-        type="text/csv",
-        base64=False,
+    basename = f"v({wavelength_range[0]}-{wavelength_range[1]})-" + os.path.basename(
+        filepath
     )
+    return export.df_to_download(df, basename, file_format)
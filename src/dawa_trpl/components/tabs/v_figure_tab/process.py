@@ -1,3 +1,4 @@
+import typing as t
 from collections import abc
 
 import numpy as np
@@ -5,20 +6,40 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
+from dawa_trpl import downsampling, fitting, models
 
-def create_figure(dfs: abc.Iterable[pd.DataFrame], log_y: bool) -> go.Figure:
-    dfs = [df.assign(name=df.attrs["filename"]) for df in dfs]
+
+def get_name(df: pd.DataFrame) -> str:
+    name: str = df.attrs["filename"]
+    if "window" in df.attrs:
+        start, stop = df.attrs["window"]
+        name += f" ({start:g}-{stop:g} nm)"
+    return name
+
+
+def create_figure(
+    dfs: abc.Iterable[pd.DataFrame],
+    log_y: bool = False,
+    x_range: tuple[float, float] | None = None,
+) -> go.Figure:
+    dfs = [df.assign(name=get_name(df)) for df in dfs]
     df = pd.concat(dfs)
+    # Traces carry their maximum for normalizing them in the browser
+    scales = df.groupby("name")["intensity"].max()
     max_intensity = df["intensity"].max()
     range_y = (0.05 * max_intensity, max_intensity)
     fig = (
         px.line(
-            df,
+            pd.concat(
+                downsampling.downsample_df(df, "time", "intensity", x_range)
+                for df in dfs
+            ),
             x="time",
             y="intensity",
             color="name",
             color_discrete_sequence=px.colors.qualitative.Set1,
             log_y=log_y,
+            render_mode="webgl" if len(dfs) > downsampling.WEBGL_TRACES else "svg",
         )
         .update_traces(
             hovertemplate=""
@@ -31,28 +52,83 @@ def create_figure(dfs: abc.Iterable[pd.DataFrame], log_y: bool) -> go.Figure:
         )
         .update_xaxes(
             title_text="<b>Time (ns)</b>",
+            range=x_range,
         )
         .update_yaxes(
             title_text="<b>Intensity (arb. units)</b>",
             range=(np.log10(range_y) if log_y else range_y) * np.array([1.0, 1.05]),
         )
+        .for_each_trace(
+            lambda trace: trace.update(meta=dict(scale=float(scales[trace.name])))
+        )
     )
     return fig
 
 
-def add_fitting_curve(fig: go.Figure, dfs: abc.Iterable[pd.DataFrame]) -> go.Figure:
-    return fig.add_traces(
-        [
-            go.Scatter(
-                x=df["time"],
-                y=df["fit"],
+_PARAM_LABELS = dict(tau="τ", beta="β", alpha="α")
+_SUBSCRIPTS = str.maketrans("0123456789", "₀₁₂₃₄₅₆₇₈₉")
+
+
+def get_fit_label(
+    fit: dict[str, t.Any], intervals: dict[str, tuple[float, float]] | None = None
+) -> str:
+    prefix = "IRF-Convolved " if "irf" in fit else ""
+    suffix = _format_intervals(intervals) if intervals else ""
+    if fit.get("model", models.DEFAULT_MODEL) == "double":
+        return (
+            prefix + "Double Exponential Approximation "
+            f"a : b = {fit['a']}:{fit['b']}, "
+            f"τ₁ = {fit['tau1']:.3g} ns, "
+            f"τ₂ = {fit['tau2']:.3g} ns" + suffix
+        )
+    model = models.get_model(fit["model"])
+    params = ", ".join(
+        f"{_format_param_name(name)} = {fit[name]:.3g}"
+        + (" ns" if name.startswith("tau") else "")
+        for name in model.summarize(fit["params"])
+    )
+    return f"{prefix}{model.label} Approximation {params}{suffix}"
+
+
+def _format_intervals(intervals: dict[str, tuple[float, float]]) -> str:
+    # Only lifetimes are shown to keep the legend short
+    lifetimes = ", ".join(
+        f"{_format_param_name(name)} {low:.3g}–{high:.3g} ns"
+        for name, (low, high) in intervals.items()
+        if name.startswith("tau")
+    )
+    return f" ({fitting.CONFIDENCE_LEVEL:.0%} CI: {lifetimes})"
+
+
+def _format_param_name(name: str) -> str:
+    base = name.rstrip("0123456789")
+    return _PARAM_LABELS.get(base, base) + name[len(base) :].translate(_SUBSCRIPTS)
+
+
+def add_fitting_curve(
+    fig: go.Figure,
+    dfs: abc.Iterable[pd.DataFrame],
+    intervals: abc.Iterable[dict[str, tuple[float, float]]] | None = None,
+    x_range: tuple[float, float] | None = None,
+) -> go.Figure:
+    dfs = list(dfs)
+    _intervals: list[dict[str, tuple[float, float]] | None] = (
+        list(intervals) if intervals is not None else [None] * len(dfs)
+    )
+    scatter = go.Scattergl if len(dfs) > downsampling.WEBGL_TRACES else go.Scatter
+    traces = list()
+    for df, interval in zip(dfs, _intervals):
+        if "fit" not in df.attrs:
+            continue
+        curve = downsampling.downsample_df(df, "time", "fit", x_range)
+        traces.append(
+            scatter(
+                x=curve["time"],
+                y=curve["fit"],
                 line=dict(color="black"),
-                name=f"Double Exponential Approximation "
-                f"a : b = {df.attrs['fit']['a']}:{df.attrs['fit']['b']}, "
-                f"τ₁ = {df.attrs['fit']['tau1']:.3g} ns, "
-                f"τ₂ = {df.attrs['fit']['tau2']:.3g} ns",
+                meta=dict(scale=float(df["intensity"].max()), fit=True),
+                name=(f"{get_name(df)} " if "window" in df.attrs else "")
+                + get_fit_label(df.attrs["fit"], interval),
             )
-            for df in dfs
-            if "fit" in df.attrs
-        ]
-    )
+        )
+    return fig.add_traces(traces)
@@ -1,11 +1,11 @@
 import base64
+import concurrent.futures
+import contextlib
 import os
-import pathlib
-import tempfile
 
 import dash
 import dash_bootstrap_components as dbc
-from dash import dcc
+from dash import dcc, html
 
 from dawa_trpl import config
 from dawa_trpl import data_system as ds
@@ -26,12 +26,29 @@ upload_dir_store = dcc.Store(id="upload-dir-store", storage_type="session", data
 last_uploaded_store = dcc.Store(
     id="last-upload-store", storage_type="memory", data=list()
 )
+# Lists the files which could not be uploaded
+upload_status_toast = dbc.Toast(
+    id="upload-status-toast",
+    header="Some files could not be uploaded",
+    icon="danger",
+    is_open=False,
+    dismissable=True,
+    style=dict(position="fixed", top=66, right=10, width=360, zIndex=1080),
+)
+# Lists the files appearing in the watched directory
+watch_interval = dcc.Interval(
+    id="watch-interval",
+    interval=config.WATCH_INTERVAL * 1000,
+    disabled=not config.WATCH_DIR,
+)
 layout = dbc.Row(
     [
         dbc.Col(files_dropdown),
         dbc.Col(file_uploader, width="auto"),
         upload_dir_store,
         last_uploaded_store,
+        upload_status_toast,
+        watch_interval,
     ],
     id="uploadbar-row",
     className="frex-nowrap ms-auto",
@@ -43,16 +60,28 @@ layout = dbc.Row(
     dash.Output(upload_dir_store, "data"), dash.Input(upload_dir_store, "data")
 )
 def update_upload_dir(upload_dir: str | None) -> str:
-    if upload_dir:
-        raise dash.exceptions.PreventUpdate
-    if not os.path.exists(config.UPLOAD_BASEDIR):  # pragma: no cover
-        os.mkdir(config.UPLOAD_BASEDIR)
-    tmpdir = tempfile.mkdtemp(dir=config.UPLOAD_BASEDIR)
-    return tmpdir
+    # A new directory is issued when the stored one has been removed by the
+    # janitor, or is not under the current base directory any more
+    with contextlib.suppress(ValueError):
+        if os.path.isdir(ds.validate_upload_dir(upload_dir)):
+            raise dash.exceptions.PreventUpdate
+    return ds.create_upload_dir()
+
+
+def save_upload(filename: str, content: str, upload_dir: str) -> str | None:
+    # Returns why the file could not be saved, or None
+    try:
+        content_type, content_string = content.split(",", 1)
+        ds.save_item(filename, base64.urlsafe_b64decode(content_string), upload_dir)
+    except (ValueError, OSError) as e:
+        return str(e) or type(e).__name__
+    return None
 
 
 @dash.callback(
     dash.Output(last_uploaded_store, "data"),
+    dash.Output(upload_status_toast, "children"),
+    dash.Output(upload_status_toast, "is_open"),
     dash.Input(file_uploader, "contents"),
     dash.State(file_uploader, "filename"),
     dash.State(upload_dir_store, "data"),
@@ -60,28 +89,49 @@ def update_upload_dir(upload_dir: str | None) -> str:
 )
 def on_upload_files(
     contents: list[str] | None, filenames: list[str] | None, upload_dir: str | None
-) -> list[str]:
-    upload_dir = ds.validate_upload_dir(upload_dir)
+) -> tuple[list[str], list[html.Li], bool]:
+    upload_dir = ds.ensure_upload_dir(upload_dir)
     if contents is None or filenames is None:
         raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
-    for filename, content in zip(filenames, contents):
-        with open(os.path.join(upload_dir, filename), "wb") as f:
-            content_type, content_string = content.split(",")
-            f.write(base64.urlsafe_b64decode(content_string))
-    return filenames
+    # Files are decoded, written and validated concurrently, and each of them
+    # is saved or rejected on its own
+    with concurrent.futures.ThreadPoolExecutor(config.WORKERS) as executor:
+        errors = list(
+            executor.map(
+                save_upload, filenames, contents, [upload_dir] * len(filenames)
+            )
+        )
+    saved = [filename for filename, error in zip(filenames, errors) if error is None]
+    ds.register_items(saved, upload_dir)
+    failures = [
+        html.Li(f"{filename}: {error}")
+        for filename, error in zip(filenames, errors)
+        if error is not None
+    ]
+    return saved, failures, bool(failures)
 
 
 @dash.callback(
     dash.Output(files_dropdown, "options"),
     dash.Input(last_uploaded_store, "data"),
     dash.State(upload_dir_store, "data"),
+    dash.Input(watch_interval, "n_intervals"),
+    dash.State(files_dropdown, "options"),
     prevent_initial_call=True,
 )
 def update_dropdown_options(
-    last_uploaded_files: list[str] | None, upload_dir: str | None
+    last_uploaded_files: list[str] | None,
+    upload_dir: str | None,
+    n_intervals: int | None = None,
+    options: list[str] | None = None,
 ) -> list[str]:
+    if not upload_dir:
+        raise dash.exceptions.PreventUpdate  # Not created yet
     upload_dir = ds.validate_upload_dir(upload_dir)
-    return [path.name for path in pathlib.Path(upload_dir).iterdir() if path.is_file()]
+    item_names = ds.get_item_names(upload_dir)
+    if item_names == options:
+        raise dash.exceptions.PreventUpdate
+    return item_names
 
 
 @dash.callback(
@@ -1,8 +1,56 @@
 import os
-import tempfile
 
 _PREFIX = "DAWA_TRPL_"
 URL_BASE_PATH = os.environ.get(_PREFIX + "URL_BASE_PATH", "/")
-UPLOAD_BASEDIR = os.environ.get(
-    _PREFIX + "UPLOAD_BASEDIR", tempfile.mkdtemp(prefix="dawa_trpl_")
+# Kept across restarts in the data directory of the user, which is created
+# with the first upload directory
+UPLOAD_BASEDIR = os.environ.get(_PREFIX + "UPLOAD_BASEDIR") or os.path.join(
+    os.environ.get("XDG_DATA_HOME")
+    or os.path.join(os.path.expanduser("~"), ".local", "share"),
+    "dawa_trpl",
+    "uploads",
 )
+# An empty string disables the persistent store
+STORE_DIR = os.environ.get(
+    _PREFIX + "STORE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "dawa_trpl"),
+)
+# Bytes of the store kept by the janitor, of which the least recently used
+# images are dropped first; 0 for no limit
+STORE_QUOTA = int(os.environ.get(_PREFIX + "STORE_QUOTA", 10 * 1024**3))  # 10 GiB
+# Seconds after which results of an image not used are dropped; 0 for no limit
+STORE_TTL = float(
+    os.environ.get(_PREFIX + "STORE_TTL", 30 * 24 * 60 * 60)  # 30 days
+)
+UPLOAD_SESSION_QUOTA = int(
+    os.environ.get(_PREFIX + "UPLOAD_SESSION_QUOTA", 1024**3)  # 1 GiB
+)
+UPLOAD_TOTAL_QUOTA = int(
+    os.environ.get(_PREFIX + "UPLOAD_TOTAL_QUOTA", 10 * 1024**3)  # 10 GiB
+)
+UPLOAD_SESSION_TTL = float(
+    os.environ.get(_PREFIX + "UPLOAD_SESSION_TTL", 7 * 24 * 60 * 60)  # 7 days
+)
+# Seconds between garbage collections of uploaded files; 0 disables it
+JANITOR_INTERVAL = float(os.environ.get(_PREFIX + "JANITOR_INTERVAL", 10 * 60))
+WORKERS = int(os.environ.get(_PREFIX + "WORKERS", os.cpu_count() or 1))
+# Resamples of the bootstrap estimating confidence intervals of fits
+BOOTSTRAP_RESAMPLES = int(os.environ.get(_PREFIX + "BOOTSTRAP_RESAMPLES", 200))
+# Points per trace of the H and V figures within the viewport; 0 disables the
+# downsampling
+DOWNSAMPLE_POINTS = int(os.environ.get(_PREFIX + "DOWNSAMPLE_POINTS", 2000))
+# Floating point type of the spectra, decays and figures, either "float64" or
+# "float32"; fits are always computed in float64
+PRECISION = os.environ.get(_PREFIX + "PRECISION", "float64")
+if PRECISION not in ("float32", "float64"):
+    raise ValueError(
+        f'{_PREFIX}PRECISION must be "float32" or "float64", not {PRECISION!r}'
+    )
+# Directory whose images are shared by every session as they appear; an empty
+# string disables it
+WATCH_DIR = os.environ.get(_PREFIX + "WATCH_DIR", "")
+# Seconds between scans of the watched directory and refreshes of the file list
+WATCH_INTERVAL = float(os.environ.get(_PREFIX + "WATCH_INTERVAL", 2))
+# Seconds between updates of the live view of acquisitions in the watched
+# directory
+LIVE_INTERVAL = float(os.environ.get(_PREFIX + "LIVE_INTERVAL", 1))
@@ -1,26 +1,73 @@
+import contextlib
 import functools
 import os
+import tempfile
+import threading
+import time
 import typing as t
 from collections import abc
 
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
 from tlab_analysis import trpl, utils
 
-from dawa_trpl import config
+from dawa_trpl import (
+    analysis,
+    cache,
+    cancellation,
+    catalog,
+    config,
+    fitting,
+    img_header,
+    models,
+    pyramid,
+    store,
+    streak,
+)
+
+WATCH_ITEM_PREFIX = "watch/"
 
 
 def validate_upload_dir(upload_dir: str | None) -> str:
     if upload_dir is None:
         raise ValueError("The upload directory must not be None.")
-    if not upload_dir.startswith(config.UPLOAD_BASEDIR):
+    # Compared by path components, so that neither a sibling sharing the
+    # prefix of the base directory nor ".." gets through
+    basedir = os.path.realpath(config.UPLOAD_BASEDIR)
+    path = os.path.realpath(upload_dir)
+    if path == basedir or os.path.commonpath([basedir, path]) != basedir:
         raise ValueError("Invalid directory as a upload directory")
     return upload_dir
 
 
+def create_upload_dir() -> str:
+    os.makedirs(config.UPLOAD_BASEDIR, exist_ok=True)
+    upload_dir = tempfile.mkdtemp(dir=config.UPLOAD_BASEDIR)
+    get_item_names(upload_dir)  # Creates an empty catalog
+    return upload_dir
+
+
+def ensure_upload_dir(upload_dir: str | None) -> str:
+    # The janitor removes sessions idle for longer than the TTL while their
+    # pages may still be open, whose directories are then created again
+    upload_dir = validate_upload_dir(upload_dir)
+    if not os.path.isdir(upload_dir):
+        os.makedirs(upload_dir, exist_ok=True)
+        get_item_names(upload_dir)  # Creates an empty catalog
+    return upload_dir
+
+
+def _resolve_item(item_name: str, upload_dir: str) -> tuple[str, str]:
+    # Items of the watched directory are shared by every session
+    if config.WATCH_DIR and item_name.startswith(WATCH_ITEM_PREFIX):
+        return item_name[len(WATCH_ITEM_PREFIX) :], config.WATCH_DIR
+    return item_name, upload_dir
+
+
 def get_item_filepath(item_name: str, upload_dir: str) -> str | None:
-    filepath = os.path.join(upload_dir, item_name)
-    return filepath if os.path.exists(filepath) else None
+    name, directory = _resolve_item(item_name, upload_dir)
+    return catalog.get_catalog(directory).get_filepath(name)
 
 
 def get_item_filepaths(
@@ -35,86 +82,822 @@ def get_existing_item_filepaths(
     item_names: abc.Iterable[str],
     upload_dir: str,
 ) -> list[str]:
-    return [
+    filepaths = [
         path for path in get_item_filepaths(item_names, upload_dir) if path is not None
     ]
+    mark_accessed(upload_dir, filepaths)
+    return filepaths
+
+
+def get_item_names(upload_dir: str) -> list[str]:
+    names = catalog.get_catalog(upload_dir).names()
+    if config.WATCH_DIR and os.path.isdir(config.WATCH_DIR):
+        names += [
+            WATCH_ITEM_PREFIX + name
+            for name in catalog.get_catalog(config.WATCH_DIR).names()
+        ]
+    return names
+
+
+def register_items(item_names: abc.Iterable[str], upload_dir: str) -> None:
+    catalog.get_catalog(upload_dir).add(item_names)
+
+
+def validate_item_name(item_name: str) -> None:
+    if os.path.basename(item_name) != item_name or item_name.startswith("."):
+        raise ValueError(f"Invalid filename {item_name!r}")
+
+
+def validate_item(filepath: str) -> None:
+    # Raises ValueError unless the file is a streak image. The header is enough
+    # for most images, which are decoded as a whole only when it is not
+    # understood, as the catalog does.
+    try:
+        img_header.read_header(filepath)
+    except img_header.HeaderError as e:
+        try:
+            trpl.read_file(filepath)
+        except Exception:
+            raise e from None
+
+
+def save_item(item_name: str, content: bytes, upload_dir: str) -> str:
+    # Written to a hidden temporary file which is renamed once validated, so
+    # that a half-written or corrupt file is never listed nor read
+    validate_item_name(item_name)
+    fd, tmppath = tempfile.mkstemp(dir=upload_dir, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        validate_item(tmppath)
+        filepath = os.path.join(upload_dir, item_name)
+        replaced = os.path.exists(filepath)
+        os.replace(tmppath, filepath)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmppath)
+        raise
+    # Only a replaced file may have been computed from before
+    if replaced:
+        invalidate_filepaths([filepath])
+    return filepath
+
+
+def get_wavelength_range(
+    item_names: abc.Iterable[str], upload_dir: str
+) -> tuple[float, float] | None:
+    return _get_range(item_names, upload_dir, "wavelength_range")
+
+
+def get_time_range(
+    item_names: abc.Iterable[str], upload_dir: str
+) -> tuple[float, float] | None:
+    return _get_range(item_names, upload_dir, "time_range")
+
+
+def _get_range(
+    item_names: abc.Iterable[str], upload_dir: str, attr: str
+) -> tuple[float, float] | None:
+    ranges = list()
+    for item_name in item_names:
+        name, directory = _resolve_item(item_name, upload_dir)
+        entry = catalog.get_catalog(directory).get(name)
+        if entry is not None and getattr(entry, attr) is not None:
+            ranges.append(getattr(entry, attr))
+    if not ranges:
+        return None
+    return min(r[0] for r in ranges), max(r[1] for r in ranges)
+
+
+def mark_accessed(upload_dir: str, filepaths: abc.Iterable[str]) -> None:
+    now = time.time_ns()
+    with contextlib.suppress(OSError):
+        os.utime(upload_dir, ns=(now, now))
+    for filepath in filepaths:
+        # Images of the watched directory are left as the instrument wrote them
+        if _is_watched(filepath):
+            continue
+        # Only the access time is updated, keeping the exact mtime which is
+        # part of the keys of content digests and of the watcher
+        with contextlib.suppress(OSError):
+            os.utime(filepath, ns=(now, os.stat(filepath).st_mtime_ns))
+
+
+def _is_watched(filepath: str) -> bool:
+    if not config.WATCH_DIR:
+        return False
+    watch_dir = os.path.realpath(config.WATCH_DIR)
+    path = os.path.realpath(filepath)
+    return os.path.commonpath([watch_dir, path]) == watch_dir
+
+
+def invalidate_filepaths(filepaths: abc.Iterable[str]) -> None:
+    # Drops what was computed from files which have been replaced or removed
+    filepaths = set(filepaths)
+    if not filepaths:
+        return
+    for func in (
+        load_image,
+        load_time_prefix_sums,
+        _load_wavelength_df,
+        _load_time_df,
+        _load_window_time_dfs,
+        load_irf,
+        load_peaks_df,
+        load_summary_df,
+        load_lifetime_map_df,
+        load_global_analysis,
+        load_fit_intervals,
+        load_pyramid,
+    ):
+        func.cache_discard(filepaths)
+    with _warm_starts_lock:
+        for key in list(_warm_starts):
+            if key[0] in filepaths or key[2] in filepaths:
+                del _warm_starts[key]
 
 
-@functools.lru_cache(maxsize=32)
 def load_trpl_data(filepath: str) -> trpl.TRPLData:
+    # Not cached, as it has a row per pixel; see `load_image`
     return trpl.read_file(filepath)
 
 
-@functools.lru_cache(maxsize=32)
+@cache.lru_cache(maxsize=32)
+def load_image(filepath: str) -> streak.StreakImage:
+    # Decoded from the header and the pixels without a row per pixel, unless
+    # the calibration tables are not found
+    try:
+        header = img_header.read_header(filepath)
+        pixels = img_header.read_pixels(filepath, header)
+    except img_header.HeaderError:
+        return streak.StreakImage.from_trpl_data(load_trpl_data(filepath))
+    return streak.StreakImage(header.time, header.wavelength, pixels, header.metadata)
+
+
+def load_streak_image(
+    filepath: str,
+) -> tuple[npt.NDArray[t.Any], npt.NDArray[t.Any], npt.NDArray[t.Any]]:
+    # The image is indexed by (time, wavelength)
+    img = load_image(filepath)
+    return img.time, img.wavelength, img.intensity
+
+
+def _load_stored_df(
+    filepath: str,
+    kind: str,
+    key: t.Any,
+    compute: abc.Callable[[], pd.DataFrame],
+    persist: abc.Callable[[], bool] = lambda: True,
+) -> pd.DataFrame:
+    # `persist` tells after computing whether the result may be stored
+    if not config.STORE_DIR:
+        return compute()
+    try:
+        digest = store.file_digest(filepath)
+    except OSError:
+        return compute()
+    _store = store.get_store()
+    df = _store.get_df(digest, kind, key)
+    if df is None:
+        df = compute()
+        if persist():
+            _store.put_df(digest, kind, df, key)
+    return df
+
+
+@cache.lru_cache(maxsize=32)
+def load_time_prefix_sums(
+    filepath: str,
+) -> tuple[npt.NDArray[t.Any], npt.NDArray[t.Any], npt.NDArray[np.float64]]:
+    time, wavelength, image = load_streak_image(filepath)
+    # The first row is zero so that a time window [i, j) sums up to
+    # `prefix_sums[j] - prefix_sums[i]`
+    prefix_sums = np.zeros((len(time) + 1, len(wavelength)))
+    np.cumsum(image, axis=0, dtype=np.float64, out=prefix_sums[1:])
+    return time, wavelength, prefix_sums
+
+
+@cache.lru_cache(maxsize=32)
+def load_pyramid(filepath: str) -> list[pyramid.Level]:
+    def compute() -> store.Arrays:
+        time, wavelength, image = load_streak_image(filepath)
+        return pyramid.to_arrays(pyramid.build_pyramid(time, wavelength, image))
+
+    return pyramid.from_arrays(
+        _load_stored_arrays(filepath, "pyramid", pyramid.TILE_SIZE, compute)
+    )
+
+
+def load_streak_image_tiles(
+    filepath: str,
+    time_range: tuple[float, float] | None = None,
+    wavelength_range: tuple[float, float] | None = None,
+) -> tuple[int, pyramid.Level]:
+    levels = load_pyramid(filepath)
+    index = pyramid.select_level(levels, time_range, wavelength_range)
+    return index, pyramid.get_tiles(levels[index], time_range, wavelength_range)
+
+
+def _load_stored_arrays(
+    filepath: str,
+    kind: str,
+    key: t.Any,
+    compute: abc.Callable[[], store.Arrays],
+) -> store.Arrays:
+    if not config.STORE_DIR:
+        return compute()
+    try:
+        digest = store.file_digest(filepath)
+    except OSError:
+        return compute()
+    _store = store.get_store()
+    arrays = _store.get(digest, kind, key)
+    if arrays is None:
+        arrays = compute()
+        _store.put(digest, kind, arrays, key)
+    return arrays
+
+
 def load_wavelength_df(
-    filepath: str, normalize_intensity: bool = False
+    filepath: str,
+    normalize_intensity: bool = False,
+    time_range: tuple[float, float] | None = None,
 ) -> pd.DataFrame:
-    data = load_trpl_data(filepath)
-    df = data.aggregate_along_time()
-    df.attrs["filename"] = os.path.basename(filepath)
+    df = _load_wavelength_df(filepath, time_range)
     if normalize_intensity:
-        max_intensity = df["intensity"].max()
-        df["intensity"] /= max_intensity
+        df = normalize(df, ["intensity"])
     return df
 
 
+@cache.lru_cache(maxsize=32)
+def _load_wavelength_df(
+    filepath: str, time_range: tuple[float, float] | None = None
+) -> pd.DataFrame:
+    if time_range is None:
+        df = _load_stored_df(
+            filepath,
+            "wavelength",
+            None,
+            lambda: load_image(filepath).aggregate_along_time(),
+        )
+    else:
+        df = _compute_time_gated_wavelength_df(filepath, time_range)
+        df.attrs["time_range"] = time_range
+    df = to_precision(df)
+    df.attrs["filename"] = os.path.basename(filepath)
+    return df
+
+
+def to_precision(df: pd.DataFrame) -> pd.DataFrame:
+    # Floats wider than `config.PRECISION` are narrowed once computed, so that
+    # stored results are shared by both precisions
+    dtype = np.dtype(config.PRECISION)
+    columns = [
+        str(column)
+        for column, column_dtype in df.dtypes.items()
+        if column_dtype.kind == "f" and column_dtype.itemsize > dtype.itemsize
+    ]
+    if not columns:
+        return df
+    # `DataFrame.astype` with a mapping compares attrs, which hold arrays of fits
+    return df.assign(**{column: df[column].astype(dtype) for column in columns})
+
+
+def normalize(df: pd.DataFrame, columns: abc.Iterable[str]) -> pd.DataFrame:
+    # Returns a copy so that the cached raw dataframes are never modified
+    max_intensity = df["intensity"].max()
+    return df.assign(**{column: df[column] / max_intensity for column in columns})
+
+
+def _compute_time_gated_wavelength_df(
+    filepath: str, time_range: tuple[float, float]
+) -> pd.DataFrame:
+    time, wavelength, prefix_sums = load_time_prefix_sums(filepath)
+    start = int(np.searchsorted(time, time_range[0], side="left"))
+    stop = int(np.searchsorted(time, time_range[1], side="right"))
+    return pd.DataFrame(
+        dict(
+            wavelength=wavelength,
+            intensity=prefix_sums[max(start, stop)] - prefix_sums[start],
+        )
+    )
+
+
 def load_wavelength_dfs(
     filepaths: abc.Iterable[str],
     normalize_intensity: bool = False,
+    time_range: tuple[float, float] | None = None,
 ) -> list[pd.DataFrame]:
     load = functools.partial(
-        load_wavelength_df, normalize_intensity=normalize_intensity
+        load_wavelength_df,
+        normalize_intensity=normalize_intensity,
+        time_range=time_range,
     )
     return list(map(load, filepaths))
 
 
-@functools.lru_cache(maxsize=32)
 def load_time_df(
     filepath: str,
     wavelength_range: tuple[float, float] | None = None,
     fitting: bool = False,
     normalize_intensity: bool = False,
+    irf_filepath: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+    warm_start: bool = False,
 ) -> pd.DataFrame:
-    data = load_trpl_data(filepath)
-    df = data.aggregate_along_wavelength(wavelength_range)
-    df["fit"] = np.nan
+    # Fits only start from nearby fitted ranges with `warm_start`, which is
+    # for interactive views; such results are not stored
+    df = _load_time_df(
+        filepath, wavelength_range, fitting, irf_filepath, model, warm_start
+    )
+    if normalize_intensity:
+        df = normalize(df, ["intensity", "fit"])
+    return df
+
+
+@cache.lru_cache(maxsize=32)
+def _load_time_df(
+    filepath: str,
+    wavelength_range: tuple[float, float] | None = None,
+    fitting: bool = False,
+    irf_filepath: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+    warm_start: bool = False,
+) -> pd.DataFrame:
+    key: tuple[t.Any, ...] = (wavelength_range, fitting)
+    if fitting:
+        key += (models.get_model(model).name,)
+        if irf_filepath is not None:
+            key += (store.file_digest(irf_filepath),)
+    warm_started = False
+
+    def compute() -> pd.DataFrame:
+        nonlocal warm_started
+        df, warm_started = _compute_time_df(
+            filepath, wavelength_range, fitting, irf_filepath, model, warm_start
+        )
+        return df
+
+    df = _load_stored_df(filepath, "time", key, compute, lambda: not warm_started)
+    df = to_precision(df)
     df.attrs["filename"] = os.path.basename(filepath)
+    return df
+
+
+def _compute_time_df(
+    filepath: str,
+    wavelength_range: tuple[float, float] | None,
+    fitting: bool,
+    irf_filepath: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+    warm_start: bool = False,
+) -> tuple[pd.DataFrame, bool]:
+    # Returns the dataframe and whether its fit started from another range
+    df = load_image(filepath).aggregate_along_wavelength(wavelength_range)
+    df["fit"] = np.nan
+    warm_started = False
+    if fitting:
+        time = df["time"].to_numpy(dtype=np.float64)
+        decays = df["intensity"].to_numpy(dtype=np.float64)[np.newaxis]
+        warm_started = _fit_decays(
+            filepath,
+            time,
+            decays,
+            [df],
+            model,
+            irf_filepath,
+            [wavelength_range],
+            warm_start,
+        )
+    return df, warm_started
+
+
+@cache.lru_cache(maxsize=32)
+def _load_window_time_dfs(
+    filepath: str,
+    windows: tuple[tuple[float, float], ...],
+    fitting: bool,
+    irf_filepath: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+) -> tuple[pd.DataFrame, ...]:
+    time, wavelength, image = load_streak_image(filepath)
+    # Every window is a row of 0/1 weights over the wavelength columns, so all
+    # decays are extracted in one matrix product
+    masks = np.array(
+        [(start <= wavelength) & (wavelength <= stop) for start, stop in windows],
+        dtype=np.float64,
+    ).reshape(len(windows), len(wavelength))
+    decays = masks @ image.T.astype(np.float64)
+    dfs = [
+        pd.DataFrame(dict(time=time, intensity=decay, fit=np.nan)) for decay in decays
+    ]
     if fitting:
-        max_intensity = df["intensity"].max()
-        fit = df["time"].between(
-            *utils.determine_fit_range_dc(
-                df["time"].to_list(),
-                df["intensity"].to_list(),
-            ),
+        _fit_decays(
+            filepath, time, decays, dfs, model, irf_filepath, windows, warm_start=True
         )
-        params, cov = utils.curve_fit(
-            _double_exponential,
-            xdata=df["time"][fit].to_list(),
-            ydata=df["intensity"][fit].to_list() / max_intensity,
-            bounds=(0.0, np.inf),
+    dfs = [to_precision(df) for df in dfs]
+    for df, window in zip(dfs, windows):
+        df.attrs["filename"] = os.path.basename(filepath)
+        df.attrs["window"] = window
+    return tuple(dfs)
+
+
+def _determine_fit_mask(
+    time: npt.NDArray[t.Any], decays: npt.NDArray[np.float64]
+) -> npt.NDArray[np.bool_]:
+    fit = np.zeros(decays.shape, dtype=bool)
+    for i in np.flatnonzero(decays.max(axis=1) > 0):
+        start, stop = utils.determine_fit_range_dc(time.tolist(), decays[i].tolist())
+        fit[i] = (start <= time) & (time <= stop)
+    return fit
+
+
+def _fit_problem(
+    filepath: str,
+    time: npt.NDArray[t.Any],
+    decays: npt.NDArray[np.float64],
+    model: models.Model,
+    irf_filepath: str | None = None,
+) -> tuple[
+    npt.NDArray[np.float64],
+    fitting.Func,
+    fitting.Func,
+    npt.NDArray[np.bool_],
+    npt.NDArray[np.bool_],
+]:
+    # Returns the time axis, the model, the fit masks and the masks for guesses
+    time = np.asarray(time, dtype=np.float64)
+    if irf_filepath is None:
+        fit = _determine_fit_mask(time, decays)
+        # Times are measured from the earliest start of the fit windows
+        x = time - time[np.argmax(fit.any(axis=0))]
+        return x, model.func, model.jac, fit, fit
+    # The whole decay including its rise is fitted with the IRF-convolved
+    # model, which assumes an evenly spaced time axis starting the decay
+    fit = np.ones(decays.shape, dtype=bool)
+    x = time - time[0]
+    func, jac = load_irf(irf_filepath, filepath).wrap(model.func, model.jac)
+    guess_mask = time >= time[np.argmax(decays, axis=1), np.newaxis]
+    return x, func, jac, fit, guess_mask
+
+
+# Fitted parameters of each wavelength range by (filepath, model, IRF), from
+# which fits of nearby ranges start while the wavelength slider is dragged
+_warm_starts: dict[
+    tuple[str, str, str | None], dict[tuple[float, float], npt.NDArray[np.float64]]
+] = dict()
+_warm_starts_lock = threading.Lock()
+_MAX_WARM_STARTS = 64
+
+
+def _get_warm_start(
+    key: tuple[str, str, str | None], wavelength_range: tuple[float, float]
+) -> npt.NDArray[np.float64] | None:
+    with _warm_starts_lock:
+        fitted = _warm_starts.get(key)
+        if not fitted:
+            return None
+        nearest = min(
+            fitted,
+            key=lambda r: abs(r[0] - wavelength_range[0])
+            + abs(r[1] - wavelength_range[1]),
         )
-        fast, slow = sorted((params[:2], params[2:]), key=lambda x: 1 / x[1])
-        a = int(fast[0] / (fast[0] + slow[0]) * 100)
-        df.attrs["fit"] = {
-            "a": a,
-            "tau1": fast[1],
-            "b": 100 - a,
-            "tau2": slow[1],
+        return fitted[nearest]
+
+
+def _put_warm_start(
+    key: tuple[str, str, str | None],
+    wavelength_range: tuple[float, float],
+    params: npt.NDArray[np.float64],
+) -> None:
+    with _warm_starts_lock:
+        fitted = _warm_starts.setdefault(key, dict())
+        fitted.pop(wavelength_range, None)
+        fitted[wavelength_range] = params
+        while len(fitted) > _MAX_WARM_STARTS:
+            del fitted[next(iter(fitted))]
+
+
+def _fit_decays(
+    filepath: str,
+    time: npt.NDArray[t.Any],
+    decays: npt.NDArray[np.float64],
+    dfs: list[pd.DataFrame],
+    model_name: str = models.DEFAULT_MODEL,
+    irf_filepath: str | None = None,
+    wavelength_ranges: abc.Sequence[tuple[float, float] | None] | None = None,
+    warm_start: bool = False,
+) -> bool:
+    # Returns whether any fit started from the parameters of a nearby range.
+    # Converged parameters are remembered either way.
+    model = models.get_model(model_name)
+    x, func, jac, fit, guess_mask = _fit_problem(
+        filepath, time, decays, model, irf_filepath
+    )
+    max_intensity = decays.max(axis=1)
+    valid = max_intensity > 0
+    y = decays[valid] / max_intensity[valid, np.newaxis]
+    p0 = model.guess(x, y, guess_mask[valid])
+    key = (filepath, model.name, irf_filepath)
+    ranges = [
+        None if wavelength_ranges is None else wavelength_ranges[i]
+        for i in np.flatnonzero(valid).tolist()
+    ]
+    warm_started = False
+    for row, wavelength_range in enumerate(ranges):
+        if warm_start and wavelength_range is not None:
+            nearby = _get_warm_start(key, wavelength_range)
+            if nearby is not None:
+                p0[row] = nearby
+                warm_started = True
+    result = fitting.fit_batch_parallel(
+        func, jac, x, y, p0, fit[valid], should_stop=cancellation.current()
+    )
+    for wavelength_range, params, converged in zip(
+        ranges, result.params, result.converged
+    ):
+        if wavelength_range is not None and converged:
+            _put_warm_start(key, wavelength_range, params)
+    curves = func(x, result.params)
+    for i, params, cov, curve in zip(
+        np.flatnonzero(valid), result.params, result.cov, curves
+    ):
+        dfs[i].attrs["fit"] = {
+            "model": model.name,
+            **model.summarize(params),
             "params": params,
             "cov": cov,
         }
-        df["fit"] = _double_exponential(df["time"][fit], *params) * max_intensity  # type: ignore[arg-type]
+        if irf_filepath is not None:
+            dfs[i].attrs["fit"]["irf"] = os.path.basename(irf_filepath)
+        dfs[i].loc[fit[i], "fit"] = curve[fit[i]] * max_intensity[i]
+    return warm_started
+
+
+@cache.lru_cache(maxsize=32)
+def load_fit_intervals(
+    filepath: str,
+    wavelength_range: tuple[float, float] | None = None,
+    model: str = models.DEFAULT_MODEL,
+    irf_filepath: str | None = None,
+) -> dict[str, tuple[float, float]]:
+    key: tuple[t.Any, ...] = (
+        wavelength_range,
+        models.get_model(model).name,
+        config.BOOTSTRAP_RESAMPLES,
+    )
+    if irf_filepath is not None:
+        key += (store.file_digest(irf_filepath),)
+    arrays = _load_stored_arrays(
+        filepath,
+        "bootstrap",
+        key,
+        lambda: _compute_bootstrap_samples(
+            filepath, wavelength_range, model, irf_filepath
+        ),
+    )
+    samples = arrays["samples"]
+    if not np.isfinite(samples).any():
+        return dict()
+    alpha = (1 - fitting.CONFIDENCE_LEVEL) / 2 * 100
+    low, high = np.nanpercentile(samples, [alpha, 100 - alpha], axis=0)
+    return {
+        str(name): (float(lo), float(hi))
+        for name, lo, hi in zip(arrays["names"], low, high)
+    }
+
+
+def _compute_bootstrap_samples(
+    filepath: str,
+    wavelength_range: tuple[float, float] | None,
+    model_name: str,
+    irf_filepath: str | None,
+) -> store.Arrays:
+    df = load_time_df(filepath, wavelength_range, True, False, irf_filepath, model_name)
+    if "fit" not in df.attrs:
+        return dict(names=np.array([], dtype=str), samples=np.empty((0, 0)))
+    model = models.get_model(model_name)
+    time = df["time"].to_numpy(dtype=np.float64)
+    decay = df["intensity"].to_numpy(dtype=np.float64)
+    x, func, jac, fit, _ = _fit_problem(
+        filepath, time, decay[np.newaxis], model, irf_filepath
+    )
+    result = fitting.bootstrap(
+        func,
+        jac,
+        x,
+        decay / decay.max(),
+        np.asarray(df.attrs["fit"]["params"], dtype=np.float64),
+        fit[0],
+        config.BOOTSTRAP_RESAMPLES,
+        should_stop=cancellation.current(),
+    )
+    summaries = [model.summarize(params) for params in result.params]
+    names = list(summaries[0])
+    samples = np.array([[summary[name] for name in names] for summary in summaries])
+    samples[~result.converged] = np.nan
+    return dict(names=np.array(names), samples=samples)
+
+
+def load_multi_fit_intervals(
+    filepaths: abc.Iterable[str],
+    wavelength_ranges: abc.Iterable[tuple[float, float]],
+    model: str = models.DEFAULT_MODEL,
+    irf_filepath: str | None = None,
+) -> list[dict[str, tuple[float, float]]]:
+    wavelength_ranges = [
+        (float(start), float(stop)) for start, stop in wavelength_ranges
+    ]
+    return [
+        load_fit_intervals(filepath, wavelength_range, model, irf_filepath)
+        for filepath in filepaths
+        for wavelength_range in wavelength_ranges
+    ]
+
+
+@cache.lru_cache(maxsize=8)
+def load_irf(irf_filepath: str, filepath: str) -> fitting.IRFConvolution:
+    time, _, _ = load_streak_image(filepath)
+    irf_time, _, irf_image = load_streak_image(irf_filepath)
+    irf = irf_image.sum(axis=1).astype(np.float64)
+    # The dark level of a scatter measurement is taken from its first points
+    irf -= np.median(irf[: max(len(irf) // 20, 1)])
+    irf = np.interp(time, irf_time, irf, left=0.0, right=0.0)
+    return fitting.IRFConvolution.from_irf(irf)
+
+
+def load_window_time_dfs(
+    filepath: str,
+    windows: abc.Iterable[tuple[float, float]],
+    fitting: bool = False,
+    normalize_intensity: bool = False,
+    irf_filepath: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+) -> list[pd.DataFrame]:
+    windows = tuple((float(start), float(stop)) for start, stop in windows)
+    dfs = _load_window_time_dfs(filepath, windows, fitting, irf_filepath, model)
     if normalize_intensity:
-        max_intensity = df["intensity"].max()
-        df["intensity"] /= max_intensity
-        df["fit"] /= max_intensity
+        return [normalize(df, ["intensity", "fit"]) for df in dfs]
+    return list(dfs)
+
+
+def load_multi_window_time_dfs(
+    filepaths: abc.Iterable[str],
+    windows: abc.Iterable[tuple[float, float]],
+    fitting: bool = False,
+    normalize_intensity: bool = False,
+    irf_filepath: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+) -> list[pd.DataFrame]:
+    windows = list(windows)
+    return [
+        df
+        for filepath in filepaths
+        for df in load_window_time_dfs(
+            filepath, windows, fitting, normalize_intensity, irf_filepath, model
+        )
+    ]
+
+
+@cache.lru_cache(maxsize=32)
+def load_peaks_df(filepath: str) -> pd.DataFrame:
+    return _load_stored_df(filepath, "peaks", None, lambda: _compute_peaks_df(filepath))
+
+
+def _compute_peaks_df(filepath: str) -> pd.DataFrame:
+    wdf = load_wavelength_df(filepath)
+    peaks = utils.find_peaks(
+        wdf["wavelength"].to_list(),
+        wdf["intensity"].to_list(),
+    )
+    return pd.DataFrame(
+        [
+            dict(
+                x=peak.x,
+                y=peak.y,
+                x0=peak.x0,
+                x1=peak.x1,
+                y0=peak.y0,
+                width=peak.width,
+            )
+            for peak in peaks
+        ],
+        columns=["x", "y", "x0", "x1", "y0", "width"],
+    )
+
+
+@cache.lru_cache(maxsize=32)
+def load_summary_df(
+    filepath: str,
+    wavelength_range: tuple[float, float] | None = None,
+    model: str = models.DEFAULT_MODEL,
+    irf_filepath: str | None = None,
+) -> pd.DataFrame:
+    # A row of the highest peak and the fitted decay, where only numbers are
+    # stored and the labels are added after loading
+    key: tuple[t.Any, ...] = (wavelength_range, models.get_model(model).name)
+    if irf_filepath is not None:
+        key += (store.file_digest(irf_filepath),)
+    df = _load_stored_df(
+        filepath,
+        "summary",
+        key,
+        lambda: _compute_summary_df(filepath, wavelength_range, model, irf_filepath),
+    )
+    return df.assign(filename=os.path.basename(filepath), model=model)[
+        ["filename", "model", *df.columns]
+    ]
+
+
+def _compute_summary_df(
+    filepath: str,
+    wavelength_range: tuple[float, float] | None,
+    model: str,
+    irf_filepath: str | None = None,
+) -> pd.DataFrame:
+    peaks = load_peaks_df(filepath).sort_values("y", ascending=False)
+    tdf = load_time_df(
+        filepath,
+        wavelength_range,
+        fitting=True,
+        irf_filepath=irf_filepath,
+        model=model,
+    )
+    fit = tdf.attrs.get("fit", dict())
+    summary: dict[str, float] = dict(
+        peak_wavelength=float(peaks["x"].iloc[0]) if len(peaks) else np.nan,
+        peak_intensity=float(peaks["y"].iloc[0]) if len(peaks) else np.nan,
+        FWHM=float(peaks["width"].iloc[0]) if len(peaks) else np.nan,
+    )
+    if fit:
+        summary.update(models.get_model(model).summarize(fit["params"]))
+    return pd.DataFrame([summary])
+
+
+@cache.lru_cache(maxsize=32)
+def load_lifetime_map_df(filepath: str, binning: int = 1) -> pd.DataFrame:
+    df = _load_stored_df(
+        filepath,
+        "lifetime_map",
+        binning,
+        lambda: _compute_lifetime_map_df(filepath, binning),
+    )
+    df.attrs["filename"] = os.path.basename(filepath)
     return df
 
 
-def _double_exponential(
-    time: float, a: float, tau1: float, b: float, tau2: float
-) -> t.Any:
-    return a * np.exp(-time / tau1) + b * np.exp(-time / tau2)
+def _compute_lifetime_map_df(filepath: str, binning: int) -> pd.DataFrame:
+    if binning < 1:
+        raise ValueError("The binning must be a positive integer.")
+    time, wavelength, image = load_streak_image(filepath)
+    n_bins = len(wavelength) // binning
+    wavelength = wavelength[: n_bins * binning].reshape(n_bins, binning).mean(axis=1)
+    decays = (
+        image[:, : n_bins * binning]
+        .astype(np.float64)
+        .reshape(len(time), n_bins, binning)
+        .sum(axis=2)
+        .T
+    )
+    total = decays.sum(axis=0)
+    start, stop = utils.determine_fit_range_dc(time.tolist(), total.tolist())
+    fit = (start <= time) & (time <= stop)
+    x = time[fit] - time[fit][0]
+    max_intensity = decays.max(axis=1)
+    valid = max_intensity > 0
+    y = decays[valid][:, fit] / max_intensity[valid, np.newaxis]
+    model = models.MODELS["double"]
+    result = fitting.fit_batch_parallel(
+        model.func, model.jac, x, y, model.guess(x, y, np.ones(y.shape, dtype=bool))
+    )
+    params = np.full((n_bins, 4), np.nan)
+    params[valid] = result.params
+    converged = np.zeros(n_bins, dtype=bool)
+    converged[valid] = result.converged
+    # Lifetimes of fits which have not converged are not drawn
+    params[~converged] = np.nan
+    # Sorts components so that the first one is the faster
+    swap = params[:, 1] > params[:, 3]
+    params[swap] = params[swap][:, [2, 3, 0, 1]]
+    a = params[:, 0] / (params[:, 0] + params[:, 2]) * 100
+    return pd.DataFrame(
+        dict(
+            wavelength=wavelength,
+            intensity=decays.sum(axis=1),
+            a=a,
+            tau1=params[:, 1],
+            b=100 - a,
+            tau2=params[:, 3],
+            converged=converged,
+        )
+    )
+
+
+def load_lifetime_map_dfs(
+    filepaths: abc.Iterable[str], binning: int = 1
+) -> list[pd.DataFrame]:
+    load = functools.partial(load_lifetime_map_df, binning=binning)
+    return list(map(load, filepaths))
 
 
 def load_time_dfs(
@@ -122,11 +905,32 @@ def load_time_dfs(
     wavelength_range: tuple[float, float] | None = None,
     fitting: bool = False,
     normalize_intensity: bool = False,
+    irf_filepath: str | None = None,
+    model: str = models.DEFAULT_MODEL,
+    warm_start: bool = False,
 ) -> list[pd.DataFrame]:
     load = functools.partial(
         load_time_df,
         wavelength_range=wavelength_range,
         fitting=fitting,
         normalize_intensity=normalize_intensity,
+        irf_filepath=irf_filepath,
+        model=model,
+        warm_start=warm_start,
     )
     return list(map(load, filepaths))
+
+
+@cache.lru_cache(maxsize=32)
+def load_global_analysis(
+    filepath: str, n_components: int = 2, rank: int = 10
+) -> analysis.GlobalAnalysis:
+    def compute() -> store.Arrays:
+        time, wavelength, image = load_streak_image(filepath)
+        return analysis.global_fit(
+            time, wavelength, image, n_components, rank
+        ).to_arrays()
+
+    return analysis.GlobalAnalysis.from_arrays(
+        _load_stored_arrays(filepath, "global_analysis", (n_components, rank), compute)
+    )
@@ -0,0 +1,56 @@
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from dawa_trpl import config
+
+# Figures with more traces than this are drawn with WebGL
+WEBGL_TRACES = 8
+
+
+def minmax_indices(y: npt.ArrayLike, n_out: int) -> npt.NDArray[np.intp]:
+    # Keeps the first and the last points, and the minimum and the maximum of
+    # every bucket, so that peaks and noise envelopes survive
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    n_buckets = n_out // 2
+    if n <= n_out or n_buckets < 1:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    return np.unique(
+        np.concatenate(
+            [
+                [0, n - 1],
+                offsets + np.nanargmin(buckets, axis=1),
+                offsets + np.nanargmax(buckets, axis=1),
+            ]
+        )
+    )
+
+
+def downsample_df(
+    df: pd.DataFrame,
+    x: str,
+    y: str,
+    x_range: tuple[float, float] | None = None,
+    max_points: int | None = None,
+) -> pd.DataFrame:
+    # Rows drawn of the column `y` within the viewport, sorted by `x`. A row
+    # beyond each end of the viewport is kept for lines to reach the edges.
+    if max_points is None:
+        max_points = config.DOWNSAMPLE_POINTS
+    values = df[x].to_numpy()
+    start, stop = 0, len(df)
+    if x_range is not None:
+        start = int(np.searchsorted(values, min(x_range), side="left"))
+        stop = int(np.searchsorted(values, max(x_range), side="right"))
+        start, stop = max(start - 1, 0), min(stop + 1, len(df))
+    indices = start + np.flatnonzero(np.isfinite(df[y].to_numpy()[start:stop]))
+    if max_points > 0:
+        indices = indices[minmax_indices(df[y].to_numpy()[indices], max_points)]
+    return df.iloc[indices]
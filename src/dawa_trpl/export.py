@@ -0,0 +1,114 @@
+import base64
+import io
+import json
+import typing as t
+from collections import abc
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import ipc, parquet
+
+from dawa_trpl import streak
+
+METADATA_KEY = b"dawa_trpl"
+
+TABLE_FORMATS = {
+    "csv": "CSV",
+    "parquet": "Parquet",
+    "arrow": "Arrow IPC",
+}
+IMAGE_FORMATS = {
+    "img": "Raw Image",
+    "npz": "NumPy NPZ",
+}
+
+
+def _json_default(obj: t.Any) -> t.Any:
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_attrs(attrs: abc.Mapping[t.Any, t.Any]) -> str:
+    return json.dumps(attrs, default=_json_default)
+
+
+def df_to_table(df: pd.DataFrame) -> pa.Table:
+    frame = df.copy(deep=False)
+    frame.attrs = dict()  # Stored as JSON under `METADATA_KEY` instead
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = dump_attrs(df.attrs).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def table_to_df(table: pa.Table) -> pd.DataFrame:
+    df: pd.DataFrame = table.to_pandas()
+    metadata = table.schema.metadata or {}
+    if METADATA_KEY in metadata:
+        df.attrs.update(json.loads(metadata[METADATA_KEY]))
+    return df
+
+
+def df_to_parquet(df: pd.DataFrame) -> bytes:
+    with io.BytesIO() as f:
+        parquet.write_table(df_to_table(df), f)
+        return f.getvalue()
+
+
+def df_to_arrow(df: pd.DataFrame) -> bytes:
+    table = df_to_table(df)
+    with io.BytesIO() as f:
+        with ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+        return f.getvalue()
+
+
+def read_parquet(raw: bytes) -> pd.DataFrame:
+    return table_to_df(parquet.read_table(pa.BufferReader(raw)))
+
+
+def read_arrow(raw: bytes) -> pd.DataFrame:
+    return table_to_df(ipc.open_file(pa.BufferReader(raw)).read_all())
+
+
+def streak_image_to_npz(data: streak.StreakImage) -> bytes:
+    with io.BytesIO() as f:
+        np.savez_compressed(
+            f,
+            intensity=data.intensity,
+            time=data.time,
+            wavelength=data.wavelength,
+            metadata=np.array(data.metadata),
+        )
+        return f.getvalue()
+
+
+def df_to_download(
+    df: pd.DataFrame, basename: str, file_format: str
+) -> dict[str, t.Any]:
+    match file_format:
+        case "csv":
+            return dict(
+                filename=basename + ".csv",
+                content=df.to_csv(index=False),
+                type="text/csv",
+                base64=False,
+            )
+        case "parquet":
+            raw = df_to_parquet(df)
+            suffix = ".parquet"
+        case "arrow":
+            raw = df_to_arrow(df)
+            suffix = ".arrow"
+        case _:
+            raise ValueError(f"Unsupported file format: {file_format}")
+    return dict(
+        filename=basename + suffix,
+        content=base64.urlsafe_b64encode(raw).decode(),
+        type="application/octet-stream",
+        base64=True,
+    )
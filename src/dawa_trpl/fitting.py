@@ -0,0 +1,220 @@
+import concurrent.futures
+import dataclasses
+import typing as t
+from collections import abc
+
+import numpy as np
+import numpy.typing as npt
+
+from dawa_trpl import cancellation, config
+
+Array = npt.NDArray[np.float64]
+Func = t.Callable[[Array, Array], Array]
+
+_MIN_PARAM = 1e-12
+CONFIDENCE_LEVEL = 0.95
+
+
+@dataclasses.dataclass(frozen=True)
+class FitResult:
+    params: Array  # (n_curves, n_params)
+    cov: Array  # (n_curves, n_params, n_params)
+    cost: Array  # (n_curves,)
+    converged: npt.NDArray[np.bool_]  # (n_curves,)
+
+
+def double_exponential(x: Array, params: Array) -> Array:
+    a, tau1, b, tau2 = (params[:, i, np.newaxis] for i in range(4))
+    return a * np.exp(-x / tau1) + b * np.exp(-x / tau2)
+
+
+def double_exponential_jacobian(x: Array, params: Array) -> Array:
+    a, tau1, b, tau2 = (params[:, i, np.newaxis] for i in range(4))
+    e1 = np.exp(-x / tau1)
+    e2 = np.exp(-x / tau2)
+    return np.stack(
+        [e1, a * x * e1 / tau1**2, e2, b * x * e2 / tau2**2],
+        axis=-1,
+    )
+
+
+@dataclasses.dataclass(frozen=True)
+class IRFConvolution:
+    irf_fft: npt.NDArray[np.complex128]  # rfft of the unit-area IRF
+    size: int  # number of points of the time grid
+    n_fft: int  # zero-padded length avoiding wrap-around
+
+    @classmethod
+    def from_irf(cls, irf: Array) -> "IRFConvolution":
+        irf = np.clip(np.asarray(irf, dtype=np.float64), 0.0, None)
+        total = irf.sum()
+        if not total > 0:
+            raise ValueError("The IRF must have a positive area.")
+        size = len(irf)
+        n_fft = 1 << (2 * size - 1).bit_length()
+        return cls(irf_fft=np.fft.rfft(irf / total, n_fft), size=size, n_fft=n_fft)
+
+    def convolve(self, y: Array, axis: int = -1) -> Array:
+        y_fft = np.fft.rfft(y, self.n_fft, axis=axis)
+        shape = [1] * y_fft.ndim
+        shape[axis] = -1
+        y_fft *= self.irf_fft.reshape(shape)
+        return np.take(
+            np.fft.irfft(y_fft, self.n_fft, axis=axis), range(self.size), axis=axis
+        )
+
+    def wrap(self, func: Func, jac: Func) -> tuple[Func, Func]:
+        # The convolution is linear, so the Jacobian is the convolved Jacobian
+        def convolved_func(x: Array, params: Array) -> Array:
+            return self.convolve(func(x, params), axis=1)
+
+        def convolved_jac(x: Array, params: Array) -> Array:
+            return self.convolve(jac(x, params), axis=1)
+
+        return convolved_func, convolved_jac
+
+
+def fit_batch(
+    func: Func,
+    jac: Func,
+    x: Array,
+    y: Array,
+    p0: Array,
+    mask: npt.NDArray[np.bool_] | None = None,
+    max_iter: int = 200,
+    tol: float = 1e-10,
+    should_stop: abc.Callable[[], bool] | None = None,
+) -> FitResult:
+    # Levenberg-Marquardt on every row of `y` at once, keeping parameters
+    # positive like `bounds=(0.0, np.inf)` of `curve_fit`
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    mask = np.ones(y.shape, dtype=bool) if mask is None else np.asarray(mask, bool)
+    params = np.maximum(np.array(p0, dtype=np.float64), _MIN_PARAM)
+    n, k = params.shape
+    residual = _masked_residual(y, func(x, params), mask)
+    cost = np.sum(residual**2, axis=1)
+    damping = np.full(n, 1e-3)
+    active = np.ones(n, dtype=bool)
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        if should_stop is not None and should_stop():
+            raise cancellation.Cancelled
+        J = _masked_jacobian(jac(x, params[active]), mask[active])
+        JTJ = np.einsum("nmi,nmj->nij", J, J)
+        g = np.einsum("nmi,nm->ni", J, residual[active])
+        diag = np.einsum("nii->ni", JTJ) + _MIN_PARAM
+        A = JTJ + damping[active, np.newaxis, np.newaxis] * _batch_diag(diag)
+        try:
+            step = np.linalg.solve(A, g[..., np.newaxis])[..., 0]
+        except np.linalg.LinAlgError:
+            step = _pinv_solve(A, g)
+        # Shrinks a parameter by at most 90% per step instead of clipping it to
+        # the bound at once, where exponential terms would vanish for good
+        candidate = np.maximum(params[active] + step, 0.1 * params[active])
+        new_residual = _masked_residual(y[active], func(x, candidate), mask[active])
+        new_cost = np.sum(new_residual**2, axis=1)
+        improved = np.isfinite(new_cost) & (new_cost < cost[active])
+        indices = np.flatnonzero(active)
+        accepted = indices[improved]
+        relative_decrease = (cost[accepted] - new_cost[improved]) / np.maximum(
+            cost[accepted], _MIN_PARAM
+        )
+        params[accepted] = candidate[improved]
+        residual[accepted] = new_residual[improved]
+        cost[accepted] = new_cost[improved]
+        damping[accepted] /= 10
+        damping[indices[~improved]] *= 10
+        active[accepted[relative_decrease < tol]] = False
+        active[indices[~improved & (damping[indices] > 1e10)]] = False
+    converged = ~active
+    J = _masked_jacobian(jac(x, params), mask)
+    JTJ = np.einsum("nmi,nmj->nij", J, J)
+    dof = np.maximum(np.sum(mask, axis=1) - k, 1)
+    cov = np.linalg.pinv(JTJ) * (cost / dof)[:, np.newaxis, np.newaxis]
+    return FitResult(params=params, cov=cov, cost=cost, converged=converged)
+
+
+def _masked_residual(y: Array, f: Array, mask: npt.NDArray[np.bool_]) -> Array:
+    # Masked points may hold non-finite values of the model, e.g. far before
+    # the start of the fit window, which must not leak into the sums
+    return np.where(mask, y - f, 0.0)
+
+
+def _masked_jacobian(J: Array, mask: npt.NDArray[np.bool_]) -> Array:
+    return np.where(mask[..., np.newaxis], J, 0.0)
+
+
+def _batch_diag(diag: Array) -> Array:
+    return diag[..., np.newaxis] * np.eye(diag.shape[-1])
+
+
+def _pinv_solve(A: Array, g: Array) -> Array:
+    return np.einsum("nij,nj->ni", np.linalg.pinv(A), g)  # type: ignore[no-any-return]
+
+
+def fit_batch_parallel(
+    func: Func,
+    jac: Func,
+    x: Array,
+    y: Array,
+    p0: Array,
+    mask: npt.NDArray[np.bool_] | None = None,
+    chunk_size: int = 64,
+    should_stop: abc.Callable[[], bool] | None = None,
+) -> FitResult:
+    n = y.shape[0]
+    if n <= chunk_size or config.WORKERS <= 1:
+        return fit_batch(func, jac, x, y, p0, mask, should_stop=should_stop)
+    chunks = [slice(i, min(i + chunk_size, n)) for i in range(0, n, chunk_size)]
+    with concurrent.futures.ThreadPoolExecutor(config.WORKERS) as executor:
+        results = list(
+            executor.map(
+                lambda s: fit_batch(
+                    func,
+                    jac,
+                    x,
+                    y[s],
+                    p0[s],
+                    None if mask is None else mask[s],
+                    should_stop=should_stop,
+                ),
+                chunks,
+            )
+        )
+    return FitResult(
+        params=np.concatenate([result.params for result in results]),
+        cov=np.concatenate([result.cov for result in results]),
+        cost=np.concatenate([result.cost for result in results]),
+        converged=np.concatenate([result.converged for result in results]),
+    )
+
+
+def bootstrap(
+    func: Func,
+    jac: Func,
+    x: Array,
+    y: Array,
+    params: Array,
+    mask: npt.NDArray[np.bool_],
+    n_resamples: int,
+    seed: int = 0,
+    should_stop: abc.Callable[[], bool] | None = None,
+) -> FitResult:
+    # Residual bootstrap of a single fitted curve: residuals within the mask are
+    # resampled onto the fitted curve, and every resample is refitted at once
+    x = np.asarray(x, dtype=np.float64)
+    curve = func(x, np.asarray(params, dtype=np.float64)[np.newaxis])[0]
+    residuals = (np.asarray(y, dtype=np.float64) - curve)[mask]
+    rng = np.random.default_rng(seed)
+    samples = curve + rng.choice(residuals, (n_resamples, len(x)))
+    return fit_batch_parallel(
+        func,
+        jac,
+        x,
+        samples,
+        np.tile(params, (n_resamples, 1)),
+        np.broadcast_to(mask, samples.shape),
+        should_stop=should_stop,
+    )
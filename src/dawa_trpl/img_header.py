@@ -0,0 +1,112 @@
+import dataclasses
+import os
+import re
+import struct
+import typing as t
+
+import numpy as np
+import numpy.typing as npt
+
+HEADER_SIZE = 64
+CALIBRATION_TABLE_LENGTH = 1024
+_BYTES_PER_PIXEL = {0: 1, 2: 2, 3: 4}
+_SCALING_POINTER_PATTERN = re.compile(rb",\d+,\d+,[^,]*,\*(\d+)")
+
+
+class HeaderError(ValueError):
+    pass
+
+
+@dataclasses.dataclass(frozen=True)
+class ImgHeader:
+    width: int
+    height: int
+    bytes_per_pixel: int
+    metadata: list[str]
+    wavelength: npt.NDArray[np.float32]
+    time: npt.NDArray[np.float32]
+    # Position of the pixels, which follow the comment
+    offset: int
+
+    @property
+    def dtype(self) -> np.dtype[t.Any]:
+        return np.dtype(f"<u{self.bytes_per_pixel}")
+
+    @property
+    def wavelength_range(self) -> tuple[float, float]:
+        return float(self.wavelength[0]), float(self.wavelength[-1])
+
+    @property
+    def time_range(self) -> tuple[float, float]:
+        return float(self.time[0]), float(self.time[-1])
+
+
+def read_header(filepath: str) -> ImgHeader:
+    with open(filepath, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE or header[:2] != b"IM":
+            raise HeaderError(f"Not a streak image: {filepath}")
+        comment_length, width, height = struct.unpack_from("<3H", header, 2)
+        (file_type,) = struct.unpack_from("<H", header, 12)
+        if file_type not in _BYTES_PER_PIXEL or width == 0 or height == 0:
+            raise HeaderError(f"Unsupported image type: {filepath}")
+        comment = f.read(comment_length)
+        size = os.fstat(f.fileno()).st_size
+        for wavelength_offset, time_offset in _calibration_offsets(comment, size):
+            wavelength = _read_table(f, wavelength_offset, width)
+            time = _read_table(f, time_offset, height)
+            if _is_axis(wavelength, width) and _is_axis(time, height):
+                break
+        else:
+            raise HeaderError(f"Calibration tables are not found: {filepath}")
+    return ImgHeader(
+        width=width,
+        height=height,
+        bytes_per_pixel=_BYTES_PER_PIXEL[file_type],
+        metadata=[
+            line
+            for line in comment.decode(errors="replace").splitlines()
+            if line.isprintable()
+        ],
+        wavelength=wavelength,
+        time=time,
+        offset=HEADER_SIZE + comment_length,
+    )
+
+
+def read_pixels(filepath: str, header: ImgHeader) -> npt.NDArray[t.Any]:
+    # The counts of the image, whose rows follow the time axis and columns the
+    # wavelength axis
+    count = header.height * header.width
+    with open(filepath, "rb") as f:
+        f.seek(header.offset)
+        pixels = np.fromfile(f, dtype=header.dtype, count=count)
+    if pixels.size < count:
+        raise HeaderError(f"Pixels are incomplete: {filepath}")
+    return pixels.reshape(header.height, header.width)
+
+
+def _calibration_offsets(comment: bytes, size: int) -> list[tuple[int, int]]:
+    # Scaling pointers in the comment are sometimes off by one byte,
+    # and the tables are also expected at the end of the file
+    offsets = list()
+    pointers = [int(match) for match in _SCALING_POINTER_PATTERN.findall(comment)]
+    if len(pointers) >= 2:
+        offsets += [(pointers[0] + d, pointers[1] + d) for d in (0, -1)]
+    table_size = CALIBRATION_TABLE_LENGTH * 4
+    offsets.append((size - 2 * table_size, size - table_size))
+    return offsets
+
+
+def _read_table(f: t.BinaryIO, offset: int, length: int) -> npt.NDArray[np.float32]:
+    if offset < HEADER_SIZE:
+        return np.empty(0, dtype=np.float32)
+    f.seek(offset)
+    raw = f.read(length * 4)
+    return np.frombuffer(raw[: len(raw) // 4 * 4], dtype="<f4").astype(np.float32)
+
+
+def _is_axis(table: npt.NDArray[np.float32], length: int) -> bool:
+    return bool(
+        table.size == length and np.isfinite(table).all() and (np.diff(table) > 0).all()
+    )
@@ -0,0 +1,125 @@
+import dataclasses
+import logging
+import os
+import shutil
+import threading
+import time
+
+from dawa_trpl import catalog, config, store
+from dawa_trpl import data_system as ds
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class UploadedFile:
+    path: str
+    size: int
+    accessed: float
+
+
+def list_upload_dirs(upload_basedir: str) -> list[str]:
+    if not os.path.isdir(upload_basedir):
+        return list()
+    with os.scandir(upload_basedir) as entries:
+        return [entry.path for entry in entries if entry.is_dir()]
+
+
+def list_uploaded_files(upload_dir: str) -> list[UploadedFile]:
+    files = list()
+    with os.scandir(upload_dir) as entries:
+        for entry in entries:
+            if not entry.is_file() or entry.name.startswith("."):
+                continue
+            stat = entry.stat()
+            files.append(
+                UploadedFile(
+                    path=entry.path,
+                    size=stat.st_size,
+                    accessed=max(stat.st_atime, stat.st_mtime),
+                )
+            )
+    return files
+
+
+def last_accessed(upload_dir: str, files: list[UploadedFile]) -> float:
+    # The access time of a directory is updated by listing it, so it is not used
+    return max([os.stat(upload_dir).st_mtime] + [file.accessed for file in files])
+
+
+def _evict_lru(files: list[UploadedFile], quota: int) -> list[UploadedFile]:
+    evicted = list()
+    total = sum(file.size for file in files)
+    for file in sorted(files, key=lambda file: file.accessed):
+        if total <= quota:
+            break
+        evicted.append(file)
+        total -= file.size
+    return evicted
+
+
+def collect(now: float | None = None) -> list[str]:
+    now = time.time() if now is None else now
+    removed: list[str] = list()
+    remaining: list[UploadedFile] = list()
+    for upload_dir in list_upload_dirs(config.UPLOAD_BASEDIR):
+        files = list_uploaded_files(upload_dir)
+        if now - last_accessed(upload_dir, files) > config.UPLOAD_SESSION_TTL:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            removed.extend(file.path for file in files)
+            continue
+        evicted = _evict_lru(files, config.UPLOAD_SESSION_QUOTA)
+        removed.extend(_remove(evicted))
+        remaining.extend(file for file in files if file not in evicted)
+    removed.extend(_remove(_evict_lru(remaining, config.UPLOAD_TOTAL_QUOTA)))
+    if removed:
+        logger.info("Removed %d uploaded files", len(removed))
+        catalog.discard_filepaths(removed)
+        ds.invalidate_filepaths(removed)
+    prune_store(now)
+    return removed
+
+
+def prune_store(now: float | None = None) -> list[str]:
+    if not config.STORE_DIR:
+        return list()
+    deleted = store.get_store().prune(config.STORE_QUOTA, config.STORE_TTL, now)
+    if deleted:
+        logger.info("Removed stored results of %d images", len(deleted))
+    return deleted
+
+
+def _remove(files: list[UploadedFile]) -> list[str]:
+    removed = list()
+    for file in files:
+        try:
+            os.remove(file.path)
+        except FileNotFoundError:
+            pass
+        removed.append(file.path)
+    return removed
+
+
+class Janitor(threading.Thread):
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="dawa-trpl-janitor", daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                collect()
+            except Exception:  # pragma: no cover
+                logger.exception("Failed to collect uploaded files")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+def start() -> Janitor | None:
+    if config.JANITOR_INTERVAL <= 0:
+        return None
+    janitor = Janitor(config.JANITOR_INTERVAL)
+    janitor.start()
+    return janitor
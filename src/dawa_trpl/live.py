@@ -0,0 +1,161 @@
+import dataclasses
+import logging
+import os
+import threading
+import typing as t
+
+import numpy as np
+import numpy.typing as npt
+
+from dawa_trpl import config, img_header, watch
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class Update:
+    # Rows of the image changed since the version asked, with the running sums
+    # along each axis which are small enough to be sent whole. Views older than
+    # `reset_version` are drawn again, as the axes may have changed.
+    header: img_header.ImgHeader
+    version: int
+    reset_version: int
+    rows: npt.NDArray[np.intp]
+    image: npt.NDArray[np.int64]
+    spectrum: npt.NDArray[np.int64]
+    decay: npt.NDArray[np.int64]
+
+
+class Acquisition:
+    # Running sums of an acquisition in progress, which is either a directory
+    # where frames are added as .img files or an .img rewritten as counts
+    # accumulate. Only new frames, or the difference of the rewritten image,
+    # are added to the sums.
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.header: img_header.ImgHeader | None = None
+        self.version = 0
+        self._reset_version = 0
+        self._intensity = np.zeros((0, 0), dtype=np.int64)
+        self._spectrum = np.zeros(0, dtype=np.int64)
+        self._decay = np.zeros(0, dtype=np.int64)
+        self._row_versions = np.zeros(0, dtype=np.int64)
+        self._frames: set[str] = set()
+        self._stat: watch.Stat | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_sequence(self) -> bool:
+        return os.path.isdir(self.path)
+
+    def poll(self) -> bool:
+        # Returns whether the sums have changed
+        with self._lock:
+            version = self.version
+            if self.is_sequence:
+                self._poll_frames()
+            else:
+                self._poll_file()
+            return self.version != version
+
+    def _poll_frames(self) -> None:
+        names = sorted(set(watch.stat_files(self.path)) - self._frames)
+        for name in names:
+            if not name.endswith(".img"):
+                continue
+            filepath = os.path.join(self.path, name)
+            try:
+                header, pixels = _read(filepath)
+            except (OSError, img_header.HeaderError):
+                continue  # Not completely written yet
+            self._frames.add(name)
+            if self.header is None:
+                self._reset(header)
+            elif pixels.shape != self._intensity.shape:
+                logger.warning("Skipped a frame of another shape: %s", filepath)
+                continue
+            self._add(pixels.astype(np.int64))
+
+    def _poll_file(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        if (stat.st_size, stat.st_mtime_ns) == self._stat:
+            return
+        try:
+            header, pixels = _read(self.path)
+        except (OSError, img_header.HeaderError):
+            return  # Retried once the file is written again
+        self._stat = (stat.st_size, stat.st_mtime_ns)
+        if self.header is None or pixels.shape != self._intensity.shape:
+            self._reset(header)
+        self._add(pixels.astype(np.int64) - self._intensity)
+
+    def _reset(self, header: img_header.ImgHeader) -> None:
+        self.header = header
+        self._reset_version = self.version + 1
+        self._intensity = np.zeros((header.height, header.width), dtype=np.int64)
+        self._spectrum = np.zeros(header.width, dtype=np.int64)
+        self._decay = np.zeros(header.height, dtype=np.int64)
+        self._row_versions = np.full(header.height, self._reset_version)
+
+    def _add(self, delta: npt.NDArray[np.int64]) -> None:
+        self.version += 1
+        self._intensity += delta
+        self._spectrum += delta.sum(axis=0)
+        self._decay += delta.sum(axis=1)
+        self._row_versions[delta.any(axis=1)] = self.version
+
+    def changes(self, since: int = 0) -> Update | None:
+        with self._lock:
+            if self.header is None:
+                return None
+            rows = np.flatnonzero(self._row_versions > since)
+            return Update(
+                header=self.header,
+                version=self.version,
+                reset_version=self._reset_version,
+                rows=rows,
+                image=self._intensity[rows],
+                spectrum=self._spectrum.copy(),
+                decay=self._decay.copy(),
+            )
+
+
+def _read(filepath: str) -> tuple[img_header.ImgHeader, npt.NDArray[t.Any]]:
+    header = img_header.read_header(filepath)
+    return header, img_header.read_pixels(filepath, header)
+
+
+def list_acquisitions() -> list[str]:
+    # Images and directories of frames in the watched directory
+    if not config.WATCH_DIR or not os.path.isdir(config.WATCH_DIR):
+        return list()
+    with os.scandir(config.WATCH_DIR) as entries:
+        return sorted(
+            entry.name
+            for entry in entries
+            if not entry.name.startswith(".")
+            and (entry.is_dir() or entry.name.endswith(".img"))
+        )
+
+
+_acquisitions: dict[str, Acquisition] = dict()
+_acquisitions_lock = threading.Lock()
+
+
+def get_acquisition(name: str) -> Acquisition:
+    # Shared by every session, so that each frame is read once. Acquisitions
+    # removed from the watched directory are dropped with their sums.
+    names = list_acquisitions()
+    if name not in names:
+        raise ValueError(f"Unknown acquisition {name!r}")
+    paths = {os.path.join(config.WATCH_DIR, n) for n in names}
+    path = os.path.join(config.WATCH_DIR, name)
+    with _acquisitions_lock:
+        for removed in set(_acquisitions) - paths:
+            del _acquisitions[removed]
+        if path not in _acquisitions:
+            _acquisitions[path] = Acquisition(path)
+        return _acquisitions[path]
@@ -0,0 +1,199 @@
+import dataclasses
+from collections import abc
+
+import numpy as np
+import numpy.typing as npt
+
+from dawa_trpl import fitting
+from dawa_trpl.fitting import Array
+
+Mask = npt.NDArray[np.bool_]
+Guess = abc.Callable[[Array, Array, Mask], Array]
+Summarize = abc.Callable[[Array], dict[str, float]]
+
+
+@dataclasses.dataclass(frozen=True)
+class Model:
+    name: str
+    label: str
+    func: fitting.Func
+    jac: fitting.Func
+    guess: Guess  # (x, y, mask) -> p0 of shape (n_curves, n_params)
+    summarize: Summarize
+
+
+def _positive(x: Array) -> Array:
+    # Points before the fit window are masked out, but must stay finite
+    return np.clip(x, 0.0, None)
+
+
+def _initial_values(x: Array, y: Array, mask: Mask) -> tuple[Array, Array]:
+    # Amplitudes at the start of the fit window and the times to decay by 1/e
+    rows = np.arange(len(y))
+    first = np.argmax(mask, axis=1)
+    last = mask.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1)
+    y0 = np.maximum(y[rows, first], 1e-12)
+    below = mask & (y < y0[:, np.newaxis] / np.e)
+    span = x[last] - x[first]
+    decay_time = np.where(
+        below.any(axis=1), x[np.argmax(below, axis=1)] - x[first], span / 2
+    )
+    dx = np.min(np.diff(x)) if len(x) > 1 else 1.0
+    return y0, np.maximum(decay_time, dx)
+
+
+def _exponentials(n: int) -> tuple[fitting.Func, fitting.Func]:
+    def func(x: Array, params: Array) -> Array:
+        x = _positive(x)
+        a, tau = params[:, 0::2, np.newaxis], params[:, 1::2, np.newaxis]
+        return np.sum(a * np.exp(-x / tau), axis=1)  # type: ignore[no-any-return]
+
+    def jac(x: Array, params: Array) -> Array:
+        x = _positive(x)
+        a, tau = params[:, 0::2, np.newaxis], params[:, 1::2, np.newaxis]
+        e = np.exp(-x / tau)
+        J = np.empty((len(params), len(x), 2 * n))
+        J[..., 0::2] = np.moveaxis(e, 1, 2)
+        J[..., 1::2] = np.moveaxis(a * x * e / tau**2, 1, 2)
+        return J
+
+    return func, jac
+
+
+def _exponentials_guess(scales: abc.Sequence[float]) -> Guess:
+    def guess(x: Array, y: Array, mask: Mask) -> Array:
+        y0, decay_time = _initial_values(x, y, mask)
+        columns = list()
+        for scale in scales:
+            columns += [y0 / len(scales), decay_time * scale]
+        return np.column_stack(columns)
+
+    return guess
+
+
+def _summarize_exponentials(params: Array) -> dict[str, float]:
+    a, tau = params[0::2], params[1::2]
+    order = np.argsort(tau)
+    summary = dict()
+    for i, j in enumerate(order, start=1):
+        summary[f"a{i}"] = float(a[j] / a.sum() * 100)
+        summary[f"tau{i}"] = float(tau[j])
+    return summary
+
+
+def _summarize_double_exponential(params: Array) -> dict[str, float]:
+    fast, slow = sorted((params[:2], params[2:]), key=lambda x: 1 / x[1])
+    a = int(fast[0] / (fast[0] + slow[0]) * 100)
+    return dict(a=a, tau1=float(fast[1]), b=100 - a, tau2=float(slow[1]))
+
+
+def _double_exponential(x: Array, params: Array) -> Array:
+    return fitting.double_exponential(_positive(x), params)
+
+
+def _double_exponential_jacobian(x: Array, params: Array) -> Array:
+    return fitting.double_exponential_jacobian(_positive(x), params)
+
+
+def _stretched_exponential(x: Array, params: Array) -> Array:
+    a, tau, beta = (params[:, i, np.newaxis] for i in range(3))
+    return a * np.exp(-((_positive(x) / tau) ** beta))
+
+
+def _stretched_exponential_jacobian(x: Array, params: Array) -> Array:
+    a, tau, beta = (params[:, i, np.newaxis] for i in range(3))
+    ratio = _positive(x) / tau
+    power = ratio**beta
+    e = np.exp(-power)
+    log_ratio = np.log(np.where(ratio > 0, ratio, 1.0))
+    return np.stack(
+        [e, a * e * beta * power / tau, -a * e * power * log_ratio], axis=-1
+    )
+
+
+def _stretched_exponential_guess(x: Array, y: Array, mask: Mask) -> Array:
+    y0, decay_time = _initial_values(x, y, mask)
+    return np.column_stack([y0, decay_time, np.full(len(y), 0.7)])
+
+
+def _power_law(x: Array, params: Array) -> Array:
+    a, tau, alpha = (params[:, i, np.newaxis] for i in range(3))
+    return a * (1 + _positive(x) / tau) ** -alpha
+
+
+def _power_law_jacobian(x: Array, params: Array) -> Array:
+    a, tau, alpha = (params[:, i, np.newaxis] for i in range(3))
+    x = _positive(x)
+    base = 1 + x / tau
+    p = base**-alpha
+    return np.stack(
+        [p, a * alpha * p / base * x / tau**2, -a * p * np.log(base)], axis=-1
+    )
+
+
+def _power_law_guess(x: Array, y: Array, mask: Mask) -> Array:
+    y0, decay_time = _initial_values(x, y, mask)
+    # (1 + t / tau)^-2 decays by 1/e at t = (e^0.5 - 1) tau
+    return np.column_stack([y0, decay_time / (np.exp(0.5) - 1), np.full(len(y), 2.0)])
+
+
+def _summarize_params(*names: str) -> Summarize:
+    def summarize(params: Array) -> dict[str, float]:
+        return {name: float(value) for name, value in zip(names, params)}
+
+    return summarize
+
+
+MODELS: dict[str, Model] = {
+    model.name: model
+    for model in [
+        Model(
+            name="single",
+            label="Single Exponential",
+            func=_exponentials(1)[0],
+            jac=_exponentials(1)[1],
+            guess=_exponentials_guess([1.0]),
+            summarize=_summarize_params("a", "tau"),
+        ),
+        Model(
+            name="double",
+            label="Double Exponential",
+            func=_double_exponential,
+            jac=_double_exponential_jacobian,
+            guess=_exponentials_guess([1 / 3, 3.0]),
+            summarize=_summarize_double_exponential,
+        ),
+        Model(
+            name="triple",
+            label="Triple Exponential",
+            func=_exponentials(3)[0],
+            jac=_exponentials(3)[1],
+            guess=_exponentials_guess([1 / 5, 1.0, 5.0]),
+            summarize=_summarize_exponentials,
+        ),
+        Model(
+            name="stretched",
+            label="Stretched Exponential",
+            func=_stretched_exponential,
+            jac=_stretched_exponential_jacobian,
+            guess=_stretched_exponential_guess,
+            summarize=_summarize_params("a", "tau", "beta"),
+        ),
+        Model(
+            name="power_law",
+            label="Power Law",
+            func=_power_law,
+            jac=_power_law_jacobian,
+            guess=_power_law_guess,
+            summarize=_summarize_params("a", "tau", "alpha"),
+        ),
+    ]
+}
+DEFAULT_MODEL = "double"
+
+
+def get_model(name: str) -> Model:
+    try:
+        return MODELS[name]
+    except KeyError:
+        raise ValueError(f"Unknown fit model: {name}") from None
@@ -4,15 +4,17 @@ import io
 import pathlib
 import re
 import typing as t
+from collections import abc
 
 import dash
 import dash_bootstrap_components as dbc
+import numpy as np
 import plotly.graph_objects as go
 import tlab_pptx
 from dash import dcc
-from tlab_analysis import utils
 
 from dawa_trpl import data_system as ds
+from dawa_trpl import fitting, models
 from dawa_trpl.components import upload_bar
 from dawa_trpl.components.tabs import h_figure_tab, v_figure_tab
 
@@ -36,34 +38,94 @@ def update_download_button_ability(selected_items: list[str] | None) -> bool:
     return bool(len(selected_items) != 1)
 
 
-@dash.callback(
-    dash.Output(download, "data"),
-    dash.Input(download_button, "n_clicks"),
-    dash.State(upload_bar.files_dropdown, "value"),
-    dash.State(upload_bar.upload_dir_store, "data"),
-    dash.State(v_figure_tab.wavelength_slider, "value"),
-    dash.State(h_figure_tab.graph, "figure"),
-    dash.State(v_figure_tab.graph, "figure"),
-    prevent_initial_call=True,
-)
-def download_powerpoint(
-    n_clicks: int,
-    selected_items: list[str] | None,
-    upload_dir: str,
-    wavelength_range: list[int],
-    h_fig: dict[str, t.Any] | None,
-    v_fig: dict[str, t.Any] | None,
-) -> dict[str, t.Any]:
-    if not selected_items:
-        raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
-    filepaths = ds.get_existing_item_filepaths(
-        selected_items,
-        ds.validate_upload_dir(upload_dir),
+def _has_data(fig: dict[str, t.Any] | None) -> bool:
+    # Graphs of tabs not opened since the selection changed are empty
+    return bool(fig and fig.get("data"))
+
+
+def create_h_figure(filepath: str) -> go.Figure:
+    return h_figure_tab.process.create_figure(ds.load_wavelength_dfs([filepath]))
+
+
+def create_v_figure(
+    filepath: str,
+    wavelength_range: abc.Sequence[float],
+    model: str = models.DEFAULT_MODEL,
+    irf_filepath: str | None = None,
+) -> go.Figure:
+    dfs = ds.load_time_dfs(
+        [filepath],
+        (float(wavelength_range[0]), float(wavelength_range[1])),
+        True,
+        irf_filepath=irf_filepath,
+        model=model,
     )
-    if len(filepaths) == 0:
-        raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
-    filepath = filepaths[0]
-    data = ds.load_trpl_data(filepath)
+    fig = v_figure_tab.process.create_figure(dfs, log_y=True)
+    return v_figure_tab.process.add_fitting_curve(fig, dfs)
+
+
+def _add_textbox(prs: t.Any, text: str, row: int = 1) -> None:
+    # Lengths are in EMU, placed in rows from the bottom of the first slide
+    margin = prs.slide_height // 20
+    textbox = prs.slides[0].shapes.add_textbox(
+        margin,
+        prs.slide_height - (row + 1) * margin,
+        prs.slide_width - 2 * margin,
+        margin,
+    )
+    textbox.text_frame.text = text
+
+
+def get_slide_lifetimes(fit: dict[str, t.Any]) -> tuple[int, int, float, float]:
+    # The slide has the two components of a double exponential, which other
+    # models fill with their fastest and slowest ones
+    if "b" in fit:
+        return int(fit["a"]), int(fit["b"]), float(fit["tau1"]), float(fit["tau2"])
+    if "tau" in fit:
+        return 100, 0, float(fit["tau"]), float(fit["tau"])
+    n_components = sum(re.fullmatch(r"tau\d+", str(key)) is not None for key in fit)
+    a = int(fit["a1"])
+    return a, 100 - a, float(fit["tau1"]), float(fit[f"tau{n_components}"])
+
+
+def add_fit_textbox(prs: t.Any, model: str, fit: dict[str, t.Any]) -> None:
+    summary = models.get_model(model).summarize(np.asarray(fit["params"]))
+    values = ", ".join(f"{name} = {value:.3g}" for name, value in summary.items())
+    _add_textbox(prs, f"{models.get_model(model).label}: {values}", row=2)
+
+
+_SUBSCRIPTS = str.maketrans("0123456789", "₀₁₂₃₄₅₆₇₈₉")
+
+
+def _lifetime_index(name: str) -> str | None:
+    match = re.fullmatch(r"tau(\d*)", name)
+    return match[1] if match else None
+
+
+def add_intervals_textbox(
+    prs: t.Any, intervals: dict[str, tuple[float, float]]
+) -> None:
+    # Lifetimes of any model, such as `tau` or `tau1`, `tau2` and `tau3`
+    lifetimes = [
+        f"τ{index.translate(_SUBSCRIPTS)} = {low:.3g}–{high:.3g} ns"
+        for name, (low, high) in intervals.items()
+        if (index := _lifetime_index(name)) is not None
+    ]
+    _add_textbox(prs, f"{fitting.CONFIDENCE_LEVEL:.0%} CI: " + ", ".join(lifetimes))
+
+
+def build_presentation(
+    filepath: str,
+    wavelength_range: tuple[float, float],
+    h_fig: go.Figure | None = None,
+    v_fig: go.Figure | None = None,
+    confidence_interval: bool = False,
+    model: str = models.DEFAULT_MODEL,
+    irf_filepath: str | None = None,
+) -> t.Any:
+    # Figures are created from the file unless given as shown in the app, and
+    # lifetimes are fitted with the model and the IRF of the V-Figure tab
+    data = ds.load_image(filepath)
     frame = (
         int(match[0])
         if (match := re.search(r"(?<=Frame=)[0-9]+(?=,)", data.metadata[0]))
@@ -81,28 +143,85 @@ def download_powerpoint(
         if (match := re.search(r"(?<=Date:)[0-9/]+(?=,)", data.metadata[3]))
         else datetime.date.today()
     )
-    wdf = ds.load_wavelength_df(filepath)
-    peaks = utils.find_peaks(
-        wdf["wavelength"].to_list(),
-        wdf["intensity"].to_list(),
+    peaks = ds.load_peaks_df(filepath).sort_values("y")
+    tdf = ds.load_time_df(
+        filepath,
+        wavelength_range,
+        fitting=True,
+        irf_filepath=irf_filepath,
+        model=model,
     )
-    peaks.sort(key=lambda peak: peak.y)
-    tdf = ds.load_time_df(filepath, tuple(wavelength_range[:2]), fitting=True)
+    a, b, tau1, tau2 = get_slide_lifetimes(tdf.attrs["fit"])
     prs = tlab_pptx.presentation.photo_luminescence.build(
         title_text="title",
         excitation_wavelength=405,  # TODO: Retrieve from `item`
         excitation_power=5,  # TODO: Retrieve from `item`
         time_range=round(data.time.max() - data.time.min()),
         center_wavelength=int(center_wavelength),
-        FWHM=peaks[0].width,
+        FWHM=float(peaks["width"].iloc[0]),
         frame=frame,
         date=date,
-        h_fig=go.Figure(h_fig),
-        v_fig=go.Figure(v_fig),
-        a=int(tdf.attrs["fit"]["a"]),
-        b=int(tdf.attrs["fit"]["b"]),
-        tau1=float(tdf.attrs["fit"]["tau1"]),
-        tau2=float(tdf.attrs["fit"]["tau2"]),
+        h_fig=h_fig if h_fig is not None else create_h_figure(filepath),
+        v_fig=(
+            v_fig
+            if v_fig is not None
+            else create_v_figure(filepath, list(wavelength_range), model, irf_filepath)
+        ),
+        a=a,
+        b=b,
+        tau1=tau1,
+        tau2=tau2,
+    )
+    if models.get_model(model).name != models.DEFAULT_MODEL:
+        add_fit_textbox(prs, model, tdf.attrs["fit"])
+    if confidence_interval:
+        intervals = ds.load_fit_intervals(
+            filepath, wavelength_range, model, irf_filepath
+        )
+        if intervals:
+            add_intervals_textbox(prs, intervals)
+    return prs
+
+
+@dash.callback(
+    dash.Output(download, "data"),
+    dash.Input(download_button, "n_clicks"),
+    dash.State(upload_bar.files_dropdown, "value"),
+    dash.State(upload_bar.upload_dir_store, "data"),
+    dash.State(v_figure_tab.wavelength_slider, "value"),
+    dash.State(h_figure_tab.graph, "figure"),
+    dash.State(v_figure_tab.graph, "figure"),
+    dash.State(v_figure_tab.confidence_interval_switch, "value"),
+    dash.State(v_figure_tab.fit_model_select, "value"),
+    dash.State(v_figure_tab.irf_select, "value"),
+    prevent_initial_call=True,
+)
+def download_powerpoint(
+    n_clicks: int,
+    selected_items: list[str] | None,
+    upload_dir: str,
+    wavelength_range: list[int],
+    h_fig: dict[str, t.Any] | None,
+    v_fig: dict[str, t.Any] | None,
+    confidence_interval: bool = False,
+    model: str = models.DEFAULT_MODEL,
+    irf_item: str | None = None,
+) -> dict[str, t.Any]:
+    if not selected_items:
+        raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
+    upload_dir = ds.validate_upload_dir(upload_dir)
+    filepaths = ds.get_existing_item_filepaths(selected_items, upload_dir)
+    if len(filepaths) == 0:
+        raise dash.exceptions.PreventUpdate  # TODO: Notify error to users
+    filepath = filepaths[0]
+    prs = build_presentation(
+        filepath,
+        (float(wavelength_range[0]), float(wavelength_range[1])),
+        go.Figure(h_fig) if _has_data(h_fig) else None,
+        go.Figure(v_fig) if _has_data(v_fig) else None,
+        confidence_interval,
+        model,
+        v_figure_tab.get_irf_filepath(irf_item, upload_dir),
     )
     with io.BytesIO() as f:
         prs.save(f)
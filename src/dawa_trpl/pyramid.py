@@ -0,0 +1,125 @@
+import dataclasses
+import math
+import typing as t
+
+import numpy as np
+import numpy.typing as npt
+
+from dawa_trpl import store
+
+Array = npt.NDArray[np.float64]
+
+TILE_SIZE = 256
+
+
+@dataclasses.dataclass(frozen=True)
+class Level:
+    time: Array  # (n_time,)
+    wavelength: Array  # (n_wavelength,)
+    image: npt.NDArray[np.float32]  # (n_time, n_wavelength)
+
+
+def _pool(values: npt.NDArray[t.Any], axis: int) -> npt.NDArray[t.Any]:
+    # Averages pairs along the axis, where the last element of an odd length is
+    # paired with itself
+    if values.shape[axis] % 2:
+        last = np.take(values, [-1], axis=axis)
+        values = np.concatenate([values, last], axis=axis)
+    shape = list(values.shape)
+    shape[axis : axis + 1] = [values.shape[axis] // 2, 2]
+    return values.reshape(shape).mean(axis=axis + 1)  # type: ignore[no-any-return]
+
+
+def build_pyramid(
+    time: Array,
+    wavelength: Array,
+    image: npt.NDArray[t.Any],
+    tile_size: int = TILE_SIZE,
+) -> list[Level]:
+    # Every level halves the previous one by 2x2 mean pooling, down to a level
+    # fitting within a single tile
+    levels = [
+        Level(
+            time=np.asarray(time, dtype=np.float64),
+            wavelength=np.asarray(wavelength, dtype=np.float64),
+            image=np.asarray(image, dtype=np.float32),
+        )
+    ]
+    while max(levels[-1].image.shape) > tile_size:
+        level = levels[-1]
+        levels.append(
+            Level(
+                time=_pool(level.time, 0),
+                wavelength=_pool(level.wavelength, 0),
+                image=_pool(_pool(level.image, 0), 1).astype(np.float32),
+            )
+        )
+    return levels
+
+
+def to_arrays(levels: list[Level]) -> store.Arrays:
+    arrays: store.Arrays = dict()
+    for i, level in enumerate(levels):
+        arrays[f"time_{i}"] = level.time
+        arrays[f"wavelength_{i}"] = level.wavelength
+        arrays[f"image_{i}"] = level.image
+    return arrays
+
+
+def from_arrays(arrays: store.Arrays) -> list[Level]:
+    return [
+        Level(
+            time=arrays[f"time_{i}"],
+            wavelength=arrays[f"wavelength_{i}"],
+            image=arrays[f"image_{i}"],
+        )
+        for i in range(len(arrays) // 3)
+    ]
+
+
+def _index_range(
+    axis: Array, value_range: tuple[float, float] | None
+) -> tuple[int, int]:
+    if value_range is None:
+        return 0, len(axis)
+    start = int(np.searchsorted(axis, min(value_range), side="left"))
+    stop = int(np.searchsorted(axis, max(value_range), side="right"))
+    return max(start - 1, 0), min(stop + 1, len(axis))
+
+
+def select_level(
+    levels: list[Level],
+    time_range: tuple[float, float] | None = None,
+    wavelength_range: tuple[float, float] | None = None,
+    tile_size: int = TILE_SIZE,
+) -> int:
+    # The finest level showing the viewport with no more points than a tile
+    # along each axis
+    start, stop = _index_range(levels[0].time, time_range)
+    n_time = stop - start
+    start, stop = _index_range(levels[0].wavelength, wavelength_range)
+    n_wavelength = stop - start
+    n = max(n_time, n_wavelength, 1)
+    return min(max(math.ceil(math.log2(n / tile_size)), 0), len(levels) - 1)
+
+
+def get_tiles(
+    level: Level,
+    time_range: tuple[float, float] | None = None,
+    wavelength_range: tuple[float, float] | None = None,
+    tile_size: int = TILE_SIZE,
+) -> Level:
+    # Crops the level to the tiles overlapping the viewport
+    def tile_slice(axis: Array, value_range: tuple[float, float] | None) -> slice:
+        start, stop = _index_range(axis, value_range)
+        start = start // tile_size * tile_size
+        stop = min(-(-stop // tile_size) * tile_size, len(axis))
+        return slice(start, max(stop, start))
+
+    rows = tile_slice(level.time, time_range)
+    columns = tile_slice(level.wavelength, wavelength_range)
+    return Level(
+        time=level.time[rows],
+        wavelength=level.wavelength[columns],
+        image=level.image[rows, columns],
+    )
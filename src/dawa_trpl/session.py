@@ -0,0 +1,212 @@
+import dataclasses
+import os
+import sys
+import typing as t
+from collections import abc
+
+import numpy.typing as npt
+import pandas as pd
+import plotly.graph_objects as go
+
+from dawa_trpl import analysis, batch, models, streak
+from dawa_trpl import data_system as ds
+from dawa_trpl.components.tabs.h_figure_tab import process as h_process
+from dawa_trpl.components.tabs.lifetime_map_tab import process as lifetime_map_process
+from dawa_trpl.components.tabs.streak_image_tab import process as streak_image_process
+from dawa_trpl.components.tabs.v_figure_tab import process as v_process
+
+
+@dataclasses.dataclass(frozen=True)
+class Dataset:
+    # An image loaded lazily through the caches of the app, so that it is read
+    # and processed once however often it is accessed. Results are copies, as
+    # editing them in place would corrupt the caches.
+    filepath: str
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.filepath)
+
+    @property
+    def image(self) -> streak.StreakImage:
+        return ds.load_image(self.filepath).copy()
+
+    def streak_image(
+        self,
+    ) -> tuple[npt.NDArray[t.Any], npt.NDArray[t.Any], npt.NDArray[t.Any]]:
+        # The time, the wavelength and the image indexed by them
+        time, wavelength, image = ds.load_streak_image(self.filepath)
+        return time.copy(), wavelength.copy(), image.copy()
+
+    def spectrum(
+        self,
+        normalize: bool = False,
+        time_range: tuple[float, float] | None = None,
+    ) -> pd.DataFrame:
+        return ds.load_wavelength_df(self.filepath, normalize, time_range).copy()
+
+    def decay(
+        self,
+        wavelength_range: tuple[float, float] | None = None,
+        fitting: bool = False,
+        normalize: bool = False,
+        model: str = models.DEFAULT_MODEL,
+        irf: str | None = None,
+    ) -> pd.DataFrame:
+        # `irf` is the path of an image whose decay is convolved with the model
+        return ds.load_time_df(
+            self.filepath,
+            wavelength_range,
+            fitting,
+            normalize,
+            irf_filepath=irf,
+            model=model,
+        ).copy()
+
+    def intervals(
+        self,
+        wavelength_range: tuple[float, float] | None = None,
+        model: str = models.DEFAULT_MODEL,
+        irf: str | None = None,
+    ) -> dict[str, tuple[float, float]]:
+        # The bootstrap confidence intervals of the fitted parameters
+        return dict(ds.load_fit_intervals(self.filepath, wavelength_range, model, irf))
+
+    def peaks(self) -> pd.DataFrame:
+        return ds.load_peaks_df(self.filepath).copy()
+
+    def summary(
+        self,
+        wavelength_range: tuple[float, float] | None = None,
+        model: str = models.DEFAULT_MODEL,
+        irf: str | None = None,
+    ) -> pd.DataFrame:
+        return ds.load_summary_df(self.filepath, wavelength_range, model, irf).copy()
+
+    def lifetime_map(self, binning: int = 1) -> pd.DataFrame:
+        return ds.load_lifetime_map_df(self.filepath, binning).copy()
+
+    def global_analysis(
+        self, n_components: int = 2, rank: int = 10
+    ) -> analysis.GlobalAnalysis:
+        arrays = ds.load_global_analysis(self.filepath, n_components, rank).to_arrays()
+        return analysis.GlobalAnalysis.from_arrays(
+            {name: array.copy() for name, array in arrays.items()}
+        )
+
+
+class Session:
+    # Images of directories or glob patterns, as given to the batch command
+    def __init__(self, *paths: str) -> None:
+        self.datasets = [Dataset(filepath) for filepath in batch.find_files(paths)]
+
+    def __repr__(self) -> str:
+        return f"Session({', '.join(self.names)})"
+
+    def __len__(self) -> int:
+        return len(self.datasets)
+
+    def __iter__(self) -> abc.Iterator[Dataset]:
+        return iter(self.datasets)
+
+    def __getitem__(self, key: int | str) -> Dataset:
+        if isinstance(key, int):
+            return self.datasets[key]
+        for dataset in self.datasets:
+            if dataset.name == key:
+                return dataset
+        raise KeyError(key)
+
+    @property
+    def names(self) -> list[str]:
+        return [dataset.name for dataset in self.datasets]
+
+    @property
+    def filepaths(self) -> list[str]:
+        return [dataset.filepath for dataset in self.datasets]
+
+    def spectra(
+        self,
+        normalize: bool = False,
+        time_range: tuple[float, float] | None = None,
+    ) -> list[pd.DataFrame]:
+        return [dataset.spectrum(normalize, time_range) for dataset in self.datasets]
+
+    def decays(
+        self,
+        wavelength_range: tuple[float, float] | None = None,
+        fitting: bool = False,
+        normalize: bool = False,
+        model: str = models.DEFAULT_MODEL,
+        irf: str | None = None,
+    ) -> list[pd.DataFrame]:
+        return [
+            dataset.decay(wavelength_range, fitting, normalize, model, irf)
+            for dataset in self.datasets
+        ]
+
+    def summary(
+        self,
+        wavelength_range: tuple[float, float] | None = None,
+        model: str = models.DEFAULT_MODEL,
+        irf: str | None = None,
+    ) -> pd.DataFrame:
+        return pd.concat(
+            [
+                dataset.summary(wavelength_range, model, irf)
+                for dataset in self.datasets
+            ],
+            ignore_index=True,
+        )
+
+    def run_batch(
+        self,
+        out_dir: str,
+        workers: int | None = None,
+        log: t.TextIO = sys.stderr,
+        **options: t.Any,
+    ) -> pd.DataFrame:
+        # Writes the results of every image as `python -m dawa_trpl batch` does
+        return batch.run(
+            self.filepaths, batch.Options(out_dir=out_dir, **options), workers, log
+        )
+
+    def streak_image_figure(self) -> go.Figure:
+        return streak_image_process.create_figure(
+            {dataset.name: dataset.image for dataset in self.datasets}
+        )
+
+    def h_figure(
+        self,
+        normalize: bool = False,
+        time_range: tuple[float, float] | None = None,
+        show_peak_vline: bool = False,
+        show_FWHM_range: bool = False,
+    ) -> go.Figure:
+        dfs = self.spectra(normalize, time_range)
+        fig = h_process.create_figure(dfs)
+        if show_peak_vline:
+            fig = h_process.add_peak_vline(fig, dfs)
+        if show_FWHM_range:
+            fig = h_process.add_FWHM_range(fig, dfs)
+        return fig
+
+    def v_figure(
+        self,
+        wavelength_range: tuple[float, float] | None = None,
+        fitting: bool = False,
+        normalize: bool = False,
+        model: str = models.DEFAULT_MODEL,
+        log_y: bool = False,
+        irf: str | None = None,
+    ) -> go.Figure:
+        dfs = self.decays(wavelength_range, fitting, normalize, model, irf)
+        fig = v_process.create_figure(dfs, log_y)
+        if fitting:
+            fig = v_process.add_fitting_curve(fig, dfs)
+        return fig
+
+    def lifetime_map_figure(self, binning: int = 1) -> go.Figure:
+        return lifetime_map_process.create_figure(
+            ds.load_lifetime_map_dfs(self.filepaths, binning)
+        )
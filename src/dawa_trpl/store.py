@@ -0,0 +1,199 @@
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import typing as t
+from collections import abc
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from dawa_trpl import config
+
+Arrays = dict[str, npt.NDArray[t.Any]]
+
+_ATTRS_KEY = "__attrs__"
+_NDARRAY_KEY = "__ndarray__"
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    digest TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    path TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (digest, kind, key)
+)
+"""
+
+
+class Store:
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, "index.sqlite3")
+
+    @contextlib.contextmanager
+    def _connect(self) -> abc.Generator[sqlite3.Connection, None, None]:
+        conn = sqlite3.connect(self.index_path, timeout=30.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _blob_path(self, digest: str, kind: str, key: str) -> str:
+        name = hashlib.sha1((kind + key).encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest, f"{kind}-{name}.npz")
+
+    def get(self, digest: str, kind: str, key: t.Any = None) -> Arrays | None:
+        _key = json.dumps(key)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT path FROM entries WHERE digest=? AND kind=? AND key=?",
+                (digest, kind, _key),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE entries SET accessed=? WHERE digest=? AND kind=? AND key=?",
+                (time.time(), digest, kind, _key),
+            )
+        try:
+            with np.load(row[0], allow_pickle=False) as npz:
+                return {name: npz[name] for name in npz.files}
+        except (OSError, ValueError):
+            return None
+
+    def put(self, digest: str, kind: str, arrays: Arrays, key: t.Any = None) -> None:
+        _key = json.dumps(key)
+        path = self._blob_path(digest, kind, _key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmppath = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                # Any names of arrays, which the stubs take for other keywords
+                np.savez(f, **t.cast(dict[str, t.Any], arrays))
+            os.replace(tmppath, path)
+        except BaseException:
+            # Left temporary files are neither listed nor pruned
+            with contextlib.suppress(OSError):
+                os.remove(tmppath)
+            raise
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, kind, _key, path, now, now),
+            )
+
+    def delete(self, digest: str) -> None:
+        with self._connect() as conn:
+            paths = conn.execute(
+                "SELECT path FROM entries WHERE digest=?", (digest,)
+            ).fetchall()
+            conn.execute("DELETE FROM entries WHERE digest=?", (digest,))
+        for (path,) in paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+        # The directories of the digest and of its prefix, once empty
+        for directory in (
+            os.path.join(self.directory, digest[:2], digest),
+            os.path.join(self.directory, digest[:2]),
+        ):
+            with contextlib.suppress(OSError):
+                os.rmdir(directory)
+
+    def usage(self) -> list[tuple[str, int, float]]:
+        # The bytes and the last access of each digest
+        with self._connect() as conn:
+            rows = conn.execute("SELECT digest, path, accessed FROM entries").fetchall()
+        usage: dict[str, tuple[int, float]] = dict()
+        for digest, path, accessed in rows:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                size = 0
+            total, last = usage.get(digest, (0, 0.0))
+            usage[digest] = (total + size, max(last, accessed))
+        return [(digest, size, last) for digest, (size, last) in usage.items()]
+
+    def prune(self, quota: int, ttl: float, now: float | None = None) -> list[str]:
+        # Deletes the results of images not used within `ttl` seconds, then of
+        # the least recently used ones until they fit in `quota` bytes; 0
+        # disables either. Returns the deleted digests.
+        now = time.time() if now is None else now
+        usage = sorted(self.usage(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in usage)
+        deleted = list()
+        for digest, size, accessed in usage:
+            expired = ttl > 0 and now - accessed > ttl
+            if not expired and (quota <= 0 or total <= quota):
+                continue
+            self.delete(digest)
+            deleted.append(digest)
+            total -= size
+        return deleted
+
+    def get_df(self, digest: str, kind: str, key: t.Any = None) -> pd.DataFrame | None:
+        arrays = self.get(digest, kind, key)
+        if arrays is None:
+            return None
+        attrs = json.loads(str(arrays.pop(_ATTRS_KEY)), object_hook=_decode_ndarray)
+        df = pd.DataFrame(arrays)
+        df.attrs.update(attrs)
+        return df
+
+    def put_df(
+        self, digest: str, kind: str, df: pd.DataFrame, key: t.Any = None
+    ) -> None:
+        arrays = {str(column): df[column].to_numpy() for column in df.columns}
+        arrays[_ATTRS_KEY] = np.array(json.dumps(df.attrs, default=_encode_ndarray))
+        self.put(digest, kind, arrays, key)
+
+
+def _encode_ndarray(obj: t.Any) -> t.Any:
+    if isinstance(obj, np.ndarray):
+        return {_NDARRAY_KEY: obj.tolist()}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _decode_ndarray(obj: dict[str, t.Any]) -> t.Any:
+    if set(obj.keys()) == {_NDARRAY_KEY}:
+        return np.array(obj[_NDARRAY_KEY])
+    return obj
+
+
+@functools.lru_cache(maxsize=None)
+def _get_store(directory: str) -> Store:
+    return Store(directory)
+
+
+def get_store() -> Store:
+    return _get_store(config.STORE_DIR)
+
+
+def file_digest(filepath: str) -> str:
+    stat = os.stat(filepath)
+    return _file_digest(filepath, stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=256)
+def _file_digest(filepath: str, size: int, mtime_ns: int) -> str:
+    hash = hashlib.blake2b(digest_size=20)
+    with open(filepath, "rb") as f:
+        while chunk := f.read(1 << 20):
+            hash.update(chunk)
+    return hash.hexdigest()
@@ -0,0 +1,108 @@
+import typing as t
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+from tlab_analysis import trpl
+
+
+def _compact(
+    image: npt.NDArray[t.Any], dtype: np.dtype[t.Any] | None = None
+) -> npt.NDArray[t.Any]:
+    # Counts of the detector are kept in its unsigned integer type, or else the
+    # smallest one holding them, rather than in the float64 of a DataFrame
+    if image.size == 0 or image.dtype.kind not in "iuf":
+        return image
+    low, high = image.min(), image.max()
+    if low < 0 or not np.array_equal(image, np.round(image)):
+        return image
+    if dtype is None or high > np.iinfo(dtype).max:
+        dtype = np.min_scalar_type(int(high))
+    return image.astype(dtype)
+
+
+class StreakImage:
+    # An image indexed by (time, wavelength) with its axes, which is several
+    # times smaller than `trpl.TRPLData` with a row per pixel. DataFrames are
+    # only created for tables and files.
+    __slots__ = ("time", "wavelength", "intensity", "metadata")
+
+    def __init__(
+        self,
+        time: npt.NDArray[t.Any],
+        wavelength: npt.NDArray[t.Any],
+        intensity: npt.NDArray[t.Any],
+        metadata: list[str],
+    ) -> None:
+        if intensity.shape != (len(time), len(wavelength)):
+            raise ValueError(
+                f"The image of {intensity.shape} does not match the axes of "
+                f"{(len(time), len(wavelength))}"
+            )
+        self.time = time
+        self.wavelength = wavelength
+        self.intensity = intensity
+        self.metadata = metadata
+
+    @classmethod
+    def from_trpl_data(
+        cls, data: trpl.TRPLData, dtype: np.dtype[t.Any] | None = None
+    ) -> "StreakImage":
+        return cls(
+            time=np.asarray(data.time.unique()),
+            wavelength=np.asarray(data.wavelength.unique()),
+            intensity=_compact(np.asarray(data.to_streak_image()), dtype),
+            metadata=list(data.metadata),
+        )
+
+    def copy(self) -> "StreakImage":
+        return StreakImage(
+            self.time.copy(),
+            self.wavelength.copy(),
+            self.intensity.copy(),
+            list(self.metadata),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.time.nbytes + self.wavelength.nbytes + self.intensity.nbytes
+
+    @property
+    def time_range(self) -> tuple[float, float]:
+        return float(self.time.min()), float(self.time.max())
+
+    @property
+    def wavelength_range(self) -> tuple[float, float]:
+        return float(self.wavelength.min()), float(self.wavelength.max())
+
+    def aggregate_along_time(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            dict(
+                wavelength=self.wavelength,
+                intensity=self.intensity.sum(axis=0, dtype=np.float64),
+            )
+        )
+
+    def aggregate_along_wavelength(
+        self, wavelength_range: tuple[float, float] | None = None
+    ) -> pd.DataFrame:
+        intensity = self.intensity
+        if wavelength_range is not None:
+            start, stop = wavelength_range
+            intensity = intensity[
+                :, (start <= self.wavelength) & (self.wavelength <= stop)
+            ]
+        return pd.DataFrame(
+            dict(time=self.time, intensity=intensity.sum(axis=1, dtype=np.float64))
+        )
+
+    def to_df(self) -> pd.DataFrame:
+        # A row per pixel as `trpl.TRPLData`
+        time, wavelength = np.meshgrid(self.time, self.wavelength, indexing="ij")
+        return pd.DataFrame(
+            dict(
+                time=time.ravel(),
+                wavelength=wavelength.ravel(),
+                intensity=self.intensity.ravel(),
+            )
+        )
@@ -0,0 +1,204 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+from collections import abc
+
+from dawa_trpl import catalog, config
+from dawa_trpl import data_system as ds
+
+logger = logging.getLogger(__name__)
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len of the name
+_BUFFER_SIZE = 64 * 1024
+
+Stat = tuple[int, int]  # (size, mtime_ns)
+
+
+class Inotify:
+    # Names of files closed after writing or moved into a directory, by
+    # inotify(7) of Linux through ctypes
+    def __init__(self, directory: str) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(_IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout: float) -> list[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return list()
+        buffer = os.read(self.fd, _BUFFER_SIZE)
+        names = list()
+        offset = 0
+        while offset < len(buffer):
+            _, _, _, length = _EVENT.unpack_from(buffer, offset)
+            offset += _EVENT.size
+            names.append(os.fsdecode(buffer[offset : offset + length].rstrip(b"\0")))
+            offset += length
+        return list(dict.fromkeys(names))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def stat_files(directory: str) -> dict[str, Stat]:
+    stats = dict()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                stats[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return stats
+
+
+class Scanner:
+    # Finds files added, modified or removed since the previous scan. A file is
+    # only reported once it is unchanged over two scans, as it may still be
+    # being written otherwise.
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.seen = stat_files(directory)
+        self._pending: dict[str, Stat] = dict()
+
+    def mark_seen(self, names: abc.Iterable[str]) -> None:
+        stats = stat_files(self.directory)
+        for name in names:
+            if name in stats:
+                self.seen[name] = stats[name]
+                self._pending.pop(name, None)
+
+    def scan(self) -> tuple[list[str], list[str]]:
+        stats = stat_files(self.directory)
+        changed = list()
+        for name, stat in stats.items():
+            if self.seen.get(name) == stat:
+                continue
+            if self._pending.get(name) == stat:
+                changed.append(name)
+            else:
+                self._pending[name] = stat
+        removed = [name for name in self.seen if name not in stats]
+        for name in removed:
+            del self.seen[name]
+        self._pending = {
+            name: stat
+            for name, stat in self._pending.items()
+            if name in stats and name not in changed
+        }
+        self.seen.update((name, stats[name]) for name in changed)
+        return changed, removed
+
+
+def ingest(directory: str, names: abc.Sequence[str]) -> None:
+    # New files are listed at once and then processed, so that they are quick
+    # to show when selected
+    filepaths = [os.path.join(directory, name) for name in names]
+    _catalog = catalog.get_catalog(directory)
+    # Only files replaced under a known name may have been computed from before
+    ds.invalidate_filepaths(
+        [
+            filepath
+            for name, filepath in zip(names, filepaths)
+            if _catalog.get(name) is not None
+        ]
+    )
+    _catalog.add(names)
+    logger.info("Ingested %d files from %s", len(names), directory)
+    for filepath in filepaths:
+        try:
+            ds.load_wavelength_df(filepath)
+            ds.load_peaks_df(filepath)
+            ds.load_time_df(filepath, fitting=True)
+        except Exception:
+            logger.exception("Failed to process %s", filepath)
+
+
+def discard(directory: str, names: abc.Sequence[str]) -> None:
+    filepaths = [os.path.join(directory, name) for name in names]
+    catalog.discard_filepaths(filepaths)
+    ds.invalidate_filepaths(filepaths)
+
+
+class Watcher(threading.Thread):
+    def __init__(self, directory: str, interval: float) -> None:
+        super().__init__(name="dawa-trpl-watcher", daemon=True)
+        self.directory = directory
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        if not os.path.isdir(self.directory):
+            logger.warning("No directory to watch at %s", self.directory)
+            return
+        scanner = Scanner(self.directory)
+        self.sync(scanner)
+        try:
+            inotify: Inotify | None = Inotify(self.directory)
+        except (OSError, AttributeError):
+            # Not Linux, or out of watches
+            logger.info("Polling %s every %g s", self.directory, self.interval)
+            inotify = None
+        try:
+            while not self._stop_event.is_set():
+                self.step(scanner, inotify)
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def sync(self, scanner: Scanner) -> None:
+        # Catches up with files added or removed while the app was not running
+        _catalog = catalog.get_catalog(self.directory)
+        added = [name for name in scanner.seen if _catalog.get(name) is None]
+        removed = [name for name in _catalog.names() if name not in scanner.seen]
+        if added:
+            ingest(self.directory, added)
+        if removed:
+            discard(self.directory, removed)
+
+    def step(self, scanner: Scanner, inotify: Inotify | None) -> None:
+        # inotify only reports writes of this host, so that scans still run for
+        # files written through network shares
+        try:
+            if inotify is None:
+                self._stop_event.wait(self.interval)
+                notified = list()
+            else:
+                notified = [
+                    name
+                    for name in inotify.read(self.interval)
+                    if not name.startswith(".")
+                ]
+                scanner.mark_seen(notified)
+                # Files may be gone by the time they are notified
+                notified = [name for name in notified if name in scanner.seen]
+            changed, removed = scanner.scan()
+            if notified or changed:
+                ingest(self.directory, list(dict.fromkeys(notified + changed)))
+            if removed:
+                discard(self.directory, removed)
+        except Exception:  # pragma: no cover
+            logger.exception("Failed to watch %s", self.directory)
+            self._stop_event.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+def start() -> Watcher | None:
+    if not config.WATCH_DIR:
+        return None
+    watcher = Watcher(config.WATCH_DIR, config.WATCH_INTERVAL)
+    watcher.start()
+    return watcher
@@ -0,0 +1,79 @@
+import pathlib
+
+import dash
+import dash_bootstrap_components as dbc
+
+from dawa_trpl import __version__, api, asgi, config, powerpoint
+from dawa_trpl.components import tabs, upload_bar
+
+app = dash.Dash(
+    __name__,
+    title="PL Analysis",
+    url_base_pathname=config.URL_BASE_PATH,
+    external_stylesheets=[dbc.themes.MATERIA],
+    extra_hot_reload_paths=list(pathlib.Path(__file__).parent.glob("**/*.py")),
+    suppress_callback_exceptions=True,
+)
+
+api.register(app.server)
+# Background tasks are started by the server rather than on import
+server = asgi.Server(app.server)
+
+navbar = dbc.Navbar(
+    [
+        dbc.NavbarBrand(
+            [
+                "TRPL ",
+                dash.html.Small("v" + __version__),
+            ],
+            href="/",
+        )
+    ],
+    color="dark",
+    dark=True,
+    style={"height": "5vh"},
+)
+
+sidebar = dash.html.Div(
+    [
+        dbc.Row(
+            [
+                dbc.Col([]),
+            ],
+            style={"height": "70vh"},
+        ),
+        dbc.Row(
+            [
+                dbc.Col(
+                    [
+                        dash.html.H5("Power Point"),
+                        powerpoint.download_button,
+                    ]
+                ),
+            ],
+            style={"height": "30vh"},
+        ),
+    ]
+)
+
+main_container = layout = dbc.Container(
+    [
+        dbc.Row([dbc.Col(upload_bar.layout)]),
+        dbc.Row([dbc.Col(tabs.layout)]),
+    ],
+    fluid=True,
+)
+
+app.layout = dbc.Container(
+    [
+        dbc.Row([navbar]),
+        dbc.Row(
+            [
+                dbc.Col(sidebar, width=2, class_name="bg-light"),
+                dbc.Col(main_container, width=10),
+            ],
+            style={"height": "100vh"},
+        ),
+    ],
+    fluid=True,
+)
@@ -14,6 +14,13 @@ def upload_basedir(mocker: pytest_mock.MockerFixture) -> abc.Generator[str, None
         yield tmpdir
 
 
+@pytest.fixture(autouse=True)
+def store_dir(mocker: pytest_mock.MockerFixture) -> abc.Generator[str, None, None]:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mocker.patch("dawa_trpl.config.STORE_DIR", new=tmpdir)
+        yield tmpdir
+
+
 @pytest.fixture()
 def upload_dir(upload_basedir: str) -> abc.Generator[str, None, None]:
     with tempfile.TemporaryDirectory(dir=upload_basedir) as tmpdir:
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+import pytest_mock
+
+from dawa_trpl import analysis
+
+
+@pytest.fixture()
+def time() -> analysis.Array:
+    return np.linspace(0, 10, 240)
+
+
+@pytest.fixture()
+def wavelength() -> analysis.Array:
+    return np.linspace(435, 535, 320)
+
+
+@pytest.fixture()
+def lifetimes() -> analysis.Array:
+    return np.array([0.3, 2.5])
+
+
+@pytest.fixture()
+def image(
+    time: analysis.Array, wavelength: analysis.Array, lifetimes: analysis.Array
+) -> analysis.Array:
+    das = np.stack(
+        [
+            1000 * np.exp(-(((wavelength - 470) / 10) ** 2)),
+            300 * np.exp(-(((wavelength - 500) / 15) ** 2)),
+        ]
+    )
+    decays = analysis.exponential_basis(np.clip(time - 1.0, 0, None), lifetimes)
+    decays[time < 1.0] = 0
+    rng = np.random.default_rng(0)
+    counts: analysis.Array = rng.poisson(decays @ das).astype(np.float64)
+    return counts
+
+
+def test_exponential_basis(time: analysis.Array, lifetimes: analysis.Array) -> None:
+    basis = analysis.exponential_basis(time, lifetimes)
+    assert basis.shape == (len(time), len(lifetimes))
+    np.testing.assert_allclose(basis[:, 1], np.exp(-time / lifetimes[1]))
+
+
+def test_global_fit(
+    time: analysis.Array,
+    wavelength: analysis.Array,
+    image: analysis.Array,
+    lifetimes: analysis.Array,
+) -> None:
+    result = analysis.global_fit(time, wavelength, image, 2, 10)
+    np.testing.assert_allclose(result.lifetimes, lifetimes, rtol=0.05)
+    assert result.das.shape == (2, len(wavelength))
+    assert result.time[0] == pytest.approx(1.0, abs=0.05)
+    assert result.residuals.shape == (len(result.time), len(wavelength))
+    assert result.cost == pytest.approx(np.sum(result.residuals**2))
+    assert len(result.singular_values) == min(result.residuals.shape)
+    # The fast component peaks at 470 nm and the slow one at 500 nm
+    assert wavelength[np.argmax(result.das[0])] == pytest.approx(470, abs=2)
+    assert wavelength[np.argmax(result.das[1])] == pytest.approx(500, abs=2)
+
+
+def test_global_fit_computes_svd_once(
+    time: analysis.Array,
+    wavelength: analysis.Array,
+    image: analysis.Array,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    svd_spy = mocker.spy(np.linalg, "svd")
+    result = analysis.global_fit(time, wavelength, image, 2, 10)
+    svd_spy.assert_called_once()
+    expected = np.linalg.svd(image[-len(result.time) :], compute_uv=False)
+    np.testing.assert_allclose(result.singular_values, expected)
+
+
+@pytest.mark.parametrize("n_components, rank", [(0, 10), (3, 2)])
+def test_global_fit_with_invalid_arguments(
+    time: analysis.Array,
+    wavelength: analysis.Array,
+    image: analysis.Array,
+    n_components: int,
+    rank: int,
+) -> None:
+    with pytest.raises(ValueError):
+        analysis.global_fit(time, wavelength, image, n_components, rank)
+
+
+def test_global_analysis_arrays(
+    time: analysis.Array, wavelength: analysis.Array, image: analysis.Array
+) -> None:
+    result = analysis.global_fit(time, wavelength, image, 2, 10)
+    actual = analysis.GlobalAnalysis.from_arrays(result.to_arrays())
+    for name in ("time", "wavelength", "lifetimes", "das", "residuals"):
+        np.testing.assert_array_equal(getattr(actual, name), getattr(result, name))
+    assert actual.cost == result.cost
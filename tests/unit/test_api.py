@@ -0,0 +1,290 @@
+import io
+import json
+import os
+import pathlib
+
+import flask
+import numpy as np
+import pandas as pd
+import pytest
+import pytest_mock
+from flask import testing
+
+from dawa_trpl import api, export
+from tests import IMGDIR
+
+
+@pytest.fixture()
+def client() -> testing.FlaskClient:
+    server = flask.Flask(__name__)
+    api.register(server)
+    return server.test_client()
+
+
+@pytest.fixture()
+def session(upload_dir: str) -> str:
+    pathlib.Path(upload_dir, "a.img").touch()
+    pathlib.Path(upload_dir, "b.img").touch()
+    return os.path.basename(upload_dir)
+
+
+@pytest.fixture()
+def load_wavelength_dfs_mock(
+    mocker: pytest_mock.MockerFixture,
+) -> pytest_mock.MockType:
+    def load_wavelength_dfs(
+        filepaths: list[str], **kwargs: object
+    ) -> list[pd.DataFrame]:
+        dfs = list()
+        for filepath in filepaths:
+            df = pd.DataFrame(dict(wavelength=[450.0, 460.0], intensity=[1.0, np.nan]))
+            df.attrs["filename"] = os.path.basename(filepath)
+            dfs.append(df)
+        return dfs
+
+    return mocker.patch(
+        "dawa_trpl.data_system.load_wavelength_dfs", side_effect=load_wavelength_dfs
+    )
+
+
+def test_create_session(client: testing.FlaskClient, upload_basedir: str) -> None:
+    response = client.post("/api/sessions")
+    assert response.status_code == 201
+    assert os.path.isdir(
+        os.path.join(upload_basedir, json.loads(response.data)["session"])
+    )
+
+
+def test_list_items(client: testing.FlaskClient, session: str) -> None:
+    response = client.get(f"/api/sessions/{session}/items")
+    assert sorted(json.loads(response.data)["items"]) == ["a.img", "b.img"]
+
+
+@pytest.mark.parametrize("session", ["unexist", "..", "."])
+def test_list_items_with_unknown_session(
+    client: testing.FlaskClient, session: str
+) -> None:
+    response = client.get(f"/api/sessions/{session}/items")
+    assert response.status_code == 404
+    assert "error" in json.loads(response.data)
+
+
+def test_upload_items(
+    client: testing.FlaskClient, session: str, upload_dir: str
+) -> None:
+    content = next(IMGDIR.glob("*.img")).read_bytes()
+    response = client.post(
+        f"/api/sessions/{session}/items",
+        data=dict(file=[(io.BytesIO(content), "c.img")]),
+    )
+    assert response.status_code == 201
+    assert json.loads(response.data) == dict(items=["c.img"])
+    assert pathlib.Path(upload_dir, "c.img").read_bytes() == content
+    response = client.get(f"/api/sessions/{session}/items")
+    assert "c.img" in json.loads(response.data)["items"]
+
+
+def test_upload_items_with_invalid_content(
+    client: testing.FlaskClient, session: str, upload_dir: str
+) -> None:
+    content = next(IMGDIR.glob("*.img")).read_bytes()
+    response = client.post(
+        f"/api/sessions/{session}/items",
+        data=dict(
+            file=[(io.BytesIO(b"data"), "c.img"), (io.BytesIO(content), "d.img")]
+        ),
+    )
+    assert response.status_code == 400
+    assert json.loads(response.data)["error"].startswith("Invalid files: c.img")
+    # The valid file is kept, while no trace of the invalid one is left
+    assert not pathlib.Path(upload_dir, "c.img").exists()
+    assert not [name for name in os.listdir(upload_dir) if name.startswith(".up")]
+    response = client.get(f"/api/sessions/{session}/items")
+    assert "d.img" in json.loads(response.data)["items"]
+
+
+@pytest.mark.parametrize("filename", ["../c.img", ".catalog.json"])
+def test_upload_items_with_invalid_filename(
+    client: testing.FlaskClient, session: str, filename: str
+) -> None:
+    response = client.post(
+        f"/api/sessions/{session}/items",
+        data=dict(file=[(io.BytesIO(b"data"), filename)]),
+    )
+    assert response.status_code == 400
+
+
+def test_get_spectra(
+    client: testing.FlaskClient,
+    session: str,
+    upload_dir: str,
+    load_wavelength_dfs_mock: pytest_mock.MockType,
+) -> None:
+    response = client.get(
+        f"/api/sessions/{session}/spectra",
+        query_string=dict(item=["a.img", "b.img"], time_range="0,10", normalize="1"),
+    )
+    assert response.status_code == 200
+    load_wavelength_dfs_mock.assert_called_once_with(
+        [os.path.join(upload_dir, "a.img"), os.path.join(upload_dir, "b.img")],
+        normalize_intensity=True,
+        time_range=(0.0, 10.0),
+    )
+    items = json.loads(response.data)["items"]
+    assert [item["item"] for item in items] == ["a.img", "b.img"]
+    assert items[0]["attrs"] == dict(filename="a.img")
+    assert items[0]["data"] == dict(wavelength=[450.0, 460.0], intensity=[1.0, None])
+
+
+@pytest.mark.parametrize(
+    "headers, query_string",
+    [({}, dict(format="arrow")), ({"Accept": api.ARROW_MIMETYPE}, {})],
+    ids=["query", "accept"],
+)
+def test_get_spectra_as_arrow(
+    client: testing.FlaskClient,
+    session: str,
+    load_wavelength_dfs_mock: pytest_mock.MockType,
+    headers: dict[str, str],
+    query_string: dict[str, str],
+) -> None:
+    response = client.get(
+        f"/api/sessions/{session}/spectra",
+        query_string=dict(item=["a.img", "b.img"], **query_string),
+        headers=headers,
+    )
+    assert response.mimetype == api.ARROW_MIMETYPE
+    df = export.read_arrow(response.data)
+    assert df["item"].to_list() == ["a.img", "a.img", "b.img", "b.img"]
+    assert list(df.columns) == ["item", "wavelength", "intensity"]
+    assert df.attrs == {
+        "a.img": dict(filename="a.img"),
+        "b.img": dict(filename="b.img"),
+    }
+
+
+def test_get_decays(
+    client: testing.FlaskClient,
+    session: str,
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    df = pd.DataFrame(dict(time=[0.0], intensity=[1.0], fit=[1.0]))
+    df.attrs["fit"] = dict(params=np.array([1.0, 2.0]))
+    load_time_dfs_mock = mocker.patch(
+        "dawa_trpl.data_system.load_time_dfs", return_value=[df]
+    )
+    response = client.get(
+        f"/api/sessions/{session}/decays",
+        query_string=dict(
+            item="a.img", wavelength_range="450,470", fitting="true", model="single"
+        ),
+    )
+    load_time_dfs_mock.assert_called_once_with(
+        [os.path.join(upload_dir, "a.img")],
+        wavelength_range=(450.0, 470.0),
+        fitting=True,
+        normalize_intensity=False,
+        irf_filepath=None,
+        model="single",
+    )
+    item = json.loads(response.data)["items"][0]
+    assert item["attrs"] == dict(fit=dict(params=[1.0, 2.0]))
+
+
+def test_get_decays_of_fit_not_converged(
+    client: testing.FlaskClient, session: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    df = pd.DataFrame(dict(time=[0.0, 1.0], intensity=[1.0, 0.5], fit=[np.nan] * 2))
+    df.attrs["fit"] = dict(
+        model="double",
+        tau1=np.nan,
+        params=np.array([1.0, np.nan]),
+        cov=np.full((2, 2), np.inf),
+    )
+    mocker.patch("dawa_trpl.data_system.load_time_dfs", return_value=[df])
+    response = client.get(
+        f"/api/sessions/{session}/decays",
+        query_string=dict(item="a.img", fitting="true"),
+    )
+
+    def reject(constant: str) -> None:
+        raise ValueError(f"{constant} is not valid JSON")
+
+    item = json.loads(response.data, parse_constant=reject)["items"][0]
+    assert item["attrs"] == dict(
+        fit=dict(
+            model="double",
+            tau1=None,
+            params=[1.0, None],
+            cov=[[None, None], [None, None]],
+        )
+    )
+    assert item["data"]["fit"] == [None, None]
+
+
+def test_get_decays_with_irf(
+    client: testing.FlaskClient,
+    session: str,
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    load_time_dfs_mock = mocker.patch(
+        "dawa_trpl.data_system.load_time_dfs", return_value=[pd.DataFrame()]
+    )
+    response = client.get(
+        f"/api/sessions/{session}/decays",
+        query_string=dict(item="a.img", fitting="true", irf="b.img"),
+    )
+    assert response.status_code == 200
+    assert load_time_dfs_mock.call_args.kwargs["irf_filepath"] == os.path.join(
+        upload_dir, "b.img"
+    )
+    response = client.get(
+        f"/api/sessions/{session}/decays",
+        query_string=dict(item="a.img", fitting="true", irf="unexist.img"),
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "query_string",
+    [
+        dict(),
+        dict(item="a.img", wavelength_range="450"),
+        dict(item="a.img", fitting="yes"),
+        dict(item="a.img", model="unknown"),
+        dict(item="a.img", format="xlsx"),
+    ],
+    ids=["no_item", "range", "flag", "model", "format"],
+)
+def test_get_decays_with_bad_request(
+    client: testing.FlaskClient,
+    session: str,
+    query_string: dict[str, str],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.data_system.load_time_dfs", return_value=[pd.DataFrame()])
+    response = client.get(f"/api/sessions/{session}/decays", query_string=query_string)
+    assert response.status_code == 400
+
+
+def test_get_peaks(
+    client: testing.FlaskClient, session: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch(
+        "dawa_trpl.data_system.load_peaks_df",
+        return_value=pd.DataFrame(dict(x=[480.0], y=[1.0])),
+    )
+    response = client.get(
+        f"/api/sessions/{session}/peaks", query_string=dict(item="b.img")
+    )
+    assert json.loads(response.data)["items"][0]["data"] == dict(x=[480.0], y=[1.0])
+
+
+def test_get_peaks_with_unknown_item(client: testing.FlaskClient, session: str) -> None:
+    response = client.get(
+        f"/api/sessions/{session}/peaks", query_string=dict(item=["a.img", "c.img"])
+    )
+    assert response.status_code == 404
+    assert json.loads(response.data) == dict(error="No items c.img")
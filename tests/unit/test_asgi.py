@@ -0,0 +1,79 @@
+import asyncio
+import typing as t
+
+import flask
+import pytest
+import pytest_mock
+
+from dawa_trpl import asgi
+
+
+@pytest.fixture()
+def start_mock(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
+    return mocker.patch("dawa_trpl.asgi.start_background_tasks")
+
+
+def test_start_background_tasks(mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("dawa_trpl.asgi._started", new=False)
+    janitor_start_mock = mocker.patch("dawa_trpl.janitor.start")
+    watch_start_mock = mocker.patch("dawa_trpl.watch.start")
+    asgi.start_background_tasks()
+    asgi.start_background_tasks()
+    janitor_start_mock.assert_called_once_with()
+    watch_start_mock.assert_called_once_with()
+
+
+def run(
+    server: asgi.Server, scope: asgi.Scope, messages: list[asgi.Message]
+) -> list[asgi.Message]:
+    sent: list[asgi.Message] = list()
+    received = iter(messages)
+
+    async def receive() -> asgi.Message:
+        return next(received)
+
+    async def send(message: asgi.Message) -> None:
+        sent.append(message)
+
+    asyncio.run(server(scope, receive, send))
+    return sent
+
+
+def test_server_starts_background_tasks_on_lifespan(
+    start_mock: pytest_mock.MockType,
+) -> None:
+    server = asgi.Server(flask.Flask(__name__))
+    sent = run(
+        server,
+        dict(type="lifespan"),
+        [dict(type="lifespan.startup"), dict(type="lifespan.shutdown")],
+    )
+    start_mock.assert_called_once_with()
+    assert [message["type"] for message in sent] == [
+        "lifespan.startup.complete",
+        "lifespan.shutdown.complete",
+    ]
+
+
+def test_server_serves_wsgi_app(start_mock: pytest_mock.MockType) -> None:
+    wsgi_app = flask.Flask(__name__)
+    wsgi_app.add_url_rule("/", view_func=lambda: "hello")
+    scope: dict[str, t.Any] = dict(
+        type="http",
+        method="GET",
+        path="/",
+        root_path="",
+        query_string=b"",
+        headers=[],
+        http_version="1.1",
+        scheme="http",
+        server=("localhost", 80),
+    )
+    sent = run(
+        asgi.Server(wsgi_app),
+        scope,
+        [dict(type="http.request", body=b"", more_body=False)],
+    )
+    start_mock.assert_called_once_with()
+    assert sent[0]["status"] == 200
+    assert b"".join(message.get("body", b"") for message in sent[1:]) == b"hello"
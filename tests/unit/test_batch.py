@@ -0,0 +1,237 @@
+import dataclasses
+import io
+import json
+import os
+import pathlib
+import typing as t
+
+import pandas as pd
+import pytest
+import pytest_mock
+
+from dawa_trpl import batch, config, export, store
+from tests import IMGDIR
+
+
+@pytest.fixture()
+def options(tmp_path: pathlib.Path) -> batch.Options:
+    return batch.Options(out_dir=str(tmp_path / "out"))
+
+
+def test_find_files(tmp_path: pathlib.Path) -> None:
+    for name in ["b.img", "a.img", "c.txt", "sub/d.img"]:
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).touch()
+    assert batch.find_files([str(tmp_path), str(tmp_path / "**/*.img")]) == [
+        str(tmp_path / "a.img"),
+        str(tmp_path / "b.img"),
+        str(tmp_path / "sub/d.img"),
+    ]
+
+
+@pytest.mark.parametrize("pptx", [True, False])
+def test_get_output_paths(tmp_path: pathlib.Path, pptx: bool) -> None:
+    options = batch.Options(out_dir=str(tmp_path), file_format="parquet", pptx=pptx)
+    paths = batch.get_output_paths("data/item.img", options)
+    assert set(paths) == {"h", "v", "peaks", "pptx"} if pptx else {"h", "v", "peaks"}
+    stem = paths["h"].name.removesuffix("-h.parquet")
+    assert stem.startswith("item-")
+    expected = {
+        "h": tmp_path / f"{stem}-h.parquet",
+        "v": tmp_path / f"{stem}-v.parquet",
+        "peaks": tmp_path / f"{stem}-peaks.parquet",
+    }
+    if pptx:
+        expected["pptx"] = tmp_path / f"{stem}.pptx"
+    assert paths == expected
+    assert batch.get_manifest_path("data/item.img", options) == (
+        tmp_path / f"{stem}.json"
+    )
+
+
+def test_get_output_paths_of_same_names(tmp_path: pathlib.Path) -> None:
+    options = batch.Options(out_dir=str(tmp_path))
+    paths = batch.get_output_paths("a/item.img", options)
+    assert paths == batch.get_output_paths(os.path.abspath("a/item.img"), options)
+    assert paths["h"] != batch.get_output_paths("b/item.img", options)["h"]
+
+
+@pytest.mark.parametrize(
+    "file_format, read",
+    [
+        ("csv", lambda path: pd.read_csv(path)),
+        ("parquet", lambda path: export.read_parquet(path.read_bytes())),
+        ("arrow", lambda path: export.read_arrow(path.read_bytes())),
+    ],
+)
+def test_write_df(tmp_path: pathlib.Path, file_format: str, read: t.Any) -> None:
+    df = pd.DataFrame(dict(x=[1.0, 2.0], y=[3.0, 4.0]))
+    path = tmp_path / f"df.{file_format}"
+    batch.write_df(df, path, file_format)
+    pd.testing.assert_frame_equal(read(path), df)
+
+
+def test_write_df_with_unsupported_format(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ValueError):
+        batch.write_df(pd.DataFrame(), tmp_path / "df.xlsx", "xlsx")
+
+
+def test_process_file(options: batch.Options) -> None:
+    os.makedirs(options.out_dir)
+    filepath = next(IMGDIR.glob("*.img")).as_posix()
+    summary, resumed = batch.process_file(filepath, options)
+    assert not resumed
+    assert summary["filename"].to_list() == [os.path.basename(filepath)]
+    for path in batch.get_output_paths(filepath, options).values():
+        assert path.exists()
+    summary, resumed = batch.process_file(filepath, options)
+    assert resumed
+
+
+@pytest.fixture()
+def ds_mock(mocker: pytest_mock.MockerFixture) -> t.Any:
+    ds_mock = mocker.patch("dawa_trpl.batch.ds")
+    ds_mock.load_wavelength_df.return_value = pd.DataFrame(
+        dict(wavelength=[450.0, 500.0], intensity=[1.0, 2.0])
+    )
+    ds_mock.load_time_df.return_value = pd.DataFrame(dict(time=[0.0], intensity=[1.0]))
+    ds_mock.load_peaks_df.return_value = pd.DataFrame(dict(x=[480.0]))
+    return ds_mock
+
+
+@pytest.fixture()
+def item(tmp_path: pathlib.Path) -> str:
+    path = tmp_path / "item.img"
+    path.write_bytes(b"item")
+    return str(path)
+
+
+def test_process_file_with_pptx(
+    options: batch.Options, ds_mock: t.Any, item: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    build_mock = mocker.patch("dawa_trpl.powerpoint.build_presentation")
+    options = dataclasses.replace(options, pptx=True)
+    os.makedirs(options.out_dir)
+    batch.process_file(item, options)
+    build_mock.assert_called_once_with(
+        item, (450.0, 500.0), model="double", irf_filepath=None
+    )
+    build_mock.return_value.save.assert_called_once_with(
+        batch.get_output_paths(item, options)["pptx"]
+    )
+
+
+@pytest.mark.parametrize("irf", [None, "irf.img"])
+def test_process_file_writes_manifest(
+    options: batch.Options, ds_mock: t.Any, item: str, irf: str | None
+) -> None:
+    if irf is not None:
+        irf = str(pathlib.Path(item).with_name(irf))
+        pathlib.Path(irf).write_bytes(b"irf")
+    options = dataclasses.replace(options, irf=irf)
+    os.makedirs(options.out_dir)
+    batch.process_file(item, options)
+    manifest = json.loads(batch.get_manifest_path(item, options).read_text())
+    assert manifest == batch.get_manifest(item, options)
+    assert manifest["filepath"] == item
+    assert manifest["digest"] == store.file_digest(item)
+    assert manifest["irf"] == (store.file_digest(irf) if irf else None)
+    ds_mock.load_summary_df.assert_called_once_with(item, None, "double", irf)
+    assert ds_mock.load_time_df.call_args.kwargs["irf_filepath"] == irf
+
+
+@pytest.mark.parametrize("overwrite", [True, False])
+def test_process_file_when_outputs_exist(
+    options: batch.Options,
+    ds_mock: t.Any,
+    item: str,
+    overwrite: bool,
+) -> None:
+    os.makedirs(options.out_dir)
+    batch.process_file(item, options)
+    ds_mock.reset_mock()
+    options = dataclasses.replace(options, overwrite=overwrite)
+    summary, resumed = batch.process_file(item, options)
+    assert summary == ds_mock.load_summary_df.return_value
+    assert resumed is not overwrite
+    assert ds_mock.load_time_df.called is overwrite
+
+
+@pytest.mark.parametrize(
+    "change", ["content", "model", "wavelength_range", "irf", "output"]
+)
+def test_process_file_when_outputs_are_stale(
+    options: batch.Options, ds_mock: t.Any, item: str, change: str
+) -> None:
+    os.makedirs(options.out_dir)
+    batch.process_file(item, options)
+    ds_mock.reset_mock()
+    match change:
+        case "content":
+            pathlib.Path(item).write_bytes(b"changed")
+        case "model":
+            options = dataclasses.replace(options, model="single")
+        case "wavelength_range":
+            options = dataclasses.replace(options, wavelength_range=(450.0, 470.0))
+        case "irf":
+            pathlib.Path(item).with_name("irf.img").write_bytes(b"irf")
+            options = dataclasses.replace(
+                options, irf=str(pathlib.Path(item).with_name("irf.img"))
+            )
+        case "output":
+            batch.get_output_paths(item, options)["v"].unlink()
+    _, resumed = batch.process_file(item, options)
+    assert not resumed
+    assert ds_mock.load_time_df.called
+
+
+def test_process_file_when_interrupted(
+    options: batch.Options, ds_mock: t.Any, item: str
+) -> None:
+    os.makedirs(options.out_dir)
+    batch.process_file(item, options)
+    ds_mock.load_peaks_df.side_effect = RuntimeError("Interrupted")
+    with pytest.raises(RuntimeError):
+        batch.process_file(item, dataclasses.replace(options, overwrite=True))
+    # The outputs of the previous run may have been partly rewritten
+    assert not batch.get_manifest_path(item, options).exists()
+    ds_mock.load_peaks_df.side_effect = None
+    assert not batch.process_file(item, options)[1]
+
+
+def test_run(options: batch.Options, mocker: pytest_mock.MockerFixture) -> None:
+    def process_file(
+        filepath: str, options: batch.Options
+    ) -> tuple[pd.DataFrame, bool]:
+        if filepath == "broken.img":
+            raise ValueError("Broken")
+        return pd.DataFrame(dict(filename=[filepath], tau1=[1.0])), filepath == "b.img"
+
+    mocker.patch("dawa_trpl.batch.process_file", side_effect=process_file)
+    mocker.patch("os.path.getsize", return_value=1024**2)
+    log = io.StringIO()
+    df = batch.run(["a.img", "broken.img", "b.img"], options, workers=1, log=log)
+    assert df["filename"].to_list() == ["a.img", "broken.img", "b.img"]
+    assert df["error"].iloc[1] == "ValueError: Broken"
+    pd.testing.assert_frame_equal(
+        pd.read_csv(pathlib.Path(options.out_dir, "summary.csv")), df
+    )
+    lines = log.getvalue().splitlines()
+    assert lines[:3] == [
+        "[1/3] a.img: done",
+        "[2/3] broken.img: failed: ValueError: Broken",
+        "[3/3] b.img: resumed",
+    ]
+    assert lines[3].startswith("Processed 3 files (1 resumed, 3.0 MiB) in ")
+
+
+def test_init_worker(mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("dawa_trpl.config.WORKERS", new=4)
+    batch._init_worker()
+    assert config.WORKERS == 1
+
+
+def test_run_without_files(options: batch.Options) -> None:
+    df = batch.run([], options, workers=1, log=io.StringIO())
+    assert df.empty
+    assert os.listdir(options.out_dir) == []
@@ -0,0 +1,42 @@
+import pytest_mock
+
+from dawa_trpl import cache
+
+
+def test_lru_cache(mocker: pytest_mock.MockerFixture) -> None:
+    func = mocker.Mock(side_effect=lambda filepath, n=1: filepath * n)
+    cached = cache.lru_cache(maxsize=2)(func)
+    assert cached("a") == "a"
+    assert cached("a") == "a"
+    assert cached("b", n=2) == "bb"
+    assert cached.cache_info() == cache.CacheInfo(1, 2, 2, 2)
+    # The least recently used entry is dropped
+    cached("a")
+    cached("c")
+    cached("b", n=2)
+    assert func.call_count == 4
+    cached.cache_clear()
+    assert cached.cache_info() == cache.CacheInfo(0, 0, 2, 0)
+
+
+def test_lru_cache_discard(mocker: pytest_mock.MockerFixture) -> None:
+    func = mocker.Mock(side_effect=lambda filepath, irf=None: (filepath, irf))
+    cached = cache.lru_cache(maxsize=8)(func)
+    cached("a.img")
+    cached("b.img", irf="irf.img")
+    cached("b.img", "other.img")
+    cached.cache_discard({"a.img", "irf.img"})
+    assert cached.cache_info().currsize == 1
+    cached("b.img", "other.img")
+    assert cached.cache_info().hits == 1
+
+
+def test_lru_cache_does_not_keep_errors(mocker: pytest_mock.MockerFixture) -> None:
+    func = mocker.Mock(side_effect=[ValueError, "a"])
+    cached = cache.lru_cache(maxsize=8)(func)
+    try:
+        cached("a.img")
+    except ValueError:
+        pass
+    assert cached("a.img") == "a"
+    assert cached.cache_info().currsize == 1
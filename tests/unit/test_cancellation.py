@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from dawa_trpl import cancellation
+
+
+def test_check_outside_of_request() -> None:
+    assert cancellation.current() is None
+    cancellation.check()
+
+
+def test_check_in_latest_request() -> None:
+    with cancellation.latest_only("key"):
+        should_stop = cancellation.current()
+        assert should_stop is not None
+        assert not should_stop()
+        cancellation.check()
+    assert cancellation.current() is None
+
+
+def test_check_in_superseded_request() -> None:
+    started = threading.Event()
+    superseded = threading.Event()
+    errors = list()
+
+    def run() -> None:
+        with cancellation.latest_only("key"):
+            started.set()
+            superseded.wait()
+            try:
+                cancellation.check()
+            except cancellation.Cancelled as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    started.wait()
+    with cancellation.latest_only("key"):
+        superseded.set()
+        thread.join()
+        cancellation.check()
+    assert len(errors) == 1
+
+
+def test_requests_with_different_keys_do_not_supersede() -> None:
+    with cancellation.latest_only("a"):
+        should_stop = cancellation.current()
+        assert should_stop is not None
+        with cancellation.latest_only("b"):
+            pass
+        assert not should_stop()
+
+
+def test_superseded_request_stays_stale() -> None:
+    with cancellation.latest_only("key"):
+        should_stop = cancellation.current()
+    assert should_stop is not None
+    with cancellation.latest_only("key"):
+        pass
+    # The key is released by the latest request, but a generation never repeats
+    with cancellation.latest_only("key"):
+        assert should_stop()
+
+
+def test_latest_only_propagates_other_errors() -> None:
+    with pytest.raises(RuntimeError):
+        with cancellation.latest_only("key"):
+            raise RuntimeError
@@ -0,0 +1,171 @@
+import os
+import pathlib
+import shutil
+
+import pytest
+import pytest_mock
+from tlab_analysis import trpl
+
+from dawa_trpl import catalog, img_header, store
+from tests import IMGDIR
+
+
+@pytest.fixture()
+def item_names(upload_dir: str) -> list[str]:
+    for path in IMGDIR.glob("*.img"):
+        shutil.copy(path, upload_dir)
+    return sorted(path.name for path in IMGDIR.glob("*.img"))
+
+
+def test_read_entry() -> None:
+    filepath = str(next(IMGDIR.glob("*.img")))
+    data = trpl.read_file(filepath)
+    entry = catalog.read_entry(filepath)
+    assert entry.name == os.path.basename(filepath)
+    assert entry.size == os.path.getsize(filepath)
+    assert entry.digest == store.file_digest(filepath)
+    assert entry.metadata == img_header.read_header(filepath).metadata
+    assert entry.wavelength_range == (data.wavelength.min(), data.wavelength.max())
+    assert entry.time_range == (data.time.min(), data.time.max())
+
+
+def test_read_entry_when_header_is_not_understood(
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.img_header.read_header", side_effect=img_header.HeaderError)
+    filepath = str(next(IMGDIR.glob("*.img")))
+    data = trpl.read_file(filepath)
+    entry = catalog.read_entry(filepath)
+    assert entry.metadata == list(data.metadata)
+    assert entry.wavelength_range == (data.wavelength.min(), data.wavelength.max())
+
+
+def test_read_entry_with_unreadable_file(upload_dir: str) -> None:
+    filepath = os.path.join(upload_dir, "broken.img")
+    pathlib.Path(filepath).write_bytes(b"broken")
+    entry = catalog.read_entry(filepath)
+    assert entry.name == "broken.img"
+    assert entry.size == 6
+    assert entry.metadata is None
+    assert entry.wavelength_range is None
+    assert entry.time_range is None
+
+
+def test_entry_to_dict_and_from_dict() -> None:
+    entry = catalog.read_entry(str(next(IMGDIR.glob("*.img"))))
+    assert catalog.Entry.from_dict(entry.to_dict()) == entry
+
+
+def test_catalog_scans_upload_dir(upload_dir: str, item_names: list[str]) -> None:
+    (pathlib.Path(upload_dir) / "subdir").mkdir()
+    _catalog = catalog.Catalog(upload_dir)
+    assert sorted(_catalog.names()) == item_names
+    assert os.path.exists(_catalog.path)
+
+
+def test_catalog_loads_persisted_entries(
+    upload_dir: str, item_names: list[str]
+) -> None:
+    expected = catalog.Catalog(upload_dir)
+    os.remove(os.path.join(upload_dir, item_names[0]))
+    actual = catalog.Catalog(upload_dir)
+    assert actual.names() == expected.names()
+
+
+def test_catalog_add(upload_dir: str, item_names: list[str]) -> None:
+    _catalog = catalog.Catalog(upload_dir)
+    shutil.copy(IMGDIR / item_names[0], os.path.join(upload_dir, "new.img"))
+    assert _catalog.get("new.img") is None
+    [entry] = _catalog.add(["new.img"])
+    assert entry.name == "new.img"
+    assert _catalog.get("new.img") == entry
+    assert catalog.Catalog(upload_dir).get("new.img") == entry
+
+
+def test_catalog_discard(upload_dir: str, item_names: list[str]) -> None:
+    _catalog = catalog.Catalog(upload_dir)
+    _catalog.discard(item_names[:1])
+    assert sorted(_catalog.names()) == item_names[1:]
+    assert sorted(catalog.Catalog(upload_dir).names()) == item_names[1:]
+
+
+def test_catalog_refreshes_when_updated_by_another_instance(
+    upload_dir: str, item_names: list[str]
+) -> None:
+    _catalog = catalog.Catalog(upload_dir)
+    catalog.Catalog(upload_dir).discard(item_names[:1])
+    assert sorted(_catalog.names()) == item_names[1:]
+
+
+def test_catalog_get_filepath(upload_dir: str, item_names: list[str]) -> None:
+    _catalog = catalog.Catalog(upload_dir)
+    assert _catalog.get_filepath(item_names[0]) == os.path.join(
+        upload_dir, item_names[0]
+    )
+    assert _catalog.get_filepath("unexist.img") is None
+
+
+def test_catalog_when_upload_dir_does_not_exist(upload_basedir: str) -> None:
+    _catalog = catalog.Catalog(os.path.join(upload_basedir, "unexist"))
+    assert _catalog.names() == []
+
+
+def test_get_catalog(upload_dir: str) -> None:
+    assert catalog.get_catalog(upload_dir) is catalog.get_catalog(upload_dir)
+
+
+def test_get_catalog_path(upload_dir: str) -> None:
+    assert catalog.get_catalog_path(upload_dir) == os.path.join(
+        upload_dir, catalog.CATALOG_FILENAME
+    )
+
+
+@pytest.mark.parametrize("use_store", [True, False])
+def test_get_catalog_path_of_watch_dir(
+    tmp_path: pathlib.Path,
+    upload_basedir: str,
+    store_dir: str,
+    use_store: bool,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new=str(tmp_path))
+    if not use_store:
+        mocker.patch("dawa_trpl.config.STORE_DIR", new="")
+    path = catalog.get_catalog_path(str(tmp_path))
+    assert os.path.dirname(path) == (store_dir if use_store else upload_basedir)
+    assert os.path.basename(path).startswith(".")
+    assert catalog.get_catalog_path(str(tmp_path / "other")) != path
+
+
+def test_catalog_of_read_only_watch_dir(
+    tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    watch_dir = tmp_path / "watch"
+    watch_dir.mkdir()
+    shutil.copy(next(IMGDIR.glob("*.img")), watch_dir / "item.img")
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new=str(watch_dir))
+    watch_dir.chmod(0o555)
+    try:
+        _catalog = catalog.Catalog(
+            str(watch_dir), catalog.get_catalog_path(str(watch_dir))
+        )
+        assert _catalog.names() == ["item.img"]
+        assert os.listdir(watch_dir) == ["item.img"]
+        assert os.path.exists(_catalog.path)
+    finally:
+        watch_dir.chmod(0o755)
+
+
+def test_discard_filepaths(upload_dir: str, item_names: list[str]) -> None:
+    catalog.discard_filepaths([os.path.join(upload_dir, item_names[0])])
+    assert sorted(catalog.get_catalog(upload_dir).names()) == item_names[1:]
+
+
+def test_discard_filepaths_when_upload_dir_is_removed(
+    upload_dir: str, item_names: list[str]
+) -> None:
+    _catalog = catalog.get_catalog(upload_dir)
+    shutil.rmtree(upload_dir)
+    catalog.discard_filepaths([os.path.join(upload_dir, item_names[0])])
+    assert catalog.get_catalog(upload_dir) is not _catalog
+    os.mkdir(upload_dir)  # The fixture removes it
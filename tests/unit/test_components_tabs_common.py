@@ -0,0 +1,82 @@
+import typing as t
+
+import dash
+import pytest
+import pytest_mock
+
+from dawa_trpl import cancellation
+from dawa_trpl.components.tabs import common
+
+
+@pytest.mark.parametrize("active_tab", [None, "h-figure"])
+def test_defer_inactive_when_tab_is_active(active_tab: str | None) -> None:
+    assert not common.defer_inactive(active_tab, "h-figure")
+
+
+def test_defer_inactive_when_inputs_change_in_hidden_tab(
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dash.ctx", triggered_id="files-dropdown")
+    assert common.defer_inactive("v-figure", "h-figure")
+
+
+def test_defer_inactive_when_tab_is_left(mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("dash.ctx", triggered_id=common.TABS_ID)
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        common.defer_inactive("v-figure", "h-figure")
+
+
+def test_latest_only() -> None:
+    with common.latest_only("session", "graph"):
+        cancellation.check()
+
+
+def test_latest_only_when_superseded() -> None:
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        with common.latest_only("session", "graph"):
+            with common.latest_only("session", "graph"):
+                pass
+            cancellation.check()
+
+
+def test_table_store_data() -> None:
+    records: list[dict[t.Hashable, t.Any]] = [
+        dict(intensity=2.0),
+        dict(intensity=4.0),
+    ]
+    assert common.table_store_data(records, [(1, 2.0), (1, 4.0)], ["intensity"]) == (
+        dict(records=records, groups=[[1, 2.0], [1, 4.0]], columns=["intensity"])
+    )
+
+
+@pytest.mark.parametrize(
+    "relayout_data, expected",
+    [
+        (
+            {"xaxis.range[0]": 450, "xaxis.range[1]": 470, "yaxis.range": [1, 2]},
+            ((450.0, 470.0), (1.0, 2.0)),
+        ),
+        ({"yaxis.range[0]": 1, "yaxis.range[1]": 2}, (None, (1.0, 2.0))),
+        ({"xaxis.autorange": True, "yaxis.autorange": True}, (None, None)),
+    ],
+)
+def test_parse_viewport(
+    relayout_data: dict[str, t.Any],
+    expected: tuple[tuple[float, float] | None, tuple[float, float] | None],
+) -> None:
+    assert common.parse_viewport(relayout_data) == expected
+
+
+@pytest.mark.parametrize(
+    "relayout_data, axes, expected",
+    [
+        ({"xaxis.range[0]": 450, "xaxis.range[1]": 470}, ("xaxis",), True),
+        ({"yaxis.range[0]": 1, "yaxis.range[1]": 2}, ("xaxis",), False),
+        ({"yaxis.autorange": True}, ("xaxis", "yaxis"), True),
+        ({"autosize": True}, ("xaxis", "yaxis"), False),
+    ],
+)
+def test_is_axis_relayout(
+    relayout_data: dict[str, t.Any], axes: tuple[str, ...], expected: bool
+) -> None:
+    assert common.is_axis_relayout(relayout_data, axes) is expected
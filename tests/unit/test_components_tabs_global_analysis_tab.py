@@ -0,0 +1,133 @@
+import os
+
+import dash
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+import pytest_mock
+
+from dawa_trpl import analysis
+from dawa_trpl.components.tabs import global_analysis_tab
+
+
+@pytest.fixture()
+def selected_items() -> list[str]:
+    return ["item0.img", "item1.img"]
+
+
+def test_update_graph_when_items_are_selected(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    process_mock = mocker.patch("dawa_trpl.components.tabs.global_analysis_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.global_analysis_tab.ds")
+    ds_mock.get_existing_item_filepaths.return_value = [
+        os.path.join(upload_dir, item) for item in selected_items
+    ]
+    fig = global_analysis_tab.update_graph(selected_items, upload_dir, 2, 10)
+    assert fig == process_mock.create_figure.return_value
+    ds_mock.validate_upload_dir.assert_called_once_with(upload_dir)
+    ds_mock.get_existing_item_filepaths.assert_called_once_with(
+        selected_items,
+        ds_mock.validate_upload_dir.return_value,
+    )
+    ds_mock.load_global_analysis.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value[0], 2, 10
+    )
+    process_mock.create_figure.assert_called_once_with(
+        ds_mock.load_global_analysis.return_value
+    )
+
+
+@pytest.mark.parametrize("selected_items", [list(), None])
+def test_update_graph_when_selected_items_is_empty_or_None(
+    selected_items: list[str] | None,
+    upload_dir: str,
+) -> None:
+    assert global_analysis_tab.update_graph(selected_items, upload_dir, 2, 10) == (
+        go.Figure()
+    )
+
+
+def test_update_graph_when_selected_items_do_not_exist(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.global_analysis_tab.ds")
+    ds_mock.get_existing_item_filepaths.return_value = list()
+    assert global_analysis_tab.update_graph(selected_items, upload_dir, 2, 10) == (
+        go.Figure()
+    )
+    ds_mock.load_global_analysis.assert_not_called()
+
+
+@pytest.mark.parametrize("n_components, rank", [(None, 10), (2, None), (0, 10), (3, 2)])
+def test_update_graph_with_invalid_options(
+    selected_items: list[str],
+    upload_dir: str,
+    n_components: int | None,
+    rank: int | None,
+) -> None:
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        global_analysis_tab.update_graph(selected_items, upload_dir, n_components, rank)
+
+
+def test_update_table_when_items_are_selected(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.global_analysis_tab.ds")
+    ds_mock.get_existing_item_filepaths.return_value = [
+        os.path.join(upload_dir, item) for item in selected_items
+    ]
+    ds_mock.load_global_analysis.return_value = analysis.GlobalAnalysis(
+        time=np.array([0.0]),
+        wavelength=np.array([450.0, 451.0]),
+        lifetimes=np.array([0.25, 2.0]),
+        das=np.array([[1.0, 2.0], [3.0, 4.0]]),
+        singular_values=np.array([1.0]),
+        residuals=np.zeros((1, 2)),
+        cost=0.0,
+    )
+    assert global_analysis_tab.update_table(selected_items, upload_dir, 2, 10) == [
+        {"wavelength": 450.0, "das1 (0.25 ns)": 1.0, "das2 (2 ns)": 3.0},
+        {"wavelength": 451.0, "das1 (0.25 ns)": 2.0, "das2 (2 ns)": 4.0},
+    ]
+
+
+@pytest.mark.parametrize("selected_items", [list(), None])
+def test_update_table_when_selected_items_is_empty_or_None(
+    selected_items: list[str] | None,
+    upload_dir: str,
+) -> None:
+    assert global_analysis_tab.update_table(selected_items, upload_dir, 2, 10) is None
+
+
+@pytest.mark.parametrize("n_components, rank", [(None, 10), (3, 2)])
+def test_update_table_with_invalid_options(
+    selected_items: list[str],
+    upload_dir: str,
+    n_components: int | None,
+    rank: int | None,
+) -> None:
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        global_analysis_tab.update_table(selected_items, upload_dir, n_components, rank)
+
+
+def test_update_in_hidden_tab(
+    upload_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dash.ctx", triggered_id="files-dropdown")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.global_analysis_tab.ds")
+    assert (
+        global_analysis_tab.update_graph(["item.img"], upload_dir, 2, 10, "v-figure")
+        == go.Figure()
+    )
+    assert (
+        global_analysis_tab.update_table(["item.img"], upload_dir, 2, 10, "v-figure")
+        is None
+    )
+    ds_mock.load_global_analysis.assert_not_called()
@@ -0,0 +1,13 @@
+import plotly.graph_objects as go
+
+from dawa_trpl import data_system as ds
+from dawa_trpl.components.tabs.global_analysis_tab import process
+from tests import IMGDIR
+
+
+def test_create_figure() -> None:
+    filepath = next(IMGDIR.glob("*.img")).as_posix()
+    result = ds.load_global_analysis(filepath, 2, 10)
+    fig = process.create_figure(result)
+    assert isinstance(fig, go.Figure)
+    assert len(fig.data) == 2 + 2
@@ -1,4 +1,5 @@
 import os
+import typing as t
 
 import dash
 import pandas as pd
@@ -16,11 +17,9 @@ def selected_items() -> list[str]:
     return ["item.img"]
 
 
-@pytest.mark.parametrize("normalize_intensity", [True, False])
 def test_update_graph_when_items_are_selected(
     selected_items: list[str] | None,
     upload_dir: str,
-    normalize_intensity: bool,
     mocker: pytest_mock.MockerFixture,
 ) -> None:
     process_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.process")
@@ -30,7 +29,6 @@ def test_update_graph_when_items_are_selected(
         upload_dir,
         show_peak_vline=False,
         show_FWHM_range=False,
-        normalize_intensity=normalize_intensity,
     )
     assert fig == process_mock.create_figure.return_value
     ds_mock.validate_upload_dir.assert_called_once_with(upload_dir)
@@ -39,14 +37,56 @@ def test_update_graph_when_items_are_selected(
         ds_mock.validate_upload_dir.return_value,
     )
     ds_mock.load_wavelength_dfs.assert_called_once_with(
-        ds_mock.get_existing_item_filepaths.return_value,
-        normalize_intensity,
+        ds_mock.get_existing_item_filepaths.return_value, time_range=None
     )
     process_mock.create_figure.assert_called_once_with(
-        ds_mock.load_wavelength_dfs.return_value
+        ds_mock.load_wavelength_dfs.return_value, x_range=None
     )
 
 
+def test_update_graph_when_zoomed(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dash.ctx", triggered_id=h_figure_tab.graph.id)
+    process_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    h_figure_tab.update_graph(
+        selected_items,
+        upload_dir,
+        show_peak_vline=False,
+        show_FWHM_range=False,
+        relayout_data={"xaxis.range[0]": 450, "xaxis.range[1]": 470},
+    )
+    process_mock.create_figure.assert_called_once_with(
+        ds_mock.load_wavelength_dfs.return_value, x_range=(450.0, 470.0)
+    )
+
+
+@pytest.mark.parametrize(
+    "relayout_data",
+    [{"autosize": True}, {"yaxis.range[0]": 0, "yaxis.range[1]": 1}],
+)
+def test_update_graph_ignores_relayout(
+    selected_items: list[str],
+    upload_dir: str,
+    relayout_data: dict[str, t.Any],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dash.ctx", triggered_id=h_figure_tab.graph.id)
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        h_figure_tab.update_graph(
+            selected_items,
+            upload_dir,
+            show_peak_vline=False,
+            show_FWHM_range=False,
+            relayout_data=relayout_data,
+        )
+    ds_mock.load_wavelength_dfs.assert_not_called()
+
+
 @pytest.mark.parametrize("selected_items", [list(), None])
 def test_update_graph_when_selected_items_is_empty_or_None(
     selected_items: list[str] | None,
@@ -57,7 +97,6 @@ def test_update_graph_when_selected_items_is_empty_or_None(
         upload_dir,
         show_peak_vline=False,
         show_FWHM_range=False,
-        normalize_intensity=False,
     )
     assert fig == go.Figure()
 
@@ -76,7 +115,6 @@ def test_update_graph_with_show_peak_vline(
         upload_dir,
         show_peak_vline=show_peak_vline,
         show_FWHM_range=False,
-        normalize_intensity=False,
     )
     if show_peak_vline:
         assert fig == process_mock.add_peak_vline.return_value
@@ -103,7 +141,6 @@ def test_update_graph_with_show_FWHM_range(
         upload_dir,
         show_peak_vline=False,
         show_FWHM_range=show_FWHM_range,
-        normalize_intensity=False,
     )
     if show_FWHM_range:
         assert fig == process_mock.add_FWHM_range.return_value
@@ -116,25 +153,22 @@ def test_update_graph_with_show_FWHM_range(
         process_mock.add_FWHM_range.assert_not_called()
 
 
-@pytest.mark.parametrize("normalize_intensity", [True, False])
 def test_update_table_when_items_are_selected(
     selected_items: list[str],
     upload_dir: str,
-    normalize_intensity: bool,
     mocker: pytest_mock.MockerFixture,
 ) -> None:
     ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
-    ds_mock.load_wavelength_dfs.return_value = [
+    dfs = [
         trpl.read_file(filepath).aggregate_along_time()
         for filepath in IMGDIR.glob("*.img")
     ]
-    table = h_figure_tab.update_table(
-        selected_items,
-        upload_dir,
-        normalize_intensity,
-    )
-    assert table == pd.concat(ds_mock.load_wavelength_dfs.return_value).to_dict(
-        "records"
+    ds_mock.load_wavelength_dfs.return_value = dfs
+    table = h_figure_tab.update_table(selected_items, upload_dir)
+    assert table == dict(
+        records=pd.concat(dfs).to_dict("records"),
+        groups=[[len(df), df["intensity"].max()] for df in dfs],
+        columns=["intensity"],
     )
     ds_mock.validate_upload_dir.assert_called_once_with(upload_dir)
     ds_mock.get_existing_item_filepaths.assert_called_once_with(
@@ -142,8 +176,7 @@ def test_update_table_when_items_are_selected(
         ds_mock.validate_upload_dir.return_value,
     )
     ds_mock.load_wavelength_dfs.assert_called_once_with(
-        ds_mock.get_existing_item_filepaths.return_value,
-        normalize_intensity,
+        ds_mock.get_existing_item_filepaths.return_value, time_range=None
     )
 
 
@@ -152,12 +185,108 @@ def test_update_table_when_selected_items_is_empty_or_None(
     selected_items: list[str] | None,
     upload_dir: str,
 ) -> None:
-    table = h_figure_tab.update_table(
+    table = h_figure_tab.update_table(selected_items, upload_dir)
+    assert table is None
+
+
+def test_update_graph_with_time_range(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.components.tabs.h_figure_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    ds_mock.get_time_range.return_value = (0.0, 9.98765)
+    h_figure_tab.update_graph(
         selected_items,
         upload_dir,
-        normalize_intensity=False,
+        show_peak_vline=False,
+        show_FWHM_range=False,
+        time_range=[1, 2.5],
+    )
+    ds_mock.get_time_range.assert_called_once_with(
+        selected_items, ds_mock.validate_upload_dir.return_value
+    )
+    ds_mock.load_wavelength_dfs.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value, time_range=(1.0, 2.5)
     )
-    assert table is None
+
+
+@pytest.mark.parametrize("time_range", [[0.0, 9.98765], [0.0, 9.99], [-1.0, 20.0]])
+def test_update_graph_with_full_time_range(
+    selected_items: list[str],
+    upload_dir: str,
+    time_range: list[float],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.components.tabs.h_figure_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    ds_mock.get_time_range.return_value = (0.0, 9.98765)
+    h_figure_tab.update_graph(
+        selected_items,
+        upload_dir,
+        show_peak_vline=False,
+        show_FWHM_range=False,
+        time_range=time_range,
+    )
+    ds_mock.load_wavelength_dfs.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value, time_range=None
+    )
+
+
+def test_update_table_with_time_range(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    ds_mock.get_time_range.return_value = (0.0, 9.98765)
+    ds_mock.load_wavelength_dfs.return_value = [
+        pd.DataFrame(dict(wavelength=[450.0], intensity=[1.0]))
+    ]
+    h_figure_tab.update_table(selected_items, upload_dir, time_range=[1, 2.5])
+    ds_mock.load_wavelength_dfs.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value, time_range=(1.0, 2.5)
+    )
+
+
+def test_update_time_slider_range_when_items_are_selected(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    ds_mock.get_time_range.return_value = (0.0, 9.98765)
+    assert h_figure_tab.update_time_slider_range(selected_items, upload_dir) == (
+        0.0,
+        9.98765,
+        (0.0, 9.98765),
+    )
+    ds_mock.validate_upload_dir.assert_called_once_with(upload_dir)
+    ds_mock.get_time_range.assert_called_once_with(
+        selected_items,
+        ds_mock.validate_upload_dir.return_value,
+    )
+
+
+def test_update_time_slider_range_when_range_is_unknown(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    ds_mock.get_time_range.return_value = None
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        h_figure_tab.update_time_slider_range(selected_items, upload_dir)
+
+
+@pytest.mark.parametrize("selected_items", [list(), None])
+def test_update_time_slider_range_when_selected_items_is_empty_or_None(
+    selected_items: list[str] | None,
+    upload_dir: str,
+) -> None:
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        h_figure_tab.update_time_slider_range(selected_items, upload_dir)
 
 
 @pytest.mark.parametrize("selected_items", [list(), None])
@@ -209,6 +338,74 @@ def test_download_csv(
     ds_mock.load_wavelength_df.assert_called_once_with(
         ds_mock.get_existing_item_filepaths.return_value[0],
         normalize_intensity,
+        None,
+    )
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_download_csv_with_binary_format(
+    selected_items: list[str],
+    upload_dir: str,
+    file_format: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    export_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.export")
+    ds_mock.get_existing_item_filepaths.return_value = [
+        os.path.join(upload_dir, item) for item in selected_items
+    ]
+    assert (
+        h_figure_tab.download_csv(1, selected_items, upload_dir, False, file_format)
+        == export_mock.df_to_download.return_value
+    )
+    export_mock.df_to_download.assert_called_once_with(
+        ds_mock.load_wavelength_df.return_value,
+        "h-" + selected_items[0],
+        file_format,
+    )
+
+
+def test_download_csv_with_time_range(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    export_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.export")
+    ds_mock.get_existing_item_filepaths.return_value = [
+        os.path.join(upload_dir, item) for item in selected_items
+    ]
+    ds_mock.get_time_range.return_value = (0.0, 9.98765)
+    h_figure_tab.download_csv(1, selected_items, upload_dir, False, "csv", [1, 2.5])
+    ds_mock.load_wavelength_df.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value[0], False, (1.0, 2.5)
+    )
+    export_mock.df_to_download.assert_called_once_with(
+        ds_mock.load_wavelength_df.return_value,
+        "h(1-2.5)-" + selected_items[0],
+        "csv",
+    )
+
+
+def test_download_csv_with_full_time_range(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    export_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.export")
+    ds_mock.get_existing_item_filepaths.return_value = [
+        os.path.join(upload_dir, item) for item in selected_items
+    ]
+    ds_mock.get_time_range.return_value = (0.0, 9.98765)
+    h_figure_tab.download_csv(
+        1, selected_items, upload_dir, False, "csv", [0.0, 9.98765]
+    )
+    ds_mock.load_wavelength_df.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value[0], False, None
+    )
+    export_mock.df_to_download.assert_called_once_with(
+        ds_mock.load_wavelength_df.return_value, "h-" + selected_items[0], "csv"
     )
 
 
@@ -235,3 +432,16 @@ def test_download_csv_when_selected_item_does_not_exist(
         h_figure_tab.download_csv(
             1, selected_items, upload_dir, normalize_intensity=False
         )
+
+
+def test_update_in_hidden_tab(
+    upload_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dash.ctx", triggered_id="files-dropdown")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.h_figure_tab.ds")
+    fig = h_figure_tab.update_graph(
+        ["item.img"], upload_dir, True, True, None, active_tab="v-figure"
+    )
+    assert fig == go.Figure()
+    assert h_figure_tab.update_table(["item.img"], upload_dir, None, "v-figure") is None
+    ds_mock.load_wavelength_dfs.assert_not_called()
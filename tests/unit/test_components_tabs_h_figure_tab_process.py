@@ -1,8 +1,10 @@
 import pathlib
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import pytest
+import pytest_mock
 
 from dawa_trpl import data_system as ds
 from dawa_trpl.components.tabs.h_figure_tab import process
@@ -31,3 +33,43 @@ def test_add_peak_vline(dfs: list[pd.DataFrame]) -> None:
 def test_add_FWHM_range(dfs: list[pd.DataFrame]) -> None:
     fig = process.add_FWHM_range(go.Figure(), dfs)
     assert isinstance(fig, go.Figure)
+
+
+def test_create_figure_sets_trace_scales(dfs: list[pd.DataFrame]) -> None:
+    fig = process.create_figure(dfs)
+    assert [trace.meta for trace in fig.data] == [
+        dict(scale=df["intensity"].max()) for df in dfs
+    ]
+
+
+def test_add_FWHM_range_names_shapes_after_traces(dfs: list[pd.DataFrame]) -> None:
+    fig = process.add_FWHM_range(go.Figure(), dfs)
+    names = [df.attrs["filename"] for df in dfs]
+    assert fig.layout.shapes
+    assert all(shape.name in names for shape in fig.layout.shapes)
+
+
+def _create_spectrum(filename: str) -> pd.DataFrame:
+    wavelength = np.linspace(400, 600, 5001)
+    intensity = np.exp(-(((wavelength - 500) / 10) ** 2))
+    df = pd.DataFrame(dict(wavelength=wavelength, intensity=intensity))
+    df.attrs["filename"] = filename
+    return df
+
+
+def test_create_figure_downsamples_traces(mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("dawa_trpl.config.DOWNSAMPLE_POINTS", 100)
+    dfs = [_create_spectrum("a.img"), _create_spectrum("b.img")]
+    fig = process.create_figure(dfs, x_range=(450.0, 550.0))
+    assert [trace.type for trace in fig.data] == ["scatter", "scatter"]
+    for trace in fig.data:
+        assert len(trace.x) <= 102
+        assert min(trace.x) < 450 and max(trace.x) > 550
+        assert max(trace.y) == trace.meta["scale"] == 1.0
+    assert fig.layout.xaxis.range == (450.0, 550.0)
+
+
+def test_create_figure_of_many_traces_uses_webgl() -> None:
+    dfs = [_create_spectrum(f"{i}.img") for i in range(10)]
+    fig = process.create_figure(dfs)
+    assert all(trace.type == "scattergl" for trace in fig.data)
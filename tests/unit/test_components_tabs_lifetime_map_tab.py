@@ -0,0 +1,103 @@
+import dash
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+import pytest_mock
+
+from dawa_trpl.components.tabs import lifetime_map_tab
+
+
+@pytest.fixture()
+def selected_items() -> list[str]:
+    return ["item.img"]
+
+
+def test_update_graph_when_items_are_selected(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    process_mock = mocker.patch("dawa_trpl.components.tabs.lifetime_map_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.lifetime_map_tab.ds")
+    fig = lifetime_map_tab.update_graph(selected_items, upload_dir, 4)
+    assert fig == process_mock.create_figure.return_value
+    ds_mock.validate_upload_dir.assert_called_once_with(upload_dir)
+    ds_mock.get_existing_item_filepaths.assert_called_once_with(
+        selected_items,
+        ds_mock.validate_upload_dir.return_value,
+    )
+    ds_mock.load_lifetime_map_dfs.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value, 4
+    )
+    process_mock.create_figure.assert_called_once_with(
+        ds_mock.load_lifetime_map_dfs.return_value
+    )
+
+
+@pytest.mark.parametrize("selected_items", [list(), None])
+def test_update_graph_when_selected_items_is_empty_or_None(
+    selected_items: list[str] | None,
+    upload_dir: str,
+) -> None:
+    assert lifetime_map_tab.update_graph(selected_items, upload_dir, 4) == go.Figure()
+
+
+@pytest.mark.parametrize("binning", [None, 0, -1])
+def test_update_graph_with_invalid_binning(
+    selected_items: list[str],
+    upload_dir: str,
+    binning: int | None,
+) -> None:
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        lifetime_map_tab.update_graph(selected_items, upload_dir, binning)
+
+
+def test_update_table_when_items_are_selected(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.lifetime_map_tab.ds")
+    df = pd.DataFrame(dict(wavelength=[450.0, 451.0], tau1=[0.1, 0.2]))
+    df.attrs["filename"] = "item.img"
+    ds_mock.load_lifetime_map_dfs.return_value = [df]
+    assert lifetime_map_tab.update_table(selected_items, upload_dir, 2) == [
+        dict(wavelength=450.0, tau1=0.1, name="item.img"),
+        dict(wavelength=451.0, tau1=0.2, name="item.img"),
+    ]
+    ds_mock.load_lifetime_map_dfs.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value, 2
+    )
+
+
+@pytest.mark.parametrize("selected_items", [list(), None])
+def test_update_table_when_selected_items_is_empty_or_None(
+    selected_items: list[str] | None,
+    upload_dir: str,
+) -> None:
+    assert lifetime_map_tab.update_table(selected_items, upload_dir, 4) is None
+
+
+@pytest.mark.parametrize("binning", [None, 0])
+def test_update_table_with_invalid_binning(
+    selected_items: list[str],
+    upload_dir: str,
+    binning: int | None,
+) -> None:
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        lifetime_map_tab.update_table(selected_items, upload_dir, binning)
+
+
+def test_update_in_hidden_tab(
+    upload_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dash.ctx", triggered_id="files-dropdown")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.lifetime_map_tab.ds")
+    assert (
+        lifetime_map_tab.update_graph(["item.img"], upload_dir, 4, "v-figure")
+        == go.Figure()
+    )
+    assert (
+        lifetime_map_tab.update_table(["item.img"], upload_dir, 4, "v-figure") is None
+    )
+    ds_mock.load_lifetime_map_dfs.assert_not_called()
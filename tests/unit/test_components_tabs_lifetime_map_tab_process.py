@@ -0,0 +1,23 @@
+import pathlib
+
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+from dawa_trpl import data_system as ds
+from dawa_trpl.components.tabs.lifetime_map_tab import process
+from tests import IMGDIR
+
+
+@pytest.fixture(scope="module")
+def dfs() -> list[pd.DataFrame]:
+    def load_lifetime_map_df(filepath: pathlib.Path) -> pd.DataFrame:
+        return ds.load_lifetime_map_df(filepath.as_posix(), 8)
+
+    return list(map(load_lifetime_map_df, IMGDIR.glob("*.img")))
+
+
+def test_create_figure(dfs: list[pd.DataFrame]) -> None:
+    fig = process.create_figure(dfs)
+    assert isinstance(fig, go.Figure)
+    assert len(fig.data) == 3 * len(dfs)
@@ -0,0 +1,117 @@
+import dash
+import plotly.graph_objects as go
+import pytest
+import pytest_mock
+
+from dawa_trpl.components.tabs import live_tab
+
+
+def test_update_options(mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("dawa_trpl.live.list_acquisitions", return_value=["frames"])
+    assert live_tab.update_options(1, live_tab.TAB_ID, []) == ["frames"]
+
+
+@pytest.mark.parametrize(
+    "active_tab, options",
+    [("streak-image", []), (live_tab.TAB_ID, ["frames"])],
+    ids=["inactive", "unchanged"],
+)
+def test_update_options_without_update(
+    active_tab: str, options: list[str], mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.live.list_acquisitions", return_value=["frames"])
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        live_tab.update_options(1, active_tab, options)
+
+
+@pytest.fixture()
+def acquisition_mock(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
+    get_acquisition_mock = mocker.patch("dawa_trpl.live.get_acquisition")
+    acquisition: pytest_mock.MockType = get_acquisition_mock.return_value
+    acquisition.changes.return_value.version = 3
+    acquisition.changes.return_value.reset_version = 1
+    return acquisition
+
+
+@pytest.fixture()
+def process_mock(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
+    process_mock = mocker.patch("dawa_trpl.components.tabs.live_tab.process")
+    process_mock.create_figures.return_value = ("image", "h", "v")
+    process_mock.patch_figures.return_value = ("image patch", "h patch", "v patch")
+    return process_mock
+
+
+@pytest.mark.parametrize(
+    "view", [None, dict(name="other", version=2)], ids=["none", "other"]
+)
+def test_update_figures_when_acquisition_is_selected(
+    view: dict[str, object] | None,
+    acquisition_mock: pytest_mock.MockType,
+    process_mock: pytest_mock.MockType,
+) -> None:
+    outputs = live_tab.update_figures("frames", 1, live_tab.TAB_ID, view)
+    assert outputs == ("image", "h", "v", dict(name="frames", version=3))
+    acquisition_mock.poll.assert_called_once_with()
+    acquisition_mock.changes.assert_called_once_with(0)
+    process_mock.create_figures.assert_called_once_with(
+        "frames", acquisition_mock.changes.return_value
+    )
+
+
+def test_update_figures_patches_figures(
+    acquisition_mock: pytest_mock.MockType, process_mock: pytest_mock.MockType
+) -> None:
+    view = dict(name="frames", version=2)
+    outputs = live_tab.update_figures("frames", 2, live_tab.TAB_ID, view)
+    assert outputs == (
+        "image patch",
+        "h patch",
+        "v patch",
+        dict(name="frames", version=3),
+    )
+    acquisition_mock.changes.assert_called_once_with(2)
+    process_mock.patch_figures.assert_called_once_with(
+        acquisition_mock.changes.return_value
+    )
+
+
+def test_update_figures_when_acquisition_is_reset(
+    acquisition_mock: pytest_mock.MockType, process_mock: pytest_mock.MockType
+) -> None:
+    acquisition_mock.changes.return_value.reset_version = 3
+    view = dict(name="frames", version=2)
+    outputs = live_tab.update_figures("frames", 2, live_tab.TAB_ID, view)
+    assert outputs[:3] == ("image", "h", "v")
+
+
+def test_update_figures_when_unchanged(acquisition_mock: pytest_mock.MockType) -> None:
+    view = dict(name="frames", version=3)
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        live_tab.update_figures("frames", 3, live_tab.TAB_ID, view)
+
+
+def test_update_figures_before_first_frame(
+    acquisition_mock: pytest_mock.MockType,
+) -> None:
+    acquisition_mock.changes.return_value = None
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        live_tab.update_figures("frames", 1, live_tab.TAB_ID, None)
+
+
+@pytest.mark.parametrize("name", [None, ""])
+def test_update_figures_without_acquisition(name: str | None) -> None:
+    outputs = live_tab.update_figures(name, 1, live_tab.TAB_ID, None)
+    assert outputs == (go.Figure(), go.Figure(), go.Figure(), None)
+
+
+def test_update_figures_when_tab_is_inactive() -> None:
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        live_tab.update_figures("frames", 1, "streak-image", None)
+
+
+def test_update_figures_with_unknown_acquisition(
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.live.get_acquisition", side_effect=ValueError)
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        live_tab.update_figures("unexist", 1, live_tab.TAB_ID, None)
@@ -0,0 +1,52 @@
+import dash
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from dawa_trpl import img_header, live
+from dawa_trpl.components.tabs.live_tab import process
+from tests import IMGDIR
+
+
+@pytest.fixture()
+def update() -> live.Update:
+    header = img_header.read_header(str(sorted(IMGDIR.glob("*.img"))[0]))
+    rows = np.array([0, 2])
+    return live.Update(
+        header=header,
+        version=2,
+        reset_version=1,
+        rows=rows,
+        image=np.ones((len(rows), header.width), dtype=np.int64),
+        spectrum=np.arange(header.width),
+        decay=np.arange(header.height),
+    )
+
+
+def test_create_figures(update: live.Update) -> None:
+    image_fig, h_fig, v_fig = process.create_figures("frames", update)
+    for fig in (image_fig, h_fig, v_fig):
+        assert isinstance(fig, go.Figure)
+        assert fig.layout.uirevision == "frames"
+    z = np.array(image_fig.data[0].z)
+    assert z.shape == (update.header.height, update.header.width)
+    np.testing.assert_array_equal(z[update.rows], update.image)
+    assert z.sum() == update.image.sum()
+    np.testing.assert_array_equal(h_fig.data[0].y, update.spectrum)
+    np.testing.assert_array_equal(v_fig.data[0].y, update.decay)
+
+
+def test_patch_figures(update: live.Update) -> None:
+    image_patch, h_patch, v_patch = process.patch_figures(update)
+    for patch in (image_patch, h_patch, v_patch):
+        assert isinstance(patch, dash.Patch)
+    operations = image_patch.to_plotly_json()["operations"]
+    # Only the changed rows of the image are sent
+    assert [operation["location"] for operation in operations] == [
+        ["data", 0, "z", 0],
+        ["data", 0, "z", 2],
+    ]
+    (operation,) = h_patch.to_plotly_json()["operations"]
+    assert operation["params"]["value"] == update.spectrum.tolist()
+    (operation,) = v_patch.to_plotly_json()["operations"]
+    assert operation["params"]["value"] == update.decay.tolist()
@@ -1,5 +1,6 @@
 import base64
 import os
+import typing as t
 
 import dash
 import plotly.graph_objects as go
@@ -29,11 +30,11 @@ def test_update_streak_image_when_items_are_selected(
         ds_mock.validate_upload_dir.return_value,
     )
     filepaths = ds_mock.get_existing_item_filepaths.return_value
-    for call, filepath in zip(ds_mock.load_trpl_data.call_args_list, filepaths):
+    for call, filepath in zip(ds_mock.load_image.call_args_list, filepaths):
         assert call == mocker.call(filepath)
     process_mock.create_figure.assert_called_once_with(
         {
-            os.path.basename(filepath): ds_mock.load_trpl_data.return_value
+            os.path.basename(filepath): ds_mock.load_image.return_value
             for filepath in filepaths
         }
     )
@@ -98,6 +99,29 @@ def test_download_img(
     )
 
 
+def test_download_img_with_npz_format(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.streak_image_tab.ds")
+    export_mock = mocker.patch("dawa_trpl.components.tabs.streak_image_tab.export")
+    ds_mock.get_existing_item_filepaths.return_value = [
+        os.path.join(upload_dir, item) for item in selected_items
+    ]
+    raw_binary = b"npz_binary"
+    export_mock.streak_image_to_npz.return_value = raw_binary
+    assert streak_image_tab.download_img(2, selected_items, upload_dir, "npz") == dict(
+        filename=selected_items[0] + ".npz",
+        content=base64.urlsafe_b64encode(raw_binary).decode(),
+        type="application/octet-stream",
+        base64=True,
+    )
+    export_mock.streak_image_to_npz.assert_called_once_with(
+        ds_mock.load_image.return_value
+    )
+
+
 @pytest.mark.parametrize("selected_items", [list(), None])
 def test_download_img_when_no_item_is_selected(
     selected_items: list[str],
@@ -125,3 +149,84 @@ def test_download_img_when_selected_item_does_not_exist(
             selected_items,
             upload_dir,
         )
+
+
+def test_update_streak_image_in_hidden_tab(
+    upload_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dash.ctx", triggered_id="files-dropdown")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.streak_image_tab.ds")
+    fig = streak_image_tab.update_streak_image(
+        ["item.img"], upload_dir, active_tab="h-figure"
+    )
+    assert fig == go.Figure()
+    ds_mock.load_image.assert_not_called()
+
+
+def test_update_streak_image_with_heatmap(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    process_mock = mocker.patch("dawa_trpl.components.tabs.streak_image_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.streak_image_tab.ds")
+    ds_mock.get_existing_item_filepaths.return_value = [
+        os.path.join(upload_dir, item) for item in selected_items
+    ]
+    ds_mock.load_streak_image_tiles.return_value = (2, mocker.sentinel.tiles)
+    fig = streak_image_tab.update_streak_image(selected_items, upload_dir, "heatmap")
+    assert fig == process_mock.create_heatmap_figure.return_value
+    ds_mock.load_streak_image_tiles.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value[0], None, None
+    )
+    process_mock.create_heatmap_figure.assert_called_once_with(
+        selected_items[0], 2, mocker.sentinel.tiles
+    )
+    ds_mock.load_image.assert_not_called()
+
+
+def test_update_streak_image_when_heatmap_is_zoomed(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.components.tabs.streak_image_tab.process")
+    mocker.patch("dash.ctx", triggered_id=streak_image_tab.graph.id)
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.streak_image_tab.ds")
+    ds_mock.load_streak_image_tiles.return_value = (0, mocker.sentinel.tiles)
+    relayout_data = {
+        "xaxis.range[0]": 450,
+        "xaxis.range[1]": 470.5,
+        "yaxis.range[0]": 1,
+        "yaxis.range[1]": 2,
+    }
+    streak_image_tab.update_streak_image(
+        selected_items, upload_dir, "heatmap", relayout_data
+    )
+    ds_mock.load_streak_image_tiles.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value[0], (1.0, 2.0), (450.0, 470.5)
+    )
+
+
+@pytest.mark.parametrize(
+    "view, relayout_data",
+    [
+        ("surface", {"xaxis.range[0]": 450, "xaxis.range[1]": 470}),
+        ("surface", {"scene.camera": dict()}),
+        ("heatmap", {"autosize": True}),
+    ],
+)
+def test_update_streak_image_ignores_relayout(
+    selected_items: list[str],
+    upload_dir: str,
+    view: str,
+    relayout_data: dict[str, t.Any],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dash.ctx", triggered_id=streak_image_tab.graph.id)
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.streak_image_tab.ds")
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        streak_image_tab.update_streak_image(
+            selected_items, upload_dir, view, relayout_data
+        )
+    ds_mock.get_existing_item_filepaths.assert_not_called()
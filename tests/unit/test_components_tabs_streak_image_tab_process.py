@@ -1,18 +1,34 @@
+import numpy as np
 import plotly.graph_objects as go
 import pytest
 from tlab_analysis import trpl
 
+from dawa_trpl import pyramid, streak
 from dawa_trpl.components.tabs.streak_image_tab import process
 from tests import IMGDIR
 
 
 @pytest.fixture()
-def item_to_data() -> dict[str, trpl.TRPLData]:
+def item_to_data() -> dict[str, streak.StreakImage]:
     return {
-        filepath.name: trpl.read_file(filepath) for filepath in IMGDIR.glob("*.img")
+        filepath.name: streak.StreakImage.from_trpl_data(trpl.read_file(filepath))
+        for filepath in IMGDIR.glob("*.img")
     }
 
 
-def test_create_figure(item_to_data: dict[str, trpl.TRPLData]) -> None:
+def test_create_figure(item_to_data: dict[str, streak.StreakImage]) -> None:
     fig = process.create_figure(item_to_data)
     assert isinstance(fig, go.Figure)
+
+
+def test_create_heatmap_figure() -> None:
+    tiles = pyramid.Level(
+        time=np.arange(3.0),
+        wavelength=np.arange(4.0),
+        image=np.ones((3, 4), dtype=np.float32),
+    )
+    fig = process.create_heatmap_figure("item.img", 2, tiles)
+    assert isinstance(fig.data[0], go.Heatmap)
+    np.testing.assert_array_equal(fig.data[0].z, tiles.image)
+    assert fig.layout.title.text == "item.img (1:4)"
+    assert fig.layout.uirevision == "item.img"
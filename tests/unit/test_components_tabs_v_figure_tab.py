@@ -1,13 +1,14 @@
 import os
+import typing as t
 
 import dash
-import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import pytest
 import pytest_mock
 from tlab_analysis import trpl
 
+from dawa_trpl import cancellation, models
 from dawa_trpl.components.tabs import v_figure_tab
 from tests import IMGDIR
 
@@ -22,14 +23,10 @@ def wavelength_range() -> list[int]:
     return [450, 500]
 
 
-@pytest.mark.parametrize("log_y", [True, False])
-@pytest.mark.parametrize("normalize_intensity", [True, False])
 def test_update_graph_when_items_are_selected(
     selected_items: list[str] | None,
     upload_dir: str,
     wavelength_range: list[int],
-    log_y: bool,
-    normalize_intensity: bool,
     mocker: pytest_mock.MockerFixture,
 ) -> None:
     process_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.process")
@@ -39,8 +36,6 @@ def test_update_graph_when_items_are_selected(
         upload_dir,
         wavelength_range,
         fitting=False,
-        log_y=log_y,
-        normalize_intensity=normalize_intensity,
     )
     assert fig == process_mock.create_figure.return_value
     ds_mock.validate_upload_dir.assert_called_once_with(upload_dir)
@@ -52,14 +47,66 @@ def test_update_graph_when_items_are_selected(
         ds_mock.get_existing_item_filepaths.return_value,
         tuple(wavelength_range),
         False,
-        normalize_intensity,
+        irf_filepath=None,
+        model="double",
+        warm_start=True,
+    )
+    process_mock.create_figure.assert_called_once_with(
+        ds_mock.load_time_dfs.return_value, x_range=None
+    )
+
+
+def test_update_graph_when_zoomed(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dash.ctx", triggered_id=v_figure_tab.graph.id)
+    process_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    v_figure_tab.update_graph(
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        fitting=True,
+        relayout_data={"xaxis.range": [1, 5]},
     )
     process_mock.create_figure.assert_called_once_with(
+        ds_mock.load_time_dfs.return_value, x_range=(1.0, 5.0)
+    )
+    process_mock.add_fitting_curve.assert_called_once_with(
+        process_mock.create_figure.return_value,
         ds_mock.load_time_dfs.return_value,
-        log_y,
+        None,
+        x_range=(1.0, 5.0),
     )
 
 
+@pytest.mark.parametrize(
+    "relayout_data",
+    [{"autosize": True}, {"yaxis.range[0]": 0, "yaxis.range[1]": 1}],
+)
+def test_update_graph_ignores_relayout(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    relayout_data: dict[str, t.Any],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dash.ctx", triggered_id=v_figure_tab.graph.id)
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        v_figure_tab.update_graph(
+            selected_items,
+            upload_dir,
+            wavelength_range,
+            fitting=False,
+            relayout_data=relayout_data,
+        )
+    ds_mock.load_time_dfs.assert_not_called()
+
+
 @pytest.mark.parametrize("selected_items", [list(), None])
 def test_update_graph_when_selected_items_is_empty_or_None(
     selected_items: list[str] | None,
@@ -71,8 +118,6 @@ def test_update_graph_when_selected_items_is_empty_or_None(
         upload_dir,
         wavelength_range,
         fitting=False,
-        log_y=False,
-        normalize_intensity=False,
     )
     assert fig == go.Figure()
 
@@ -92,14 +137,14 @@ def test_update_graph_with_fitting(
         upload_dir,
         wavelength_range,
         fitting=fitting,
-        log_y=False,
-        normalize_intensity=False,
     )
     if fitting:
         assert fig == process_mock.add_fitting_curve.return_value
         process_mock.add_fitting_curve.assert_called_once_with(
             process_mock.create_figure.return_value,
             ds_mock.load_time_dfs.return_value,
+            None,
+            x_range=None,
         )
     else:
         assert fig == process_mock.create_figure.return_value
@@ -107,28 +152,30 @@ def test_update_graph_with_fitting(
 
 
 @pytest.mark.parametrize("fitting", [True, False])
-@pytest.mark.parametrize("normalize_intensity", [True, False])
 def test_update_table_when_items_are_selected(
     selected_items: list[str],
     upload_dir: str,
     wavelength_range: list[int],
     fitting: bool,
-    normalize_intensity: bool,
     mocker: pytest_mock.MockerFixture,
 ) -> None:
     ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
-    ds_mock.load_time_dfs.return_value = [
+    dfs = [
         trpl.read_file(filepath).aggregate_along_wavelength()
         for filepath in IMGDIR.glob("*.img")
     ]
+    ds_mock.load_time_dfs.return_value = dfs
     table = v_figure_tab.update_table(
         selected_items,
         upload_dir,
         wavelength_range,
         fitting,
-        normalize_intensity,
     )
-    assert table == pd.concat(ds_mock.load_time_dfs.return_value).to_dict("records")
+    assert table == dict(
+        records=pd.concat(dfs).to_dict("records"),
+        groups=[[len(df), df["intensity"].max()] for df in dfs],
+        columns=["intensity", "fit"],
+    )
     ds_mock.validate_upload_dir.assert_called_once_with(upload_dir)
     ds_mock.get_existing_item_filepaths.assert_called_once_with(
         selected_items,
@@ -138,7 +185,9 @@ def test_update_table_when_items_are_selected(
         ds_mock.get_existing_item_filepaths.return_value,
         tuple(wavelength_range),
         fitting,
-        normalize_intensity,
+        irf_filepath=None,
+        model="double",
+        warm_start=True,
     )
 
 
@@ -153,7 +202,6 @@ def test_update_table_when_selected_items_is_empty_or_None(
         upload_dir,
         wavelength_range,
         fitting=False,
-        normalize_intensity=False,
     )
     assert table is None
 
@@ -164,22 +212,29 @@ def test_update_wavelength_slider_range_when_items_are_selected(
     mocker: pytest_mock.MockerFixture,
 ) -> None:
     ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
-    ds_mock.get_existing_item_filepaths.return_value = [
-        os.path.join(upload_dir, item) for item in selected_items
-    ]
-    wavelength = np.linspace(435, 535, 640)
-    ds_mock.load_trpl_data.return_value.wavelength = wavelength
+    ds_mock.get_wavelength_range.return_value = (435.2, 535.8)
     assert v_figure_tab.update_wavelength_slider_range(selected_items, upload_dir) == (
-        int(wavelength.min()),
-        int(wavelength.max()),
+        435,
+        535,
     )
     ds_mock.validate_upload_dir.assert_called_once_with(upload_dir)
-    ds_mock.get_existing_item_filepaths.assert_called_once_with(
+    ds_mock.get_wavelength_range.assert_called_once_with(
         selected_items,
         ds_mock.validate_upload_dir.return_value,
     )
 
 
+def test_update_wavelength_slider_range_when_range_is_unknown(
+    selected_items: list[str],
+    upload_dir: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    ds_mock.get_wavelength_range.return_value = None
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        v_figure_tab.update_wavelength_slider_range(selected_items, upload_dir)
+
+
 @pytest.mark.parametrize("selected_items", [list(), None])
 def test_update_wavelength_slider_range_when_selected_items_is_empty_or_None(
     selected_items: list[str] | None,
@@ -245,6 +300,35 @@ def test_download_csv(
         tuple(wavelength_range),
         fitting,
         normalize_intensity,
+        None,
+        "double",
+        warm_start=True,
+    )
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_download_csv_with_binary_format(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    file_format: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    export_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.export")
+    ds_mock.get_existing_item_filepaths.return_value = [
+        os.path.join(upload_dir, item) for item in selected_items
+    ]
+    assert (
+        v_figure_tab.download_csv(
+            1, selected_items, upload_dir, wavelength_range, True, False, file_format
+        )
+        == export_mock.df_to_download.return_value
+    )
+    export_mock.df_to_download.assert_called_once_with(
+        ds_mock.load_time_df.return_value,
+        f"v({wavelength_range[0]}-{wavelength_range[1]})-" + selected_items[0],
+        file_format,
     )
 
 
@@ -283,3 +367,356 @@ def test_download_csv_when_selected_item_does_not_exist(
             fitting=False,
             normalize_intensity=False,
         )
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        (None, []),
+        ("", []),
+        ("450-470", [(450.0, 470.0)]),
+        ("450-470, 480.5 - 500;510-520", [(450, 470), (480.5, 500), (510, 520)]),
+        ("450-470,", [(450.0, 470.0)]),
+    ],
+)
+def test_parse_wavelength_windows(
+    text: str | None, expected: list[tuple[float, float]]
+) -> None:
+    assert v_figure_tab.parse_wavelength_windows(text) == expected
+
+
+@pytest.mark.parametrize("text", ["450", "450-", "a-b", "470-450", "450-470-490"])
+def test_parse_wavelength_windows_with_invalid_text(text: str) -> None:
+    with pytest.raises(ValueError):
+        v_figure_tab.parse_wavelength_windows(text)
+
+
+@pytest.mark.parametrize("fitting", [True, False])
+def test_update_graph_with_wavelength_windows(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    fitting: bool,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    process_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    v_figure_tab.update_graph(
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        fitting=fitting,
+        wavelength_windows="450-470, 480-500",
+    )
+    ds_mock.load_time_dfs.assert_not_called()
+    ds_mock.load_multi_window_time_dfs.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value,
+        [(450.0, 470.0), (480.0, 500.0)],
+        fitting,
+        irf_filepath=None,
+        model="double",
+    )
+    process_mock.create_figure.assert_called_once_with(
+        ds_mock.load_multi_window_time_dfs.return_value, x_range=None
+    )
+
+
+def test_update_graph_with_invalid_wavelength_windows(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        v_figure_tab.update_graph(
+            selected_items,
+            upload_dir,
+            wavelength_range,
+            fitting=False,
+            wavelength_windows="450",
+        )
+
+
+def test_update_table_with_wavelength_windows(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    dfs = [pd.DataFrame(dict(time=[0.0], intensity=[1.0])) for _ in range(2)]
+    dfs[0].attrs["window"] = (450.0, 470.0)
+    dfs[1].attrs["window"] = (480.0, 500.0)
+    ds_mock.load_multi_window_time_dfs.return_value = dfs
+    assert v_figure_tab.update_table(
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        fitting=False,
+        wavelength_windows="450-470, 480-500",
+    ) == dict(
+        records=[
+            dict(time=0.0, intensity=1.0, window="450-470"),
+            dict(time=0.0, intensity=1.0, window="480-500"),
+        ],
+        groups=[[1, 1.0], [1, 1.0]],
+        columns=["intensity", "fit"],
+    )
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [(None, (False, False)), ("450-470", (True, False)), ("450", (False, True))],
+)
+def test_update_wavelength_windows_validity(
+    text: str | None, expected: tuple[bool, bool]
+) -> None:
+    assert v_figure_tab.update_wavelength_windows_validity(text) == expected
+
+
+def test_download_csv_with_wavelength_windows(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    ds_mock.get_existing_item_filepaths.return_value = [
+        os.path.join(upload_dir, item) for item in selected_items
+    ]
+    dfs = [pd.DataFrame(dict(time=[0.0], intensity=[1.0])) for _ in range(2)]
+    dfs[0].attrs["window"] = (450.0, 470.0)
+    dfs[1].attrs["window"] = (480.0, 500.0)
+    ds_mock.load_window_time_dfs.return_value = dfs
+    assert v_figure_tab.download_csv(
+        1,
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        True,
+        False,
+        "csv",
+        "450-470, 480-500",
+    ) == dict(
+        filename="v(windows)-" + selected_items[0] + ".csv",
+        content="time,intensity,window\n0.0,1.0,450-470\n0.0,1.0,480-500\n",
+        type="text/csv",
+        base64=False,
+    )
+    ds_mock.load_time_df.assert_not_called()
+    ds_mock.load_window_time_dfs.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value[0],
+        [(450.0, 470.0), (480.0, 500.0)],
+        True,
+        False,
+        None,
+        "double",
+    )
+
+
+def test_update_graph_with_irf(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.components.tabs.v_figure_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    v_figure_tab.update_graph(
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        fitting=True,
+        irf_item="scatter.img",
+    )
+    ds_mock.get_item_filepath.assert_called_once_with(
+        "scatter.img", ds_mock.validate_upload_dir.return_value
+    )
+    ds_mock.load_time_dfs.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value,
+        tuple(wavelength_range),
+        True,
+        irf_filepath=ds_mock.get_item_filepath.return_value,
+        model="double",
+        warm_start=True,
+    )
+
+
+@pytest.mark.parametrize("irf_item", ["", None])
+def test_get_irf_filepath_without_irf(irf_item: str | None, upload_dir: str) -> None:
+    assert v_figure_tab.get_irf_filepath(irf_item, upload_dir) is None
+
+
+@pytest.mark.parametrize("item_names", [None, [], ["a.img", "b.img"]])
+def test_update_irf_options(item_names: list[str] | None) -> None:
+    assert v_figure_tab.update_irf_options(item_names) == [
+        dict(label="None", value="")
+    ] + [dict(label=name, value=name) for name in item_names or []]
+
+
+@pytest.mark.parametrize("model", ["single", "stretched"])
+def test_update_graph_with_model(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    model: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.components.tabs.v_figure_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    v_figure_tab.update_graph(
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        fitting=True,
+        model=model,
+    )
+    ds_mock.load_time_dfs.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value,
+        tuple(wavelength_range),
+        True,
+        irf_filepath=None,
+        model=model,
+        warm_start=True,
+    )
+
+
+def test_fit_model_select_options() -> None:
+    assert [option["value"] for option in v_figure_tab.fit_model_select.options] == (
+        list(models.MODELS)
+    )
+
+
+@pytest.mark.parametrize("callback", ["update_graph", "update_table"])
+def test_update_when_superseded(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    callback: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    ds_mock.load_time_dfs.side_effect = cancellation.Cancelled
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        getattr(v_figure_tab, callback)(
+            selected_items,
+            upload_dir,
+            wavelength_range,
+            fitting=True,
+        )
+
+
+@pytest.mark.parametrize("wavelength_windows", [None, "450-470, 480-500"])
+def test_update_graph_with_confidence_interval(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    wavelength_windows: str | None,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    process_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    v_figure_tab.update_graph(
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        fitting=True,
+        wavelength_windows=wavelength_windows,
+        confidence_interval=True,
+    )
+    ds_mock.load_multi_fit_intervals.assert_called_once_with(
+        ds_mock.get_existing_item_filepaths.return_value,
+        v_figure_tab.parse_wavelength_windows(wavelength_windows)
+        or [(float(wavelength_range[0]), float(wavelength_range[1]))],
+        "double",
+        None,
+    )
+    process_mock.add_fitting_curve.assert_called_once_with(
+        process_mock.create_figure.return_value,
+        mocker.ANY,
+        ds_mock.load_multi_fit_intervals.return_value,
+        x_range=None,
+    )
+
+
+def test_update_graph_without_fitting_skips_confidence_interval(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.components.tabs.v_figure_tab.process")
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    v_figure_tab.update_graph(
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        fitting=False,
+        confidence_interval=True,
+    )
+    ds_mock.load_multi_fit_intervals.assert_not_called()
+
+
+def test_update_table_with_confidence_interval(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    ds_mock.load_time_dfs.return_value = [
+        pd.DataFrame(dict(time=[0.0], intensity=[1.0]))
+    ]
+    ds_mock.load_multi_fit_intervals.return_value = [dict(tau1=(0.5, 0.7))]
+    assert v_figure_tab.update_table(
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        fitting=True,
+        confidence_interval=True,
+    )["records"] == [dict(time=0.0, intensity=1.0, tau1_low=0.5, tau1_high=0.7)]
+
+
+def test_update_in_hidden_tab(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dash.ctx", triggered_id=v_figure_tab.wavelength_slider.id)
+    ds_mock = mocker.patch("dawa_trpl.components.tabs.v_figure_tab.ds")
+    fig = v_figure_tab.update_graph(
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        fitting=True,
+        active_tab="h-figure",
+    )
+    assert fig == go.Figure()
+    table = v_figure_tab.update_table(
+        selected_items,
+        upload_dir,
+        wavelength_range,
+        fitting=True,
+        active_tab="h-figure",
+    )
+    assert table is None
+    ds_mock.load_time_dfs.assert_not_called()
+
+
+def test_update_when_tab_is_left(
+    selected_items: list[str],
+    upload_dir: str,
+    wavelength_range: list[int],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dash.ctx", triggered_id="figure-tabs")
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        v_figure_tab.update_graph(
+            selected_items,
+            upload_dir,
+            wavelength_range,
+            fitting=True,
+            active_tab="h-figure",
+        )
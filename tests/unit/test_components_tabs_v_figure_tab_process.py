@@ -1,10 +1,14 @@
 import pathlib
+import typing as t
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import pytest
+import pytest_mock
 
 from dawa_trpl import data_system as ds
+from dawa_trpl import models
 from dawa_trpl.components.tabs.v_figure_tab import process
 from tests import IMGDIR
 
@@ -27,3 +31,117 @@ def test_create_figure(dfs: list[pd.DataFrame], log_y: bool) -> None:
 def test_add_fitting_curve(dfs: list[pd.DataFrame]) -> None:
     fig = process.add_fitting_curve(go.Figure(), dfs)
     assert isinstance(fig, go.Figure)
+
+
+def test_get_name() -> None:
+    df = pd.DataFrame()
+    df.attrs["filename"] = "item.img"
+    assert process.get_name(df) == "item.img"
+    df.attrs["window"] = (450.0, 470.5)
+    assert process.get_name(df) == "item.img (450-470.5 nm)"
+
+
+def test_create_figure_with_windows() -> None:
+    filepath = next(IMGDIR.glob("*.img")).as_posix()
+    dfs = ds.load_window_time_dfs(filepath, [(450, 470), (480, 500)], fitting=True)
+    fig = process.add_fitting_curve(process.create_figure(dfs, True), dfs)
+    assert [trace.name for trace in fig.data[:2]] == [
+        process.get_name(df) for df in dfs
+    ]
+    assert len(fig.data) == 4
+
+
+def test_create_figure_sets_trace_scales() -> None:
+    filepath = next(IMGDIR.glob("*.img")).as_posix()
+    dfs = ds.load_window_time_dfs(filepath, [(450, 470), (480, 500)], fitting=True)
+    fig = process.add_fitting_curve(process.create_figure(dfs), dfs)
+    scales = [df["intensity"].max() for df in dfs]
+    assert [trace.meta for trace in fig.data] == [
+        *(dict(scale=scale) for scale in scales),
+        *(dict(scale=scale, fit=True) for scale in scales),
+    ]
+
+
+def test_get_fit_label_of_double_exponential() -> None:
+    fit = dict(model="double", a=70, tau1=0.5, b=30, tau2=4.0)
+    assert process.get_fit_label(fit) == (
+        "Double Exponential Approximation a : b = 70:30, τ₁ = 0.5 ns, τ₂ = 4 ns"
+    )
+    assert process.get_fit_label(dict(fit, irf="irf.img")).startswith("IRF-Convolved ")
+
+
+@pytest.mark.parametrize(
+    "fit, expected",
+    [
+        (
+            dict(model="single", params=np.array([1.0, 2.0])),
+            "Single Exponential Approximation a = 1, τ = 2 ns",
+        ),
+        (
+            dict(model="stretched", params=np.array([1.0, 2.0, 0.6])),
+            "Stretched Exponential Approximation a = 1, τ = 2 ns, β = 0.6",
+        ),
+        (
+            dict(model="triple", params=np.array([0.5, 0.3, 0.3, 2.0, 0.2, 8.0])),
+            "Triple Exponential Approximation a₁ = 50, τ₁ = 0.3 ns, "
+            "a₂ = 30, τ₂ = 2 ns, a₃ = 20, τ₃ = 8 ns",
+        ),
+    ],
+)
+def test_get_fit_label(fit: dict[str, t.Any], expected: str) -> None:
+    fit.update(models.MODELS[fit["model"]].summarize(fit["params"]))
+    assert process.get_fit_label(fit) == expected
+
+
+def test_get_fit_label_with_intervals() -> None:
+    fit = dict(model="double", a=70, tau1=0.5, b=30, tau2=4.0)
+    intervals = dict(a=(65.0, 75.0), tau1=(0.45, 0.55), b=(25.0, 35.0), tau2=(3.8, 4.2))
+    assert process.get_fit_label(fit, intervals).endswith(
+        " (95% CI: τ₁ 0.45–0.55 ns, τ₂ 3.8–4.2 ns)"
+    )
+
+
+def test_add_fitting_curve_with_intervals() -> None:
+    fitted = [
+        ds.load_time_df(filepath.as_posix(), fitting=True)
+        for filepath in IMGDIR.glob("*.img")
+    ]
+    intervals = [dict(tau1=(0.1, 0.2), tau2=(1.0, 2.0)) for _ in fitted]
+    fig = process.add_fitting_curve(go.Figure(), fitted, intervals)
+    for trace in fig.data:
+        assert trace.name.endswith("(95% CI: τ₁ 0.1–0.2 ns, τ₂ 1–2 ns)")
+
+
+def _create_decay(filename: str) -> pd.DataFrame:
+    time = np.linspace(0, 100, 10001)
+    df = pd.DataFrame(
+        dict(
+            time=time,
+            intensity=np.exp(-time / 10),
+            fit=np.where(time >= 5, np.exp(-time / 10), np.nan),
+        )
+    )
+    df.attrs["filename"] = filename
+    df.attrs["fit"] = dict(model="double", a=100, tau1=10.0, b=0, tau2=10.0)
+    return df
+
+
+def test_create_figure_downsamples_traces(mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("dawa_trpl.config.DOWNSAMPLE_POINTS", 100)
+    dfs = [_create_decay("a.img"), _create_decay("b.img")]
+    fig = process.add_fitting_curve(
+        process.create_figure(dfs, x_range=(2.0, 50.0)), dfs, x_range=(2.0, 50.0)
+    )
+    assert [trace.type for trace in fig.data] == ["scatter"] * 4
+    for trace in fig.data:
+        assert len(trace.x) <= 102
+        assert max(trace.x) > 50
+        assert trace.meta["scale"] == 1.0
+    assert [min(trace.x) for trace in fig.data] == [1.99, 1.99, 5.0, 5.0]
+    assert fig.layout.xaxis.range == (2.0, 50.0)
+
+
+def test_create_figure_of_many_traces_uses_webgl() -> None:
+    dfs = [_create_decay(f"{i}.img") for i in range(10)]
+    fig = process.add_fitting_curve(process.create_figure(dfs), dfs)
+    assert all(trace.type == "scattergl" for trace in fig.data)
@@ -2,10 +2,13 @@ import base64
 import filecmp
 import os
 import pathlib
+import shutil
 
 import dash
 import pytest
 
+from dawa_trpl import catalog
+from dawa_trpl import data_system as ds
 from dawa_trpl.components import upload_bar
 from tests import IMGDIR, FixtureRequest
 
@@ -14,15 +17,38 @@ def test_update_upload_dir_when_upload_dir_already_exists(
     dirname: str, upload_basedir: str
 ) -> None:
     upload_dir = os.path.join(upload_basedir, dirname)
+    os.mkdir(upload_dir)
     with pytest.raises(dash.exceptions.PreventUpdate):
         upload_bar.update_upload_dir(upload_dir)
 
 
+def test_update_upload_dir_when_upload_dir_is_removed(
+    dirname: str, upload_basedir: str
+) -> None:
+    removed = os.path.join(upload_basedir, dirname)
+    upload_dir = upload_bar.update_upload_dir(removed)
+    assert upload_dir != removed
+    assert os.path.isdir(upload_dir)
+
+
+def test_update_upload_dir_when_upload_dir_is_of_another_basedir(
+    tmp_path: pathlib.Path, upload_basedir: str
+) -> None:
+    # A directory of the base directory before a restart
+    stale = tmp_path / "stale" / "session"
+    stale.mkdir(parents=True)
+    upload_dir = upload_bar.update_upload_dir(str(stale))
+    assert upload_dir != str(stale)
+    assert upload_dir.startswith(upload_basedir)
+
+
 @pytest.mark.parametrize("upload_dir", ["", None])
 def test_update_upload_dir_when_upload_dir_does_not_exist_yet(
     upload_dir: str, upload_basedir: str
 ) -> None:
-    assert upload_bar.update_upload_dir(upload_dir).startswith(upload_basedir)
+    upload_dir = upload_bar.update_upload_dir(upload_dir)
+    assert upload_dir.startswith(upload_basedir)
+    assert os.path.exists(os.path.join(upload_dir, catalog.CATALOG_FILENAME))
 
 
 @pytest.fixture()
@@ -64,11 +90,49 @@ def test_on_upload_files_when_files_are_uploaded(
     upload_dir: str,
 ) -> None:
     assert len(filenames) == len(contents)
-    assert upload_bar.on_upload_files(contents, filenames, upload_dir) == filenames
+    assert upload_bar.on_upload_files(contents, filenames, upload_dir) == (
+        filenames,
+        [],
+        False,
+    )
     for datapath in datapaths:
         uploaded_path = os.path.join(upload_dir, os.path.basename(datapath))
         assert os.path.exists(uploaded_path)
         assert filecmp.cmp(uploaded_path, datapath)
+    assert sorted(ds.get_item_names(upload_dir)) == sorted(filenames)
+
+
+def test_on_upload_files_when_upload_dir_is_removed(
+    contents: list[str], filenames: list[str], upload_dir: str
+) -> None:
+    shutil.rmtree(upload_dir)
+    saved, _, _ = upload_bar.on_upload_files(contents, filenames, upload_dir)
+    assert saved == filenames
+    assert sorted(ds.get_item_names(upload_dir)) == sorted(filenames)
+
+
+def test_on_upload_files_with_corrupt_files(
+    datapaths: list[str],
+    contents: list[str],
+    filenames: list[str],
+    upload_dir: str,
+) -> None:
+    corrupt = "application/octet-stream," + base64.urlsafe_b64encode(b"IM").decode()
+    saved, failures, is_open = upload_bar.on_upload_files(
+        [corrupt, *contents, contents[0]],
+        ["corrupt.img", *filenames, "../escaped.img"],
+        upload_dir,
+    )
+    assert saved == filenames
+    assert [failure.children.split(":")[0] for failure in failures] == [
+        "corrupt.img",
+        "../escaped.img",
+    ]
+    assert is_open
+    assert sorted(os.listdir(upload_dir)) == sorted(
+        [catalog.CATALOG_FILENAME, *filenames]
+    )
+    assert sorted(ds.get_item_names(upload_dir)) == sorted(filenames)
 
 
 def test_on_upload_files_when_contents_is_None(upload_dir: str) -> None:
@@ -93,13 +157,29 @@ def dropdown_options(request: FixtureRequest[str], upload_dir: str) -> list[str]
             (upload_dirpath / "uploaded_file.img").touch()
         case "include_dir":
             (upload_dirpath / "subdir").mkdir()
-    return [path.name for path in upload_dirpath.iterdir() if path.is_file()]
+    return [
+        path.name
+        for path in upload_dirpath.iterdir()
+        if path.is_file() and not path.name.startswith(".")
+    ]
 
 
 def test_update_dropdown_options(dropdown_options: list[str], upload_dir: str) -> None:
     assert upload_bar.update_dropdown_options(None, upload_dir) == dropdown_options
 
 
+def test_update_dropdown_options_when_unchanged(
+    dropdown_options: list[str], upload_dir: str
+) -> None:
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        upload_bar.update_dropdown_options(None, upload_dir, 1, dropdown_options)
+
+
+def test_update_dropdown_options_without_upload_dir() -> None:
+    with pytest.raises(dash.exceptions.PreventUpdate):
+        upload_bar.update_dropdown_options(None, None, 1)
+
+
 @pytest.mark.parametrize(
     "filenames", [["filename"], [], None], ids=["has_value", "empty", "none"]
 )
@@ -0,0 +1,45 @@
+import os
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+
+def import_config(**environ: str) -> subprocess.CompletedProcess[str]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path), **environ)
+    return subprocess.run(
+        [sys.executable, "-c", "import dawa_trpl.config"],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+@pytest.mark.parametrize("precision", ["float32", "float64"])
+def test_precision(precision: str) -> None:
+    assert import_config(DAWA_TRPL_PRECISION=precision).returncode == 0
+
+
+@pytest.mark.parametrize("precision", ["float16", "double", ""])
+def test_invalid_precision(precision: str) -> None:
+    result = import_config(DAWA_TRPL_PRECISION=precision)
+    assert result.returncode != 0
+    assert "DAWA_TRPL_PRECISION" in result.stderr
+
+
+def test_upload_basedir(tmp_path: pathlib.Path) -> None:
+    # A stable directory, which importing the package does not create
+    code = "from dawa_trpl import config; print(config.UPLOAD_BASEDIR)"
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in ("XDG_DATA_HOME", "DAWA_TRPL_UPLOAD_BASEDIR")
+    }
+    env.update(HOME=str(tmp_path), PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    expected = tmp_path / ".local" / "share" / "dawa_trpl" / "uploads"
+    assert result.stdout.strip() == str(expected)
+    assert not (tmp_path / ".local").exists()
@@ -1,11 +1,14 @@
 import os
 import pathlib
+import shutil
 
+import numpy as np
 import pandas as pd
 import pytest
 import pytest_mock
-from tlab_analysis import trpl
+from tlab_analysis import trpl, utils
 
+from dawa_trpl import cancellation, fitting, img_header, models, pyramid, store
 from dawa_trpl import data_system as ds
 from tests import IMGDIR, FixtureRequest
 
@@ -17,6 +20,47 @@ def test_validate_upload_dir_with_valid_upload_dir(
     assert ds.validate_upload_dir(upload_dir) == upload_dir
 
 
+def test_ensure_upload_dir(dirname: str, upload_basedir: str) -> None:
+    upload_dir = os.path.join(upload_basedir, dirname)
+    assert ds.ensure_upload_dir(upload_dir) == upload_dir
+    assert os.path.isdir(upload_dir)
+    assert ds.get_item_names(upload_dir) == []
+    assert ds.ensure_upload_dir(upload_dir) == upload_dir
+
+
+def test_ensure_upload_dir_when_upload_dir_is_not_under_upload_basedir(
+    tmpdir: str,
+) -> None:
+    with pytest.raises(ValueError):
+        ds.ensure_upload_dir(os.path.join(tmpdir, "upload_dir"))
+    assert not os.path.exists(os.path.join(tmpdir, "upload_dir"))
+
+
+@pytest.mark.parametrize("name", ["", "..", "../other", "dirname/.."])
+def test_validate_upload_dir_when_upload_dir_escapes_upload_basedir(
+    name: str, upload_basedir: str
+) -> None:
+    with pytest.raises(ValueError):
+        ds.validate_upload_dir(os.path.join(upload_basedir, name))
+
+
+def test_validate_upload_dir_when_upload_dir_shares_prefix_of_upload_basedir(
+    upload_basedir: str,
+) -> None:
+    with pytest.raises(ValueError):
+        ds.validate_upload_dir(upload_basedir + "-other")
+
+
+def test_create_upload_dir_creates_upload_basedir(
+    tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    upload_basedir = tmp_path / "dawa_trpl" / "uploads"
+    mocker.patch("dawa_trpl.config.UPLOAD_BASEDIR", new=str(upload_basedir))
+    upload_dir = ds.create_upload_dir()
+    assert os.path.dirname(upload_dir) == str(upload_basedir)
+    assert ds.validate_upload_dir(upload_dir) == upload_dir
+
+
 def test_validate_upload_dir_when_upload_dir_is_None() -> None:
     with pytest.raises(ValueError):
         ds.validate_upload_dir(None)
@@ -78,20 +122,275 @@ def test_existing_item_filepaths(
     assert ds.get_existing_item_filepaths(item_names, upload_dir) == [exist_path]
 
 
+def test_get_item_names(upload_dir: str) -> None:
+    pathlib.Path(upload_dir, "item.img").touch()
+    assert ds.get_item_names(upload_dir) == ["item.img"]
+
+
+def test_get_item_names_with_watch_dir(
+    upload_dir: str, tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    watch_dir = tmp_path / "watch"
+    watch_dir.mkdir()
+    (watch_dir / "watched.img").touch()
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new=str(watch_dir))
+    pathlib.Path(upload_dir, "item.img").touch()
+    assert ds.get_item_names(upload_dir) == ["item.img", "watch/watched.img"]
+    assert ds.get_item_filepath("watch/watched.img", upload_dir) == str(
+        watch_dir / "watched.img"
+    )
+
+
+def test_get_item_filepath_when_watch_dir_is_disabled(
+    upload_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new="")
+    assert ds.get_item_filepath("watch/item.img", upload_dir) is None
+
+
+def test_register_items(upload_dir: str) -> None:
+    assert ds.get_item_names(upload_dir) == []
+    pathlib.Path(upload_dir, "item.img").touch()
+    assert ds.get_item_filepath("item.img", upload_dir) is None
+    ds.register_items(["item.img"], upload_dir)
+    assert ds.get_item_filepath("item.img", upload_dir) == os.path.join(
+        upload_dir, "item.img"
+    )
+
+
+def test_get_wavelength_range(upload_dir: str) -> None:
+    filepaths = list(IMGDIR.glob("*.img"))
+    for filepath in filepaths:
+        shutil.copy(filepath, upload_dir)
+    wavelengths = [trpl.read_file(filepath).wavelength for filepath in filepaths]
+    assert ds.get_wavelength_range(
+        [filepath.name for filepath in filepaths] + ["unexist.img"], upload_dir
+    ) == (
+        min(wavelength.min() for wavelength in wavelengths),
+        max(wavelength.max() for wavelength in wavelengths),
+    )
+
+
+def test_get_wavelength_range_when_no_range_is_known(upload_dir: str) -> None:
+    pathlib.Path(upload_dir, "broken.img").write_bytes(b"broken")
+    assert ds.get_wavelength_range(["broken.img", "unexist.img"], upload_dir) is None
+
+
+def test_get_time_range(upload_dir: str) -> None:
+    filepaths = list(IMGDIR.glob("*.img"))
+    for filepath in filepaths:
+        shutil.copy(filepath, upload_dir)
+    times = [trpl.read_file(filepath).time for filepath in filepaths]
+    assert ds.get_time_range(
+        [filepath.name for filepath in filepaths] + ["unexist.img"], upload_dir
+    ) == (
+        min(time.min() for time in times),
+        max(time.max() for time in times),
+    )
+
+
+def test_get_time_range_when_no_range_is_known(upload_dir: str) -> None:
+    pathlib.Path(upload_dir, "broken.img").write_bytes(b"broken")
+    assert ds.get_time_range(["broken.img", "unexist.img"], upload_dir) is None
+
+
+def test_get_existing_item_filepaths_marks_accessed(
+    upload_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mark_accessed_mock = mocker.patch("dawa_trpl.data_system.mark_accessed")
+    exist_path = os.path.join(upload_dir, "exist.img")
+    pathlib.Path(exist_path).touch()
+    ds.get_existing_item_filepaths(["exist.img", "unexist.img"], upload_dir)
+    mark_accessed_mock.assert_called_once_with(upload_dir, [exist_path])
+
+
+def test_mark_accessed(upload_dir: str) -> None:
+    filepath = os.path.join(upload_dir, "item.img")
+    pathlib.Path(filepath).touch()
+    os.utime(upload_dir, (0, 0))
+    os.utime(filepath, (0, 0))
+    ds.mark_accessed(upload_dir, [filepath, os.path.join(upload_dir, "unexist.img")])
+    assert os.stat(upload_dir).st_mtime > 0
+    assert os.stat(filepath).st_atime > 0
+    assert os.stat(filepath).st_mtime == 0
+
+
+def test_mark_accessed_keeps_mtime_ns(upload_dir: str) -> None:
+    # Not representable by a float of seconds
+    mtime_ns = 1760890000123456789
+    filepath = os.path.join(upload_dir, "item.img")
+    pathlib.Path(filepath).touch()
+    os.utime(filepath, ns=(0, mtime_ns))
+    ds.mark_accessed(upload_dir, [filepath])
+    assert os.stat(filepath).st_atime_ns > 0
+    assert os.stat(filepath).st_mtime_ns == mtime_ns
+
+
+def test_mark_accessed_skips_watched_files(
+    upload_dir: str, tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new=str(tmp_path))
+    filepath = tmp_path / "item.img"
+    filepath.touch()
+    os.utime(filepath, ns=(0, 0))
+    ds.mark_accessed(upload_dir, [str(filepath)])
+    assert os.stat(filepath).st_atime_ns == 0
+
+
+def test_invalidate_filepaths(mocker: pytest_mock.MockerFixture) -> None:
+    funcs = [
+        "load_image",
+        "load_time_prefix_sums",
+        "_load_wavelength_df",
+        "_load_time_df",
+        "_load_window_time_dfs",
+        "load_irf",
+        "load_peaks_df",
+        "load_summary_df",
+        "load_lifetime_map_df",
+        "load_global_analysis",
+        "load_fit_intervals",
+        "load_pyramid",
+    ]
+    mocks = [mocker.patch(f"dawa_trpl.data_system.{func}") for func in funcs]
+    ds.invalidate_filepaths([])
+    for mock in mocks:
+        mock.cache_clear.assert_not_called()
+    ds.invalidate_filepaths(["item.img"])
+    for mock in mocks:
+        mock.cache_clear.assert_not_called()
+        mock.cache_discard.assert_called_once_with({"item.img"})
+
+
+def test_invalidate_filepaths_keeps_other_files(
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds.load_irf.cache_clear()
+    load_streak_image_mock = mocker.patch("dawa_trpl.data_system.load_streak_image")
+    load_streak_image_mock.return_value = (
+        np.arange(4.0),
+        np.arange(2.0),
+        np.ones((4, 2)),
+    )
+    mocker.patch("dawa_trpl.fitting.IRFConvolution.from_irf")
+    ds.load_irf("irf.img", "a.img")
+    ds.load_irf("irf.img", "b.img")
+    ds.load_irf("other.img", "b.img")
+    mocker.patch.dict(
+        "dawa_trpl.data_system._warm_starts",
+        {
+            ("a.img", "double", None): dict(),
+            ("b.img", "double", "irf.img"): dict(),
+            ("b.img", "double", "other.img"): dict(),
+        },
+        clear=True,
+    )
+    ds.invalidate_filepaths(["a.img", "irf.img"])
+    assert ds.load_irf.cache_info().currsize == 1
+    ds.load_irf("other.img", "b.img")
+    assert ds.load_irf.cache_info().hits == 1
+    assert list(ds._warm_starts) == [("b.img", "double", "other.img")]
+
+
 @pytest.fixture(params=[path.name for path in IMGDIR.glob("*.img")])
 def filepath(request: FixtureRequest[str]) -> str:
     return os.path.join(IMGDIR, request.param)
 
 
+def test_save_item(filepath: str, upload_dir: str) -> None:
+    content = pathlib.Path(filepath).read_bytes()
+    saved = ds.save_item("item.img", content, upload_dir)
+    assert saved == os.path.join(upload_dir, "item.img")
+    assert pathlib.Path(saved).read_bytes() == content
+    assert os.listdir(upload_dir) == ["item.img"]
+
+
+@pytest.mark.parametrize("exists", [True, False])
+def test_save_item_invalidates_replaced_item(
+    exists: bool, upload_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.data_system.validate_item")
+    invalidate_filepaths_mock = mocker.patch(
+        "dawa_trpl.data_system.invalidate_filepaths"
+    )
+    if exists:
+        pathlib.Path(upload_dir, "item.img").touch()
+    saved = ds.save_item("item.img", b"item", upload_dir)
+    if exists:
+        invalidate_filepaths_mock.assert_called_once_with([saved])
+    else:
+        invalidate_filepaths_mock.assert_not_called()
+
+
+@pytest.mark.parametrize("content", [b"", b"IM", b"not a streak image"])
+def test_save_item_with_corrupt_content(content: bytes, upload_dir: str) -> None:
+    with pytest.raises(ValueError):
+        ds.save_item("item.img", content, upload_dir)
+    # Neither the item nor its temporary file is left
+    assert os.listdir(upload_dir) == []
+
+
+@pytest.mark.parametrize("item_name", ["../item.img", "dir/item.img", ".item.img"])
+def test_save_item_with_invalid_name(item_name: str, upload_dir: str) -> None:
+    with pytest.raises(ValueError):
+        ds.save_item(item_name, b"", upload_dir)
+    assert os.listdir(upload_dir) == []
+
+
 def test_load_trpl_data(filepath: str) -> None:
     assert ds.load_trpl_data(filepath) == trpl.read_file(filepath)
 
 
+def test_load_image(filepath: str, mocker: pytest_mock.MockerFixture) -> None:
+    load_trpl_data_spy = mocker.spy(ds, "load_trpl_data")
+    data = trpl.read_file(filepath)
+    img = ds.load_image(filepath)
+    np.testing.assert_array_equal(img.time, data.time.unique())
+    np.testing.assert_array_equal(img.wavelength, data.wavelength.unique())
+    np.testing.assert_array_equal(img.intensity, data.to_streak_image())
+    # Counts of the detector are kept in its own type
+    assert img.intensity.dtype == np.uint16
+    assert img.metadata == img_header.read_header(filepath).metadata
+    assert ds.load_image(filepath) is img
+    load_trpl_data_spy.assert_not_called()
+
+
+def test_load_image_without_calibration_tables(
+    tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    filepath = str(tmp_path / "item.img")
+    mocker.patch("dawa_trpl.img_header.read_header", side_effect=img_header.HeaderError)
+    data = pd.DataFrame(dict(time=[0.0, 0.0, 1.0, 1.0], wavelength=[400.0, 500.0] * 2))
+    trpl_data_mock = mocker.patch("dawa_trpl.data_system.load_trpl_data")
+    trpl_data_mock.return_value.time = data["time"]
+    trpl_data_mock.return_value.wavelength = data["wavelength"]
+    trpl_data_mock.return_value.to_streak_image.return_value = np.array(
+        [[1.0, 2.0], [3.0, 4.0]]
+    )
+    trpl_data_mock.return_value.metadata = ["Date: 2024"]
+    img = ds.load_image(filepath)
+    trpl_data_mock.assert_called_once_with(filepath)
+    np.testing.assert_array_equal(img.time, [0.0, 1.0])
+    np.testing.assert_array_equal(img.intensity, [[1, 2], [3, 4]])
+    assert img.metadata == ["Date: 2024"]
+
+
+def test_load_streak_image(filepath: str) -> None:
+    data = ds.load_trpl_data(filepath)
+    time, wavelength, image = ds.load_streak_image(filepath)
+    np.testing.assert_array_equal(time, data.time.unique())
+    np.testing.assert_array_equal(wavelength, data.wavelength.unique())
+    np.testing.assert_array_equal(image, data.to_streak_image())
+    assert image.shape == (len(time), len(wavelength))
+
+
 def test_load_wavelength_df(filepath: str) -> None:
     actual = ds.load_wavelength_df(filepath)
     expected = ds.load_trpl_data(filepath).aggregate_along_time()
     pd.testing.assert_series_equal(actual["wavelength"], expected["wavelength"])
-    pd.testing.assert_series_equal(actual["intensity"], expected["intensity"])
+    pd.testing.assert_series_equal(
+        actual["intensity"], expected["intensity"], check_dtype=False
+    )
     assert actual.attrs["filename"] == os.path.basename(filepath)
 
 
@@ -103,6 +402,110 @@ def test_load_wavelength_df_with_normalize_intensity(
     assert bool(wdf["intensity"].max() == 1.0) is normalize_intensity
 
 
+def test_load_wavelength_df_caches_raw_df_only(filepath: str) -> None:
+    ds._load_wavelength_df.cache_clear()
+    normalized = ds.load_wavelength_df(filepath, normalize_intensity=True)
+    raw = ds.load_wavelength_df(filepath)
+    assert ds._load_wavelength_df.cache_info().currsize == 1
+    assert raw["intensity"].max() > 1.0
+    pd.testing.assert_series_equal(
+        normalized["intensity"], raw["intensity"] / raw["intensity"].max()
+    )
+    assert normalized.attrs["filename"] == raw.attrs["filename"]
+
+
+def test_load_wavelength_df_reuses_stored_df(
+    filepath: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds._load_wavelength_df.cache_clear()
+    expected = ds.load_wavelength_df(filepath)
+    ds._load_wavelength_df.cache_clear()
+    load_image_mock = mocker.patch("dawa_trpl.data_system.load_image")
+    actual = ds.load_wavelength_df(filepath)
+    load_image_mock.assert_not_called()
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_load_wavelength_df_without_store(
+    filepath: str, store_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.config.STORE_DIR", new="")
+    ds._load_wavelength_df.cache_clear()
+    ds.load_wavelength_df(filepath)
+    assert os.listdir(store_dir) == []
+
+
+@pytest.mark.parametrize("precision", ["float32", "float64"])
+def test_to_precision(precision: str, mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("dawa_trpl.config.PRECISION", new=precision)
+    df = pd.DataFrame(
+        dict(
+            time=np.array([0.0, 1.0], dtype=np.float32),
+            intensity=[1.0, 2.0],
+            count=[1, 2],
+        )
+    )
+    df.attrs["filename"] = "a.img"
+    actual = ds.to_precision(df)
+    # Floats are narrowed only
+    assert actual["time"].dtype == np.float32
+    assert actual["intensity"].dtype == precision
+    assert actual["count"].dtype == np.int64
+    assert actual.attrs == df.attrs
+    np.testing.assert_array_equal(actual["intensity"], df["intensity"])
+
+
+def test_load_wavelength_df_with_float32_precision(
+    filepath: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds._load_wavelength_df.cache_clear()
+    expected = ds.load_wavelength_df(filepath)
+    mocker.patch("dawa_trpl.config.PRECISION", new="float32")
+    ds._load_wavelength_df.cache_clear()
+    actual = ds.load_wavelength_df(filepath, normalize_intensity=True)
+    ds._load_wavelength_df.cache_clear()
+    assert (actual.dtypes == np.float32).all()
+    np.testing.assert_allclose(actual, ds.normalize(expected, ["intensity"]), rtol=1e-6)
+    gated = ds.load_wavelength_df(filepath, time_range=(0.0, 2.0))
+    ds._load_wavelength_df.cache_clear()
+    assert (gated.dtypes == np.float32).all()
+
+
+def test_load_time_prefix_sums(filepath: str) -> None:
+    time, wavelength, image = ds.load_streak_image(filepath)
+    actual_time, actual_wavelength, prefix_sums = ds.load_time_prefix_sums(filepath)
+    np.testing.assert_array_equal(actual_time, time)
+    np.testing.assert_array_equal(actual_wavelength, wavelength)
+    assert prefix_sums.shape == (len(time) + 1, len(wavelength))
+    np.testing.assert_array_equal(prefix_sums[0], 0)
+    np.testing.assert_allclose(prefix_sums[-1], image.sum(axis=0))
+
+
+@pytest.mark.parametrize("time_range", [(0.0, 2.0), (1.5, 4.0), (3.0, 3.0)])
+def test_load_wavelength_df_with_time_range(
+    filepath: str, time_range: tuple[float, float]
+) -> None:
+    time, wavelength, image = ds.load_streak_image(filepath)
+    actual = ds.load_wavelength_df(filepath, time_range=time_range)
+    gate = (time_range[0] <= time) & (time <= time_range[1])
+    np.testing.assert_array_equal(actual["wavelength"], wavelength)
+    np.testing.assert_allclose(actual["intensity"], image[gate].sum(axis=0))
+    assert actual.attrs["time_range"] == time_range
+    assert actual.attrs["filename"] == os.path.basename(filepath)
+
+
+def test_load_wavelength_df_with_whole_time_range(filepath: str) -> None:
+    time, _, _ = ds.load_streak_image(filepath)
+    actual = ds.load_wavelength_df(filepath, time_range=(time[0], time[-1]))
+    expected = ds.load_wavelength_df(filepath)
+    np.testing.assert_allclose(actual["intensity"], expected["intensity"])
+
+
+def test_load_wavelength_df_with_empty_time_range(filepath: str) -> None:
+    actual = ds.load_wavelength_df(filepath, time_range=(5.0, 4.0))
+    assert (actual["intensity"] == 0).all()
+
+
 @pytest.fixture(params=["single_filepath", "multiple_filepaths"])
 def filepaths(request: FixtureRequest[str]) -> list[str]:
     filepaths = [str(path) for path in IMGDIR.glob("*.img")]
@@ -128,7 +531,9 @@ def test_load_wavelength_dfs(
     for call, filepath in zip(
         load_wavelength_df_mock.call_args_list, filepaths, strict=True
     ):
-        assert call == mocker.call(filepath, normalize_intensity=normalize_intensity)
+        assert call == mocker.call(
+            filepath, normalize_intensity=normalize_intensity, time_range=None
+        )
 
 
 @pytest.mark.parametrize("wavelength_range", [(440, 470), (460, 500)])
@@ -139,7 +544,9 @@ def test_load_time_df(
     actual = ds.load_time_df(filepath, wavelength_range)
     expected = ds.load_trpl_data(filepath).aggregate_along_wavelength(wavelength_range)
     pd.testing.assert_series_equal(actual["time"], expected["time"])
-    pd.testing.assert_series_equal(actual["intensity"], expected["intensity"])
+    pd.testing.assert_series_equal(
+        actual["intensity"], expected["intensity"], check_dtype=False
+    )
     assert actual.attrs["filename"] == os.path.basename(filepath)
     # TODO: Assert wr.df["fit"] is filled with nan
 
@@ -159,6 +566,7 @@ def test_load_time_df_with_fitting(
     assert bool(tdf.attrs.get("fit") is not None) is fitting
     if fitting:
         assert set(tdf.attrs["fit"].keys()) == {
+            "model",
             "a",
             "tau1",
             "b",
@@ -169,6 +577,190 @@ def test_load_time_df_with_fitting(
     # TODO: Assert wr.df["fit"] is valid
 
 
+def test_load_time_df_with_float32_precision(
+    filepath: str,
+    wavelength_range: tuple[float, float],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.config.STORE_DIR", new="")
+    ds._load_time_df.cache_clear()
+    expected = ds.load_time_df(filepath, wavelength_range, fitting=True)
+    mocker.patch("dawa_trpl.config.PRECISION", new="float32")
+    ds._load_time_df.cache_clear()
+    actual = ds.load_time_df(filepath, wavelength_range, fitting=True)
+    ds._load_time_df.cache_clear()
+    assert (actual.dtypes == np.float32).all()
+    # The fitter still runs in float64, so only the rounding of the curve differs
+    np.testing.assert_allclose(
+        actual.attrs["fit"]["params"], expected.attrs["fit"]["params"], rtol=1e-6
+    )
+    assert actual.attrs["fit"]["tau1"] == pytest.approx(expected.attrs["fit"]["tau1"])
+    assert actual.attrs["fit"]["tau2"] == pytest.approx(expected.attrs["fit"]["tau2"])
+    np.testing.assert_allclose(
+        actual["fit"], expected["fit"], rtol=1e-6, atol=1e-6 * expected["fit"].max()
+    )
+
+
+def test_load_time_df_reuses_stored_df(
+    filepath: str,
+    wavelength_range: tuple[float, float],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds._load_time_df.cache_clear()
+    expected = ds.load_time_df(filepath, wavelength_range, fitting=True)
+    ds._load_time_df.cache_clear()
+    load_image_mock = mocker.patch("dawa_trpl.data_system.load_image")
+    actual = ds.load_time_df(filepath, wavelength_range, fitting=True)
+    load_image_mock.assert_not_called()
+    pd.testing.assert_frame_equal(actual, expected)
+    assert actual.attrs["fit"]["tau1"] == expected.attrs["fit"]["tau1"]
+    assert actual.attrs["fit"]["tau2"] == expected.attrs["fit"]["tau2"]
+
+
+@pytest.mark.parametrize("model", list(models.MODELS))
+def test_load_time_df_with_model(
+    filepath: str, wavelength_range: tuple[float, float], model: str
+) -> None:
+    tdf = ds.load_time_df(filepath, wavelength_range, fitting=True, model=model)
+    fit = tdf.attrs["fit"]
+    assert fit["model"] == model
+    assert fit["params"].shape == fit["cov"].shape[:1]
+    assert np.isfinite(fit["params"]).all()
+    assert tdf["fit"].notna().any()
+    # The fitted curve follows the decay within the fit range
+    fitted = tdf[tdf["fit"].notna()]
+    assert np.abs(fitted["fit"] - fitted["intensity"]).mean() < (
+        0.1 * tdf["intensity"].max()
+    )
+
+
+def test_load_time_df_stores_df_per_model(
+    filepath: str,
+    wavelength_range: tuple[float, float],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    ds._load_time_df.cache_clear()
+    expected = {
+        model: ds.load_time_df(filepath, wavelength_range, fitting=True, model=model)
+        for model in ("single", "double")
+    }
+    ds._load_time_df.cache_clear()
+    load_image_mock = mocker.patch("dawa_trpl.data_system.load_image")
+    for model, df in expected.items():
+        actual = ds.load_time_df(filepath, wavelength_range, fitting=True, model=model)
+        assert actual.attrs["fit"]["model"] == model
+        pd.testing.assert_frame_equal(actual, df)
+    load_image_mock.assert_not_called()
+
+
+def test_load_time_df_starts_from_nearest_fitted_range(
+    filepath: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds.invalidate_filepaths([filepath])
+    near = ds.load_time_df(filepath, (450, 500), fitting=True, warm_start=True)
+    ds.load_time_df(filepath, (400, 600), fitting=True, warm_start=True)
+    fit_batch_parallel_spy = mocker.spy(fitting, "fit_batch_parallel")
+    ds.load_time_df(filepath, (452, 500), fitting=True, warm_start=True)
+    p0 = fit_batch_parallel_spy.call_args.args[4]
+    np.testing.assert_array_equal(p0[0], near.attrs["fit"]["params"])
+
+
+def test_load_time_df_does_not_store_warm_started_fit(
+    filepath: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds.invalidate_filepaths([filepath])
+    ds.load_time_df(filepath, (450, 500), fitting=True)
+    put_df_spy = mocker.spy(store.Store, "put_df")
+    fit_batch_parallel_spy = mocker.spy(fitting, "fit_batch_parallel")
+    warm = ds.load_time_df(filepath, (452, 500), fitting=True, warm_start=True)
+    put_df_spy.assert_not_called()
+    # Fits which are stored start from the guess of the data
+    expected = ds.load_time_df(filepath, (452, 500), fitting=True)
+    put_df_spy.assert_called_once()
+    p0 = fit_batch_parallel_spy.call_args.args[4]
+    assert not np.array_equal(p0[0], warm.attrs["fit"]["params"])
+    ds.invalidate_filepaths([filepath])
+    pd.testing.assert_frame_equal(
+        ds.load_time_df(filepath, (452, 500), fitting=True), expected
+    )
+
+
+def test_invalidate_filepaths_drops_warm_starts(
+    filepath: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds.invalidate_filepaths([filepath])
+    fitted = ds.load_time_df(filepath, (450, 500), fitting=True, warm_start=True)
+    ds.invalidate_filepaths([filepath])
+    fit_batch_parallel_spy = mocker.spy(fitting, "fit_batch_parallel")
+    ds.load_time_df(filepath, (452, 500), fitting=True, warm_start=True)
+    p0 = fit_batch_parallel_spy.call_args.args[4]
+    assert not np.array_equal(p0[0], fitted.attrs["fit"]["params"])
+
+
+def test_load_time_df_when_superseded(filepath: str) -> None:
+    ds._load_time_df.cache_clear()
+    with cancellation.latest_only("key"):
+        # A newer request with the same key supersedes this one
+        with cancellation.latest_only("key"):
+            pass
+        with pytest.raises(cancellation.Cancelled):
+            ds.load_time_df(filepath, (450, 500), fitting=True)
+    assert ds._load_time_df.cache_info().currsize == 0
+
+
+def test_load_fit_intervals(filepath: str) -> None:
+    fit = ds.load_time_df(filepath, (450, 500), fitting=True).attrs["fit"]
+    intervals = ds.load_fit_intervals(filepath, (450, 500))
+    assert set(intervals) == {"a", "tau1", "b", "tau2"}
+    for name in ("tau1", "tau2"):
+        low, high = intervals[name]
+        assert low <= fit[name] <= high
+
+
+def test_load_fit_intervals_reuses_stored_samples(
+    filepath: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds.load_fit_intervals.cache_clear()
+    expected = ds.load_fit_intervals(filepath, (450, 500), "single")
+    ds.load_fit_intervals.cache_clear()
+    bootstrap_mock = mocker.patch("dawa_trpl.fitting.bootstrap")
+    assert ds.load_fit_intervals(filepath, (450, 500), "single") == expected
+    bootstrap_mock.assert_not_called()
+
+
+def test_load_fit_intervals_with_resamples(
+    filepath: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.config.BOOTSTRAP_RESAMPLES", new=10)
+    bootstrap_spy = mocker.spy(fitting, "bootstrap")
+    ds.load_fit_intervals.cache_clear()
+    ds.load_fit_intervals(filepath, (450, 500))
+    assert bootstrap_spy.call_args.args[6] == 10
+
+
+def test_load_multi_fit_intervals(
+    filepaths: list[str], mocker: pytest_mock.MockerFixture
+) -> None:
+    load_fit_intervals_mock = mocker.patch("dawa_trpl.data_system.load_fit_intervals")
+    windows = [(450, 470), (480, 500)]
+    intervals = ds.load_multi_fit_intervals(filepaths, windows, "single")
+    assert intervals == [load_fit_intervals_mock.return_value] * (
+        len(filepaths) * len(windows)
+    )
+    assert load_fit_intervals_mock.call_args_list == [
+        mocker.call(filepath, (float(start), float(stop)), "single", None)
+        for filepath in filepaths
+        for start, stop in windows
+    ]
+
+
+def test_load_time_df_with_unknown_model(
+    filepath: str, wavelength_range: tuple[float, float]
+) -> None:
+    with pytest.raises(ValueError):
+        ds.load_time_df(filepath, wavelength_range, fitting=True, model="unknown")
+
+
 @pytest.mark.parametrize("normalize_intensity", [True, False])
 def test_load_time_df_with_normalize_intensity(
     filepath: str,
@@ -181,6 +773,217 @@ def test_load_time_df_with_normalize_intensity(
     assert bool(tdf["intensity"].max() == 1.0) is normalize_intensity
 
 
+@pytest.mark.parametrize("windows", [[(440, 470)], [(440, 470), (460, 500)]])
+def test_load_window_time_dfs(
+    filepath: str, windows: list[tuple[float, float]]
+) -> None:
+    dfs = ds.load_window_time_dfs(filepath, windows)
+    assert len(dfs) == len(windows)
+    for df, window in zip(dfs, windows, strict=True):
+        expected = ds.load_time_df(filepath, window)
+        np.testing.assert_array_equal(df["time"], expected["time"])
+        np.testing.assert_allclose(df["intensity"], expected["intensity"])
+        assert df["fit"].isna().all()
+        assert df.attrs["filename"] == os.path.basename(filepath)
+        assert df.attrs["window"] == window
+
+
+def test_load_window_time_dfs_with_fitting(filepath: str) -> None:
+    windows = [(440, 470), (460, 500)]
+    dfs = ds.load_window_time_dfs(filepath, windows, fitting=True)
+    for df, window in zip(dfs, windows, strict=True):
+        expected = ds.load_time_df(filepath, window, fitting=True)
+        assert set(df.attrs["fit"].keys()) == set(expected.attrs["fit"].keys())
+        assert df.attrs["fit"]["a"] + df.attrs["fit"]["b"] == 100
+        for key in ("tau1", "tau2"):
+            assert df.attrs["fit"][key] == pytest.approx(
+                expected.attrs["fit"][key], rel=5e-2
+            )
+        assert df["fit"].notna().any()
+
+
+def test_load_window_time_dfs_with_model(filepath: str) -> None:
+    dfs = ds.load_window_time_dfs(
+        filepath, [(440, 470), (460, 500)], fitting=True, model="stretched"
+    )
+    for df in dfs:
+        assert set(df.attrs["fit"]) == {"model", "a", "tau", "beta", "params", "cov"}
+
+
+def test_load_window_time_dfs_with_normalize_intensity(filepath: str) -> None:
+    dfs = ds.load_window_time_dfs(
+        filepath, [(440, 470)], fitting=True, normalize_intensity=True
+    )
+    assert dfs[0]["intensity"].max() == 1.0
+    assert dfs[0]["fit"].max() <= 1.1
+
+
+def test_load_irf(mocker: pytest_mock.MockerFixture) -> None:
+    time = np.linspace(0, 10, 200)
+    wavelength = np.linspace(435, 535, 50)
+    irf = np.exp(-0.5 * ((time - 1.0) / 0.1) ** 2)
+    images = {
+        "sample.img": (time, wavelength, np.zeros((len(time), len(wavelength)))),
+        # The dark level of 10 counts is subtracted
+        "scatter.img": (time, wavelength, np.outer(irf, np.ones(len(wavelength))) + 10),
+    }
+    mocker.patch("dawa_trpl.data_system.load_streak_image", side_effect=images.get)
+    ds.load_irf.cache_clear()
+    convolution = ds.load_irf("scatter.img", "sample.img")
+    ds.load_irf.cache_clear()
+    assert convolution.size == len(time)
+    expected = np.convolve(np.ones(len(time)), irf / irf.sum())[: len(time)]
+    np.testing.assert_allclose(
+        convolution.convolve(np.ones(len(time))), expected, atol=1e-6
+    )
+
+
+def test_load_time_df_with_irf(filepath: str) -> None:
+    # Any streak image serves as an IRF to check the plumbing
+    tdf = ds.load_time_df(filepath, (450, 500), fitting=True, irf_filepath=filepath)
+    assert tdf.attrs["fit"]["irf"] == os.path.basename(filepath)
+    assert tdf.attrs["fit"]["a"] + tdf.attrs["fit"]["b"] == 100
+    assert tdf["fit"].notna().all()
+    expected = ds.load_time_df(filepath, (450, 500), fitting=True)
+    assert "irf" not in expected.attrs["fit"]
+
+
+def test_load_window_time_dfs_with_irf(filepath: str) -> None:
+    dfs = ds.load_window_time_dfs(
+        filepath, [(440, 470), (460, 500)], fitting=True, irf_filepath=filepath
+    )
+    for df in dfs:
+        assert df.attrs["fit"]["irf"] == os.path.basename(filepath)
+        assert df["fit"].notna().all()
+
+
+def test_load_multi_window_time_dfs(
+    filepaths: list[str], mocker: pytest_mock.MockerFixture
+) -> None:
+    load_window_time_dfs_mock = mocker.patch(
+        "dawa_trpl.data_system.load_window_time_dfs"
+    )
+    dfs = [[mocker.Mock(), mocker.Mock()] for _ in filepaths]
+    load_window_time_dfs_mock.side_effect = dfs
+    windows = [(440.0, 470.0), (460.0, 500.0)]
+    assert ds.load_multi_window_time_dfs(filepaths, windows, True, False) == [
+        df for _dfs in dfs for df in _dfs
+    ]
+    for call, filepath in zip(
+        load_window_time_dfs_mock.call_args_list, filepaths, strict=True
+    ):
+        assert call == mocker.call(filepath, windows, True, False, None, "double")
+
+
+def test_load_peaks_df(filepath: str) -> None:
+    wdf = ds.load_wavelength_df(filepath)
+    peaks = utils.find_peaks(wdf["wavelength"].to_list(), wdf["intensity"].to_list())
+    df = ds.load_peaks_df(filepath)
+    assert list(df.columns) == ["x", "y", "x0", "x1", "y0", "width"]
+    assert df["x"].to_list() == [peak.x for peak in peaks]
+    assert df["width"].to_list() == [peak.width for peak in peaks]
+
+
+@pytest.mark.parametrize("model", ["double", "single"])
+def test_load_summary_df(filepath: str, model: str) -> None:
+    df = ds.load_summary_df(filepath, (450.0, 470.0), model)
+    peak = ds.load_peaks_df(filepath).sort_values("y").iloc[-1]
+    fit = ds.load_time_df(filepath, (450.0, 470.0), fitting=True, model=model).attrs[
+        "fit"
+    ]
+    assert len(df) == 1
+    assert df[["filename", "model"]].iloc[0].to_list() == [
+        os.path.basename(filepath),
+        model,
+    ]
+    assert df["peak_wavelength"].iloc[0] == peak["x"]
+    assert df["FWHM"].iloc[0] == peak["width"]
+    for name, value in models.get_model(model).summarize(fit["params"]).items():
+        assert df[name].iloc[0] == pytest.approx(value)
+
+
+def test_load_summary_df_reuses_stored_summary(
+    filepath: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    expected = ds.load_summary_df(filepath)
+    ds.load_summary_df.cache_clear()
+    compute_mock = mocker.patch("dawa_trpl.data_system._compute_summary_df")
+    pd.testing.assert_frame_equal(ds.load_summary_df(filepath), expected)
+    compute_mock.assert_not_called()
+
+
+@pytest.mark.parametrize("binning", [1, 4, 7])
+def test_load_lifetime_map_df(filepath: str, binning: int) -> None:
+    time, wavelength, image = ds.load_streak_image(filepath)
+    df = ds.load_lifetime_map_df(filepath, binning)
+    assert list(df.columns) == [
+        "wavelength",
+        "intensity",
+        "a",
+        "tau1",
+        "b",
+        "tau2",
+        "converged",
+    ]
+    assert len(df) == len(wavelength) // binning
+    assert df["wavelength"].is_monotonic_increasing
+    assert df["intensity"].sum() == image[:, : len(df) * binning].sum()
+    fitted = df[df["converged"]]
+    assert len(fitted) > 0
+    assert (fitted["tau1"] <= fitted["tau2"]).all()
+    np.testing.assert_allclose(fitted["a"] + fitted["b"], 100)
+    assert df[~df["converged"]][["a", "tau1", "b", "tau2"]].isna().all(axis=None)
+    assert df.attrs["filename"] == os.path.basename(filepath)
+
+
+def test_load_lifetime_map_df_masks_fits_not_converged(
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    time = np.linspace(0.0, 10.0, 50)
+    decay = np.exp(-time / 2.0) * 1000
+    image = np.outer(decay, np.ones(3))
+    mocker.patch(
+        "dawa_trpl.data_system.load_streak_image",
+        return_value=(time, np.array([400.0, 500.0, 600.0]), image),
+    )
+    mocker.patch.object(utils, "determine_fit_range_dc", return_value=(0.0, 10.0))
+    params = np.array([[1.0, 3.0, 1.0, 1.0]] * 3)
+    mocker.patch(
+        "dawa_trpl.fitting.fit_batch_parallel",
+        return_value=fitting.FitResult(
+            params=params,
+            cov=np.zeros((3, 4, 4)),
+            cost=np.zeros(3),
+            converged=np.array([True, False, True]),
+        ),
+    )
+    df = ds._compute_lifetime_map_df("item.img", 1)
+    assert df["converged"].tolist() == [True, False, True]
+    assert df.loc[1, ["a", "tau1", "b", "tau2"]].isna().all()
+    assert df.loc[[0, 2], "tau1"].tolist() == [1.0, 1.0]
+    assert df.loc[[0, 2], "tau2"].tolist() == [3.0, 3.0]
+
+
+def test_load_lifetime_map_df_with_invalid_binning(filepath: str) -> None:
+    with pytest.raises(ValueError):
+        ds.load_lifetime_map_df(filepath, 0)
+
+
+def test_load_lifetime_map_dfs(
+    filepaths: list[str], mocker: pytest_mock.MockerFixture
+) -> None:
+    load_lifetime_map_df_mock = mocker.patch(
+        "dawa_trpl.data_system.load_lifetime_map_df"
+    )
+    dfs = [mocker.Mock() for _ in filepaths]
+    load_lifetime_map_df_mock.side_effect = dfs
+    assert ds.load_lifetime_map_dfs(filepaths, 4) == dfs
+    for call, filepath in zip(
+        load_lifetime_map_df_mock.call_args_list, filepaths, strict=True
+    ):
+        assert call == mocker.call(filepath, binning=4)
+
+
 @pytest.mark.parametrize("fitting", [True, False])
 @pytest.mark.parametrize("normalize_intensity", [True, False])
 def test_load_time_dfs(
@@ -208,4 +1011,59 @@ def test_load_time_dfs(
             wavelength_range=wavelength_range,
             fitting=fitting,
             normalize_intensity=normalize_intensity,
+            irf_filepath=None,
+            model="double",
+            warm_start=False,
         )
+
+
+def test_load_global_analysis(filepath: str) -> None:
+    time, wavelength, image = ds.load_streak_image(filepath)
+    result = ds.load_global_analysis(filepath, 2, 10)
+    np.testing.assert_array_equal(result.wavelength, wavelength)
+    assert result.lifetimes.shape == (2,)
+    assert (np.diff(result.lifetimes) > 0).all()
+    assert result.das.shape == (2, len(wavelength))
+    assert result.residuals.shape == (len(result.time), len(wavelength))
+
+
+def test_load_global_analysis_reuses_stored_result(
+    filepath: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds.load_global_analysis.cache_clear()
+    expected = ds.load_global_analysis(filepath, 2, 10)
+    ds.load_global_analysis.cache_clear()
+    load_streak_image_mock = mocker.patch("dawa_trpl.data_system.load_streak_image")
+    actual = ds.load_global_analysis(filepath, 2, 10)
+    load_streak_image_mock.assert_not_called()
+    np.testing.assert_array_equal(actual.lifetimes, expected.lifetimes)
+    np.testing.assert_array_equal(actual.das, expected.das)
+
+
+def test_load_pyramid_reuses_stored_pyramid(
+    filepath: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds.load_pyramid.cache_clear()
+    expected = ds.load_pyramid(filepath)
+    ds.load_pyramid.cache_clear()
+    load_streak_image_mock = mocker.patch("dawa_trpl.data_system.load_streak_image")
+    actual = ds.load_pyramid(filepath)
+    load_streak_image_mock.assert_not_called()
+    assert len(actual) == len(expected)
+    for a, b in zip(actual, expected):
+        np.testing.assert_array_equal(a.image, b.image)
+
+
+def test_load_streak_image_tiles(filepath: str) -> None:
+    time, wavelength, image = ds.load_streak_image(filepath)
+    level, tiles = ds.load_streak_image_tiles(filepath)
+    assert level == len(ds.load_pyramid(filepath)) - 1
+    assert max(tiles.image.shape) <= pyramid.TILE_SIZE
+    # A small viewport is shown at the full resolution
+    level, tiles = ds.load_streak_image_tiles(
+        filepath, (time[10], time[20]), (wavelength[10], wavelength[20])
+    )
+    assert level == 0
+    np.testing.assert_array_equal(
+        tiles.image, image[: len(tiles.time), : len(tiles.wavelength)]
+    )
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+import pytest_mock
+
+from dawa_trpl import downsampling
+
+
+@pytest.fixture()
+def df() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    time = np.linspace(0, 100, 10001)
+    intensity = np.exp(-time / 10) + rng.normal(0, 0.01, len(time))
+    intensity[5000] = 2.0  # a spike
+    fit = np.where(time >= 5, np.exp(-time / 10), np.nan)
+    return pd.DataFrame(dict(time=time, intensity=intensity, fit=fit))
+
+
+def test_minmax_indices() -> None:
+    y = np.sin(np.linspace(0, 20 * np.pi, 10001))
+    indices = downsampling.minmax_indices(y, 200)
+    assert len(indices) <= 202
+    assert np.all(np.diff(indices) > 0)
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    np.testing.assert_allclose(y[indices].max(), y.max())
+    np.testing.assert_allclose(y[indices].min(), y.min())
+
+
+@pytest.mark.parametrize("n, n_out", [(10, 10), (10, 100), (10, 1), (9, 8)])
+def test_minmax_indices_of_few_points(n: int, n_out: int) -> None:
+    indices = downsampling.minmax_indices(np.arange(float(n)), n_out)
+    assert indices[0] == 0 and indices[-1] == n - 1
+    if n <= n_out or n_out < 2:
+        np.testing.assert_array_equal(indices, np.arange(n))
+
+
+def test_downsample_df(df: pd.DataFrame) -> None:
+    actual = downsampling.downsample_df(df, "time", "intensity", max_points=500)
+    assert len(actual) <= 502
+    assert actual["intensity"].max() == df["intensity"].max()
+    assert actual["time"].iloc[0] == 0 and actual["time"].iloc[-1] == 100
+
+
+def test_downsample_df_within_x_range(df: pd.DataFrame) -> None:
+    actual = downsampling.downsample_df(
+        df, "time", "intensity", (60.0, 40.0), max_points=500
+    )
+    assert len(actual) <= 502
+    # A point beyond each edge keeps the line up to the edges
+    assert actual["time"].iloc[0] < 40 and actual["time"].iloc[1] >= 40
+    assert actual["time"].iloc[-1] > 60 and actual["time"].iloc[-2] <= 60
+    assert actual["intensity"].max() == 2.0
+    # Zooming in keeps more points of the viewport
+    zoomed = downsampling.downsample_df(
+        df, "time", "intensity", (49.0, 51.0), max_points=500
+    )
+    assert len(zoomed) == 203
+
+
+def test_downsample_df_drops_missing_values(df: pd.DataFrame) -> None:
+    actual = downsampling.downsample_df(df, "time", "fit", max_points=500)
+    assert actual["fit"].notna().all()
+    assert actual["time"].iloc[0] == 5
+
+
+def test_downsample_df_when_disabled(
+    df: pd.DataFrame, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.config.DOWNSAMPLE_POINTS", 0)
+    actual = downsampling.downsample_df(df, "time", "intensity")
+    pd.testing.assert_frame_equal(actual, df)
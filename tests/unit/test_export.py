@@ -0,0 +1,97 @@
+import base64
+import io
+import typing as t
+
+import numpy as np
+import pandas as pd
+import pytest
+from tlab_analysis import trpl
+
+from dawa_trpl import export, streak
+from tests import IMGDIR, FixtureRequest
+
+
+@pytest.fixture()
+def df() -> pd.DataFrame:
+    df = pd.DataFrame(
+        dict(time=np.linspace(0, 10, 5), intensity=np.arange(5.0), fit=np.nan)
+    )
+    df.attrs["filename"] = "item.img"
+    df.attrs["fit"] = dict(a=30, tau1=0.5, params=np.array([1.0, 2.0]))
+    return df
+
+
+def test_dump_attrs(df: pd.DataFrame) -> None:
+    assert (
+        export.dump_attrs(df.attrs) == '{"filename": "item.img", '
+        '"fit": {"a": 30, "tau1": 0.5, "params": [1.0, 2.0]}}'
+    )
+
+
+def test_dump_attrs_with_unserializable_object() -> None:
+    with pytest.raises(TypeError):
+        export.dump_attrs(dict(obj=object()))
+
+
+def test_df_to_parquet(df: pd.DataFrame) -> None:
+    actual = export.read_parquet(export.df_to_parquet(df))
+    pd.testing.assert_frame_equal(actual, df, check_flags=False)
+    assert actual.attrs["filename"] == "item.img"
+    assert actual.attrs["fit"]["params"] == [1.0, 2.0]
+
+
+def test_df_to_arrow(df: pd.DataFrame) -> None:
+    actual = export.read_arrow(export.df_to_arrow(df))
+    pd.testing.assert_frame_equal(actual, df, check_flags=False)
+    assert actual.attrs["filename"] == "item.img"
+    assert actual.attrs["fit"]["params"] == [1.0, 2.0]
+
+
+@pytest.fixture(params=[path.name for path in IMGDIR.glob("*.img")])
+def trpl_data(request: FixtureRequest[str]) -> trpl.TRPLData:
+    return trpl.read_file(IMGDIR / request.param)
+
+
+def test_streak_image_to_npz(trpl_data: trpl.TRPLData) -> None:
+    data = streak.StreakImage.from_trpl_data(trpl_data)
+    with np.load(io.BytesIO(export.streak_image_to_npz(data))) as npz:
+        np.testing.assert_array_equal(npz["intensity"], trpl_data.to_streak_image())
+        np.testing.assert_array_equal(npz["time"], trpl_data.time.unique())
+        np.testing.assert_array_equal(npz["wavelength"], trpl_data.wavelength.unique())
+        assert npz["metadata"].tolist() == trpl_data.metadata
+
+
+def test_df_to_download_with_csv(df: pd.DataFrame) -> None:
+    assert export.df_to_download(df, "item", "csv") == dict(
+        filename="item.csv",
+        content=df.to_csv(index=False),
+        type="text/csv",
+        base64=False,
+    )
+
+
+@pytest.mark.parametrize(
+    "file_format, suffix, read",
+    [
+        ("parquet", ".parquet", export.read_parquet),
+        ("arrow", ".arrow", export.read_arrow),
+    ],
+)
+def test_df_to_download_with_binary_format(
+    df: pd.DataFrame,
+    file_format: str,
+    suffix: str,
+    read: t.Callable[[bytes], pd.DataFrame],
+) -> None:
+    download = export.df_to_download(df, "item", file_format)
+    assert download["filename"] == "item" + suffix
+    assert download["type"] == "application/octet-stream"
+    assert download["base64"] is True
+    pd.testing.assert_frame_equal(
+        read(base64.urlsafe_b64decode(download["content"])), df, check_flags=False
+    )
+
+
+def test_df_to_download_with_unsupported_format(df: pd.DataFrame) -> None:
+    with pytest.raises(ValueError):
+        export.df_to_download(df, "item", "xlsx")
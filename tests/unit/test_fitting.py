@@ -0,0 +1,255 @@
+import numpy as np
+import pytest
+import pytest_mock
+from scipy import optimize
+
+from dawa_trpl import cancellation, fitting
+
+
+@pytest.fixture()
+def x() -> fitting.Array:
+    return np.linspace(0, 10, 400)
+
+
+@pytest.fixture()
+def params() -> fitting.Array:
+    rng = np.random.default_rng(0)
+    n = 100
+    return np.column_stack(
+        [
+            rng.uniform(0.2, 0.8, n),
+            rng.uniform(0.1, 0.5, n),
+            rng.uniform(0.2, 0.8, n),
+            rng.uniform(1.0, 4.0, n),
+        ]
+    )
+
+
+@pytest.fixture()
+def y(x: fitting.Array, params: fitting.Array) -> fitting.Array:
+    rng = np.random.default_rng(1)
+    return fitting.double_exponential(x, params) + rng.normal(
+        0, 0.01, (len(params), len(x))
+    )
+
+
+@pytest.fixture()
+def p0(params: fitting.Array) -> fitting.Array:
+    return np.tile([0.5, 0.3, 0.5, 2.0], (len(params), 1))
+
+
+def test_double_exponential(x: fitting.Array, params: fitting.Array) -> None:
+    actual = fitting.double_exponential(x, params)
+    assert actual.shape == (len(params), len(x))
+    a, tau1, b, tau2 = params[0]
+    np.testing.assert_allclose(actual[0], a * np.exp(-x / tau1) + b * np.exp(-x / tau2))
+
+
+def test_double_exponential_jacobian(x: fitting.Array, params: fitting.Array) -> None:
+    actual = fitting.double_exponential_jacobian(x, params)
+    assert actual.shape == (len(params), len(x), 4)
+    eps = 1e-7
+    for i in range(4):
+        dp = np.zeros(4)
+        dp[i] = eps
+        expected = (
+            fitting.double_exponential(x, params + dp)
+            - fitting.double_exponential(x, params - dp)
+        ) / (2 * eps)
+        np.testing.assert_allclose(actual[..., i], expected, rtol=1e-5, atol=1e-7)
+
+
+def test_fit_batch(
+    x: fitting.Array, y: fitting.Array, p0: fitting.Array, params: fitting.Array
+) -> None:
+    result = fitting.fit_batch(
+        fitting.double_exponential, fitting.double_exponential_jacobian, x, y, p0
+    )
+    assert result.params.shape == params.shape
+    assert result.cov.shape == (len(params), 4, 4)
+    assert result.converged.all()
+    assert (result.params > 0).all()
+    np.testing.assert_allclose(
+        fitting.double_exponential(x, result.params),
+        fitting.double_exponential(x, params),
+        atol=0.02,
+    )
+
+
+def test_fit_batch_agrees_with_curve_fit(
+    x: fitting.Array, y: fitting.Array, p0: fitting.Array
+) -> None:
+    def func(x: fitting.Array, *params: float) -> fitting.Array:
+        curve: fitting.Array = fitting.double_exponential(x, np.array([params]))[0]
+        return curve
+
+    result = fitting.fit_batch(
+        fitting.double_exponential, fitting.double_exponential_jacobian, x, y, p0
+    )
+    for i in range(5):
+        params, cov = optimize.curve_fit(func, x, y[i], p0=p0[i], bounds=(0.0, np.inf))
+        np.testing.assert_allclose(result.params[i], params, rtol=1e-4)
+        np.testing.assert_allclose(result.cov[i], cov, rtol=1e-3, atol=1e-12)
+
+
+def test_fit_batch_with_mask(
+    x: fitting.Array, y: fitting.Array, p0: fitting.Array, params: fitting.Array
+) -> None:
+    mask = np.ones_like(y, dtype=bool)
+    mask[:, -50:] = False
+    corrupted = y.copy()
+    corrupted[:, -50:] = 100.0
+    result = fitting.fit_batch(
+        fitting.double_exponential,
+        fitting.double_exponential_jacobian,
+        x,
+        corrupted,
+        p0,
+        mask,
+    )
+    expected = fitting.fit_batch(
+        fitting.double_exponential,
+        fitting.double_exponential_jacobian,
+        x[:-50],
+        y[:, :-50],
+        p0,
+    )
+    np.testing.assert_allclose(result.params, expected.params, rtol=1e-6)
+
+
+def test_fit_batch_parallel(
+    x: fitting.Array,
+    y: fitting.Array,
+    p0: fitting.Array,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.config.WORKERS", new=4)
+    expected = fitting.fit_batch(
+        fitting.double_exponential, fitting.double_exponential_jacobian, x, y, p0
+    )
+    actual = fitting.fit_batch_parallel(
+        fitting.double_exponential,
+        fitting.double_exponential_jacobian,
+        x,
+        y,
+        p0,
+        chunk_size=16,
+    )
+    np.testing.assert_allclose(actual.params, expected.params)
+    np.testing.assert_allclose(actual.cov, expected.cov)
+    np.testing.assert_array_equal(actual.converged, expected.converged)
+
+
+@pytest.fixture()
+def irf(x: fitting.Array) -> fitting.Array:
+    return np.exp(-0.5 * ((x - 1.0) / 0.08) ** 2)
+
+
+def test_irf_convolution(x: fitting.Array, irf: fitting.Array) -> None:
+    convolution = fitting.IRFConvolution.from_irf(irf)
+    assert convolution.n_fft >= 2 * len(x) - 1
+    y = np.random.default_rng(0).random((3, len(x)))
+    expected = np.array([np.convolve(row, irf / irf.sum())[: len(x)] for row in y])
+    np.testing.assert_allclose(convolution.convolve(y), expected, atol=1e-12)
+    np.testing.assert_allclose(
+        convolution.convolve(y.T, axis=0), expected.T, atol=1e-12
+    )
+
+
+@pytest.mark.parametrize("irf", [np.zeros(10), -np.ones(10)])
+def test_irf_convolution_without_area(irf: fitting.Array) -> None:
+    with pytest.raises(ValueError):
+        fitting.IRFConvolution.from_irf(irf)
+
+
+def test_fit_batch_with_irf(x: fitting.Array, irf: fitting.Array) -> None:
+    func, jac = fitting.IRFConvolution.from_irf(irf).wrap(
+        fitting.double_exponential, fitting.double_exponential_jacobian
+    )
+    params = np.array([[0.7, 0.1, 0.3, 2.0], [0.5, 0.05, 0.5, 1.5]])
+    rng = np.random.default_rng(0)
+    y = func(x, params) + rng.normal(0, 0.001, (len(params), len(x)))
+    result = fitting.fit_batch(
+        func, jac, x, y, np.tile([0.5, 0.3, 0.5, 2.5], (len(params), 1))
+    )
+    assert result.converged.all()
+    np.testing.assert_allclose(result.params, params, rtol=0.05)
+    eps = 1e-7
+    for i in range(4):
+        dp = np.zeros(4)
+        dp[i] = eps
+        expected = (func(x, params + dp) - func(x, params - dp)) / (2 * eps)
+        np.testing.assert_allclose(
+            jac(x, params)[..., i], expected, rtol=1e-5, atol=1e-7
+        )
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_fit_batch_parallel_when_stopped(
+    x: fitting.Array,
+    y: fitting.Array,
+    p0: fitting.Array,
+    workers: int,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.config.WORKERS", new=workers)
+    with pytest.raises(cancellation.Cancelled):
+        fitting.fit_batch_parallel(
+            fitting.double_exponential,
+            fitting.double_exponential_jacobian,
+            x,
+            y,
+            p0,
+            chunk_size=16,
+            should_stop=lambda: True,
+        )
+
+
+def test_bootstrap(x: fitting.Array) -> None:
+    params = np.array([0.7, 0.5, 0.3, 3.0])
+    rng = np.random.default_rng(2)
+    y = fitting.double_exponential(x, params[np.newaxis])[0] + rng.normal(
+        0, 0.01, len(x)
+    )
+    mask = np.ones(len(x), dtype=bool)
+    fitted = fitting.fit_batch(
+        fitting.double_exponential,
+        fitting.double_exponential_jacobian,
+        x,
+        y[np.newaxis],
+        params[np.newaxis],
+    ).params[0]
+    result = fitting.bootstrap(
+        fitting.double_exponential,
+        fitting.double_exponential_jacobian,
+        x,
+        y,
+        fitted,
+        mask,
+        n_resamples=100,
+    )
+    assert result.params.shape == (100, 4)
+    assert result.converged.all()
+    low, high = np.percentile(result.params, [2.5, 97.5], axis=0)
+    assert (low <= fitted).all() and (fitted <= high).all()
+    assert (low <= params).all() and (params <= high).all()
+
+
+def test_bootstrap_is_reproducible(x: fitting.Array) -> None:
+    params = np.array([0.7, 0.5, 0.3, 3.0])
+    y = fitting.double_exponential(x, params[np.newaxis])[0] + np.sin(x) * 0.01
+    mask = x > 1
+    results = [
+        fitting.bootstrap(
+            fitting.double_exponential,
+            fitting.double_exponential_jacobian,
+            x,
+            y,
+            params,
+            mask,
+            n_resamples=10,
+            seed=1,
+        )
+        for _ in range(2)
+    ]
+    np.testing.assert_array_equal(results[0].params, results[1].params)
@@ -0,0 +1,76 @@
+import pathlib
+
+import numpy as np
+import pytest
+from tlab_analysis import trpl
+
+from dawa_trpl import img_header
+from tests import IMGDIR, FixtureRequest
+
+
+@pytest.fixture(params=[path.name for path in IMGDIR.glob("*.img")])
+def filepath(request: FixtureRequest[str]) -> pathlib.Path:
+    return IMGDIR / request.param
+
+
+def test_read_header(filepath: pathlib.Path) -> None:
+    data = trpl.read_file(filepath)
+    header = img_header.read_header(str(filepath))
+    streak_image = data.to_streak_image()
+    assert (header.height, header.width) == streak_image.shape
+    assert header.bytes_per_pixel == 2
+    assert header.dtype == np.uint16
+    np.testing.assert_allclose(header.wavelength, data.wavelength.unique())
+    np.testing.assert_allclose(header.time, data.time.unique())
+    assert header.wavelength_range == (data.wavelength.min(), data.wavelength.max())
+    assert header.time_range == (data.time.min(), data.time.max())
+    assert any("Frame=" in line for line in header.metadata)
+    assert any("Date:" in line for line in header.metadata)
+
+
+def test_read_pixels(filepath: pathlib.Path) -> None:
+    header = img_header.read_header(str(filepath))
+    pixels = img_header.read_pixels(str(filepath), header)
+    assert pixels.dtype == header.dtype
+    np.testing.assert_array_equal(pixels, trpl.read_file(filepath).to_streak_image())
+
+
+def test_read_pixels_of_incomplete_file(
+    filepath: pathlib.Path, tmp_path: pathlib.Path
+) -> None:
+    header = img_header.read_header(str(filepath))
+    (tmp_path / "item.img").write_bytes(filepath.read_bytes()[: header.offset + 10])
+    with pytest.raises(img_header.HeaderError):
+        img_header.read_pixels(str(tmp_path / "item.img"), header)
+
+
+def test_read_header_with_wrong_scaling_pointers(
+    filepath: pathlib.Path, tmp_path: pathlib.Path
+) -> None:
+    raw = filepath.read_bytes().replace(b"*0614925", b"*0000000")
+    (tmp_path / "item.img").write_bytes(raw)
+    header = img_header.read_header(str(tmp_path / "item.img"))
+    assert (
+        header.wavelength_range
+        == img_header.read_header(str(filepath)).wavelength_range
+    )
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [b"", b"broken", b"IM" + b"\0" * 62, b"IM" + b"\xff" * 62],
+    ids=["empty", "not_img", "zero_size", "unsupported_type"],
+)
+def test_read_header_with_invalid_file(raw: bytes, tmp_path: pathlib.Path) -> None:
+    (tmp_path / "item.img").write_bytes(raw)
+    with pytest.raises(img_header.HeaderError):
+        img_header.read_header(str(tmp_path / "item.img"))
+
+
+def test_read_header_without_calibration_tables(
+    filepath: pathlib.Path, tmp_path: pathlib.Path
+) -> None:
+    raw = filepath.read_bytes()
+    (tmp_path / "item.img").write_bytes(raw[: -2 * 4 * 1024])
+    with pytest.raises(img_header.HeaderError):
+        img_header.read_header(str(tmp_path / "item.img"))
@@ -0,0 +1,160 @@
+import os
+import pathlib
+import time
+
+import pytest
+import pytest_mock
+
+from dawa_trpl import janitor
+
+
+def create_file(upload_dir: str, name: str, size: int, accessed: float) -> pathlib.Path:
+    path = pathlib.Path(upload_dir) / name
+    path.write_bytes(b"\0" * size)
+    os.utime(path, (accessed, accessed))
+    return path
+
+
+@pytest.fixture()
+def now() -> float:
+    return time.time()
+
+
+@pytest.fixture()
+def invalidate_mock(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
+    return mocker.patch("dawa_trpl.data_system.invalidate_filepaths")
+
+
+@pytest.fixture()
+def discard_mock(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
+    return mocker.patch("dawa_trpl.catalog.discard_filepaths")
+
+
+def test_list_upload_dirs(upload_basedir: str, upload_dir: str) -> None:
+    pathlib.Path(upload_basedir, "file.img").touch()
+    assert janitor.list_upload_dirs(upload_basedir) == [upload_dir]
+
+
+def test_list_upload_dirs_when_upload_basedir_does_not_exist(tmpdir: str) -> None:
+    assert janitor.list_upload_dirs(os.path.join(tmpdir, "unexist")) == []
+
+
+def test_list_uploaded_files(upload_dir: str, now: float) -> None:
+    path = create_file(upload_dir, "item.img", 10, now)
+    (pathlib.Path(upload_dir) / "subdir").mkdir()
+    (pathlib.Path(upload_dir) / ".catalog.json").touch()
+    assert janitor.list_uploaded_files(upload_dir) == [
+        janitor.UploadedFile(str(path), 10, now)
+    ]
+
+
+def test_collect_removes_idle_upload_dir(
+    upload_dir: str,
+    now: float,
+    invalidate_mock: pytest_mock.MockType,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    path = create_file(upload_dir, "item.img", 10, now - 100)
+    os.utime(upload_dir, (now - 100, now - 100))
+    mocker.patch("dawa_trpl.config.UPLOAD_SESSION_TTL", new=50)
+    assert janitor.collect(now) == [str(path)]
+    assert not os.path.exists(upload_dir)
+    invalidate_mock.assert_called_once_with([str(path)])
+
+
+def test_collect_keeps_active_upload_dir(
+    upload_dir: str,
+    now: float,
+    invalidate_mock: pytest_mock.MockType,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    create_file(upload_dir, "old.img", 10, now - 100)
+    create_file(upload_dir, "new.img", 10, now - 10)
+    mocker.patch("dawa_trpl.config.UPLOAD_SESSION_TTL", new=50)
+    assert janitor.collect(now) == []
+    assert len(os.listdir(upload_dir)) == 2
+    invalidate_mock.assert_not_called()
+
+
+def test_collect_evicts_least_recently_used_files_over_session_quota(
+    upload_dir: str,
+    now: float,
+    invalidate_mock: pytest_mock.MockType,
+    discard_mock: pytest_mock.MockType,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    oldest = create_file(upload_dir, "oldest.img", 10, now - 30)
+    older = create_file(upload_dir, "older.img", 10, now - 20)
+    create_file(upload_dir, "newest.img", 10, now - 10)
+    mocker.patch("dawa_trpl.config.UPLOAD_SESSION_QUOTA", new=15)
+    assert janitor.collect(now) == [str(oldest), str(older)]
+    assert os.listdir(upload_dir) == ["newest.img"]
+    invalidate_mock.assert_called_once_with([str(oldest), str(older)])
+    discard_mock.assert_called_once_with([str(oldest), str(older)])
+
+
+def test_collect_evicts_least_recently_used_files_over_total_quota(
+    upload_basedir: str,
+    now: float,
+    invalidate_mock: pytest_mock.MockType,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    upload_dirs = [os.path.join(upload_basedir, f"session{i}") for i in range(2)]
+    for upload_dir in upload_dirs:
+        os.mkdir(upload_dir)
+    oldest = create_file(upload_dirs[0], "oldest.img", 10, now - 30)
+    create_file(upload_dirs[1], "older.img", 10, now - 20)
+    create_file(upload_dirs[0], "newest.img", 10, now - 10)
+    mocker.patch("dawa_trpl.config.UPLOAD_TOTAL_QUOTA", new=25)
+    assert janitor.collect(now) == [str(oldest)]
+    # Besides the catalog of the session
+    assert [
+        name for name in os.listdir(upload_dirs[0]) if not name.startswith(".")
+    ] == ["newest.img"]
+    assert os.listdir(upload_dirs[1]) == ["older.img"]
+
+
+def test_collect_prunes_store(
+    now: float, store_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.config.STORE_QUOTA", new=100)
+    mocker.patch("dawa_trpl.config.STORE_TTL", new=50)
+    prune_mock = mocker.patch("dawa_trpl.store.Store.prune", return_value=["digest"])
+    janitor.collect(now)
+    prune_mock.assert_called_once_with(100, 50, now)
+
+
+def test_prune_store_when_store_is_disabled(
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.config.STORE_DIR", new="")
+    get_store_mock = mocker.patch("dawa_trpl.store.get_store")
+    assert janitor.prune_store() == []
+    get_store_mock.assert_not_called()
+
+
+def test_janitor_collects_periodically(mocker: pytest_mock.MockerFixture) -> None:
+    collect_mock = mocker.patch("dawa_trpl.janitor.collect")
+    _janitor = janitor.Janitor(interval=0.01)
+    _janitor.start()
+    time.sleep(0.1)
+    _janitor.stop()
+    _janitor.join()
+    assert collect_mock.call_count > 0
+
+
+@pytest.mark.parametrize("interval", [0, -1])
+def test_start_when_disabled(
+    interval: float, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.config.JANITOR_INTERVAL", new=interval)
+    assert janitor.start() is None
+
+
+def test_start(mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("dawa_trpl.config.JANITOR_INTERVAL", new=60)
+    _janitor = janitor.start()
+    assert _janitor is not None
+    assert _janitor.is_alive()
+    _janitor.stop()
+    _janitor.join()
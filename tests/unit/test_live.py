@@ -0,0 +1,159 @@
+import os
+import pathlib
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+import pytest_mock
+
+from dawa_trpl import img_header, live
+from tests import IMGDIR
+
+SOURCE = sorted(IMGDIR.glob("*.img"))[0]
+
+
+def write_frame(path: pathlib.Path, counts: npt.NDArray[np.int64]) -> None:
+    # An image of SOURCE whose pixels are replaced
+    header = img_header.read_header(str(SOURCE))
+    raw = bytearray(SOURCE.read_bytes())
+    pixels = counts.astype(header.dtype).tobytes()
+    raw[header.offset : header.offset + len(pixels)] = pixels
+    path.write_bytes(bytes(raw))
+
+
+@pytest.fixture()
+def shape() -> tuple[int, int]:
+    header = img_header.read_header(str(SOURCE))
+    return header.height, header.width
+
+
+@pytest.fixture()
+def frames(shape: tuple[int, int]) -> list[npt.NDArray[np.int64]]:
+    rng = np.random.default_rng(0)
+    frames = [rng.poisson(1.0, shape) for _ in range(3)]
+    # The second frame only has counts in a few rows
+    frames[1][5:] = 0
+    return frames
+
+
+def assert_sums(update: live.Update | None, image: npt.NDArray[np.int64]) -> None:
+    assert update is not None
+    np.testing.assert_array_equal(update.image, image[update.rows])
+    np.testing.assert_array_equal(update.spectrum, image.sum(axis=0))
+    np.testing.assert_array_equal(update.decay, image.sum(axis=1))
+
+
+def test_acquisition_of_frames(
+    tmp_path: pathlib.Path, frames: list[npt.NDArray[np.int64]]
+) -> None:
+    acquisition = live.Acquisition(str(tmp_path))
+    assert not acquisition.poll()
+    assert acquisition.changes() is None
+    write_frame(tmp_path / "frame0.img", frames[0])
+    assert acquisition.poll()
+    update = acquisition.changes()
+    assert update is not None
+    assert (update.version, update.reset_version) == (1, 1)
+    np.testing.assert_array_equal(update.rows, np.arange(len(frames[0])))
+    assert_sums(update, frames[0])
+    write_frame(tmp_path / "frame1.img", frames[1])
+    write_frame(tmp_path / "frame2.img", frames[2])
+    assert acquisition.poll()
+    assert not acquisition.poll()
+    assert_sums(acquisition.changes(), np.sum(frames, axis=0))
+    # Only the rows of the last frame have changed since it was added
+    update = acquisition.changes(2)
+    assert update is not None
+    assert update.version == 3
+    np.testing.assert_array_equal(update.rows, np.flatnonzero(frames[2].any(axis=1)))
+
+
+def test_acquisition_of_frames_skips_incomplete_frame(
+    tmp_path: pathlib.Path, frames: list[npt.NDArray[np.int64]]
+) -> None:
+    acquisition = live.Acquisition(str(tmp_path))
+    write_frame(tmp_path / "frame0.img", frames[0])
+    raw = (tmp_path / "frame0.img").read_bytes()
+    (tmp_path / "frame1.img").write_bytes(raw[: len(raw) // 2])
+    acquisition.poll()
+    assert_sums(acquisition.changes(), frames[0])
+    write_frame(tmp_path / "frame1.img", frames[1])
+    assert acquisition.poll()
+    assert_sums(acquisition.changes(), frames[0] + frames[1])
+
+
+def test_acquisition_of_rewritten_image(
+    tmp_path: pathlib.Path, frames: list[npt.NDArray[np.int64]]
+) -> None:
+    path = tmp_path / "acquisition.img"
+    acquisition = live.Acquisition(str(path))
+    assert not acquisition.poll()
+    write_frame(path, frames[0])
+    assert acquisition.poll()
+    assert not acquisition.poll()
+    write_frame(path, frames[0] + frames[1])
+    os.utime(path, ns=(0, 0))  # Rewritten within the resolution of mtime
+    assert acquisition.poll()
+    update = acquisition.changes(1)
+    assert_sums(update, frames[0] + frames[1])
+    assert update is not None
+    np.testing.assert_array_equal(update.rows, np.flatnonzero(frames[1].any(axis=1)))
+
+
+def test_acquisition_of_rewritten_image_when_restarted(
+    tmp_path: pathlib.Path, frames: list[npt.NDArray[np.int64]]
+) -> None:
+    path = tmp_path / "acquisition.img"
+    acquisition = live.Acquisition(str(path))
+    write_frame(path, frames[0] + frames[2])
+    acquisition.poll()
+    write_frame(path, frames[1])
+    os.utime(path, ns=(0, 0))
+    acquisition.poll()
+    assert_sums(acquisition.changes(), frames[1])
+
+
+def test_list_acquisitions(
+    tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new=str(tmp_path))
+    (tmp_path / "frames").mkdir()
+    (tmp_path / "acquisition.img").touch()
+    (tmp_path / "notes.txt").touch()
+    (tmp_path / ".catalog.json").touch()
+    assert live.list_acquisitions() == ["acquisition.img", "frames"]
+
+
+def test_list_acquisitions_when_watch_dir_is_disabled(
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new="")
+    assert live.list_acquisitions() == []
+
+
+def test_get_acquisition(
+    tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new=str(tmp_path))
+    (tmp_path / "frames").mkdir()
+    acquisition = live.get_acquisition("frames")
+    assert acquisition.path == str(tmp_path / "frames")
+    assert live.get_acquisition("frames") is acquisition
+    for name in ["unexist", "..", "../frames"]:
+        with pytest.raises(ValueError):
+            live.get_acquisition(name)
+
+
+def test_get_acquisition_drops_removed_acquisitions(
+    tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new=str(tmp_path))
+    mocker.patch.dict(live._acquisitions, clear=True)
+    (tmp_path / "frames").mkdir()
+    (tmp_path / "acquisition.img").touch()
+    acquisition = live.get_acquisition("frames")
+    (tmp_path / "frames").rmdir()
+    live.get_acquisition("acquisition.img")
+    assert list(live._acquisitions) == [str(tmp_path / "acquisition.img")]
+    (tmp_path / "frames").mkdir()
+    assert live.get_acquisition("frames") is not acquisition
@@ -0,0 +1,105 @@
+import os
+import pathlib
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+import pytest_mock
+
+from dawa_trpl import __main__, batch
+
+
+@pytest.mark.parametrize("from_reloader", [True, False])
+def test_main_runs_app(from_reloader: bool, mocker: pytest_mock.MockerFixture) -> None:
+    app_mock = mocker.patch("dawa_trpl.web.app")
+    mocker.patch(
+        "werkzeug.serving.is_running_from_reloader", return_value=from_reloader
+    )
+    start_mock = mocker.patch("dawa_trpl.asgi.start_background_tasks")
+    __main__.main([])
+    app_mock.run_server.assert_called_once_with(debug=True)
+    # The parent process of the reloader only watches the sources
+    assert start_mock.called is from_reloader
+
+
+def test_main_runs_batch(mocker: pytest_mock.MockerFixture) -> None:
+    find_files_mock = mocker.patch("dawa_trpl.batch.find_files")
+    run_mock = mocker.patch("dawa_trpl.batch.run")
+    __main__.main(
+        [
+            "batch",
+            "images",
+            "*.img",
+            "-o",
+            "out",
+            "-w",
+            "450",
+            "470",
+            "--irf",
+            "irf.img",
+            "--pptx",
+        ]
+    )
+    find_files_mock.assert_called_once_with(["images", "*.img"])
+    run_mock.assert_called_once_with(
+        find_files_mock.return_value,
+        batch.Options(
+            out_dir="out",
+            wavelength_range=(450.0, 470.0),
+            model="double",
+            irf="irf.img",
+            file_format="csv",
+            pptx=True,
+        ),
+        None,
+    )
+
+
+def test_main_runs_batch_with_pptx_of_model_and_irf(
+    tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    # The presentation is fitted like the summary
+    item, irf = tmp_path / "item.img", tmp_path / "irf.img"
+    item.write_bytes(b"item")
+    irf.write_bytes(b"irf")
+    ds_mock = mocker.patch("dawa_trpl.batch.ds")
+    ds_mock.load_summary_df.return_value = pd.DataFrame(dict(filename=["item.img"]))
+    ds_mock.load_wavelength_df.return_value = pd.DataFrame(
+        dict(wavelength=[450.0, 500.0], intensity=[1.0, 2.0])
+    )
+    ds_mock.load_time_df.return_value = pd.DataFrame(dict(time=[0.0], intensity=[1.0]))
+    ds_mock.load_peaks_df.return_value = pd.DataFrame(dict(x=[480.0]))
+    build_mock = mocker.patch("dawa_trpl.powerpoint.build_presentation")
+    __main__.main(
+        [
+            "batch",
+            str(item),
+            "-o",
+            str(tmp_path / "out"),
+            "--model",
+            "single",
+            "--irf",
+            str(irf),
+            "--pptx",
+            "-j",
+            "1",
+        ]
+    )
+    ds_mock.load_summary_df.assert_called_once_with(str(item), None, "single", str(irf))
+    build_mock.assert_called_once_with(
+        str(item), (450.0, 500.0), model="single", irf_filepath=str(irf)
+    )
+
+
+def test_main_runs_batch_without_app() -> None:
+    # The batch command does not build the app
+    code = (
+        "import sys; from unittest import mock; from dawa_trpl import __main__; "
+        "mock.patch('dawa_trpl.batch.run').start(); "
+        "__main__.main(['batch', 'unexist']); "
+        "assert 'dawa_trpl.web' not in sys.modules; "
+        "assert 'dawa_trpl.powerpoint' not in sys.modules"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from dawa_trpl import fitting, models
+
+PARAMS = dict(
+    single=[1.0, 2.0],
+    double=[0.7, 0.5, 0.3, 4.0],
+    triple=[0.5, 0.3, 0.3, 2.0, 0.2, 8.0],
+    stretched=[1.0, 2.0, 0.6],
+    power_law=[1.0, 1.5, 1.8],
+)
+
+
+@pytest.fixture()
+def x() -> fitting.Array:
+    return np.linspace(0, 20, 500)
+
+
+def test_models_are_registered_by_name() -> None:
+    assert set(models.MODELS) == set(PARAMS)
+    for name, model in models.MODELS.items():
+        assert model.name == name
+    assert models.DEFAULT_MODEL in models.MODELS
+
+
+def test_get_model() -> None:
+    assert models.get_model("double") is models.MODELS["double"]
+
+
+def test_get_model_with_unknown_name() -> None:
+    with pytest.raises(ValueError):
+        models.get_model("unknown")
+
+
+@pytest.mark.parametrize("name", list(PARAMS))
+def test_jacobian(x: fitting.Array, name: str) -> None:
+    model = models.MODELS[name]
+    params = np.array([PARAMS[name]])
+    actual = model.jac(x, params)
+    assert actual.shape == (1, len(x), params.shape[1])
+    eps = 1e-7
+    for i in range(params.shape[1]):
+        dp = np.zeros(params.shape[1])
+        dp[i] = eps
+        expected = (model.func(x, params + dp) - model.func(x, params - dp)) / (2 * eps)
+        np.testing.assert_allclose(actual[..., i], expected, rtol=1e-5, atol=1e-7)
+
+
+@pytest.mark.parametrize("name", list(PARAMS))
+def test_func_is_finite_before_time_zero(name: str) -> None:
+    model = models.MODELS[name]
+    x = np.linspace(-5, 5, 11)
+    params = np.array([PARAMS[name]])
+    assert np.isfinite(model.func(x, params)).all()
+    assert np.isfinite(model.jac(x, params)).all()
+
+
+@pytest.mark.parametrize("name", list(PARAMS))
+def test_guess(x: fitting.Array, name: str) -> None:
+    model = models.MODELS[name]
+    y = model.func(x, np.array([PARAMS[name]] * 3))
+    p0 = model.guess(x, y, np.ones(y.shape, dtype=bool))
+    assert p0.shape == (3, len(PARAMS[name]))
+    assert (p0 > 0).all()
+
+
+@pytest.mark.parametrize("name", list(PARAMS))
+def test_fit_recovers_model(x: fitting.Array, name: str) -> None:
+    model = models.MODELS[name]
+    params = np.array([PARAMS[name]])
+    y = model.func(x, params)
+    mask = np.ones(y.shape, dtype=bool)
+    result = fitting.fit_batch(model.func, model.jac, x, y, model.guess(x, y, mask))
+    np.testing.assert_allclose(model.func(x, result.params), y, atol=1e-3)
+
+
+def test_summarize_double_exponential() -> None:
+    summary = models.MODELS["double"].summarize(np.array(PARAMS["double"]))
+    assert summary["a"] + summary["b"] == 100
+    assert {summary["tau1"], summary["tau2"]} == {0.5, 4.0}
+
+
+def test_summarize_triple_exponential() -> None:
+    summary = models.MODELS["triple"].summarize(np.array(PARAMS["triple"]))
+    assert [summary[f"tau{i}"] for i in range(1, 4)] == [0.3, 2.0, 8.0]
+    assert sum(summary[f"a{i}"] for i in range(1, 4)) == pytest.approx(100)
@@ -2,11 +2,14 @@ import os
 import pathlib
 
 import dash
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
 import pytest
 import pytest_mock
 from tlab_analysis import trpl
 
-from dawa_trpl import powerpoint
+from dawa_trpl import powerpoint, streak
 from tests import IMGDIR, FixtureRequest
 
 
@@ -51,7 +54,10 @@ def test_download_powerpoint_when_items_are_selected(
     get_existing_item_filepaths_mock = mocker.patch(
         "dawa_trpl.data_system.get_existing_item_filepaths", return_value=["item.img"]
     )
-    mocker.patch("dawa_trpl.data_system.load_trpl_data", return_value=trpl_data)
+    mocker.patch(
+        "dawa_trpl.data_system.load_image",
+        return_value=streak.StreakImage.from_trpl_data(trpl_data),
+    )
     validate_upload_dir_mock = mocker.patch("dawa_trpl.data_system.validate_upload_dir")
     result = powerpoint.download_powerpoint(
         n_clicks=1,
@@ -104,3 +110,187 @@ def test_download_powerpoint_when_selected_item_does_not_exist(
             h_fig=None,
             v_fig=None,
         )
+
+
+@pytest.mark.parametrize(
+    "intervals, expected",
+    [
+        (
+            dict(a=(20, 40), tau1=(0.45, 0.55), b=(60, 80), tau2=(3.8, 4.2)),
+            "95% CI: τ₁ = 0.45–0.55 ns, τ₂ = 3.8–4.2 ns",
+        ),
+        (dict(a=(0.9, 1.1), tau=(1.4, 1.6)), "95% CI: τ = 1.4–1.6 ns"),
+        (
+            dict(a=(0.9, 1.1), tau=(1.4, 1.6), beta=(0.6, 0.8)),
+            "95% CI: τ = 1.4–1.6 ns",
+        ),
+        (
+            dict(
+                a1=(10, 30),
+                tau1=(0.1, 0.3),
+                a2=(20, 40),
+                tau2=(0.9, 1.1),
+                a3=(40, 60),
+                tau3=(4.5, 5.5),
+            ),
+            "95% CI: τ₁ = 0.1–0.3 ns, τ₂ = 0.9–1.1 ns, τ₃ = 4.5–5.5 ns",
+        ),
+    ],
+    ids=["double", "single", "stretched", "triple"],
+)
+def test_add_intervals_textbox(
+    intervals: dict[str, tuple[float, float]],
+    expected: str,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    prs = mocker.MagicMock(slide_width=9144000, slide_height=6858000)
+    powerpoint.add_intervals_textbox(prs, intervals)
+    add_textbox = prs.slides[0].shapes.add_textbox
+    add_textbox.assert_called_once()
+    assert add_textbox.return_value.text_frame.text == expected
+
+
+def test_create_h_figure() -> None:
+    filepath = next(IMGDIR.glob("*.img")).as_posix()
+    fig = powerpoint.create_h_figure(filepath)
+    assert len(fig.data) == 1
+
+
+def test_create_v_figure() -> None:
+    filepath = next(IMGDIR.glob("*.img")).as_posix()
+    fig = powerpoint.create_v_figure(filepath, [460, 480])
+    # The decay and its fitting curve
+    assert len(fig.data) == 2
+
+
+@pytest.mark.parametrize(
+    "fit, expected",
+    [
+        (dict(a=30, tau1=0.5, b=70, tau2=4.0), (30, 70, 0.5, 4.0)),
+        (dict(a=2.0, tau=1.5), (100, 0, 1.5, 1.5)),
+        (dict(a=2.0, tau=1.5, beta=0.7), (100, 0, 1.5, 1.5)),
+        (
+            dict(a1=20.0, tau1=0.2, a2=30.0, tau2=1.0, a3=50.0, tau3=5.0),
+            (20, 80, 0.2, 5.0),
+        ),
+    ],
+    ids=["double", "single", "stretched", "triple"],
+)
+def test_get_slide_lifetimes(
+    fit: dict[str, float], expected: tuple[int, int, float, float]
+) -> None:
+    assert powerpoint.get_slide_lifetimes(fit) == expected
+
+
+@pytest.fixture()
+def load_time_df_mock(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
+    # A single exponential fit
+    load_time_df_mock: pytest_mock.MockType = mocker.patch(
+        "dawa_trpl.data_system.load_time_df"
+    )
+    load_time_df_mock.return_value.attrs = dict(
+        fit=dict(model="single", a=1.0, tau=2.0, params=np.array([1.0, 2.0]))
+    )
+    return load_time_df_mock
+
+
+@pytest.fixture()
+def build_mock(
+    load_time_df_mock: pytest_mock.MockType, mocker: pytest_mock.MockerFixture
+) -> pytest_mock.MockType:
+    # The presentation of an image without metadata
+    mocker.patch(
+        "dawa_trpl.data_system.load_image",
+        return_value=streak.StreakImage(
+            np.arange(3.0), np.arange(2.0), np.ones((3, 2)), ["", "", "", ""]
+        ),
+    )
+    mocker.patch(
+        "dawa_trpl.data_system.load_peaks_df",
+        return_value=pd.DataFrame(dict(x=[500.0], y=[1.0], width=[10.0])),
+    )
+    build_mock: pytest_mock.MockType = mocker.patch(
+        "tlab_pptx.presentation.photo_luminescence.build"
+    )
+    prs = build_mock.return_value
+    prs.slide_width, prs.slide_height = 9144000, 6858000
+    return build_mock
+
+
+def test_build_presentation_with_model_and_irf(
+    build_mock: pytest_mock.MockType, load_time_df_mock: pytest_mock.MockType
+) -> None:
+    prs = powerpoint.build_presentation(
+        "item.img",
+        (460.0, 480.0),
+        go.Figure(),
+        go.Figure(),
+        model="single",
+        irf_filepath="irf.img",
+    )
+    assert prs is build_mock.return_value
+    load_time_df_mock.assert_called_once_with(
+        "item.img",
+        (460.0, 480.0),
+        fitting=True,
+        irf_filepath="irf.img",
+        model="single",
+    )
+    kwargs = build_mock.call_args.kwargs
+    assert (kwargs["a"], kwargs["b"], kwargs["tau1"], kwargs["tau2"]) == (
+        100,
+        0,
+        2.0,
+        2.0,
+    )
+    add_textbox = prs.slides[0].shapes.add_textbox
+    add_textbox.assert_called_once()
+    assert add_textbox.return_value.text_frame.text == (
+        "Single Exponential: a = 1, tau = 2"
+    )
+
+
+def test_build_presentation_with_confidence_interval(
+    build_mock: pytest_mock.MockType, mocker: pytest_mock.MockerFixture
+) -> None:
+    load_fit_intervals_mock = mocker.patch(
+        "dawa_trpl.data_system.load_fit_intervals",
+        return_value=dict(a=(0.9, 1.1), tau=(1.8, 2.2)),
+    )
+    prs = powerpoint.build_presentation(
+        "item.img",
+        (460.0, 480.0),
+        go.Figure(),
+        go.Figure(),
+        confidence_interval=True,
+        model="single",
+        irf_filepath="irf.img",
+    )
+    load_fit_intervals_mock.assert_called_once_with(
+        "item.img", (460.0, 480.0), "single", "irf.img"
+    )
+    # The textbox of the fit and then the one of the intervals
+    add_textbox = prs.slides[0].shapes.add_textbox
+    assert add_textbox.call_count == 2
+    assert add_textbox.return_value.text_frame.text == "95% CI: τ = 1.8–2.2 ns"
+
+
+def test_download_powerpoint_forwards_model_and_irf(
+    upload_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.powerpoint.ds")
+    ds_mock.get_existing_item_filepaths.return_value = ["item.img"]
+    get_irf_filepath_mock = mocker.patch(
+        "dawa_trpl.components.tabs.v_figure_tab.get_irf_filepath",
+        return_value="irf.img",
+    )
+    build_mock = mocker.patch("dawa_trpl.powerpoint.build_presentation")
+    powerpoint.download_powerpoint(
+        1, ["item.img"], upload_dir, [460, 480], None, None, True, "single", "irf"
+    )
+    get_irf_filepath_mock.assert_called_once_with(
+        "irf", ds_mock.validate_upload_dir.return_value
+    )
+    build_mock.assert_called_once_with(
+        "item.img", (460.0, 480.0), None, None, True, "single", "irf.img"
+    )
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from dawa_trpl import pyramid
+
+
+@pytest.fixture()
+def time() -> pyramid.Array:
+    return np.linspace(0, 10, 1000)
+
+
+@pytest.fixture()
+def wavelength() -> pyramid.Array:
+    return np.linspace(435, 535, 641)
+
+
+@pytest.fixture()
+def image(time: pyramid.Array, wavelength: pyramid.Array) -> pyramid.Array:
+    rng = np.random.default_rng(0)
+    return rng.poisson(100, (len(time), len(wavelength))).astype(np.float64)
+
+
+@pytest.fixture()
+def levels(
+    time: pyramid.Array, wavelength: pyramid.Array, image: pyramid.Array
+) -> list[pyramid.Level]:
+    return pyramid.build_pyramid(time, wavelength, image, tile_size=64)
+
+
+def test_build_pyramid(levels: list[pyramid.Level], image: pyramid.Array) -> None:
+    assert [level.image.shape for level in levels] == [
+        (1000, 641),
+        (500, 321),
+        (250, 161),
+        (125, 81),
+        (63, 41),
+    ]
+    for level in levels:
+        assert level.image.shape == (len(level.time), len(level.wavelength))
+        assert level.image.dtype == np.float32
+    np.testing.assert_allclose(levels[1].image[0, 0], image[:2, :2].mean())
+    # The last column of an odd width is paired with itself
+    np.testing.assert_allclose(levels[1].image[0, -1], image[:2, -1].mean())
+    np.testing.assert_allclose(levels[1].wavelength[-1], 535)
+
+
+def test_build_pyramid_of_small_image() -> None:
+    levels = pyramid.build_pyramid(np.arange(3.0), np.arange(4.0), np.ones((3, 4)))
+    assert len(levels) == 1
+
+
+def test_to_arrays_and_from_arrays(levels: list[pyramid.Level]) -> None:
+    actual = pyramid.from_arrays(pyramid.to_arrays(levels))
+    assert len(actual) == len(levels)
+    for a, b in zip(actual, levels):
+        np.testing.assert_array_equal(a.time, b.time)
+        np.testing.assert_array_equal(a.wavelength, b.wavelength)
+        np.testing.assert_array_equal(a.image, b.image)
+
+
+@pytest.mark.parametrize(
+    "time_range, wavelength_range, expected",
+    [
+        (None, None, 4),
+        ((0.0, 0.5), (435.0, 440.0), 0),
+        ((0.0, 1.0), None, 4),
+        ((2.0, 4.0), (450.0, 480.0), 2),
+    ],
+)
+def test_select_level(
+    levels: list[pyramid.Level],
+    time_range: tuple[float, float] | None,
+    wavelength_range: tuple[float, float] | None,
+    expected: int,
+) -> None:
+    assert (
+        pyramid.select_level(levels, time_range, wavelength_range, tile_size=64)
+        == expected
+    )
+
+
+@pytest.mark.parametrize(
+    "time_range, wavelength_range",
+    [(None, None), ((2.0, 4.0), (450.0, 480.0)), ((9.9, 10.0), (534.0, 535.0))],
+)
+def test_get_tiles(
+    levels: list[pyramid.Level],
+    time_range: tuple[float, float] | None,
+    wavelength_range: tuple[float, float] | None,
+) -> None:
+    index = pyramid.select_level(levels, time_range, wavelength_range, tile_size=64)
+    level = levels[index]
+    tiles = pyramid.get_tiles(level, time_range, wavelength_range, tile_size=64)
+    # Payloads are bounded by a few tiles whatever the viewport is
+    assert max(tiles.image.shape) <= 3 * 64
+    assert tiles.image.shape == (len(tiles.time), len(tiles.wavelength))
+    for axis, full_axis, value_range in [
+        (tiles.time, level.time, time_range or (0.0, 10.0)),
+        (tiles.wavelength, level.wavelength, wavelength_range or (435.0, 535.0)),
+    ]:
+        assert axis[0] <= max(value_range[0], full_axis[0])
+        assert axis[-1] >= min(value_range[1], full_axis[-1])
+    start = int(np.searchsorted(level.time, tiles.time[0]))
+    assert start % 64 == 0
@@ -0,0 +1,158 @@
+import io
+import os
+import pathlib
+import subprocess
+import sys
+
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+import pytest_mock
+
+import dawa_trpl
+from dawa_trpl import batch, session
+from dawa_trpl import data_system as ds
+from tests import IMGDIR
+
+
+@pytest.fixture()
+def sess() -> session.Session:
+    return session.Session(IMGDIR.as_posix())
+
+
+def test_session_is_exported() -> None:
+    assert dawa_trpl.Session is session.Session
+    assert dawa_trpl.Dataset is session.Dataset
+
+
+def test_import_has_no_side_effect() -> None:
+    # Neither the app is built nor the janitor and the watcher are started
+    code = (
+        "import sys, threading, dawa_trpl; "
+        "assert 'dawa_trpl.web' not in sys.modules; "
+        "assert threading.active_count() == 1"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
+
+
+def test_session(sess: session.Session) -> None:
+    filepaths = batch.find_files([IMGDIR.as_posix()])
+    assert sess.filepaths == filepaths
+    assert sess.names == [os.path.basename(filepath) for filepath in filepaths]
+    assert len(sess) == len(filepaths)
+    assert [dataset.filepath for dataset in sess] == filepaths
+
+
+def test_session_getitem(sess: session.Session) -> None:
+    assert sess[0] == sess.datasets[0]
+    assert sess[sess.names[-1]] == sess.datasets[-1]
+    with pytest.raises(KeyError):
+        sess["unexist.img"]
+
+
+def test_dataset(tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture) -> None:
+    ds_mock = mocker.patch("dawa_trpl.session.ds")
+    dataset = session.Dataset(str(tmp_path / "item.img"))
+    assert dataset.name == "item.img"
+    assert dataset.image == ds_mock.load_image.return_value.copy.return_value
+    assert (
+        dataset.spectrum(True, (0.0, 1.0))
+        == ds_mock.load_wavelength_df.return_value.copy.return_value
+    )
+    ds_mock.load_wavelength_df.assert_called_once_with(
+        dataset.filepath, True, (0.0, 1.0)
+    )
+    assert (
+        dataset.decay((450.0, 470.0), True)
+        == ds_mock.load_time_df.return_value.copy.return_value
+    )
+    ds_mock.load_time_df.assert_called_once_with(
+        dataset.filepath, (450.0, 470.0), True, False, irf_filepath=None, model="double"
+    )
+
+
+def test_dataset_with_irf(
+    tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.session.ds")
+    ds_mock.load_fit_intervals.return_value = {"tau1": (1.0, 2.0)}
+    dataset = session.Dataset(str(tmp_path / "item.img"))
+    irf = str(tmp_path / "irf.img")
+    dataset.decay((450.0, 470.0), True, model="single", irf=irf)
+    ds_mock.load_time_df.assert_called_once_with(
+        dataset.filepath, (450.0, 470.0), True, False, irf_filepath=irf, model="single"
+    )
+    dataset.summary((450.0, 470.0), "single", irf)
+    ds_mock.load_summary_df.assert_called_once_with(
+        dataset.filepath, (450.0, 470.0), "single", irf
+    )
+    intervals = dataset.intervals((450.0, 470.0), "single", irf)
+    assert intervals == {"tau1": (1.0, 2.0)}
+    assert intervals is not ds_mock.load_fit_intervals.return_value
+    ds_mock.load_fit_intervals.assert_called_once_with(
+        dataset.filepath, (450.0, 470.0), "single", irf
+    )
+
+
+def test_dataset_global_analysis(sess: session.Session) -> None:
+    dataset = sess[0]
+    result = dataset.global_analysis(n_components=2, rank=5)
+    assert result.lifetimes.shape == (2,)
+    assert result.das.shape == (2, len(result.wavelength))
+    result.lifetimes[:] = -1.0
+    assert (dataset.global_analysis(n_components=2, rank=5).lifetimes > 0).all()
+
+
+def test_dataset_uses_caches(sess: session.Session) -> None:
+    dataset = sess[0]
+    ds._load_wavelength_df.cache_clear()
+    dataset.spectrum()
+    dataset.spectrum()
+    assert ds._load_wavelength_df.cache_info().misses == 1
+    pd.testing.assert_frame_equal(
+        dataset.decay(fitting=True), ds.load_time_df(dataset.filepath, fitting=True)
+    )
+
+
+def test_dataset_returns_copies(sess: session.Session) -> None:
+    dataset = sess[0]
+    spectrum = dataset.spectrum()
+    spectrum["intensity"] = 0.0
+    assert (dataset.spectrum()["intensity"] != 0.0).any()
+    decay = dataset.decay(fitting=True)
+    decay.attrs["fit"]["tau1"] = -1.0
+    assert dataset.decay(fitting=True).attrs["fit"]["tau1"] != -1.0
+    dataset.peaks().drop(dataset.peaks().index, inplace=True)
+    assert not dataset.peaks().empty
+    time, wavelength, image = dataset.streak_image()
+    image[:] = 0
+    assert dataset.image.intensity.any()
+
+
+def test_session_summary(sess: session.Session) -> None:
+    df = sess.summary()
+    assert df["filename"].to_list() == sess.names
+
+
+def test_session_run_batch(sess: session.Session, tmp_path: pathlib.Path) -> None:
+    df = sess.run_batch(str(tmp_path), workers=1, log=io.StringIO(), file_format="csv")
+    assert df["filename"].to_list() == sess.names
+    assert (tmp_path / "summary.csv").exists()
+
+
+@pytest.mark.parametrize(
+    "method, kwargs",
+    [
+        ("streak_image_figure", dict()),
+        ("h_figure", dict(show_peak_vline=True, show_FWHM_range=True)),
+        ("v_figure", dict(fitting=True, log_y=True)),
+        ("lifetime_map_figure", dict(binning=4)),
+    ],
+)
+def test_session_figures(
+    sess: session.Session, method: str, kwargs: dict[str, object]
+) -> None:
+    fig = getattr(sess, method)(**kwargs)
+    assert isinstance(fig, go.Figure)
+    assert fig.data
@@ -0,0 +1,158 @@
+import os
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+import pytest_mock
+
+from dawa_trpl import store
+from tests import IMGDIR
+
+
+@pytest.fixture()
+def _store(store_dir: str) -> store.Store:
+    return store.Store(store_dir)
+
+
+@pytest.fixture()
+def digest() -> str:
+    return "0123456789abcdef"
+
+
+def test_get_when_entry_does_not_exist(_store: store.Store, digest: str) -> None:
+    assert _store.get(digest, "kind") is None
+
+
+@pytest.mark.parametrize("key", [None, "key", [450.0, 500.0], [[450, 500], True]])
+def test_put_and_get(_store: store.Store, digest: str, key: object) -> None:
+    arrays = dict(x=np.arange(5), y=np.linspace(0, 1, 5))
+    _store.put(digest, "kind", arrays, key)
+    actual = _store.get(digest, "kind", key)
+    assert actual is not None
+    assert actual.keys() == arrays.keys()
+    for name, array in arrays.items():
+        np.testing.assert_array_equal(actual[name], array)
+
+
+def test_get_with_different_key(_store: store.Store, digest: str) -> None:
+    _store.put(digest, "kind", dict(x=np.arange(5)), "key")
+    assert _store.get(digest, "kind", "other") is None
+    assert _store.get(digest, "other", "key") is None
+
+
+@pytest.mark.parametrize("failing", ["numpy.savez", "os.replace"])
+def test_put_removes_temporary_file_on_failure(
+    _store: store.Store, digest: str, failing: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch(failing, side_effect=OSError("No space left on device"))
+    with pytest.raises(OSError):
+        _store.put(digest, "kind", dict(x=np.arange(5)))
+    directory = os.path.dirname(_store._blob_path(digest, "kind", "null"))
+    assert os.listdir(directory) == []
+    assert _store.get(digest, "kind") is None
+
+
+def test_store_survives_reopening(store_dir: str, digest: str) -> None:
+    store.Store(store_dir).put(digest, "kind", dict(x=np.arange(5)))
+    actual = store.Store(store_dir).get(digest, "kind")
+    assert actual is not None
+    np.testing.assert_array_equal(actual["x"], np.arange(5))
+
+
+def test_delete(_store: store.Store, digest: str) -> None:
+    _store.put(digest, "kind", dict(x=np.arange(5)), "key")
+    path = _store._blob_path(digest, "kind", '"key"')
+    assert os.path.exists(path)
+    _store.delete(digest)
+    assert _store.get(digest, "kind", "key") is None
+    assert not os.path.exists(path)
+
+
+def test_delete_removes_empty_directories(_store: store.Store, digest: str) -> None:
+    _store.put(digest, "kind", dict(x=np.arange(5)))
+    _store.delete(digest)
+    assert os.listdir(_store.directory) == ["index.sqlite3"]
+
+
+def test_usage(_store: store.Store, digest: str) -> None:
+    assert _store.usage() == []
+    _store.put(digest, "kind", dict(x=np.arange(5)), "a")
+    _store.put(digest, "kind", dict(x=np.arange(5)), "b")
+    ((actual_digest, size, accessed),) = _store.usage()
+    assert actual_digest == digest
+    assert size == 2 * os.path.getsize(_store._blob_path(digest, "kind", '"a"'))
+    assert accessed > 0
+
+
+@pytest.mark.parametrize(
+    "quota, ttl, expected",
+    [
+        (0, 0, []),
+        (0, 150, ["old"]),
+        (1, 0, ["old", "new"]),
+        (-1, 50, ["old", "new"]),
+    ],
+)
+def test_prune(
+    _store: store.Store,
+    quota: int,
+    ttl: float,
+    expected: list[str],
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    mocker.patch("time.time", return_value=0.0)
+    _store.put("old", "kind", dict(x=np.arange(5)))
+    mocker.patch("time.time", return_value=100.0)
+    _store.put("new", "kind", dict(x=np.arange(5)))
+    assert _store.prune(quota, ttl, now=200.0) == expected
+    for digest in ("old", "new"):
+        assert (_store.get(digest, "kind") is None) is (digest in expected)
+
+
+def test_prune_keeps_recently_used(
+    _store: store.Store, mocker: pytest_mock.MockerFixture
+) -> None:
+    mocker.patch("time.time", return_value=0.0)
+    _store.put("old", "kind", dict(x=np.arange(5)))
+    _store.put("new", "kind", dict(x=np.arange(5)))
+    mocker.patch("time.time", return_value=100.0)
+    _store.get("old", "kind")
+    size = sum(size for _, size, _ in _store.usage())
+    assert _store.prune(size - 1, 0, now=200.0) == ["new"]
+
+
+def test_put_df_and_get_df(_store: store.Store, digest: str) -> None:
+    df = pd.DataFrame(dict(time=np.linspace(0, 10, 5), intensity=np.arange(5.0)))
+    df.attrs["fit"] = dict(a=30, tau1=np.float64(0.5), params=np.array([1.0, 2.0]))
+    _store.put_df(digest, "kind", df)
+    actual = _store.get_df(digest, "kind")
+    assert actual is not None
+    pd.testing.assert_frame_equal(actual, df, check_flags=False)
+    assert actual.attrs["fit"]["a"] == 30
+    assert actual.attrs["fit"]["tau1"] == 0.5
+    np.testing.assert_array_equal(actual.attrs["fit"]["params"], [1.0, 2.0])
+
+
+def test_get_df_when_entry_does_not_exist(_store: store.Store, digest: str) -> None:
+    assert _store.get_df(digest, "kind") is None
+
+
+def test_get_store(store_dir: str) -> None:
+    assert store.get_store() is store.get_store()
+    assert store.get_store().directory == store_dir
+
+
+def test_file_digest() -> None:
+    filepaths = sorted(IMGDIR.glob("*.img"))
+    digests = [store.file_digest(str(filepath)) for filepath in filepaths]
+    assert digests == [store.file_digest(str(filepath)) for filepath in filepaths]
+    assert all(len(digest) == 40 for digest in digests)
+
+
+def test_file_digest_changes_with_content(tmp_path: pathlib.Path) -> None:
+    filepath = tmp_path / "item.img"
+    filepath.write_bytes(b"content")
+    digest = store.file_digest(str(filepath))
+    filepath.write_bytes(b"modified content")
+    assert store.file_digest(str(filepath)) != digest
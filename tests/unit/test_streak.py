@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+import pytest_mock
+
+from dawa_trpl import streak
+
+
+@pytest.fixture()
+def image() -> streak.StreakImage:
+    return streak.StreakImage(
+        time=np.arange(3.0, dtype=np.float32),
+        wavelength=np.array([450.0, 460.0, 470.0, 480.0], dtype=np.float32),
+        intensity=np.arange(12, dtype=np.uint16).reshape(3, 4),
+        metadata=["Frame=1,"],
+    )
+
+
+def test_streak_image_has_no_dict(image: streak.StreakImage) -> None:
+    assert not hasattr(image, "__dict__")
+
+
+def test_streak_image_with_mismatched_axes() -> None:
+    with pytest.raises(ValueError):
+        streak.StreakImage(np.arange(2.0), np.arange(4.0), np.zeros((3, 4)), [])
+
+
+@pytest.mark.parametrize(
+    "values, dtype, expected",
+    [
+        ([0.0, 255.0], None, np.uint8),
+        ([0.0, 1000.0], None, np.uint16),
+        ([0.0, 255.0], np.dtype(np.uint16), np.uint16),
+        ([0.0, 70000.0], np.dtype(np.uint16), np.uint32),
+        ([0.5, 1.0], None, np.float64),
+        ([-1.0, 1.0], None, np.float64),
+    ],
+)
+def test_from_trpl_data(
+    values: list[float],
+    dtype: np.dtype[np.unsignedinteger] | None,
+    expected: type,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    data = mocker.Mock()
+    data.time = pd.Series([0.0, 0.0, 1.0, 1.0])
+    data.wavelength = pd.Series([450.0, 460.0, 450.0, 460.0])
+    data.to_streak_image.return_value = np.array([values, values])
+    data.metadata = ("Frame=1,",)
+    image = streak.StreakImage.from_trpl_data(data, dtype)
+    np.testing.assert_array_equal(image.time, [0.0, 1.0])
+    np.testing.assert_array_equal(image.wavelength, [450.0, 460.0])
+    np.testing.assert_array_equal(image.intensity, [values, values])
+    assert image.intensity.dtype == expected
+    assert image.metadata == ["Frame=1,"]
+
+
+def test_copy(image: streak.StreakImage) -> None:
+    copied = image.copy()
+    copied.intensity[0, 0] = 100
+    copied.metadata.append("copied")
+    assert image.intensity[0, 0] == 0
+    assert image.metadata == ["Frame=1,"]
+    np.testing.assert_array_equal(copied.time, image.time)
+
+
+def test_nbytes(image: streak.StreakImage) -> None:
+    assert image.nbytes == 3 * 4 + 4 * 4 + 12 * 2
+
+
+def test_ranges(image: streak.StreakImage) -> None:
+    assert image.time_range == (0.0, 2.0)
+    assert image.wavelength_range == (450.0, 480.0)
+
+
+def test_aggregate_along_time(image: streak.StreakImage) -> None:
+    df = image.aggregate_along_time()
+    assert list(df.columns) == ["wavelength", "intensity"]
+    np.testing.assert_array_equal(df["wavelength"], image.wavelength)
+    np.testing.assert_array_equal(df["intensity"], [12.0, 15.0, 18.0, 21.0])
+    assert df["intensity"].dtype == np.float64
+
+
+@pytest.mark.parametrize(
+    "wavelength_range, expected",
+    [(None, [6.0, 22.0, 38.0]), ((455.0, 470.0), [3.0, 11.0, 19.0])],
+)
+def test_aggregate_along_wavelength(
+    image: streak.StreakImage,
+    wavelength_range: tuple[float, float] | None,
+    expected: list[float],
+) -> None:
+    df = image.aggregate_along_wavelength(wavelength_range)
+    assert list(df.columns) == ["time", "intensity"]
+    np.testing.assert_array_equal(df["time"], image.time)
+    np.testing.assert_array_equal(df["intensity"], expected)
+
+
+def test_to_df(image: streak.StreakImage) -> None:
+    df = image.to_df()
+    assert len(df) == image.intensity.size
+    row = df.iloc[5]
+    assert (row["time"], row["wavelength"], row["intensity"]) == (1.0, 460.0, 5)
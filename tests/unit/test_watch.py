@@ -0,0 +1,197 @@
+import os
+import pathlib
+import threading
+
+import pytest
+import pytest_mock
+
+from dawa_trpl import catalog, watch
+
+
+@pytest.fixture()
+def watch_dir(tmp_path: pathlib.Path) -> str:
+    return str(tmp_path)
+
+
+@pytest.fixture()
+def ingest_mock(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
+    return mocker.patch("dawa_trpl.watch.ingest")
+
+
+@pytest.fixture()
+def discard_mock(mocker: pytest_mock.MockerFixture) -> pytest_mock.MockType:
+    return mocker.patch("dawa_trpl.watch.discard")
+
+
+def write(watch_dir: str, name: str, content: bytes = b"\0") -> None:
+    pathlib.Path(watch_dir, name).write_bytes(content)
+
+
+def test_stat_files(watch_dir: str) -> None:
+    write(watch_dir, "item.img", b"\0" * 10)
+    write(watch_dir, ".catalog.json")
+    os.mkdir(os.path.join(watch_dir, "subdir"))
+    stats = watch.stat_files(watch_dir)
+    assert list(stats) == ["item.img"]
+    assert stats["item.img"][0] == 10
+
+
+def test_scanner(watch_dir: str) -> None:
+    write(watch_dir, "old.img")
+    scanner = watch.Scanner(watch_dir)
+    assert scanner.scan() == ([], [])
+    write(watch_dir, "new.img")
+    # Reported once it stops changing
+    assert scanner.scan() == ([], [])
+    write(watch_dir, "new.img", b"\0" * 2)
+    assert scanner.scan() == ([], [])
+    assert scanner.scan() == (["new.img"], [])
+    assert scanner.scan() == ([], [])
+    os.remove(os.path.join(watch_dir, "old.img"))
+    assert scanner.scan() == ([], ["old.img"])
+
+
+def test_scanner_mark_seen(watch_dir: str) -> None:
+    scanner = watch.Scanner(watch_dir)
+    write(watch_dir, "new.img")
+    assert scanner.scan() == ([], [])
+    scanner.mark_seen(["new.img", "missing.img"])
+    assert list(scanner.seen) == ["new.img"]
+    assert scanner.scan() == ([], [])
+
+
+@pytest.mark.skipif(not hasattr(os, "pipe2"), reason="inotify is only of Linux")
+def test_inotify(watch_dir: str) -> None:
+    inotify = watch.Inotify(watch_dir)
+    try:
+        assert inotify.read(0.01) == []
+        write(watch_dir, "item.img")
+        os.mkdir(os.path.join(watch_dir, "subdir"))
+        write(os.path.join(watch_dir, "subdir"), "moved.img")
+        os.rename(
+            os.path.join(watch_dir, "subdir", "moved.img"),
+            os.path.join(watch_dir, "moved.img"),
+        )
+        assert inotify.read(1.0) == ["item.img", "moved.img"]
+    finally:
+        inotify.close()
+
+
+def test_inotify_when_directory_does_not_exist(tmp_path: pathlib.Path) -> None:
+    with pytest.raises((OSError, AttributeError)):
+        watch.Inotify(str(tmp_path / "unexist"))
+
+
+def test_ingest(watch_dir: str, mocker: pytest_mock.MockerFixture) -> None:
+    ds_mock = mocker.patch("dawa_trpl.watch.ds")
+    ds_mock.load_wavelength_df.side_effect = [ValueError, None]
+    catalog.get_catalog(watch_dir)
+    write(watch_dir, "broken.img")
+    write(watch_dir, "item.img")
+    watch.ingest(watch_dir, ["broken.img", "item.img"])
+    filepaths = [os.path.join(watch_dir, name) for name in ["broken.img", "item.img"]]
+    # New files have nothing to invalidate
+    ds_mock.invalidate_filepaths.assert_called_once_with([])
+    assert sorted(catalog.get_catalog(watch_dir).names()) == ["broken.img", "item.img"]
+    # A failure does not stop the others
+    ds_mock.load_time_df.assert_called_once_with(filepaths[1], fitting=True)
+
+
+def test_ingest_replaced_file(
+    watch_dir: str, mocker: pytest_mock.MockerFixture
+) -> None:
+    ds_mock = mocker.patch("dawa_trpl.watch.ds")
+    write(watch_dir, "item.img")
+    catalog.get_catalog(watch_dir)
+    write(watch_dir, "item.img", b"\1")
+    write(watch_dir, "new.img")
+    watch.ingest(watch_dir, ["item.img", "new.img"])
+    ds_mock.invalidate_filepaths.assert_called_once_with(
+        [os.path.join(watch_dir, "item.img")]
+    )
+
+
+def test_discard(watch_dir: str, mocker: pytest_mock.MockerFixture) -> None:
+    invalidate_mock = mocker.patch("dawa_trpl.data_system.invalidate_filepaths")
+    write(watch_dir, "item.img")
+    catalog.get_catalog(watch_dir).add(["item.img"])
+    os.remove(os.path.join(watch_dir, "item.img"))
+    watch.discard(watch_dir, ["item.img"])
+    assert catalog.get_catalog(watch_dir).names() == []
+    invalidate_mock.assert_called_once_with([os.path.join(watch_dir, "item.img")])
+
+
+def test_watcher_sync(
+    watch_dir: str,
+    ingest_mock: pytest_mock.MockType,
+    discard_mock: pytest_mock.MockType,
+) -> None:
+    write(watch_dir, "known.img")
+    write(watch_dir, "gone.img")
+    catalog.get_catalog(watch_dir).add(["known.img", "gone.img"])
+    os.remove(os.path.join(watch_dir, "gone.img"))
+    write(watch_dir, "new.img")
+    watcher = watch.Watcher(watch_dir, 0.01)
+    watcher.sync(watch.Scanner(watch_dir))
+    ingest_mock.assert_called_once_with(watch_dir, ["new.img"])
+    discard_mock.assert_called_once_with(watch_dir, ["gone.img"])
+
+
+def test_watcher_step_with_inotify(
+    watch_dir: str,
+    ingest_mock: pytest_mock.MockType,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    scanner = watch.Scanner(watch_dir)
+    write(watch_dir, "item.img")
+    inotify_mock = mocker.Mock(spec=watch.Inotify)
+    inotify_mock.read.return_value = ["item.img", ".catalog.json", "gone.img"]
+    watch.Watcher(watch_dir, 0.01).step(scanner, inotify_mock)
+    # Notified files need no second scan
+    ingest_mock.assert_called_once_with(watch_dir, ["item.img"])
+
+
+def test_watcher_step_with_polling(
+    watch_dir: str,
+    ingest_mock: pytest_mock.MockType,
+    discard_mock: pytest_mock.MockType,
+) -> None:
+    write(watch_dir, "old.img")
+    scanner = watch.Scanner(watch_dir)
+    watcher = watch.Watcher(watch_dir, 0.01)
+    write(watch_dir, "item.img")
+    os.remove(os.path.join(watch_dir, "old.img"))
+    watcher.step(scanner, None)
+    ingest_mock.assert_not_called()
+    discard_mock.assert_called_once_with(watch_dir, ["old.img"])
+    watcher.step(scanner, None)
+    ingest_mock.assert_called_once_with(watch_dir, ["item.img"])
+
+
+def test_watcher(watch_dir: str, mocker: pytest_mock.MockerFixture) -> None:
+    ingested = threading.Event()
+    mocker.patch("dawa_trpl.watch.ingest", side_effect=lambda *_: ingested.set())
+    # The file is found by either the sync on start or the following steps
+    catalog.get_catalog(watch_dir)
+    watcher = watch.Watcher(watch_dir, 0.01)
+    watcher.start()
+    try:
+        write(watch_dir, "item.img")
+        assert ingested.wait(5.0)
+    finally:
+        watcher.stop()
+        watcher.join(5.0)
+    assert not watcher.is_alive()
+
+
+def test_start(watch_dir: str, mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new=watch_dir)
+    watcher = watch.start()
+    assert watcher is not None
+    watcher.stop()
+    watcher.join(5.0)
+
+
+def test_start_when_disabled(mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("dawa_trpl.config.WATCH_DIR", new="")
+    assert watch.start() is None